@@ -4,8 +4,8 @@
 
 import streamlit as st
 from streamlit_option_menu import option_menu
+import importlib
 import logging
-from pathlib import Path
 
 # Настраиваем базовую конфигурацию - ДОЛЖНО БЫТЬ ПЕРВОЙ КОМАНДОЙ STREAMLIT!
 st.set_page_config(
@@ -15,195 +15,23 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-def add_custom_styles():
-    """Добавляет кастомные стили для профессиональной навигационной панели с цветами проекта."""
-    
-    st.markdown('<link rel="stylesheet" href="static/accessibility.css">', unsafe_allow_html=True)
-    st.markdown("""
-    <style>
-    /* Глобальные цвета темы - в соответствии с проектом */
-    :root {
-        --primary-color: #FF4B4B; /* Красный акцент */
-        --secondary-color: #0B2545; /* Темно-синий фон */
-        --accent-color: #134074; /* Средний синий */
-        --highlight-color: #8DA9C4; /* Светло-синий */
-        --text-color: #FFFFFF; /* Белый текст */
-    }
-    
-    /* Усовершенствованный стиль для сайдбара */
-    section.st-emotion-cache-vk3wp9.e1fqkh3o11, 
-    section[data-testid="stSidebar"],
-    div.st-emotion-cache-6qob1r.e1fqkh3o3 {
-        background: linear-gradient(150deg, #0b2545 0%, #173b73 90%);
-        width: auto !important;
-        min-width: 250px !important;
-        max-width: 320px !important;
-        box-shadow: 2px 0 16px rgba(0,0,0,0.3) !important;
-        border-right: 1px solid rgba(255,255,255,0.1);
-    }
-    
-    /* Стилизация изображения логотипа */
-    .st-emotion-cache-1kyxreq.e1tzin5v3 img {
-        margin: 0 auto;
-        display: block;
-        max-width: 90%;
-        height: auto;
-        transition: transform 0.3s ease;
-    }
-    
-    .st-emotion-cache-1kyxreq.e1tzin5v3 img:hover {
-        transform: scale(1.02);
-    }
-    
-    /* Улучшенные стили для навигационных пунктов */
-    .nav-link {
-        white-space: nowrap !important;
-        overflow: hidden !important;
-        text-overflow: ellipsis !important;
-        font-size: 16px !important;
-        margin: 4px 0 !important;
-        border-radius: 6px !important;
-        transition: all 0.3s ease !important;
-    }
-    
-    .nav-link:hover {
-        background-color: rgba(255,255,255,0.1) !important;
-        color: #ffffff !important;
-        transform: translateX(3px);
-        letter-spacing: 0.3px;
-    }
-    
-    /* Анимации и эффекты для выбранного элемента */
-    .nav-link-selected {
-        transition: all 0.3s ease !important;
-        box-shadow: 0 2px 8px rgba(0,0,0,0.2) !important;
-    }
-    
-    /* Настройка адаптивности сайдбара */
-    @media (min-width: 1200px) {
-        section[data-testid="stSidebar"] {
-            min-width: 280px !important;
-            max-width: 320px !important;
-        }
-    }
-    
-    @media (max-width: 1199px) and (min-width: 992px) {
-        section[data-testid="stSidebar"] {
-            min-width: 260px !important;
-            max-width: 300px !important;
-        }
-    }
-    
-    @media (max-width: 991px) and (min-width: 768px) {
-        section[data-testid="stSidebar"] {
-            min-width: 240px !important;
-            max-width: 280px !important;
-        }
-    }
-    
-    @media (max-width: 767px) {
-        section[data-testid="stSidebar"] {
-            min-width: 220px !important;
-            max-width: 260px !important;
-        }
-    }
-    
-    /* Убираем лишние отступы и рамки */
-    .css-1544g2n.e1fqkh3o4 {
-        padding: 0 !important;
-    }
-    
-    /* Улучшенные стили для скролл-бара */
-    ::-webkit-scrollbar {
-        width: 5px;
-        height: 5px;
-    }
-    
-    ::-webkit-scrollbar-track {
-        background: rgba(0,0,0,0.1);
-        border-radius: 10px;
-    }
-    
-    ::-webkit-scrollbar-thumb {
-        background: linear-gradient(45deg, #FF4B4B, #ff6b6b);
-        border-radius: 10px;
-        border: 1px solid rgba(255,255,255,0.1);
-    }
-    
-    ::-webkit-scrollbar-thumb:hover {
-        background: #ff3b3b;
-    }
-    
-    /* Фикс для отображения контента */
-    .stApp {
-        overflow-x: hidden;
-    }
-    
-    /* Исправление для горизонтального скролла */
-    .st-emotion-cache-18ni7ap.ezrtsby2 {
-        overflow-x: auto !important;
-    }
-    
-    /* Убираем отступы в контейнерах */
-    div.st-emotion-cache-16txtl3.eczjsme4 {
-        padding: 0 !important;
-    }
-    
-    /* Стили для всех селекторов меню */
-    div[data-testid="stVerticalBlock"] div[data-baseweb="select"] div,
-    div[data-testid="stVerticalBlock"] div[role="listbox"],
-    div[data-testid="stVerticalBlock"] div[data-baseweb="select"] ul {
-        white-space: nowrap !important;
-        overflow: hidden !important;
-        text-overflow: ellipsis !important;
-    }
-    
-    /* Улучшенные стили для streamlit-option-menu */
-    #MainMenu, #main-menu, #main_menu {
-        white-space: nowrap !important;
-        overflow: hidden !important;
-        font-family: 'SF Pro Display', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif !important;
-    }
-    
-    /* Корректировка отступов в меню */
-    .css-17ziqus, .css-pkbazv, .st-emotion-cache-17ziqus, .st-emotion-cache-pkbazv {
-        padding-left: 15px !important;
-        padding-right: 15px !important;
-    }
-    
-    /* Установка фиксированной ширины основных элементов меню */
-    .css-17ziqus, .st-emotion-cache-17ziqus {
-        width: 100% !important;
-        max-width: 300px !important;
-    }
-    
-    /* Уменьшаем размер значков в меню и добавляем анимацию */
-    .nav-link svg {
-        width: 18px !important;
-        height: 18px !important;
-        margin-right: 10px !important;
-        transition: transform 0.3s ease !important;
-    }
-    
-    .nav-link:hover svg {
-        transform: translateX(2px) !important;
-    }
-    
-    /* Делаем текст меню более заметным */
-    .nav-link span {
-        font-weight: 500 !important;
-        letter-spacing: 0.5px !important;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-
 # Импорты из структурированных модулей
-from src.pages import home, analysis, predict, team, info
+# (страницы и сервисы моделей загружаются лениво: torch, XGBoost, pymatgen и RDKit
+# импортируются только при первом расчете на странице «AI синтез»)
 from src.utils.ui import load_user_preferences
-from src.utils.storage import clear_prediction_cache
-from src.services.model_service import ModelService
-from src.config.app_config import LOGGING_CONFIG
-from src.config.model_config import MODEL_CONFIG
+from src.utils.ui import inject_css_bundle, page_image
+from src.utils.performance.instrumentation import latency_tracker
+from src.utils.performance.metrics import start_metrics_server, write_metrics_textfile
+from src.config.app_config import LOGGING_CONFIG, METRICS_CONFIG
+
+# Модули страниц по пунктам меню
+PAGE_MODULES = {
+    "Главная": "src.pages.home",
+    "AI синтез": "src.pages.predict",
+    "О MOF": "src.pages.info",
+    "Анализ": "src.pages.analysis",
+    "О проекте": "src.pages.team",
+}
 
 # Настройка логирования
 import logging.config
@@ -212,30 +40,62 @@ logger = logging.getLogger(__name__)
 
 # Загружаем стили
 def load_styles():
-    """Загружает CSS стили для приложения."""
-    css_path = Path("static/style.css")
-    if css_path.exists():
-        with open(css_path, encoding='utf-8') as css_file:
-            st.markdown(f'<style>{css_file.read()}</style>', unsafe_allow_html=True)
-    else:
-        logger.error(f"Файл стилей не найден: {css_path}")
+    """
+    Подключает CSS-бандл приложения (общие стили и навигационная панель).
+    Бандл собирается один раз на процесс, далее передается ссылкой на кэшируемый файл.
+    """
+    inject_css_bundle('app')
+
+def export_metrics():
+    """
+    Экспортирует метрики в формате Prometheus: в файл textfile-коллектора,
+    если путь задан, иначе через локальный эндпоинт /metrics.
+    """
+    if not METRICS_CONFIG['enabled']:
+        return
+    if METRICS_CONFIG['textfile_path']:
+        write_metrics_textfile()
+        return
+    try:
+        start_metrics_server()
+    except OSError as e:
+        logger.warning(f"Не удалось запустить эндпоинт метрик: {str(e)}")
 
-def initialize_services():
-    """Инициализирует сервисы приложения."""
-    # Инициализируем сервис моделей (ленивая загрузка)
-    if 'model_service' not in st.session_state:
-        logger.info("Инициализация сервиса моделей")
-        st.session_state.model_service = ModelService()
+def create_performance_panel():
+    """Отображает в сайдбаре замеры задержек стадий конвейера предсказаний."""
+    with st.expander("⏱️ Производительность", expanded=False):
+        # Трекер общий для процесса: переключатель показывает его текущее состояние
+        # и меняет его только по действию пользователя, а не при каждом перезапуске
+        # скрипта (иначе сессия со снятым флажком выключала бы замеры для всех)
+        st.session_state.latency_instrumentation = latency_tracker.enabled
+        st.checkbox(
+            "Замер задержек конвейера",
+            key="latency_instrumentation",
+            on_change=lambda: latency_tracker.set_enabled(st.session_state.latency_instrumentation),
+            help="Замеряет время каждой стадии предсказания и ее подфаз (признаки, масштабирование, инференс, декодирование). "
+                 "Переключатель действует на все сессии процесса."
+        )
         
-    # Проверяем кэш предсказаний
-    if 'cache_cleared' not in st.session_state:
-        st.session_state.cache_cleared = False
-    
-    # Очищаем кэш при запуске приложения (только один раз)
-    if not st.session_state.cache_cleared:
-        clear_prediction_cache()
-        st.session_state.cache_cleared = True
-        logger.info("Кэш предсказаний очищен при инициализации")
+        stats = latency_tracker.get_stats()
+        if not stats:
+            st.caption("Замеров пока нет. Выполните расчет на странице «AI синтез».")
+            return
+        
+        rows = [
+            {
+                "Стадия": key,
+                "N": summary['count'],
+                "p50, мс": round(summary['p50_ms'], 2),
+                "p99, мс": round(summary['p99_ms'], 2),
+                "Посл., мс": round(summary['last_ms'], 2)
+            }
+            for key, summary in stats.items()
+        ]
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        
+        if st.button("Сбросить замеры", key="reset_latency_stats"):
+            latency_tracker.reset()
+            st.rerun()
 
 def create_sidebar():
     """Создает профессиональную навигационную панель с цветами проекта."""
@@ -244,7 +104,7 @@ def create_sidebar():
     with st.sidebar:
         # Контейнер для логотипа с отступами и улучшенным отображением
         with st.container():
-            st.image("images/logo.png", use_container_width=True)
+            st.image(page_image("logo.png"), use_container_width=True)
         
         # Элегантный разделитель после логотипа
         st.markdown("""
@@ -312,6 +172,9 @@ def create_sidebar():
             }
         )
         
+        # Панель замеров задержек конвейера предсказаний
+        create_performance_panel()
+        
         # Добавляем элегантный футер в нижней части сайдбара
         st.markdown("""
         <div style="position: fixed; bottom: 0; left: 0; width: 100%; background: linear-gradient(0deg, #0B2545 0%, transparent 100%); 
@@ -335,26 +198,16 @@ def run():
         # Загружаем стили
         load_styles()
         
-        # Добавляем кастомные стили для навигационной панели
-        add_custom_styles()
-        
-        # Инициализируем сервисы
-        initialize_services()
-        
         # Создаем боковое меню и получаем выбранный пункт
         selected = create_sidebar()
         
-        # Выбор и отображение страницы
-        if selected == "Главная":
-            home.show()
-        elif selected == "AI синтез": # Сокращенное название
-            predict.show()
-        elif selected == "О MOF": # Сокращенное название
-            info.show()
-        elif selected == "Анализ":
-            analysis.show()
-        elif selected == "О проекте":
-            team.show()
+        # Выбор и отображение страницы (модуль импортируется при первом выборе)
+        page_module = PAGE_MODULES.get(selected)
+        if page_module:
+            importlib.import_module(page_module).show()
+
+        # Экспортируем метрики после отрисовки страницы
+        export_metrics()
             
     except Exception as e:
         logger.error(f"Ошибка при запуске приложения: {str(e)}", exc_info=True)
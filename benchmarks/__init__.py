@@ -0,0 +1,6 @@
+"""
+Бенчмарки производительности конвейера AdsorpNET.
+
+Запуск из корня репозитория:
+    python -m benchmarks.bench_pipeline --output bench_results.json
+"""
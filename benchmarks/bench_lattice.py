@@ -0,0 +1,123 @@
+"""
+Проверка решетки предсказаний: задержка запроса и согласие с точным расчетом.
+
+Для воспроизводимой выборки точек из рабочих диапазонов формы
+(sample_input_grid) сравнивает ответы решетки с результатами точного
+конвейера (run_batch_prediction) и замеряет задержку запросов.
+
+Отчет:
+    - задержка запроса к решетке (p50/p99, мкс);
+    - доля ответов в пределах допуска (без перехода к точному расчету);
+    - доля совпадений категориального рецепта (металл, лиганд, растворитель,
+      температуры) — для всех ответов решетки и для ответов в пределах допуска;
+    - медианная и 95-процентильная относительная ошибка масс и объема.
+
+Пример:
+    python -m benchmarks.bench_lattice --points 2000
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+logger = logging.getLogger(__name__)
+
+CATEGORICAL_FIELDS = {
+    'metal': 'metal_type', 'ligand': 'ligand_type', 'solvent': 'solvent_type',
+    'tsyn': 'temperature', 'tdry': 'temperature', 'treg': 'temperature',
+}
+NUMERIC_FIELDS = ('salt_mass', 'acid_mass', 'synthesis_volume')
+
+
+def _same_class(first: Any, second: Any) -> bool:
+    """Сравнивает классы (температуры — как числа)."""
+    if isinstance(first, str) or isinstance(second, str):
+        return str(first) == str(second)
+    return float(first) == float(second)
+
+
+def compare(approximate: List[Dict[str, Any]], exact: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Сравнивает ответы решетки с точными результатами.
+
+    Args:
+        approximate: Ответы PredictionLattice.predict (без точного расчета)
+        exact: Результаты run_batch_prediction для тех же точек
+
+    Returns:
+        Dict[str, float]: Доли совпадений и ошибки числовых выходов
+    """
+    within = np.array([item['approximation']['within_tolerance'] for item in approximate])
+    matches = np.array([
+        all(_same_class(a[key][field], e[key][field]) for key, field in CATEGORICAL_FIELDS.items())
+        for a, e in zip(approximate, exact)
+    ])
+    errors = np.array([
+        [abs(a[key] - e[key]) / max(abs(e[key]), 1e-9) for key in NUMERIC_FIELDS]
+        for a, e in zip(approximate, exact)
+    ])
+    within_errors = errors[within] if within.any() else np.zeros((1, len(NUMERIC_FIELDS)))
+    return {
+        'within_tolerance_share': float(within.mean()),
+        'recipe_agreement': float(matches.mean()),
+        'recipe_agreement_within_tolerance': float(matches[within].mean()) if within.any() else float('nan'),
+        'numeric_error_p50': float(np.median(errors)),
+        'numeric_error_p95': float(np.quantile(errors, 0.95)),
+        'numeric_error_within_tolerance_p95': float(np.quantile(within_errors, 0.95)),
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Проверка решетки предсказаний")
+    parser.add_argument('--lattice', help="Каталог решетки (по умолчанию из LATTICE_CONFIG)")
+    parser.add_argument('--points', type=int, default=1000, help="Число проверочных точек")
+    parser.add_argument('--seed', type=int, default=7, help="Зерно выборки проверочных точек")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    args = parse_args(argv)
+
+    from src.services.lattice import get_lattice
+    from src.services.predictor_service import PredictorService
+    from src.utils.data import sample_input_grid
+
+    lattice = get_lattice(args.lattice)
+    if lattice is None:
+        logger.error("Решетка не найдена или устарела: соберите ее командой python -m src.services.lattice")
+        return 1
+
+    grid = sample_input_grid(args.points, args.seed)
+    for point in grid[:10]:
+        lattice.predict(point)
+
+    durations, approximate = [], []
+    for point in grid:
+        start = time.perf_counter()
+        approximate.append(lattice.predict(point))
+        durations.append((time.perf_counter() - start) * 1e6)
+
+    exact = PredictorService().run_batch_prediction(grid)
+    report = {
+        'query_p50_us': float(np.percentile(durations, 50)),
+        'query_p99_us': float(np.percentile(durations, 99)),
+        **compare(approximate, exact),
+    }
+    print(f"Решетка: {len(lattice)} точек, проверка на {len(grid)} точках")
+    for name, value in report.items():
+        print(f"{name:<40} {value:>12.4f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,488 @@
+"""
+Воспроизводимый бенчмарк полного конвейера предсказаний синтеза MOF.
+
+Замеряет:
+    - холодный старт (импорт, инициализация сервисов) и задержку первого запроса
+      в отдельном процессе;
+    - установившуюся задержку одиночного запроса (p50/p99);
+    - задержку поиска лучших рецептов (run_beam_search, пакетные стадии);
+    - задержку оценки неопределенности Monte Carlo dropout в зависимости от
+      числа проходов T (проходы выполняются одним вызовом модели);
+    - пропускную способность пакетного конвейера (run_batch_prediction)
+      для N = 1/32/1024/65536 — пакет обрабатывается целиком;
+    - пиковое потребление памяти (RSS);
+    - разбивку по стадиям конвейера (трекер задержек).
+
+Входные данные — фиксированная выборка из рабочих диапазонов формы
+(sample_input_grid). Результаты сохраняются в JSON и могут сравниваться
+с сохраненным эталоном: ухудшение сверх допуска считается регрессией
+и приводит к ненулевому коду возврата.
+
+Примеры:
+    python -m benchmarks.bench_pipeline --output bench_results.json
+    python -m benchmarks.bench_pipeline --baseline benchmarks/baseline.json
+    python -m benchmarks.bench_pipeline --quick --save-baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZES = (1, 32, 1024, 65536)
+DEFAULT_MC_SAMPLES = (1, 8, 32, 64)
+
+# Направление улучшения метрик: 'lower' — меньше лучше, 'higher' — больше лучше
+METRIC_DIRECTIONS = {
+    'cold_start.import_s': 'lower',
+    'cold_start.init_s': 'lower',
+    'cold_start.first_request_ms': 'lower',
+    'latency.p50_ms': 'lower',
+    'latency.p99_ms': 'lower',
+    'beam_search.p50_ms': 'lower',
+    'beam_search.p99_ms': 'lower',
+    'memory.peak_rss_mb': 'lower',
+}
+
+
+def _peak_rss_mb() -> float:
+    """Возвращает пиковый RSS текущего процесса в МБ."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux — КБ, macOS — байты
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+def _percentiles(values_ms: List[float]) -> Dict[str, float]:
+    """Сводка по выборке длительностей."""
+    data = np.asarray(values_ms, dtype=float)
+    return {
+        'count': int(data.size),
+        'mean_ms': float(data.mean()),
+        'p50_ms': float(np.percentile(data, 50)),
+        'p90_ms': float(np.percentile(data, 90)),
+        'p99_ms': float(np.percentile(data, 99)),
+        'max_ms': float(data.max())
+    }
+
+
+def cold_start_probe(seed: int) -> Dict[str, float]:
+    """
+    Замеряет холодный старт в текущем (свежем) процессе.
+
+    Args:
+        seed: Зерно выборки входных данных
+
+    Returns:
+        Dict[str, float]: Время импорта, инициализации и первого запроса
+    """
+    start = time.perf_counter()
+    from src.services.predictor_service import PredictorService
+    from src.utils.data import sample_input_grid
+    import_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    predictor = PredictorService()
+    init_s = time.perf_counter() - start
+
+    inputs = sample_input_grid(1, seed)[0]
+    start = time.perf_counter()
+    predictor.run_full_prediction(**inputs)
+    first_request_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        'import_s': import_s,
+        'init_s': init_s,
+        'first_request_ms': first_request_ms,
+        'peak_rss_mb': _peak_rss_mb()
+    }
+
+
+def bench_cold_start(seed: int, repeats: int) -> Dict[str, float]:
+    """
+    Запускает замер холодного старта в отдельных процессах и берет медиану.
+
+    Args:
+        seed: Зерно выборки входных данных
+        repeats: Количество запусков
+    """
+    runs = []
+    for _ in range(repeats):
+        completed = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.bench_pipeline', '--cold-start-probe', '--seed', str(seed)],
+            cwd=ROOT_DIR, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"Замер холодного старта завершился с ошибкой:\n{completed.stderr[-2000:]}")
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return {key: float(np.median([run[key] for run in runs])) for key in runs[0]}
+
+
+def bench_latency(predictor: Any, grid: List[Dict[str, float]], warm_up: int, requests: int) -> Dict[str, float]:
+    """
+    Замеряет установившуюся задержку одиночного запроса.
+
+    Args:
+        predictor: Экземпляр PredictorService
+        grid: Выборка входных данных
+        warm_up: Количество прогревочных запросов
+        requests: Количество замеряемых запросов
+    """
+    for i in range(warm_up):
+        predictor.run_full_prediction(**grid[i % len(grid)])
+
+    durations = []
+    for i in range(requests):
+        start = time.perf_counter()
+        predictor.run_full_prediction(**grid[i % len(grid)])
+        durations.append((time.perf_counter() - start) * 1000)
+    return _percentiles(durations)
+
+
+def bench_beam_search(
+    predictor: Any,
+    grid: List[Dict[str, float]],
+    warm_up: int,
+    requests: int,
+    top_k: int
+) -> Dict[str, float]:
+    """
+    Замеряет задержку поиска лучших рецептов (все ветви стадии — один вызов модели).
+
+    Args:
+        predictor: Экземпляр PredictorService
+        grid: Выборка входных данных
+        warm_up: Количество прогревочных запросов
+        requests: Количество замеряемых запросов
+        top_k: Число раскрываемых классов на категориальной стадии
+    """
+    for i in range(warm_up):
+        predictor.run_beam_search(**grid[i % len(grid)], top_k=top_k)
+
+    durations = []
+    branches = 0
+    for i in range(requests):
+        start = time.perf_counter()
+        result = predictor.run_beam_search(**grid[i % len(grid)], top_k=top_k)
+        durations.append((time.perf_counter() - start) * 1000)
+        branches = result['n_branches']
+    return {**_percentiles(durations), 'top_k': top_k, 'branches': branches}
+
+
+def bench_mc_dropout(
+    predictor: Any,
+    grid: List[Dict[str, float]],
+    requests: int,
+    samples: List[int]
+) -> Dict[str, Dict[str, float]]:
+    """
+    Замеряет задержку одиночного запроса с оценкой неопределенности.
+
+    Args:
+        predictor: Экземпляр PredictorService
+        grid: Выборка входных данных
+        requests: Количество замеряемых запросов для каждого T
+        samples: Значения числа проходов T
+    """
+    results = {}
+    for mc_samples in samples:
+        predictor.run_batch_prediction(grid[:1], mc_samples=mc_samples)
+        durations = []
+        for i in range(requests):
+            start = time.perf_counter()
+            predictor.run_batch_prediction([grid[i % len(grid)]], mc_samples=mc_samples)
+            durations.append((time.perf_counter() - start) * 1000)
+        results[str(mc_samples)] = _percentiles(durations)
+    return results
+
+
+def bench_throughput(
+    predictor: Any,
+    grid: List[Dict[str, float]],
+    batch_sizes: List[int],
+    chunk_size: int
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Замеряет пропускную способность пакетного конвейера (run_batch_prediction).
+
+    Пакет из N точек обрабатывается целиком частями по chunk_size точек:
+    каждая стадия части — один пакетный вызов модели.
+
+    Args:
+        predictor: Экземпляр PredictorService
+        grid: Выборка входных данных (не короче максимального пакета)
+        batch_sizes: Размеры пакетов
+        chunk_size: Точек в одном вызове run_batch_prediction
+    """
+    # Прогрев пакетных путей (первые вызовы моделей с новой формой входа)
+    predictor.run_batch_prediction(grid[:min(len(grid), chunk_size)])
+
+    results = {}
+    for n in batch_sizes:
+        batch = grid[:n]
+        start = time.perf_counter()
+        for offset in range(0, n, chunk_size):
+            predictor.run_batch_prediction(batch[offset:offset + chunk_size])
+        elapsed = time.perf_counter() - start
+        results[str(n)] = {
+            'items': n,
+            'seconds': elapsed,
+            'items_per_s': n / elapsed if elapsed > 0 else 0.0,
+            'chunk_size': chunk_size
+        }
+        logger.info(f"N={n}: {results[str(n)]['items_per_s']:.1f} элементов/с за {elapsed:.2f} с")
+    return results
+
+
+def bench_stages(predictor: Any, grid: List[Dict[str, float]], requests: int) -> Dict[str, Dict[str, float]]:
+    """
+    Собирает разбивку задержки по стадиям конвейера.
+
+    Args:
+        predictor: Экземпляр PredictorService
+        grid: Выборка входных данных
+        requests: Количество запросов
+    """
+    tracker = predictor.latency_tracker
+    was_enabled = tracker.enabled
+    tracker.reset()
+    tracker.set_enabled(True)
+    try:
+        for i in range(requests):
+            predictor.run_full_prediction(**grid[i % len(grid)])
+        return {
+            key: {'p50_ms': stats['p50_ms'], 'p99_ms': stats['p99_ms'], 'mean_ms': stats['mean_ms']}
+            for key, stats in tracker.get_stats().items()
+            if '.' not in key
+        }
+    finally:
+        tracker.set_enabled(was_enabled)
+
+
+def flatten_metrics(results: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Приводит результаты к плоскому словарю сравниваемых метрик.
+
+    Args:
+        results: Раздел 'results' отчета бенчмарка
+
+    Returns:
+        Dict[str, float]: {имя метрики: значение}
+    """
+    flat = {}
+    for key in ('import_s', 'init_s', 'first_request_ms'):
+        if key in results.get('cold_start', {}):
+            flat[f'cold_start.{key}'] = results['cold_start'][key]
+    for key in ('p50_ms', 'p99_ms'):
+        if key in results.get('latency', {}):
+            flat[f'latency.{key}'] = results['latency'][key]
+    for key in ('p50_ms', 'p99_ms'):
+        if key in results.get('beam_search', {}):
+            flat[f'beam_search.{key}'] = results['beam_search'][key]
+    for mc_samples, stats in results.get('mc_dropout', {}).items():
+        flat[f'mc_dropout.{mc_samples}.p50_ms'] = stats['p50_ms']
+    for n, item in results.get('throughput', {}).items():
+        flat[f'throughput.{n}.items_per_s'] = item['items_per_s']
+    if 'peak_rss_mb' in results.get('memory', {}):
+        flat['memory.peak_rss_mb'] = results['memory']['peak_rss_mb']
+    for stage, stats in results.get('stages', {}).items():
+        flat[f'stages.{stage}.p50_ms'] = stats['p50_ms']
+    return flat
+
+
+def compare_with_baseline(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float
+) -> List[Dict[str, Any]]:
+    """
+    Сравнивает результаты с эталоном.
+
+    Args:
+        current: Текущий отчет
+        baseline: Эталонный отчет
+        tolerance: Допустимое относительное ухудшение (0.2 = 20%)
+
+    Returns:
+        List[Dict[str, Any]]: Сравнение по общим метрикам с флагом регрессии
+    """
+    current_flat = flatten_metrics(current['results'])
+    baseline_flat = flatten_metrics(baseline['results'])
+
+    comparison = []
+    for name in sorted(set(current_flat) & set(baseline_flat)):
+        direction = METRIC_DIRECTIONS.get(name, 'higher' if name.startswith('throughput.') else 'lower')
+        old, new = baseline_flat[name], current_flat[name]
+        if old == 0:
+            continue
+        change = (new - old) / old
+        worse = change > tolerance if direction == 'lower' else change < -tolerance
+        comparison.append({
+            'metric': name, 'baseline': old, 'current': new,
+            'change': change, 'regression': worse
+        })
+    return comparison
+
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Выполняет набор бенчмарков.
+
+    Args:
+        args: Аргументы командной строки
+
+    Returns:
+        Dict[str, Any]: Отчет (метаданные и результаты)
+    """
+    from src.config import LATTICE_CONFIG
+    from src.utils.data import sample_input_grid
+
+    args.chunk_size = args.chunk_size or LATTICE_CONFIG['batch_size']
+    results: Dict[str, Any] = {}
+
+    if not args.skip_cold_start:
+        logger.info("Замер холодного старта")
+        results['cold_start'] = bench_cold_start(args.seed, args.cold_start_repeats)
+
+    from src.services.predictor_service import PredictorService
+
+    predictor = PredictorService()
+    grid = sample_input_grid(max(max(args.batch_sizes), args.requests), args.seed)
+
+    logger.info("Замер установившейся задержки")
+    results['latency'] = bench_latency(predictor, grid, args.warm_up, args.requests)
+
+    logger.info("Замер поиска лучших рецептов")
+    results['beam_search'] = bench_beam_search(
+        predictor, grid, args.warm_up, args.stage_requests, args.beam_top_k
+    )
+
+    logger.info("Замер оценки неопределенности (Monte Carlo dropout)")
+    results['mc_dropout'] = bench_mc_dropout(predictor, grid, args.stage_requests, args.mc_samples)
+
+    logger.info("Разбивка по стадиям")
+    results['stages'] = bench_stages(predictor, grid, args.stage_requests)
+
+    logger.info("Замер пропускной способности")
+    results['throughput'] = bench_throughput(predictor, grid, args.batch_sizes, args.chunk_size)
+
+    results['memory'] = {'peak_rss_mb': _peak_rss_mb()}
+
+    import torch
+    import xgboost
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'torch': torch.__version__,
+            'xgboost': xgboost.__version__,
+            'numpy': np.__version__,
+            'torch_threads': torch.get_num_threads(),
+            'seed': args.seed,
+            'requests': args.requests,
+            'batch_sizes': list(args.batch_sizes),
+            'chunk_size': args.chunk_size
+        },
+        'results': results
+    }
+
+
+def print_report(report: Dict[str, Any], comparison: Optional[List[Dict[str, Any]]] = None) -> None:
+    """Выводит краткую сводку результатов."""
+    for name, value in flatten_metrics(report['results']).items():
+        print(f"{name:<45} {value:>12.3f}")
+
+    if comparison:
+        print("\n=== Сравнение с эталоном ===")
+        for row in comparison:
+            flag = 'РЕГРЕССИЯ' if row['regression'] else 'ok'
+            print(f"{row['metric']:<45} {row['baseline']:>12.3f} -> {row['current']:>12.3f} "
+                  f"({row['change']:+.1%}) {flag}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Разбирает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description="Бенчмарк конвейера предсказаний AdsorpNET")
+    parser.add_argument('--seed', type=int, default=42, help="Зерно выборки входных данных")
+    parser.add_argument('--requests', type=int, default=200, help="Запросов для замера задержки")
+    parser.add_argument('--warm-up', type=int, default=10, help="Прогревочных запросов")
+    parser.add_argument('--stage-requests', type=int, default=50, help="Запросов для разбивки по стадиям")
+    parser.add_argument('--beam-top-k', type=int, default=3,
+                        help="Число раскрываемых классов при замере run_beam_search")
+    parser.add_argument('--mc-samples', type=int, nargs='+', default=list(DEFAULT_MC_SAMPLES),
+                        help="Числа проходов Monte Carlo dropout")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=list(DEFAULT_BATCH_SIZES),
+                        help="Размеры пакетов для замера пропускной способности")
+    parser.add_argument('--chunk-size', type=int,
+                        help="Точек в одном вызове run_batch_prediction (по умолчанию LATTICE_CONFIG['batch_size'])")
+    parser.add_argument('--cold-start-repeats', type=int, default=3, help="Запусков холодного старта")
+    parser.add_argument('--skip-cold-start', action='store_true', help="Не замерять холодный старт")
+    parser.add_argument('--quick', action='store_true', help="Сокращенный прогон (для быстрой проверки)")
+    parser.add_argument('--output', default='bench_results.json', help="Файл для сохранения результатов")
+    parser.add_argument('--baseline', help="Эталонный отчет для сравнения")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Допустимое относительное ухудшение")
+    parser.add_argument('--save-baseline', help="Сохранить текущий отчет как эталон")
+    parser.add_argument('--cold-start-probe', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.requests = min(args.requests, 20)
+        args.warm_up = min(args.warm_up, 3)
+        args.stage_requests = min(args.stage_requests, 10)
+        args.cold_start_repeats = 1
+        args.batch_sizes = [n for n in args.batch_sizes if n <= 1024] or [1]
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа бенчмарка."""
+    args = parse_args(argv)
+
+    if args.cold_start_probe:
+        print(json.dumps(cold_start_probe(args.seed)))
+        return 0
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    # Логи сервисов на каждый запрос искажают замеры
+    logging.getLogger('src').setLevel(logging.WARNING)
+
+    report = run_suite(args)
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        comparison = compare_with_baseline(report, baseline, args.tolerance)
+        report['comparison'] = {'baseline': args.baseline, 'tolerance': args.tolerance, 'metrics': comparison}
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        logger.info(f"Результаты сохранены в {path}")
+
+    print_report(report, comparison)
+
+    if comparison and any(row['regression'] for row in comparison):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
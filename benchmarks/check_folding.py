@@ -0,0 +1,108 @@
+"""
+Проверка встраивания скейлеров в первый слой torch-моделей.
+
+Для каждой torch-модели (металлы и температуры) загружается исходная
+модель и ее копия со скейлером, встроенным в слой embedding
+(AffineKernel.fold_into). Исходная модель получает масштабированные
+признаки, копия — исходные (тождественное ядро AffineKernel.passthrough).
+Данные — случайные значения в окрестности обучающих и случайные 0/1 в
+One-Hot столбцах.
+
+Встраивание не побитовое: веса хранятся в float32, а исходные признаки
+на порядки больше масштабированных. Отчет — доля совпадающих
+предсказанных классов и максимальное расхождение вероятностей.
+Код возврата 1, если расхождение вероятностей больше --tolerance или
+класс изменился у примера, где два самых вероятных класса исходной
+модели различаются больше чем на --tolerance (почти равные классы
+могут поменяться местами из-за округления).
+
+Пример:
+    python -m benchmarks.check_folding --samples 20000
+"""
+
+import argparse
+import copy
+import logging
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Совпадение torch-моделей со встроенными скейлерами")
+    parser.add_argument('--samples', type=int, default=20000, help="Размер случайной выборки")
+    parser.add_argument('--tolerance', type=float, default=1e-3, help="Допустимое расхождение вероятностей")
+    parser.add_argument('--seed', type=int, default=0, help="Зерно генератора")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    args = parse_args(argv)
+
+    import torch
+
+    from src.config import INPUT_FOLDING_CONFIG
+    from src.services.model_service import ModelService, TORCH_MODEL_INPUTS
+
+    from benchmarks.check_scaling import random_frame
+
+    # Исходные модели загружаются без встраивания
+    INPUT_FOLDING_CONFIG['enabled'] = False
+    service = ModelService()
+    rng = np.random.default_rng(args.seed)
+
+    failures = 0
+    print(f"{'модель':<14} {'признаков':>9} {'классы совпадают':>17} {'макс. расхождение':>18}")
+    for model_name, (scaler_name, features, categorical_columns) in TORCH_MODEL_INPUTS.items():
+        model = service.get_model(model_name)
+        scaler = service.get_scaler(scaler_name)
+        kernel = service.get_scaling_kernel(scaler_name)
+        folded = copy.deepcopy(model)
+
+        if categorical_columns is None:
+            raw = random_frame(scaler, features, [], args.samples, rng).to_numpy()
+            scaled, unscaled = kernel.transform(raw), kernel.passthrough().transform(raw)
+            positions = np.arange(len(features), dtype=np.intp)
+        else:
+            numeric_columns = list(np.setdiff1d(features, categorical_columns))
+            df = random_frame(scaler, numeric_columns, categorical_columns, args.samples, rng)
+            layout = kernel.layout(features, categorical_columns)
+            scaled = layout.transform(df)
+            unscaled = kernel.passthrough().layout(features, categorical_columns).transform(df)
+            positions = layout.positions
+        kernel.fold_into(folded.embedding, positions)
+
+        with torch.no_grad():
+            logits = model(torch.from_numpy(scaled).to(service.get_device()))
+            folded_logits = folded(torch.from_numpy(unscaled).to(service.get_device()))
+        if model_name == 'metal_binary':
+            probs = torch.sigmoid(logits.reshape(-1)).cpu().numpy()
+            folded_probs = torch.sigmoid(folded_logits.reshape(-1)).cpu().numpy()
+            same = (probs >= 0.5) == (folded_probs >= 0.5)
+            margin = np.abs(2 * probs - 1)
+        else:
+            probs = torch.softmax(logits, dim=1).cpu().numpy()
+            folded_probs = torch.softmax(folded_logits, dim=1).cpu().numpy()
+            same = probs.argmax(axis=1) == folded_probs.argmax(axis=1)
+            top_two = np.sort(probs, axis=1)[:, -2:]
+            margin = top_two[:, 1] - top_two[:, 0]
+
+        difference = float(np.max(np.abs(probs - folded_probs)))
+        failures += difference > args.tolerance or bool(np.any(~same & (margin > args.tolerance)))
+        print(f"{model_name:<14} {len(features):>9} {np.mean(same):>17.4%} {difference:>18.2e}")
+
+    print(f"Моделей с расхождениями: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
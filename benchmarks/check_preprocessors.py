@@ -0,0 +1,196 @@
+"""
+Проверка совпадения скейлеров и энкодеров .npz с исходными пиклами.
+
+Для каждого пикла из saved_scalers/ берется файл .npz рядом с ним (если
+его нет — пикл экспортируется во временный каталог) и сравнивается с
+объектом sklearn:
+    - атрибуты (mean_, scale_, min_, classes_, feature_names_in_ и т.д.)
+      совпадают вместе с типами;
+    - скейлеры: transform и inverse_transform на случайной выборке в
+      окрестности обучающих данных (float64, float32 и DataFrame с
+      именами признаков) совпадают побитово;
+    - энкодеры: transform всех классов и inverse_transform всех индексов
+      совпадают, неизвестная метка вызывает ValueError в обоих вариантах.
+Отдельный процесс проверяет, что чтение всех .npz не импортирует sklearn.
+Код возврата 1 при любом расхождении.
+
+Пример:
+    python -m benchmarks.check_preprocessors --samples 2000
+"""
+
+import argparse
+import logging
+import subprocess
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+logger = logging.getLogger(__name__)
+
+
+def _same(expected: Any, actual: Any) -> bool:
+    """Побитовое совпадение массивов вместе с типом и формой."""
+    expected, actual = np.asarray(expected), np.asarray(actual)
+    return expected.dtype == actual.dtype and expected.shape == actual.shape and np.array_equal(expected, actual)
+
+
+def _raises(func, *args) -> bool:
+    try:
+        func(*args)
+    except ValueError:
+        return True
+    return False
+
+
+def check_scaler(original: Any, exported: Any, samples: int, rng: np.random.Generator) -> List[str]:
+    """
+    Сравнивает скейлер .npz с исходным.
+
+    Args:
+        original: Скейлер sklearn
+        exported: Скейлер src.services.preprocessors
+        samples: Размер случайной выборки
+        rng: Генератор случайных чисел
+
+    Returns:
+        List[str]: Описания расхождений (пустой список — совпадение)
+    """
+    if hasattr(original, 'mean_'):
+        center, spread = original.mean_, original.scale_
+    else:
+        center, spread = original.data_min_ + original.data_range_ / 2, original.data_range_
+    X = center + rng.standard_normal((samples, original.n_features_in_)) * np.where(spread > 0, spread, 1.0)
+
+    cases = {'float64': X, 'float32': X.astype(np.float32)}
+    if hasattr(original, 'feature_names_in_'):
+        cases['DataFrame'] = pd.DataFrame(X, columns=original.feature_names_in_)
+
+    problems = []
+    if exported.n_features_in_ != original.n_features_in_:
+        problems.append('n_features_in_')
+    for name, data in cases.items():
+        if not _same(original.transform(data), exported.transform(data)):
+            problems.append(f"transform ({name})")
+    if not _same(original.inverse_transform(X), exported.inverse_transform(X)):
+        problems.append('inverse_transform')
+    if _raises(original.transform, X[:, :-1]) != _raises(exported.transform, X[:, :-1]):
+        problems.append('проверка числа признаков')
+    if hasattr(original, 'feature_names_in_'):
+        renamed = pd.DataFrame(X, columns=[f"x{i}" for i in range(X.shape[1])])
+        if not _raises(exported.transform, renamed):
+            problems.append('проверка имен признаков')
+    return problems
+
+
+def check_encoder(original: Any, exported: Any) -> List[str]:
+    """
+    Сравнивает энкодер .npz с исходным.
+
+    Args:
+        original: LabelEncoder sklearn
+        exported: NpLabelEncoder
+
+    Returns:
+        List[str]: Описания расхождений (пустой список — совпадение)
+    """
+    problems = []
+    indices = np.arange(len(original.classes_))
+    if not _same(original.inverse_transform(indices), exported.inverse_transform(indices)):
+        problems.append('inverse_transform')
+    if not _same(original.transform(original.classes_), exported.transform(original.classes_)):
+        problems.append('transform')
+    if not _raises(exported.inverse_transform, [len(indices)]):
+        problems.append('проверка неизвестного индекса')
+    return problems
+
+
+def loads_without_sklearn(paths: List[Path]) -> bool:
+    """Загружает файлы .npz в отдельном процессе и проверяет, что sklearn не импортирован."""
+    code = (
+        "import sys\n"
+        "from src.services.preprocessors import load_preprocessor\n"
+        "for path in sys.argv[1:]:\n"
+        "    load_preprocessor(path)\n"
+        "sys.exit('sklearn' in sys.modules)\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code, *map(str, paths)], cwd=ROOT_DIR)
+    return result.returncode == 0
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    from src.config import SCALERS_DIR
+
+    parser = argparse.ArgumentParser(description="Совпадение скейлеров и энкодеров .npz с пиклами")
+    parser.add_argument('--scalers-dir', default=str(SCALERS_DIR), help="Каталог с пиклами")
+    parser.add_argument('--samples', type=int, default=2000, help="Размер случайной выборки для скейлеров")
+    parser.add_argument('--seed', type=int, default=0, help="Зерно генератора")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    args = parse_args(argv)
+
+    from src.services.preprocessors import (
+        export_all, load_preprocessor, preprocessor_path
+    )
+
+    sources = sorted(Path(args.scalers_dir).glob('*.pkl'))
+    if not sources:
+        logger.error(f"В каталоге {args.scalers_dir} нет пиклов")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        missing = [source for source in sources if not preprocessor_path(source).exists()]
+        if missing:
+            logger.info(f"Нет .npz для {len(missing)} пиклов: экспорт во временный каталог")
+            for source in missing:
+                (Path(tmp) / source.name).symlink_to(source)
+            export_all(tmp)
+        paths = {
+            source: preprocessor_path(Path(tmp) / source.name if source in missing else source)
+            for source in sources
+        }
+
+        exported = {source: load_preprocessor(path) for source, path in paths.items()}
+        sklearn_free = loads_without_sklearn(list(paths.values()))
+
+    import joblib
+
+    # Предупреждения sklearn о версии пиклов и массивах без имен признаков
+    warnings.filterwarnings('ignore', module='sklearn')
+
+    failures: Dict[str, List[str]] = {}
+    rng = np.random.default_rng(args.seed)
+    for source in sources:
+        original = joblib.load(source)
+        problems = [
+            name for name in vars(original)
+            if name.endswith('_') and not name.startswith('_')
+            and not _same(getattr(original, name), getattr(exported[source], name, None))
+        ]
+        if hasattr(original, 'classes_'):
+            problems += check_encoder(original, exported[source])
+        else:
+            problems += check_scaler(original, exported[source], args.samples, rng)
+        status = 'ok' if not problems else 'расхождения: ' + ', '.join(problems)
+        print(f"{source.name:<40} {type(original).__name__:<16} {status}")
+        if problems:
+            failures[source.name] = problems
+
+    print(f"Загрузка .npz без импорта sklearn: {'да' if sklearn_free else 'нет'}")
+    print(f"Проверено файлов: {len(sources)}, с расхождениями: {len(failures)}")
+    return 0 if sklearn_free and not failures else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Проверка бустеров XGBoost с порогами в исходных единицах (src.services.xgb_thresholds).
+
+Для каждой модели XGBoost, файл которой есть в saved_models/, исходный
+бустер получает масштабированные признаки, а скомпилированный
+(<имя>.raw.json или, если его нет, компиляция в памяти) — исходные
+признаки без масштабирования. Предсказания сравниваются побитово:
+    - случайные значения float64 в окрестности обучающих, One-Hot — 0/1;
+    - те же значения, округленные до float32;
+    - значения на границах разбиений: каждый числовой столбец принимает
+      границу R одного из деревьев (наименьшее значение, идущее вправо)
+      или предыдущее перед порогом число float32 (идет влево).
+Разбиение может отличаться только для значений меньше R, округляющихся к
+порогу (меньше полушага float32 от R); строки с такими значениями
+считаются отдельно («в окне»).
+
+Отчет — число отличающихся строк (в скобках — из них в окне) и время
+сборки входа одной строки (мкс) с масштабированием и без. Код возврата 1
+при расхождении в строке вне окна.
+
+Пример:
+    python -m benchmarks.check_raw_thresholds --samples 20000
+"""
+
+import argparse
+import logging
+import sys
+import warnings
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Совпадение бустеров XGBoost с порогами в исходных единицах")
+    parser.add_argument('--samples', type=int, default=20000, help="Размер случайной выборки")
+    parser.add_argument('--repeats', type=int, default=2000, help="Повторов для замера одной строки")
+    parser.add_argument('--seed', type=int, default=0, help="Зерно генератора")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    args = parse_args(argv)
+
+    import xgboost as xgb
+
+    from src.config import MODELS_DIR, SCALERS_DIR
+    from src.services.model_service import XGB_MODEL_FILES, XGB_MODEL_INPUTS
+    from src.services.preprocessors import load_artifact
+    from src.services.xgb_thresholds import (
+        compile_booster, load_booster, raw_boundaries, raw_model_path, split_thresholds, stage_inputs
+    )
+
+    from benchmarks.check_scaling import per_call_us, random_frame
+
+    # Предупреждения sklearn о версии пиклов
+    warnings.filterwarnings('ignore', module='sklearn')
+    rng = np.random.default_rng(args.seed)
+
+    failures = checked = 0
+    print(f"{'модель':<10} {'порогов':>8} {'float64':>10} {'float32':>10} {'границы':>10} "
+          f"{'масштаб., мкс':>14} {'без, мкс':>9}")
+    for model_name, file_name in XGB_MODEL_FILES.items():
+        source_path = MODELS_DIR / file_name
+        if not source_path.exists():
+            logger.warning(f"{file_name}: файл не найден, модель {model_name} пропущена")
+            continue
+
+        scaler_name, features, categorical_columns = XGB_MODEL_INPUTS[model_name]
+        _, kernel, positions = stage_inputs(model_name)
+        source = load_booster(source_path)
+        raw_path = raw_model_path(source_path)
+        compiled = (
+            load_booster(raw_path) if raw_path.exists()
+            else compile_booster(source, kernel, positions, scaler_name)
+        )
+
+        numeric_columns = list(np.setdiff1d(features, categorical_columns))
+        scaler = load_artifact(SCALERS_DIR / f"scaler_{scaler_name}.pkl")
+        layout = kernel.layout(features, categorical_columns)
+        raw_layout = kernel.passthrough().layout(features, categorical_columns)
+
+        split_positions, scaled_thresholds = split_thresholds(source, positions)
+        _, thresholds = split_thresholds(compiled, positions)
+        boundaries = np.empty(len(thresholds))
+        for position in np.unique(split_positions):
+            mask = split_positions == position
+            boundaries[mask] = raw_boundaries(kernel, int(position), scaled_thresholds[mask])
+
+        def in_window(df) -> np.ndarray:
+            """Строки, где значение меньше границы R, но округляется к порогу."""
+            rows = np.zeros(len(df), dtype=bool)
+            for position, column in enumerate(numeric_columns):
+                mask = split_positions == position
+                if not mask.any():
+                    continue
+                # Для совпадающих порогов достаточно наибольшей границы
+                order = np.argsort(thresholds[mask], kind='stable')
+                unique, starts = np.unique(thresholds[mask][order], return_index=True)
+                largest = np.maximum.reduceat(boundaries[mask][order], starts)
+
+                values = df[column].to_numpy(dtype=np.float64)
+                rounded = values.astype(np.float32)
+                index = np.minimum(np.searchsorted(unique, rounded), len(unique) - 1)
+                rows |= (unique[index] == rounded) & (values < largest[index])
+            return rows
+
+        def differing(df) -> Tuple[int, int]:
+            """Число отличающихся строк и число из них в окне."""
+            expected = source.predict(xgb.DMatrix(layout.transform(df), feature_names=features))
+            actual = compiled.predict(xgb.DMatrix(raw_layout.transform(df), feature_names=features))
+            same = (expected.view(np.int32) == actual.view(np.int32)).reshape(len(df), -1).all(axis=1)
+            return int(np.sum(~same)), int(np.sum(~same & in_window(df)))
+
+        # Случайные значения и они же, округленные до float32
+        df64 = random_frame(scaler, numeric_columns, categorical_columns, args.samples, rng)
+        df32 = df64.copy()
+        df32[numeric_columns] = df64[numeric_columns].to_numpy().astype(np.float32).astype(np.float64)
+
+        # Значения на границах разбиений: граница R или число float32 перед порогом
+        edges = df64.copy()
+        for position, column in enumerate(numeric_columns):
+            mask = split_positions == position
+            if not mask.any():
+                continue
+            choice = rng.integers(0, mask.sum(), len(edges))
+            below = np.nextafter(thresholds[mask], np.float32(-np.inf))[choice].astype(np.float64)
+            edges[column] = np.where(rng.integers(0, 2, len(edges)).astype(bool), below, boundaries[mask][choice])
+
+        results = [differing(df) for df in (df64, df32, edges)]
+        row = df32.iloc[:1].copy()
+        scaled_us = per_call_us(lambda: layout.transform(row), args.repeats)
+        raw_us = per_call_us(lambda: raw_layout.transform(row), args.repeats)
+        failures += any(total > window for total, window in results)
+        checked += 1
+        float64_diff, float32_diff, edge_diff = (f"{total} ({window})" for total, window in results)
+        print(f"{model_name:<10} {len(thresholds):>8} {float64_diff:>10} {float32_diff:>10} {edge_diff:>10} "
+              f"{scaled_us:>14.1f} {raw_us:>9.1f}")
+
+    print(f"Проверено моделей: {checked}, с расхождениями вне окна: {failures}")
+    return 1 if failures or not checked else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
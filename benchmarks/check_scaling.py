@@ -0,0 +1,185 @@
+"""
+Проверка и замер масштабирования входов без sklearn (src.services.scaling).
+
+Для каждого из 11 скейлеров конвейера (исходные пиклы sklearn) входы
+моделей собираются двумя способами и сравниваются побитово:
+    - прежний: scaler.transform по числовым столбцам (DataFrame),
+      добавление One-Hot столбцов, выборка признаков модели, float32;
+    - новый: AffineKernel.layout(...).transform (металлы — AffineKernel.transform).
+Также проверяется масштабирование подмножества столбцов
+(AffineKernel.transform_columns) против полного transform sklearn.
+Данные — случайные значения в окрестности обучающих и случайные 0/1
+в One-Hot столбцах, пакеты из 1 и 256 строк.
+
+Отчет — время сборки входа одной строки (мкс) обоими способами.
+Код возврата 1 при любом расхождении.
+
+Пример:
+    python -m benchmarks.check_scaling --repeats 2000
+"""
+
+import argparse
+import logging
+import sys
+import time
+import warnings
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+logger = logging.getLogger(__name__)
+
+
+def stage_inputs() -> Dict[str, Tuple[List[str], Optional[List[str]]]]:
+    """Признаки и One-Hot столбцы стадий (None — вход металлов без разметки)."""
+    from src.domain.features import (
+        features_metal, features_ligand, features_solvent, features_salt_mass,
+        features_acid_mass, features_Vsyn, features_Tsyn, features_Tdry, features_Treg,
+        metal_columns, ligand_columns, solvent_columns
+    )
+
+    all_columns = metal_columns + ligand_columns + solvent_columns
+    return {
+        'binary_metals': (features_metal, None),
+        'major_metal': (features_metal, None),
+        'minor_metal': (features_metal, None),
+        'ligand': (features_ligand, metal_columns),
+        'solvent': (features_solvent, metal_columns + ligand_columns),
+        'salt_mass': (features_salt_mass, all_columns),
+        'acid_mass': (features_acid_mass, all_columns),
+        'Vsyn': (features_Vsyn, all_columns),
+        'Tsyn': (features_Tsyn, all_columns),
+        'Tdry': (features_Tdry, all_columns),
+        'Treg': (features_Treg, all_columns),
+    }
+
+
+def legacy_inputs(scaler: Any, features: List[str], categorical_columns: List[str], df: pd.DataFrame) -> np.ndarray:
+    """Вход модели, собранный прежним способом (как в методах predict_* до замены)."""
+    numeric_columns = np.setdiff1d(features, categorical_columns)
+    scaled = pd.DataFrame(scaler.transform(df[numeric_columns].copy()), columns=numeric_columns)
+    for col in categorical_columns:
+        if col in df.columns:
+            scaled[col] = df[col]
+    return np.asarray(scaled[features].values, dtype=np.float32)
+
+
+def random_frame(
+    scaler: Any,
+    numeric_columns: List[str],
+    categorical_columns: List[str],
+    rows: int,
+    rng: np.random.Generator
+) -> pd.DataFrame:
+    """Случайные признаки стадии: числовые около обучающих значений, One-Hot — 0/1."""
+    if hasattr(scaler, 'mean_'):
+        center, spread = scaler.mean_, scaler.scale_
+    else:
+        center, spread = scaler.data_min_ + scaler.data_range_ / 2, scaler.data_range_
+    values = center + rng.standard_normal((rows, len(numeric_columns))) * np.where(spread > 0, spread, 1.0)
+    df = pd.DataFrame(values, columns=numeric_columns)
+    for col in categorical_columns:
+        df[col] = rng.integers(0, 2, rows)
+    return df
+
+
+def per_call_us(func: Callable[[], Any], repeats: int) -> float:
+    """Среднее время вызова в микросекундах."""
+    func()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def _same(expected: np.ndarray, actual: np.ndarray) -> bool:
+    """Побитовое совпадение (NaN совпадает с NaN)."""
+    if expected.dtype != actual.dtype or expected.shape != actual.shape:
+        return False
+    return np.ascontiguousarray(expected).tobytes() == np.ascontiguousarray(actual).tobytes()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Совпадение и скорость масштабирования без sklearn")
+    parser.add_argument('--repeats', type=int, default=2000, help="Повторов для замера одной строки")
+    parser.add_argument('--seed', type=int, default=0, help="Зерно генератора")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    args = parse_args(argv)
+
+    import joblib
+
+    from src.config import SCALERS_DIR
+    from src.services.scaling import AffineKernel
+
+    # Предупреждения sklearn о версии пиклов
+    warnings.filterwarnings('ignore', module='sklearn')
+    rng = np.random.default_rng(args.seed)
+
+    failures = 0
+    legacy_total = kernel_total = 0.0
+    print(f"{'скейлер':<16} {'признаков':>9} {'совпадение':>11} {'sklearn, мкс':>13} {'ядро, мкс':>10}")
+    for name, (features, categorical_columns) in stage_inputs().items():
+        scaler = joblib.load(SCALERS_DIR / f"scaler_{name}.pkl")
+        kernel = AffineKernel(scaler)
+        problems = []
+
+        if categorical_columns is None:
+            def legacy(values):
+                return np.asarray(scaler.transform(values), dtype=np.float32)
+
+            def fast(values):
+                return kernel.transform(values)
+
+            frames = {rows: random_frame(scaler, features, [], rows, rng).to_numpy() for rows in (1, 256)}
+            numeric = frames[256]
+        else:
+            layout = kernel.layout(features, categorical_columns)
+
+            def legacy(df):
+                return legacy_inputs(scaler, features, categorical_columns, df)
+
+            def fast(df):
+                return layout.transform(df)
+
+            numeric_columns = list(np.setdiff1d(features, categorical_columns))
+            frames = {
+                rows: random_frame(scaler, numeric_columns, categorical_columns, rows, rng)
+                for rows in (1, 256)
+            }
+            numeric = frames[256][numeric_columns].to_numpy(dtype=np.float64)
+
+        for rows, data in frames.items():
+            if not _same(legacy(data), fast(data)):
+                problems.append(f"вход ({rows} строк)")
+
+        # Подмножество столбцов (как для переменных столбцов в поиске по лучу)
+        positions = np.sort(rng.choice(numeric.shape[1], size=max(1, numeric.shape[1] // 3), replace=False))
+        expected = scaler.transform(numeric)[:, positions]
+        if not _same(expected, kernel.transform_columns(numeric[:, positions], positions)):
+            problems.append('подмножество столбцов')
+
+        legacy_us = per_call_us(lambda: legacy(frames[1]), args.repeats)
+        kernel_us = per_call_us(lambda: fast(frames[1]), args.repeats)
+        legacy_total += legacy_us
+        kernel_total += kernel_us
+        failures += bool(problems)
+        status = 'да' if not problems else 'нет: ' + ', '.join(problems)
+        print(f"{name:<16} {len(features):>9} {status:>11} {legacy_us:>13.1f} {kernel_us:>10.1f}")
+
+    print(f"Сумма по 11 скейлерам: sklearn {legacy_total:.0f} мкс, ядро {kernel_total:.0f} мкс "
+          f"(ускорение {legacy_total / kernel_total:.1f}x)")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Отчет о времени импорта и проверка ленивой загрузки ML-библиотек.
+
+Запускает отрисовку главной страницы (streamlit AppTest) и импорт модулей
+остальных страниц в отдельных процессах под `python -X importtime`, выводит
+самые дорогие модули и завершается с ненулевым кодом, если на этих путях
+были импортированы тяжелые ML-библиотеки (torch, XGBoost, pymatgen, RDKit,
+scikit-learn).
+
+Примеры:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --top 30 --output import_time.json
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Библиотеки, которые не должны загружаться без расчета предсказаний
+HEAVY_MODULES = ('torch', 'xgboost', 'pymatgen', 'rdkit', 'sklearn', 'joblib')
+
+# Страницы, модули которых не должны тянуть ML-библиотеки при импорте
+PAGE_MODULES = ('src.pages.home', 'src.pages.info', 'src.pages.team', 'src.pages.analysis', 'src.pages.predict')
+
+_IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def _loaded_heavy_modules() -> List[str]:
+    """Возвращает тяжелые библиотеки, уже загруженные в текущем процессе."""
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def probe(target: str) -> Dict[str, Any]:
+    """
+    Выполняет целевой сценарий в текущем процессе.
+
+    Args:
+        target: 'app' — отрисовка приложения с главной страницей,
+                иначе имя модуля страницы для импорта
+
+    Returns:
+        Dict[str, Any]: Загруженные тяжелые библиотеки и ошибка сценария
+    """
+    error = None
+    if target == 'app':
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(str(ROOT_DIR / 'app.py'), default_timeout=120).run()
+        if at.exception:
+            error = str(at.exception[0].message)
+    else:
+        import importlib
+        importlib.import_module(target)
+    return {'heavy_modules': _loaded_heavy_modules(), 'error': error}
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """
+    Разбирает вывод `python -X importtime`.
+
+    Args:
+        stderr: Поток ошибок процесса
+
+    Returns:
+        List[Dict[str, Any]]: Модули с собственным и накопленным временем (мкс) и глубиной
+    """
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            rows.append({
+                'module': match.group(4),
+                'self_us': int(match.group(1)),
+                'cumulative_us': int(match.group(2)),
+                'depth': len(match.group(3)) // 2
+            })
+    return rows
+
+
+def run_target(target: str) -> Dict[str, Any]:
+    """
+    Запускает сценарий в отдельном процессе под -X importtime.
+
+    Args:
+        target: Сценарий (см. probe)
+
+    Returns:
+        Dict[str, Any]: Результат сценария и разбор времени импорта
+    """
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'benchmarks.import_time', '--probe', target],
+        cwd=ROOT_DIR, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Сценарий {target} завершился с ошибкой:\n{completed.stderr[-2000:]}")
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    imports = parse_importtime(completed.stderr)
+    result['imports'] = imports
+    result['total_import_ms'] = sum(row['cumulative_us'] for row in imports if row['depth'] == 0) / 1000
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Точка входа отчета."""
+    parser = argparse.ArgumentParser(description="Отчет о времени импорта AdsorpNET")
+    parser.add_argument('--top', type=int, default=15, help="Количество модулей в отчете")
+    parser.add_argument('--output', help="Файл для сохранения отчета (JSON)")
+    parser.add_argument('--probe', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        print(json.dumps(probe(args.probe)))
+        return 0
+
+    report = {}
+    failed = False
+    for target in ('app',) + PAGE_MODULES:
+        result = run_target(target)
+        report[target] = result
+
+        status = 'ok'
+        if result['error']:
+            status = f"ОШИБКА: {result['error']}"
+            failed = True
+        elif result['heavy_modules']:
+            status = f"ЗАГРУЖЕНЫ: {', '.join(result['heavy_modules'])}"
+            failed = True
+        print(f"\n=== {target}: импорт {result['total_import_ms']:.0f} мс — {status} ===")
+
+        top = sorted(
+            (row for row in result['imports'] if row['depth'] <= 1),
+            key=lambda row: row['cumulative_us'], reverse=True
+        )[:args.top]
+        for row in top:
+            print(f"{row['module']:<50} {row['cumulative_us'] / 1000:>10.1f} мс")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Проверка квантованных ключей кэша предсказаний.
+
+Для воспроизводимой выборки точек (sample_input_grid) строится соседняя
+точка внутри той же корзины политики допусков (каждое поле выбирается
+равномерно в пределах своей корзины), проверяется совпадение ключей и
+оба варианта рассчитываются точным пакетным конвейером
+(run_batch_prediction). Попадание в кэш по ключу соседней точки вернуло бы
+рецепт исходной, поэтому доля совпадений рецептов — это точность ответов
+кэша относительно точного пересчета.
+
+Отчет:
+    - доля совпадений ключа для точки и ее копии с шумом 1e-9 (отн.);
+    - доля совпадений полного категориального рецепта (металл, лиганд,
+      растворитель, температуры) для точек из одной корзины;
+    - медианная и 95-процентильная относительная ошибка масс и объема.
+Код возврата 1, если доля совпадений рецептов ниже целевой.
+
+Пример:
+    python -m benchmarks.verify_cache_keys --points 500 --target 0.99
+"""
+
+import argparse
+import logging
+import math
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+logger = logging.getLogger(__name__)
+
+
+def bucket_neighbour(
+    point: Dict[str, float],
+    policy: Dict[str, Dict[str, float]],
+    rng: np.random.Generator
+) -> Dict[str, float]:
+    """
+    Выбирает случайную точку в той же корзине, что и исходная.
+
+    Args:
+        point: Исходная точка
+        policy: Допуски полей
+        rng: Генератор случайных чисел
+
+    Returns:
+        Dict[str, float]: Соседняя точка (поля без допуска не изменяются)
+    """
+    neighbour = dict(point)
+    for key, value in point.items():
+        tolerance = policy.get(key)
+        if not tolerance:
+            continue
+        if 'rel' in tolerance:
+            if value <= 0:
+                continue
+            step = math.log1p(tolerance['rel'])
+            bucket = round(math.log(value) / step)
+            # Внутренняя часть корзины: границы округления не проверяются
+            neighbour[key] = math.exp((bucket + rng.uniform(-0.499, 0.499)) * step)
+        else:
+            bucket = round(value / tolerance['abs'])
+            neighbour[key] = (bucket + rng.uniform(-0.499, 0.499)) * tolerance['abs']
+    return neighbour
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    from src.config import PREDICTION_CACHE_CONFIG
+
+    parser = argparse.ArgumentParser(description="Проверка квантованных ключей кэша")
+    parser.add_argument('--points', type=int, default=PREDICTION_CACHE_CONFIG['verify_samples'],
+                        help="Число проверочных точек")
+    parser.add_argument('--target', type=float, default=PREDICTION_CACHE_CONFIG['target_agreement'],
+                        help="Требуемая доля совпадений рецептов")
+    parser.add_argument('--seed', type=int, default=11, help="Зерно выборки проверочных точек")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    args = parse_args(argv)
+
+    from src.config import PREDICTION_CACHE_CONFIG
+    from src.services.predictor_service import PredictorService
+    from src.services.robustness import RECIPE_KEYS
+    from src.services.sensitivity import NUMERIC_OUTPUTS, results_to_frame
+    from src.utils.data import sample_input_grid
+    from src.utils.storage import create_cache_key
+
+    policy = PREDICTION_CACHE_CONFIG['key_policy']
+    rng = np.random.default_rng(args.seed)
+    grid = sample_input_grid(args.points, args.seed)
+    neighbours = [bucket_neighbour(point, policy, rng) for point in grid]
+
+    key_mismatches = sum(create_cache_key(p, policy) != create_cache_key(q, policy) for p, q in zip(grid, neighbours))
+    if key_mismatches:
+        logger.error(f"Соседние точки получили другой ключ: {key_mismatches} из {len(grid)}")
+        return 1
+    noisy_hits = np.mean([
+        create_cache_key(p, policy) == create_cache_key({k: v * (1 + 1e-9) for k, v in p.items()}, policy)
+        for p in grid
+    ])
+
+    predictor = PredictorService()
+    exact = results_to_frame(predictor.run_batch_prediction(grid))
+    nearby = results_to_frame(predictor.run_batch_prediction(neighbours))
+
+    keys = list(RECIPE_KEYS)
+    agreement = float((exact[keys] == nearby[keys]).all(axis=1).mean())
+    numeric = list(NUMERIC_OUTPUTS)
+    errors = (nearby[numeric] - exact[numeric]).abs().to_numpy() / np.maximum(exact[numeric].abs().to_numpy(), 1e-9)
+
+    report: Dict[str, Any] = {
+        'noise_key_hit_rate': float(noisy_hits),
+        'recipe_agreement': agreement,
+        'numeric_error_p50': float(np.median(errors)),
+        'numeric_error_p95': float(np.quantile(errors, 0.95)),
+    }
+    print(f"Политика ключей: {policy}")
+    print(f"Проверка на {len(grid)} точках, целевая доля совпадений {args.target:.2%}")
+    for name, value in report.items():
+        print(f"{name:<40} {value:>12.4f}")
+
+    if agreement < args.target:
+        logger.error(f"Доля совпадений {agreement:.2%} ниже целевой {args.target:.2%}: уменьшите допуски")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -286,7 +286,11 @@ class MetalClassifier(nn.Module):
 
     def forward(self, x):
         # x: [batch_size, input_dim]
-        x = self.embedding(x)  # [batch_size, embed_dim]
+        return self.forward_embedded(self.embedding(x))
+
+    def forward_embedded(self, x):
+        # x: [batch_size, embed_dim] - output of self.embedding (may be assembled
+        # from precomputed partial projections of the input columns)
 
         # Transformer expects input as [batch_size, seq_len, embed_dim] because batch_first=True
         x = x.unsqueeze(1)  # [batch_size, 1, embed_dim]  # Assuming seq_len=1
@@ -355,7 +359,11 @@ class TransformerClassifier(nn.Module):
 
     def forward(self, x):
         # x: [batch_size, input_dim]
-        x = self.embedding(x)  # [batch_size, embed_dim]
+        return self.forward_embedded(self.embedding(x))
+
+    def forward_embedded(self, x):
+        # x: [batch_size, embed_dim] - output of self.embedding (may be assembled
+        # from precomputed partial projections of the input columns)
 
         # Transformer expects input as [batch_size, seq_len, embed_dim] because batch_first=True
         x = x.unsqueeze(1)  # [batch_size, 1, embed_dim]  # Assuming seq_len=1
@@ -423,7 +431,11 @@ class TransformerTsynClassifier(nn.Module):
 
     def forward(self, x):
         # x: [batch_size, input_dim]
-        x = self.embedding(x)  # [batch_size, embed_dim]
+        return self.forward_embedded(self.embedding(x))
+
+    def forward_embedded(self, x):
+        # x: [batch_size, embed_dim] - output of self.embedding (may be assembled
+        # from precomputed partial projections of the input columns)
 
         # Transformer expects input as [batch_size, seq_len, embed_dim] because batch_first=True
         x = x.unsqueeze(1)  # [batch_size, 1, embed_dim]  # Assuming seq_len=1
@@ -491,12 +503,17 @@ class TransformerTdryClassifier(nn.Module):
 
     def forward(self, x):
         # x: [batch_size, input_dim]
-        x = self.embedding(x)  # [batch_size, embed_dim]
+        return self.forward_embedded(self.embedding(x))
+
+    def forward_embedded(self, x):
+        # x: [batch_size, embed_dim] - output of self.embedding (may be assembled
+        # from precomputed partial projections of the input columns)
         
-        # Transformer expects input as [sequence_length, batch_size, embed_dim]
-        x = x.unsqueeze(0)  # [1, batch_size, embed_dim]
-        x = self.transformer_encoder(x)  # [1, batch_size, embed_dim]
-        x = x.squeeze(0)  # [batch_size, embed_dim]
+        # Transformer expects input as [batch_size, seq_len, embed_dim] because batch_first=True
+        # (a [1, batch_size, embed_dim] input would let samples attend to each other)
+        x = x.unsqueeze(1)  # [batch_size, 1, embed_dim]  # Assuming seq_len=1
+        x = self.transformer_encoder(x)  # [batch_size, 1, embed_dim]
+        x = x.squeeze(1)  # [batch_size, embed_dim]
         
         # Fully connected layers
         x = F.relu(self.bn1(self.fc1(x)))
@@ -559,7 +576,11 @@ class TransformerTregClassifier(nn.Module):
 
     def forward(self, x):
         # x: [batch_size, input_dim]
-        x = self.embedding(x)  # [batch_size, embed_dim]
+        return self.forward_embedded(self.embedding(x))
+
+    def forward_embedded(self, x):
+        # x: [batch_size, embed_dim] - output of self.embedding (may be assembled
+        # from precomputed partial projections of the input columns)
 
         # Transformer expects input as [batch_size, seq_len, embed_dim] because batch_first=True
         x = x.unsqueeze(1)  # [batch_size, 1, embed_dim]  # Assuming seq_len=1
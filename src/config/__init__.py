@@ -1,6 +1,10 @@
 from .app_config import (
     BASE_DIR, STATIC_DIR, TEMPLATES_DIR,
-    LOGGING_CONFIG, VALIDATION_RULES
+    LOGGING_CONFIG, VALIDATION_RULES, PERFORMANCE_CONFIG, METRICS_CONFIG,
+    ASSETS_CONFIG, INVERSE_DESIGN_CONFIG, UNCERTAINTY_CONFIG,
+    ROBUSTNESS_CONFIG, LATTICE_CONFIG, PREDICTION_CACHE_CONFIG,
+    MODEL_RESIDENCY_CONFIG, PREFORK_CONFIG, CHECKPOINT_CONFIG, BUNDLE_CONFIG,
+    PREPROCESSOR_CONFIG, INPUT_FOLDING_CONFIG
 )
 from .model_config import (
     MODELS_DIR, SCALERS_DIR, MODEL_CONFIG, 
@@ -9,7 +13,11 @@ from .model_config import (
 
 __all__ = [
     'BASE_DIR', 'STATIC_DIR', 'TEMPLATES_DIR',
-    'LOGGING_CONFIG', 'VALIDATION_RULES',
+    'LOGGING_CONFIG', 'VALIDATION_RULES', 'PERFORMANCE_CONFIG', 'METRICS_CONFIG', 'ASSETS_CONFIG',
+    'INVERSE_DESIGN_CONFIG', 'UNCERTAINTY_CONFIG', 'ROBUSTNESS_CONFIG',
+    'LATTICE_CONFIG', 'PREDICTION_CACHE_CONFIG', 'MODEL_RESIDENCY_CONFIG',
+    'PREFORK_CONFIG', 'CHECKPOINT_CONFIG', 'BUNDLE_CONFIG', 'PREPROCESSOR_CONFIG',
+    'INPUT_FOLDING_CONFIG',
     'MODELS_DIR', 'SCALERS_DIR', 'MODEL_CONFIG',
     'SCALER_CONFIG', 'CALCULATION_CONSTANTS'
 ]
\ No newline at end of file
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Базовые пути
@@ -12,6 +13,144 @@ VALIDATION_RULES = {
     'E_kDg_moll': {'min': 0, 'max': float('inf')}
 }
 
+# Параметры инструментирования производительности
+PERFORMANCE_CONFIG = {
+    'instrumentation_enabled': os.getenv('ADSORPNET_INSTRUMENTATION', '0') == '1',
+    'latency_window_size': 1000,
+}
+
+# Конфигурация графических ресурсов (уменьшенные варианты изображений)
+ASSETS_CONFIG = {
+    'images_dir': BASE_DIR / "images",
+    'output_dir': STATIC_DIR / "assets",
+    'icon_size': 128,
+    'image_format': 'WEBP',
+    'quality': 85,
+}
+
+# Резидентность моделей в памяти (ModelService)
+MODEL_RESIDENCY_CONFIG = {
+    'memory_budget_mb': float(os.getenv('ADSORPNET_MODEL_BUDGET_MB', '0')),  # 0 — без ограничения
+    'eviction_policy': os.getenv('ADSORPNET_MODEL_EVICTION', 'lru'),         # 'lru' или 'lfu'
+    # Модели, которые не вытесняются (через запятую)
+    'pinned_models': tuple(
+        name.strip() for name in os.getenv('ADSORPNET_PINNED_MODELS', '').split(',') if name.strip()
+    ),
+}
+
+# Чекпойнты torch-моделей: safetensors с отображением в память (src.services.checkpoints)
+CHECKPOINT_CONFIG = {
+    'use_safetensors': os.getenv('ADSORPNET_SAFETENSORS', '1') == '1',
+    # Проверять контрольную сумму тензоров при каждой загрузке (читает все байты файла)
+    'verify_on_load': os.getenv('ADSORPNET_VERIFY_CHECKPOINTS', '0') == '1',
+}
+
+# Скейлеры и энкодеры в .npz без pickle и sklearn (src.services.preprocessors)
+PREPROCESSOR_CONFIG = {
+    # Загружать saved_scalers/*.npz вместо пиклов, если файлы экспортированы
+    'use_npz': os.getenv('ADSORPNET_NPZ_PREPROCESSORS', '1') == '1',
+}
+
+# Встраивание скейлеров в модели (src.services.scaling, src.services.xgb_thresholds)
+INPUT_FOLDING_CONFIG = {
+    # Модели металлов и температур принимают исходные признаки без отдельного масштабирования
+    'enabled': os.getenv('ADSORPNET_FOLD_SCALERS', '1') == '1',
+    # Загружать бустеры XGBoost с порогами в исходных единицах (*.raw.json), если они скомпилированы.
+    # По умолчанию выключено: benchmarks/check_raw_thresholds не показывает выигрыша
+    # (масштабирование одной строки и так занимает доли времени predict)
+    'xgboost_raw_thresholds': os.getenv('ADSORPNET_RAW_THRESHOLDS', '0') == '1',
+}
+
+# Единый архив артефактов конвейера (src.services.bundle)
+BUNDLE_CONFIG = {
+    # Загружать артефакты ModelService из архива вместо отдельных файлов
+    'enabled': os.getenv('ADSORPNET_USE_BUNDLE', '0') == '1',
+    'path': Path(os.getenv('ADSORPNET_BUNDLE', str(BASE_DIR / "saved_models" / "adsorpnet.bundle"))),
+    'verify_checksums': True,   # SHA-256 записи при первом обращении
+}
+
+# Pre-fork запуск рабочих процессов с общими весами моделей (src.services.prefork)
+PREFORK_CONFIG = {
+    'workers': int(os.getenv('ADSORPNET_WORKERS', '2')),
+    'base_port': int(os.getenv('ADSORPNET_BASE_PORT', '8501')),
+    'threads_per_worker': int(os.getenv('ADSORPNET_WORKER_THREADS', '1')),
+    'report_interval_s': 300.0,     # период отчета о памяти рабочих процессов
+}
+
+# Параметры обратного поиска входного профиля (CMA-ES по пакетному конвейеру)
+INVERSE_DESIGN_CONFIG = {
+    'initial_samples': 256,     # случайных точек в нулевом поколении
+    'population_size': 32,      # точек в поколении CMA-ES
+    'initial_sigma': 0.3,       # начальный шаг в нормированном пространстве [0, 1]^5
+    'max_generations': 100,
+    'time_budget_s': 10.0,
+    'patience': 15,             # поколений без улучшения до перезапуска
+    'max_idle_restarts': 2,     # перезапусков без улучшения до остановки
+    'tolerance': 1e-3,          # достаточное относительное отклонение от цели
+    'top_n': 5,
+}
+
+# Параметры оценки неопределенности (Monte Carlo dropout)
+UNCERTAINTY_CONFIG = {
+    'mc_samples': int(os.getenv('ADSORPNET_MC_SAMPLES', '32')),
+    'max_mc_samples': 256,
+}
+
+# Параметры оценки устойчивости рецепта к погрешности измерений
+ROBUSTNESS_CONFIG = {
+    'samples': 256,
+    'max_samples': 10000,
+    # Относительная погрешность измерения входных параметров по умолчанию
+    'relative_errors': {
+        'SBAT_m2_gr': 0.02,
+        'a0_mmoll_gr': 0.02,
+        'E_kDg_moll': 0.02,
+        'Ws_cm3_gr': 0.02,
+        'Sme_m2_gr': 0.02,
+    },
+    'quantiles': (0.05, 0.25, 0.5, 0.75, 0.95),
+}
+
+# Решетка предрассчитанных предсказаний (приближенные ответы без инференса)
+LATTICE_CONFIG = {
+    'path': BASE_DIR / "saved_models" / "lattice",
+    'points_log2': 16,          # 65536 точек выборки Соболя
+    'batch_size': 4096,
+    'neighbours': 8,
+    # Допуски, при превышении которых выполняется точный расчет
+    'max_distance': 0.1,        # до ближайшей точки в нормированном пространстве [0, 1]^5
+    'max_disagreement': 0.0,    # доля несогласных соседей по категориальным выходам
+    'max_relative_spread': 0.05,
+}
+
+# Кэш предсказаний и квантование входов перед построением ключа.
+# Допуск поля задается абсолютно ({'abs': шаг}) или относительно
+# ({'rel': доля}, логарифмические корзины); поля без допуска хешируются точно.
+PREDICTION_CACHE_CONFIG = {
+    'enabled': os.getenv('ADSORPNET_PREDICTION_CACHE', '1') == '1',
+    'maxsize': 1000,
+    'key_policy': {
+        'SBAT_m2_gr': {'rel': 5e-4},
+        'a0_mmoll_gr': {'rel': 5e-4},
+        'E_kDg_moll': {'rel': 5e-4},
+        'Ws_cm3_gr': {'rel': 5e-4},
+        'Sme_m2_gr': {'rel': 5e-4},
+    },
+    'verify_samples': 500,          # точек в режиме проверки ключей
+    'target_agreement': 0.99,       # требуемая доля совпадений с точным расчетом
+}
+
+# Конфигурация экспорта метрик (формат Prometheus)
+METRICS_CONFIG = {
+    'enabled': os.getenv('ADSORPNET_METRICS', '0') == '1',
+    'host': os.getenv('ADSORPNET_METRICS_HOST', '127.0.0.1'),
+    'port': int(os.getenv('ADSORPNET_METRICS_PORT', '9108')),
+    # Путь для textfile-коллектора node_exporter (используется в режиме Streamlit)
+    'textfile_path': os.getenv('ADSORPNET_METRICS_TEXTFILE', ''),
+    # Номер рабочего процесса pre-fork (src.services.prefork): метка worker у всех метрик
+    'worker': os.getenv('ADSORPNET_METRICS_WORKER', ''),
+}
+
 # Конфигурация логирования
 LOGGING_CONFIG = {
     'version': 1,
@@ -1,6 +1,7 @@
 from .constants import (
     METAL_MOLAR_MASSES, LIGAND_MOLAR_MASSES,
-    METAL_IONIC_RADIUS, METAL_ELECTRONEGATIVITY
+    METAL_IONIC_RADIUS, METAL_ELECTRONEGATIVITY,
+    INPUT_RANGES, WS_TO_W0_RATIO_RANGE, SME_TO_SBAT_FRACTION_RANGE
 )
 from .features import (
     features_metal, features_ligand, features_solvent, 
@@ -12,6 +13,7 @@ from .features import (
 __all__ = [
     'METAL_MOLAR_MASSES', 'LIGAND_MOLAR_MASSES',
     'METAL_IONIC_RADIUS', 'METAL_ELECTRONEGATIVITY',
+    'INPUT_RANGES', 'WS_TO_W0_RATIO_RANGE', 'SME_TO_SBAT_FRACTION_RANGE',
     'features_metal', 'features_ligand', 'features_solvent', 
     'features_salt_mass', 'features_acid_mass', 'features_Vsyn',
     'features_Tsyn', 'features_Tdry', 'features_Treg',
@@ -64,4 +64,16 @@ SOLVENT_SMILES = {
     'Вода': 'O',
     'ДМСО': 'CS(=O)C',
     'Ацетонитрил': 'CC#N'
-}
\ No newline at end of file
+}
+
+# Рабочие диапазоны входных параметров формы синтеза (см. render_input_form)
+INPUT_RANGES = {
+    'SBAT_m2_gr': (500.0, 3000.0),   # м²/г
+    'a0_mmoll_gr': (5.0, 20.0),      # ммоль/г
+    'E_kDg_moll': (5.0, 10.0),       # кДж/моль
+}
+
+# Зависимые параметры задаются относительно базовых:
+# Ws — доля от объема микропор W₀ (Ws > W₀), Sme — доля от SБЭТ (10-30%)
+WS_TO_W0_RATIO_RANGE = (1.05, 2.0)
+SME_TO_SBAT_FRACTION_RANGE = (0.1, 0.3)
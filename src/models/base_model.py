@@ -2,7 +2,7 @@ from abc import ABC, abstractmethod
 import torch
 import logging
 from typing import Any, Dict, Optional, List, Tuple
-from ..utils.cache import create_cache_key, cached_prediction
+from ..utils.storage.cache import create_cache_key, cached_prediction, store_prediction
 from ..utils.performance.batch_processing import BatchProcessor
 from ..utils.performance.quantization import ModelQuantizer
 from ..utils.performance.cuda_optimization import CUDAOptimizer
@@ -163,7 +163,7 @@ class BaseModel(ABC):
         
         # Сохраняем в кэш
         if self.use_cache:
-            cached_prediction.cache_info = result
+            store_prediction(cache_key, self.__class__.__name__, result)
             
         return result
     
@@ -5,7 +5,7 @@ import logging
 from typing import Dict, Any, List, Tuple
 from .base_model import BaseModel
 from ..config import MODEL_CONFIG, SCALER_CONFIG
-import joblib
+from ..services.preprocessors import load_artifact
 
 logger = logging.getLogger(__name__)
 
@@ -57,7 +57,7 @@ class MetalClassifier(BaseModel):
             'minor': 'minor_metal'
         }[model_type]
         
-        self.scaler = joblib.load(SCALER_CONFIG[scaler_key])
+        self.scaler = load_artifact(SCALER_CONFIG[scaler_key])
         self.input_features = None  # Будет установлено при загрузке модели
         
     def load_model(self) -> None:
@@ -4,7 +4,7 @@ import logging
 from typing import Dict, Any, List
 from .base_model import BaseModel
 from ..config import MODEL_CONFIG, SCALER_CONFIG
-import joblib
+from ..services.preprocessors import load_artifact
 
 logger = logging.getLogger(__name__)
 
@@ -24,8 +24,8 @@ class SolventClassifier(BaseModel):
         )
         
         # Загрузка скейлера и энкодера
-        self.scaler = joblib.load(SCALER_CONFIG['solvent'])
-        self.label_encoder = joblib.load('saved_scalers/label_encoder_solvent.pkl')
+        self.scaler = load_artifact(SCALER_CONFIG['solvent'])
+        self.label_encoder = load_artifact('saved_scalers/label_encoder_solvent.pkl')
         
     def load_model(self) -> None:
         """Загрузка модели из файла."""
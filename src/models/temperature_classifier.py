@@ -5,7 +5,7 @@ import logging
 from typing import Dict, Any, List
 from .base_model import BaseModel
 from ..config import MODEL_CONFIG, SCALER_CONFIG
-import joblib
+from ..services.preprocessors import load_artifact
 
 logger = logging.getLogger(__name__)
 
@@ -49,8 +49,8 @@ class BaseTemperatureClassifier(BaseModel):
         )
         
         # Загрузка скейлера и энкодера
-        self.scaler = joblib.load(SCALER_CONFIG[temp_type.lower()])
-        self.label_encoder = joblib.load(f'saved_scalers/label_encoder_{temp_type}.pkl')
+        self.scaler = load_artifact(SCALER_CONFIG[temp_type.lower()])
+        self.label_encoder = load_artifact(f'saved_scalers/label_encoder_{temp_type}.pkl')
         self.input_features = None
         
     def load_model(self) -> None:
@@ -2,10 +2,252 @@
 Страница анализа структуры MOF.
 """
 
+from typing import Dict, Optional, Tuple
+
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 from src.utils.ui.page_config import load_theme_css
+from src.services.sensitivity import (
+    SWEEP_PARAMETERS, SWEEP_OUTPUTS, CATEGORICAL_OUTPUTS,
+    default_sweep_range
+)
+
+# Базовая точка по умолчанию — значения формы страницы предсказания
+DEFAULT_BASE_POINT = {
+    'SBAT_m2_gr': 1200.0,
+    'a0_mmoll_gr': 10.5,
+    'E_kDg_moll': 6.5,
+    'Ws_cm3_gr': 0.4371,
+    'Sme_m2_gr': 200.0,
+}
+
+# Цвета категорий на тепловых картах
+CATEGORY_COLORS = ['#4e54c8', '#8f94fb', '#FF4B4B', '#2ca02c', '#ff7f0e', '#17becf']
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_sweep(
+    base_point: Tuple[Tuple[str, float], ...],
+    x_parameter: str,
+    x_range: Tuple[float, float],
+    x_points: int,
+    y_parameter: Optional[str] = None,
+    y_range: Optional[Tuple[float, float]] = None,
+    y_points: int = 0
+) -> pd.DataFrame:
+    """
+    Рассчитывает развертку и кэширует ее по (базовая точка, параметры развертки).
+
+    Args:
+        base_point: Базовая точка в виде кортежа пар (параметр, значение)
+        x_parameter: Первый изменяемый параметр
+        x_range: Диапазон первого параметра
+        x_points: Число значений первого параметра
+        y_parameter: Второй изменяемый параметр (None — одномерная развертка)
+        y_range: Диапазон второго параметра
+        y_points: Число значений второго параметра
+
+    Returns:
+        pd.DataFrame: Входные параметры и результаты для каждой точки
+    """
+    # Сервис (и ML-библиотеки) импортируется только при первом расчете
+    from src.services.predictor_service import PredictorService
+    from src.services.sensitivity import run_sweep
+
+    return run_sweep(
+        PredictorService(), dict(base_point), x_parameter, x_range, x_points,
+        y_parameter, y_range, y_points
+    )
+
+
+def sweep_curve(df: pd.DataFrame, x_parameter: str, output: str) -> go.Figure:
+    """
+    Строит кривую результата вдоль одномерной развертки.
+
+    Args:
+        df: Результаты развертки
+        x_parameter: Изменяемый параметр
+        output: Результат конвейера (ключ SWEEP_OUTPUTS)
+
+    Returns:
+        go.Figure: График
+    """
+    fig = go.Figure()
+    if output in CATEGORICAL_OUTPUTS:
+        # Класс по оси Y, цвет — уверенность классификатора
+        fig.add_trace(go.Scatter(
+            x=df[x_parameter],
+            y=df[output],
+            mode='markers',
+            marker=dict(
+                size=9,
+                color=df[f'{output}_confidence'],
+                colorscale='Viridis',
+                cmin=0, cmax=1,
+                showscale=True,
+                colorbar=dict(title="Уверенность")
+            ),
+            hovertemplate="%{x:.4g}: %{y} (%{marker.color:.0%})<extra></extra>"
+        ))
+        fig.update_yaxes(type='category')
+    else:
+        fig.add_trace(go.Scatter(
+            x=df[x_parameter],
+            y=df[output],
+            mode='lines+markers',
+            line=dict(color='#4e54c8', shape='hv' if output in ('tsyn', 'tdry', 'treg') else 'linear'),
+            marker=dict(size=5)
+        ))
+
+    fig.update_layout(
+        title=SWEEP_OUTPUTS[output],
+        xaxis_title=SWEEP_PARAMETERS[x_parameter],
+        yaxis_title=SWEEP_OUTPUTS[output],
+        height=350,
+        margin=dict(l=40, r=20, t=50, b=40)
+    )
+    return fig
+
+
+def sweep_heatmap(df: pd.DataFrame, x_parameter: str, y_parameter: str, output: str) -> go.Figure:
+    """
+    Строит тепловую карту результата по двумерной развертке.
+
+    Args:
+        df: Результаты развертки
+        x_parameter: Параметр по оси X
+        y_parameter: Параметр по оси Y
+        output: Результат конвейера (ключ SWEEP_OUTPUTS)
+
+    Returns:
+        go.Figure: График
+    """
+    if output in CATEGORICAL_OUTPUTS:
+        # Классы кодируются номерами с дискретной шкалой цветов
+        categories = sorted(df[output].unique())
+        codes = df[output].map({category: i for i, category in enumerate(categories)})
+        z = codes.to_numpy().reshape(-1, df[x_parameter].nunique())
+        labels = df[output].to_numpy().reshape(z.shape)
+        n = len(categories)
+        colorscale = []
+        for i in range(n):
+            color = CATEGORY_COLORS[i % len(CATEGORY_COLORS)]
+            colorscale += [[i / n, color], [(i + 1) / n, color]]
+        trace = go.Heatmap(
+            x=df[x_parameter].unique(),
+            y=df[y_parameter].unique(),
+            z=z,
+            text=labels,
+            zmin=-0.5, zmax=n - 0.5,
+            colorscale=colorscale,
+            colorbar=dict(tickvals=list(range(n)), ticktext=categories),
+            hovertemplate="%{x:.4g}, %{y:.4g}: %{text}<extra></extra>"
+        )
+    else:
+        trace = go.Heatmap(
+            x=df[x_parameter].unique(),
+            y=df[y_parameter].unique(),
+            z=df[output].to_numpy().reshape(-1, df[x_parameter].nunique()),
+            colorscale='Viridis',
+            hovertemplate="%{x:.4g}, %{y:.4g}: %{z:.4g}<extra></extra>"
+        )
+
+    fig = go.Figure(trace)
+    fig.update_layout(
+        title=SWEEP_OUTPUTS[output],
+        xaxis_title=SWEEP_PARAMETERS[x_parameter],
+        yaxis_title=SWEEP_PARAMETERS[y_parameter],
+        height=400,
+        margin=dict(l=40, r=20, t=50, b=40)
+    )
+    return fig
+
+
+def render_sensitivity_panel() -> None:
+    """Отображает панель анализа чувствительности рекомендаций к входным параметрам."""
+    st.markdown("### Чувствительность рекомендаций модели")
+    st.write(
+        "Изменяйте один или два входных параметра при фиксированных остальных: "
+        "все точки рассчитываются одним пакетным прогоном модели."
+    )
+
+    # Базовая точка: последние введенные на странице предсказания значения
+    base_defaults: Dict[str, float] = {**DEFAULT_BASE_POINT, **(st.session_state.get('user_inputs') or {})}
+    base_point = {}
+    columns = st.columns(len(SWEEP_PARAMETERS))
+    for column, (parameter, label) in zip(columns, SWEEP_PARAMETERS.items()):
+        with column:
+            base_point[parameter] = st.number_input(
+                label, value=float(base_defaults[parameter]), min_value=0.0,
+                format="%.4f" if parameter == 'Ws_cm3_gr' else "%.2f",
+                key=f"sweep_base_{parameter}"
+            )
+
+    two_dimensional = st.radio(
+        "Тип развертки", ["Один параметр (кривые)", "Два параметра (тепловые карты)"],
+        horizontal=True, key="sweep_mode"
+    ) != "Один параметр (кривые)"
+
+    parameters = list(SWEEP_PARAMETERS)
+    axes = [('x', 'Параметр по оси X', 0, 50)]
+    if two_dimensional:
+        axes.append(('y', 'Параметр по оси Y', 2, 25))
+
+    spec = {}
+    for axis, title, default_index, default_points in axes:
+        col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+        with col1:
+            parameter = st.selectbox(
+                title, parameters, index=default_index,
+                format_func=SWEEP_PARAMETERS.get, key=f"sweep_{axis}_parameter"
+            )
+        low, high = default_sweep_range(parameter, base_point)
+        with col2:
+            low = st.number_input("От", value=float(low), key=f"sweep_{axis}_low_{parameter}")
+        with col3:
+            high = st.number_input("До", value=float(high), key=f"sweep_{axis}_high_{parameter}")
+        with col4:
+            points = st.number_input("Точек", min_value=2, max_value=100, value=default_points,
+                                     key=f"sweep_{axis}_points")
+        spec[axis] = (parameter, (float(low), float(high)), int(points))
+
+    outputs = st.multiselect(
+        "Показываемые результаты", list(SWEEP_OUTPUTS),
+        default=['metal', 'ligand', 'salt_mass', 'tsyn'],
+        format_func=SWEEP_OUTPUTS.get, key="sweep_outputs"
+    )
+
+    if two_dimensional and spec['x'][0] == spec['y'][0]:
+        st.warning("Выберите разные параметры для осей X и Y.")
+        return
+
+    if st.button("📈 Рассчитать развертку", type="primary", key="sweep_run"):
+        st.session_state.sweep_request = (tuple(sorted(base_point.items())), spec)
+
+    request = st.session_state.get('sweep_request')
+    if request is None:
+        return
+
+    # Повторные отрисовки с той же разверткой берутся из кэша
+    request_base, request_spec = request
+    x_parameter, x_range, x_points = request_spec['x']
+    y_parameter, y_range, y_points = request_spec.get('y', (None, None, 0))
+    with st.spinner("Расчет развертки..."):
+        df = cached_sweep(request_base, x_parameter, x_range, x_points, y_parameter, y_range, y_points)
+
+    chart_columns = st.columns(2)
+    for i, output in enumerate(outputs):
+        with chart_columns[i % 2]:
+            if y_parameter is None:
+                fig = sweep_curve(df, x_parameter, output)
+            else:
+                fig = sweep_heatmap(df, x_parameter, y_parameter, output)
+            st.plotly_chart(fig, use_container_width=True, key=f"sweep_chart_{output}")
+
+    with st.expander("Таблица развертки"):
+        st.dataframe(df, use_container_width=True)
+
 
 def show():
     """Отображает страницу аналитики MOF материалов."""
@@ -123,6 +365,9 @@ def show():
     
     st.dataframe(filtered_df, use_container_width=True)
 
+    st.markdown("---")
+    render_sensitivity_panel()
+
 
 if __name__ == "__main__":
     show() 
\ No newline at end of file
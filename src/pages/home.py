@@ -1,27 +1,8 @@
 import streamlit as st
 import pandas as pd
-from pathlib import Path
-from PIL import Image
 import plotly.graph_objects as go
 
-
-###############################
-# Helpers
-###############################
-
-def load_home_css() -> None:
-    """Inject CSS styles for the Home page from *static/home.css*.
-
-    If the file cannot be found we fail silently so the rest of the page
-    still renders.
-    """
-    css_path = Path("static/style.css")
-    if css_path.exists():
-        with css_path.open() as f:
-            css = f.read()
-        st.markdown(f"<style>{css}</style>", unsafe_allow_html=True)
-    else:
-        st.warning("CSS‑файл static/home.css не найден – страница показана без кастомных стилей.")
+from src.utils.ui import page_image
 
 
 ###############################
@@ -31,10 +12,7 @@ def load_home_css() -> None:
 def show():
     """Главная страница AdsorpNET."""
 
-    # 1. Load page‑specific styles -------------------------
-    load_home_css()
-
-    # 2. Header -------------------------------------------
+    # 1. Header -------------------------------------------
     header_col1, header_col2 = st.columns([3, 1])
 
     with header_col1:
@@ -45,7 +23,7 @@ def show():
         # Навигационные ссылки "Главная" и "Профиль" удалены
         pass
 
-    # 3. Tabs ---------------------------------------------
+    # 2. Tabs ---------------------------------------------
     tab1, tab2 = st.tabs(["🔍 Обзор", "🧪 AI синтез MOFs"])
 
     # ------------------------------------------------------------------
@@ -67,9 +45,9 @@ def show():
 
         # --- Hero: изображение ---------------------------------------
         with hero_col2:
-            img_path = Path("images/MOF_Synthesis_Prediction.png")
-            if img_path.exists():
-                st.image(str(img_path), width=450)
+            hero_image = page_image("MOF_Synthesis_Prediction.png")
+            if hero_image:
+                st.image(hero_image, width=450)
             else:
                 # Fallback визуализация – простая 3‑D scatter
                 fig = go.Figure(
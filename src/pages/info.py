@@ -3,7 +3,7 @@
 """
 
 import streamlit as st
-from src.utils.ui import load_theme_css
+from src.utils.ui import load_theme_css, page_image
 
 def show():
     """Отображает страницу с информацией о MOF."""
@@ -76,7 +76,7 @@ def show():
     
     with col1:
         try:
-            st.image("images/1page.jpg", 
+            st.image(page_image("1page.jpg"), 
         caption="Структура типичного MOF",
         use_container_width=True)
         except:
@@ -84,7 +84,7 @@ def show():
             
     with col2:
         try:
-            st.image("images/2page.jpg", 
+            st.image(page_image("2page.jpg"), 
                     caption="Примеры применения MOF",
                      use_container_width=True)
         except:
@@ -7,13 +7,12 @@ import streamlit as st
 import pandas as pd
 import base64
 from io import BytesIO
-from pathlib import Path
 from typing import Dict, Any, List, Union, Tuple, Optional
 import os
-import time
 
+from src.config import ROBUSTNESS_CONFIG, UNCERTAINTY_CONFIG
 from src.utils.ui import load_theme_css
-from src.services.predictor_service import PredictorService
+from src.utils.ui.styles import inject_css_bundle
 
 # --- Константы ---
 PRIMARY_COLOR = "#4361ee"
@@ -22,6 +21,25 @@ SUCCESS_COLOR = "#06d6a0"
 WARNING_COLOR = "#ffd166"
 DANGER_COLOR = "#ef476f"
 
+# Стадии конвейера предсказаний и их подписи (совпадают с PIPELINE_STAGES сервиса;
+# продублированы, чтобы не импортировать сервис и ML-библиотеки до расчета)
+PIPELINE_STAGE_ORDER = (
+    'derived_features', 'metal', 'ligand', 'solvent', 'salt_mass',
+    'acid_mass', 'Vsyn', 'Tsyn', 'Tdry', 'Treg'
+)
+STAGE_LABELS = {
+    'derived_features': "Расчет производных характеристик",
+    'metal': "Подбор металла",
+    'ligand': "Подбор лиганда",
+    'solvent': "Подбор растворителя",
+    'salt_mass': "Расчет массы соли",
+    'acid_mass': "Расчет массы кислоты",
+    'Vsyn': "Расчет объема растворителя",
+    'Tsyn': "Подбор температуры синтеза",
+    'Tdry': "Подбор температуры сушки",
+    'Treg': "Подбор температуры регенерации",
+}
+
 # --- Утилиты ---
 
 def get_img_as_base64(file_path: str) -> str:
@@ -41,232 +59,42 @@ def get_img_as_base64(file_path: str) -> str:
         print(f"Ошибка чтения файла {file_path}: {e}")
         return "data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"
 
-@st.cache_data(show_spinner=False)
-def load_icon_map() -> Dict[str, str]:
-    """Предзагрузка и кэширование иконок"""
-    icon_dir = Path("images")
-    icons = {
-        "Металл": "Metal.png",
-        "Лиганд": "Ligand.png",
-        "Растворитель": "Solvent.png",
-        "m (соли), г": "SaltMass.png",
-        "m(кис-ты), г": "AcidMass.png",
-        "Vсин. (р-ля), мл": "Vsyn.png",
-        "Т.син., °С": "Tsyn.png",
-        "Т суш., °С": "Tdry.png",
-        "Tрег, ᵒС": "Treg.png",
-    }
-    
-    icon_map = {}
-    for name, file in icons.items():
-        try:
-            path = icon_dir / file
-            with path.open("rb") as f:
-                icon_map[name] = base64.b64encode(f.read()).decode()
-        except (FileNotFoundError, IOError) as e:
-            # Тихо продолжаем без иконки
-            icon_map[name] = ""
-    
-    return icon_map
-
-# --- Минимальные стили CSS для улучшения внешнего вида ---
-
-def inject_minimal_css() -> None:
-    """Внедряет минимум необходимых стилей для улучшения внешнего вида"""
-    css = """
-    <style>
-    /* Основные стили, не использующие сложный HTML */
+@st.cache_resource(show_spinner=False)
+def load_icon_paths() -> Dict[str, Optional[str]]:
+    """
+    Предзагрузка и кэширование иконок карточек результатов.
     
+    Иконки уменьшаются до размера карточки и сжимаются один раз на процесс
+    (готовые варианты с хэшем содержимого переиспользуются между запусками).
     
-    /* Контейнер списка вкладок */
-    .stTabs [data-baseweb="tab-list"] {
-        background: transparent;                       /* убираем белый фон */
-        border: none;                                  /* без рамки */
-        gap: 0;                                        /* плотно друг к другу */
-        border-bottom: 1px solid rgba(255,255,255,.15);/* тонкий разделитель */
-    }
-
-    /* Каждая вкладка */
-    .stTabs [data-baseweb="tab"] {
-        background: transparent;                       /* прозрачный фон */
-        color: rgba(255,255,255,.6);                   /* бледный текст */
-        padding: 8px 20px;
-        font-weight: 500;
-        transition: color .2s;
-        border: none;                                  /* убираем внутренние рамки */
-    }
-
-    /* Ховер по неактивной вкладке */
-    .stTabs [data-baseweb="tab"]:hover:not([aria-selected="true"]) {
-        color: #ffffff;                                /* подсвечиваем текст */
-    }
-
-    /* Активная вкладка */
-    .stTabs [aria-selected="true"] {
-        color: #ffffff;
-        background: rgba(67,97,238,.15);               /* лёгкая заливка */
-        border-bottom: 3px solid #4361ee;              /* подчёркивание фирменным цветом */
-        font-weight: 600;
-    }
-
-    /* Сброс густых внутренних границ, которые рисует baseweb */
-    .stTabs [data-baseweb="tab"]::before,
-    .stTabs [data-baseweb="tab"]::after {
-        display: none;
-    }
+    Returns:
+        Dict[str, Optional[str]]: {название параметра: путь к варианту иконки для st.image}
+    """
+    from src.utils.ui.assets import build_result_icons
     
-    /* ── отключаем синее подчёркивание активной вкладки ────────────── */
-    .stTabs [aria-selected="true"] {
-        border-bottom: none !important;   /* было 3px solid #4361ee */
-    }
+    return {name: str(path) if path else None for name, path in build_result_icons().items()}
 
+@st.cache_resource(show_spinner=False)
+def load_icon_map() -> Dict[str, str]:
+    """
+    Источники иконок для HTML-тега <img>.
     
+    URL статической раздачи (или data URI) подходит только для HTML: st.image
+    получает путь к файлу (load_icon_paths), так как относительные URL он
+    принимает не во всех поддерживаемых версиях Streamlit.
     
+    Returns:
+        Dict[str, str]: {название параметра: src для тега <img>}
+    """
+    from src.utils.ui.assets import image_src
     
-    /* Основные стили для текста */
-    h1, h2, h3 {
-        margin-bottom: 0.5rem; /* Уменьшенный отступ после заголовков */
-    }
-    
-    h1 {
-        font-size: 1.8rem;
-        font-weight: 700;
-    }
-    
-    h2 {
-        font-size: 1.5rem;
-        font-weight: 600;
-        margin-top: 1.5rem;
-    }
-    
-    h3 {
-        font-size: 1.25rem;
-        font-weight: 600;
-        margin-top: 1.25rem;
-        color: #2c3e50;
-        border-bottom: none; /* Убран разделитель */
-        padding-bottom: 0px; /* Убран отступ под заголовком */
-        margin-bottom: 10px; /* Уменьшен отступ после заголовка */
-    }
-    
-    
-    /* Улучшение стилей для полей ввода - убираем белые разделители и контур */
-    div[data-testid="stNumberInput"] {
-    margin-bottom: 10px;
-    margin-top: 5px;
-    background: transparent;
-    border: 1px solid rgba(255, 255, 255, 0.2) !important;
-    box-shadow: 0 0 0 1px rgba(255, 255, 255, 0.1) !important;
-    border-radius: 8px !important;
-    padding: 8px !important;
-    position: relative !important;
-}
-    
-    /* Убираем белый контур вокруг полей ввода */
-    input[type="number"] {
-    border: none !important;
-    box-shadow: none !important;
-    background-color: transparent !important;
-    color: white !important;
-}
-    
-    /* Отображение меток в одну строку и без описания */
-    div[data-testid="stNumberInput"] label {
-        border-left: 3px solid #4361ee;
-        padding-left: 8px;
-        font-weight: 500;
-        white-space: nowrap;
-        overflow: visible;
-        width: auto;
-        display: inline-block;
-        max-width: 85%; /* Ограничиваем ширину метки для освобождения места для иконки */
-    }
-    
-    /* Стиль для контейнера метки */
-    div[data-testid="stNumberInput"] > div:first-child {
-        display: flex !important;
-        justify-content: space-between !important;
-        align-items: center !important;
-        flex-direction: row !important;
-        width: 100% !important;
-    }
-    
-    /* Стиль для иконки помощи */
-    div[data-testid="stNumberInput"] [data-testid="stTooltipIcon"] {
-        position: absolute !important;
-        right: 10px !important;
-        top: 10px !important;
-        margin-left: auto !important;
-    }
-    
-    /* Дополнительная фиксация иконок */
-    div[data-baseweb="tooltip"] {
-        display: inline-block !important;
-        position: relative !important;
-        left: auto !important;
-        right: 0 !important;
-    }
-    
-    /* Скрываем текст описания после параметров */
-    div[data-testid="stNumberInput"] + div[data-testid="stText"] {
-        display: none !important;
-    }
-    
-    /* Улучшаем вид info-блоков */
-    div.stAlert {
-        border-radius: 8px;
-        border-left-width: 3px;
-        margin: 15px 0 15px 0;
-    }
-    
-    div.stAlert[data-baseweb="notification"] {
-        background-color: #e7f5ff;
-    }
-    
-    /* Кнопка рассчета */
-    div.stButton > button[data-testid="baseButton-primary"] {
-        background-color: #4361ee;
-        font-weight: 600;
-        border-radius: 8px;
-    }
-    
-    div.stButton > button[data-testid="baseButton-primary"]:hover {
-        background-color: #3a56d4;
-        box-shadow: 0 2px 6px rgba(0, 0, 0, 0.1);
-    }
-    
-    /* Заголовок экспандера */
-    button[data-testid="stExpander"] {
-        background-color: #f8f9fa;
-        border-radius: 6px;
-        border: none;
-        padding: 10px;
-    }
-    
-    /* Содержимое экспандера */
-    div[data-testid="stExpander-content"] {
-        border: 1px solid #f1f3f5;
-        border-radius: 0 0 8px 8px;
-        padding: 10px 15px;
-    }
-    
-    /* контрастные чипы для тёмной темы */
-    .alt-chip {
-        display:inline-block;
-        padding:4px 12px;
-        margin:4px 6px 4px 0;
-        border-radius:20px;
-        background:rgba(255,255,255,.08);  /* лёгкая подсветка */
-        color:#ffffff;                     /* белый текст */
-        font-size:14px;
-        line-height:20px;
-        white-space:nowrap;
-    }
+    return {name: image_src(path) for name, path in load_icon_paths().items()}
 
+# --- Минимальные стили CSS для улучшения внешнего вида ---
 
-    </style>
-    """
-    st.markdown(css, unsafe_allow_html=True)
+def inject_minimal_css() -> None:
+    """Подключает CSS-бандл страницы предсказания (вкладки, карточки параметров)"""
+    inject_css_bundle('predict')
 
 # --- Компоненты UI, использующие нативный Streamlit ---
 
@@ -510,76 +338,6 @@ def display_predicted_parameters(parameters: List[Dict[str, Any]]) -> None:
         "Температуры": ["Т.син., °С", "Т суш., °С", "Tрег, ᵒС"],
     }
     
-    # Добавляем CSS для карточек параметров
-    st.markdown("""
-    <style>
-    .param-card {
-        background: rgba(30, 40, 60, 0.6);
-        border-radius: 12px;
-        padding: 16px;
-        margin-bottom: 16px;
-        box-shadow: 0 8px 16px rgba(0, 0, 0, 0.4), 
-                    0 2px 4px rgba(0, 0, 0, 0.3), 
-                    inset 0 1px 0 rgba(255, 255, 255, 0.1),
-                    inset 0 0 3px rgba(255, 255, 255, 0.1);
-        border: 1px solid rgba(255, 255, 255, 0.1);
-        transition: transform 0.2s, box-shadow 0.2s;
-    }
-    
-    .param-card:hover {
-        transform: translateY(-4px);
-        box-shadow: 0 12px 24px rgba(0, 0, 0, 0.5), 
-                    0 4px 8px rgba(0, 0, 0, 0.4),
-                    inset 0 1px 0 rgba(255, 255, 255, 0.15),
-                    inset 0 0 5px rgba(255, 255, 255, 0.15);
-    }
-    
-    .param-content {
-        display: flex;
-        align-items: center;
-    }
-    
-    .param-icon {
-        flex: 0 0 80px;
-        margin-right: 20px;
-    }
-    
-    .param-icon img {
-        width: 80px;
-        height: 80px;
-        border: 2px solid rgba(255, 255, 255, 0.3);
-        border-radius: 8px;
-        box-shadow: 0 0 10px rgba(255, 255, 255, 0.1);
-    }
-    
-    .param-info {
-        flex: 1;
-    }
-    
-    .param-name {
-        font-weight: 600;
-        color: rgba(255, 255, 255, 0.85);
-        margin-bottom: 5px;
-    }
-    
-    .param-value {
-        font-size: 1.4rem;
-        font-weight: 700;
-        color: #4cc9f0;
-        margin-bottom: 10px;
-    }
-    
-    .emoji-icon {
-        font-size: 3rem;
-        text-align: center;
-        display: flex;
-        justify-content: center;
-        align-items: center;
-        width: 80px;
-        height: 80px;
-    }
-    </style>
-    """, unsafe_allow_html=True)
 
     # Создаем вкладки
     tab_titles = list(categories.keys())
@@ -599,8 +357,8 @@ def display_predicted_parameters(parameters: List[Dict[str, Any]]) -> None:
                 
                 with col1:
                     # Отображаем иконку
-                    if param.get("image_base64"):
-                        st.image(param["image_base64"], width=80)
+                    if param.get("image_path"):
+                        st.image(param["image_path"], width=80)
                     else:
                         emoji = {"Металл": "⚗️", "Лиганд": "🔬", "Растворитель": "💧"}.get(param["name"], "🧪")
                         st.markdown(f'<div class="emoji-icon">{emoji}</div>', unsafe_allow_html=True)
@@ -621,12 +379,128 @@ def display_predicted_parameters(parameters: List[Dict[str, Any]]) -> None:
                 st.markdown("<hr style='margin: 20px 0; border-color: rgba(255,255,255,0.1);'>", unsafe_allow_html=True)
     
 
+def display_uncertainty() -> None:
+    """
+    Отображает оценку неопределенности классификаторов (Monte Carlo dropout).
+
+    Оценка рассчитывается по запросу пользователя и сохраняется в сессии.
+    """
+    mc_samples = UNCERTAINTY_CONFIG['mc_samples']
+    with st.expander("Оценка неопределенности предсказания", expanded=False):
+        st.write(
+            f"Классификаторы выполняют {mc_samples} проходов с включенным dropout. "
+            "Энтропия отражает общую неопределенность выбора, взаимная информация — "
+            "неуверенность самой модели (высокая — входные данные далеки от обучающей выборки)."
+        )
+        if st.session_state.get("uncertainty") is None:
+            if not st.button("📊 Оценить неопределенность", key="uncertainty_run"):
+                return
+            from src.services.predictor_service import PredictorService
+
+            predictor: PredictorService = st.session_state.get("_predictor") or PredictorService()
+            st.session_state._predictor = predictor
+            with st.spinner("Оценка неопределенности..."):
+                result = predictor.run_batch_prediction(
+                    [st.session_state.user_inputs], mc_samples=mc_samples
+                )[0]
+            st.session_state.uncertainty = result['uncertainty']
+
+        labels = {'metal': "Металл", 'tsyn': "Т.син., °С", 'tdry': "Т суш., °С", 'treg': "Tрег, ᵒС"}
+        st.dataframe(pd.DataFrame([
+            {
+                "Параметр": labels[key],
+                "Класс (по среднему)": str(item['prediction']),
+                "Средняя вероятность, %": round(item['mean_probability'] * 100, 1),
+                "Энтропия, нат": round(item['entropy'], 3),
+                "Взаимная информация, нат": round(item['mutual_information'], 4),
+            }
+            for key, item in st.session_state.uncertainty.items()
+        ]), use_container_width=True, hide_index=True)
+
+
+def display_robustness() -> None:
+    """
+    Отображает устойчивость рецепта к погрешности измерения входных параметров.
+
+    Расчет выполняется по запросу пользователя и сохраняется в сессии.
+    """
+    with st.expander("Устойчивость к погрешности измерений", expanded=False):
+        st.write(
+            "Входные параметры случайно изменяются в пределах погрешности измерения, "
+            "и все копии рассчитываются одним пакетом. Показано, как часто сохраняется "
+            "рекомендованный рецепт и как распределены массы и температуры."
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            error_percent = st.number_input(
+                "Относительная погрешность, %", min_value=0.0, max_value=50.0,
+                value=ROBUSTNESS_CONFIG['relative_errors']['SBAT_m2_gr'] * 100, step=0.5,
+                key="robustness_error"
+            )
+        with col2:
+            n_samples = st.selectbox(
+                "Число копий", [64, 256, 1024],
+                index=[64, 256, 1024].index(ROBUSTNESS_CONFIG['samples']), key="robustness_samples"
+            )
+
+        if st.button("🎯 Оценить устойчивость", key="robustness_run"):
+            from src.services.predictor_service import PredictorService
+            from src.services.robustness import run_robustness
+
+            predictor: PredictorService = st.session_state.get("_predictor") or PredictorService()
+            st.session_state._predictor = predictor
+            with st.spinner("Расчет возмущенных копий..."):
+                st.session_state.robustness = run_robustness(
+                    predictor, st.session_state.user_inputs,
+                    {parameter: error_percent / 100 for parameter in st.session_state.user_inputs},
+                    n_samples
+                )
+
+        report = st.session_state.get("robustness")
+        if report is None:
+            return
+
+        st.metric("Совпадение с рекомендованным рецептом", f"{report['recipe_stability']:.0%}")
+
+        labels = {'metal': "Металл", 'ligand': "Лиганд", 'solvent': "Растворитель"}
+        st.dataframe(pd.DataFrame([
+            {
+                "Параметр": labels[key],
+                "Рекомендация": item['nominal'],
+                "Доля совпадений, %": round(item['nominal_frequency'] * 100, 1),
+                "Частый класс": item['mode'],
+                "Доля частого класса, %": round(item['mode_frequency'] * 100, 1),
+            }
+            for key, item in report['categorical'].items()
+        ]), use_container_width=True, hide_index=True)
+
+        st.dataframe(pd.DataFrame([
+            {
+                "Металл": recipe['metal'],
+                "Лиганд": recipe['ligand'],
+                "Растворитель": recipe['solvent'],
+                "Доля, %": round(recipe['frequency'] * 100, 1),
+            }
+            for recipe in report['recipes'][:5]
+        ]), use_container_width=True, hide_index=True)
+
+        from src.services.sensitivity import NUMERIC_OUTPUTS
+        st.dataframe(pd.DataFrame([
+            {
+                "Параметр": NUMERIC_OUTPUTS[key],
+                "Рекомендация": round(item['nominal'], 3),
+                **{f"q{float(q) * 100:.0f}": round(value, 3) for q, value in item['quantiles'].items()},
+            }
+            for key, item in report['numeric'].items()
+        ]), use_container_width=True, hide_index=True)
+
+
 # Функция для генерации HTML для иконки
 def generate_icon_html(param: Dict[str, Any]) -> str:
     """Создает HTML-код для отображения иконки параметра"""
-    if param.get("image_base64"):
+    if param.get("image_src"):
         return f"""
-        <img src="{param['image_base64']}" 
+        <img src="{param['image_src']}" 
              style="width: 80px; height: 80px; 
                     border: 2px solid white; 
                     border-radius: 8px;
@@ -649,13 +523,15 @@ def format_prediction_results_for_display(prediction_results: Dict[str, Any]) ->
     # Загружаем иконки
     icon_folder = "images"
     icon_map = load_icon_map()
+    icon_paths = load_icon_paths()
     
     # Формируем список параметров с метаданными
     parameters = [
         {
             "name": "Металл",
             "image": os.path.join(icon_folder, "Metal.png"),
-            "image_base64": f"data:image/png;base64,{icon_map.get('Металл', '')}",
+            "image_src": icon_map.get('Металл', ""),
+            "image_path": icon_paths.get('Металл'),
             "value": prediction_results.get('metal', {}).get('metal_type', 'N/A'),
             "prob": prediction_results.get('metal', {}).get('confidence'),
             "alternatives": prediction_results.get('metal', {}).get('alternatives', [
@@ -666,7 +542,8 @@ def format_prediction_results_for_display(prediction_results: Dict[str, Any]) ->
         {
             "name": "Лиганд",
             "image": os.path.join(icon_folder, "Ligand.png"),
-            "image_base64": f"data:image/png;base64,{icon_map.get('Лиганд', '')}",
+            "image_src": icon_map.get('Лиганд', ""),
+            "image_path": icon_paths.get('Лиганд'),
             "value": prediction_results.get('ligand', {}).get('ligand_type', 'N/A'),
             "prob": prediction_results.get('ligand', {}).get('confidence'),
             "alternatives": prediction_results.get('ligand', {}).get('alternatives', [
@@ -677,7 +554,8 @@ def format_prediction_results_for_display(prediction_results: Dict[str, Any]) ->
         {
             "name": "Растворитель",
             "image": os.path.join(icon_folder, "Solvent.png"),
-            "image_base64": f"data:image/png;base64,{icon_map.get('Растворитель', '')}",
+            "image_src": icon_map.get('Растворитель', ""),
+            "image_path": icon_paths.get('Растворитель'),
             "value": prediction_results.get('solvent', {}).get('solvent_type', 'N/A'),
             "prob": prediction_results.get('solvent', {}).get('confidence'),
             "alternatives": prediction_results.get('solvent', {}).get('alternatives', [
@@ -688,42 +566,48 @@ def format_prediction_results_for_display(prediction_results: Dict[str, Any]) ->
         {
             "name": "m (соли), г",
             "image": os.path.join(icon_folder, "SaltMass.png"),
-            "image_base64": f"data:image/png;base64,{icon_map.get('m (соли), г', '')}",
+            "image_src": icon_map.get('m (соли), г', ""),
+            "image_path": icon_paths.get('m (соли), г'),
             "value": f"{prediction_results.get('salt_mass', 0):.3f}",
             "prob": None
         },
         {
             "name": "m(кис-ты), г",
             "image": os.path.join(icon_folder, "AcidMass.png"),
-            "image_base64": f"data:image/png;base64,{icon_map.get('m(кис-ты), г', '')}",
+            "image_src": icon_map.get('m(кис-ты), г', ""),
+            "image_path": icon_paths.get('m(кис-ты), г'),
             "value": f"{prediction_results.get('acid_mass', 0):.3f}",
             "prob": None
         },
         {
             "name": "Vсин. (р-ля), мл",
             "image": os.path.join(icon_folder, "Vsyn.png"),
-            "image_base64": f"data:image/png;base64,{icon_map.get('Vсин. (р-ля), мл', '')}",
+            "image_src": icon_map.get('Vсин. (р-ля), мл', ""),
+            "image_path": icon_paths.get('Vсин. (р-ля), мл'),
             "value": f"{prediction_results.get('synthesis_volume', 0):.1f}",
             "prob": None
         },
         {
             "name": "Т.син., °С",
             "image": os.path.join(icon_folder, "Tsyn.png"),
-            "image_base64": f"data:image/png;base64,{icon_map.get('Т.син., °С', '')}",
+            "image_src": icon_map.get('Т.син., °С', ""),
+            "image_path": icon_paths.get('Т.син., °С'),
             "value": prediction_results.get('tsyn', {}).get('temperature', 'N/A'),
             "prob": prediction_results.get('tsyn', {}).get('confidence')
         },
         {
             "name": "Т суш., °С",
             "image": os.path.join(icon_folder, "Tdry.png"),
-            "image_base64": f"data:image/png;base64,{icon_map.get('Т суш., °С', '')}",
+            "image_src": icon_map.get('Т суш., °С', ""),
+            "image_path": icon_paths.get('Т суш., °С'),
             "value": prediction_results.get('tdry', {}).get('temperature', 'N/A'),
             "prob": prediction_results.get('tdry', {}).get('confidence')
         },
         {
             "name": "Tрег, ᵒС",
             "image": os.path.join(icon_folder, "Treg.png"),
-            "image_base64": f"data:image/png;base64,{icon_map.get('Tрег, ᵒС', '')}",
+            "image_src": icon_map.get('Tрег, ᵒС', ""),
+            "image_path": icon_paths.get('Tрег, ᵒС'),
             "value": prediction_results.get('treg', {}).get('temperature', 'N/A'),
             "prob": prediction_results.get('treg', {}).get('confidence')
         },
@@ -731,6 +615,32 @@ def format_prediction_results_for_display(prediction_results: Dict[str, Any]) ->
     
     return parameters
 
+def format_stage_event(event: Dict[str, Any]) -> str:
+    """
+    Форматирует событие завершения стадии конвейера для журнала прогресса.
+    
+    Args:
+        event: Событие прогресса PredictorService.run_full_prediction
+    
+    Returns:
+        str: Строка Markdown с названием стадии, результатом и временем
+    """
+    stage = event['stage']
+    result = event['result']
+    
+    if stage == 'derived_features':
+        value = f"W₀ = {result['W0_cm3_g']:.4f} см³/г, x₀ = {result['x0_nm']:.3f} нм"
+    elif stage in ('metal', 'ligand', 'solvent'):
+        value = f"{result[f'{stage}_type']} ({float(result['confidence']):.0%})"
+    elif stage in ('salt_mass', 'acid_mass'):
+        value = f"{result:.3f} г"
+    elif stage == 'Vsyn':
+        value = f"{result:.1f} мл"
+    else:
+        value = f"{result['temperature']} °C"
+    
+    return f"✅ **{STAGE_LABELS.get(stage, stage)}:** {value} · {event['stage_ms']:.0f} мс"
+
 def prepare_download_df(
     input_params: Dict[str, float],
     prediction_results: Dict[str, Any],
@@ -859,6 +769,12 @@ def show() -> None:
     if "download_df" not in st.session_state:
         st.session_state.download_df = None
     
+    if "uncertainty" not in st.session_state:
+        st.session_state.uncertainty = None
+    
+    if "robustness" not in st.session_state:
+        st.session_state.robustness = None
+    
     # Сохраняем состояние индикаторов прогресса
     if "progress_container" not in st.session_state:
         st.session_state.progress_container = None
@@ -911,27 +827,15 @@ def show() -> None:
         st.session_state.status_text = status_text
         st.session_state.progress_bar = progress_bar
         
-        # Последовательно показываем прогресс анализа
-        steps = [
-            "Предобработка данных", 
-            "Анализ характеристик", 
-            "Подбор компонентов", 
-            "Расчет пропорций", 
-            "Оптимизация температур", 
-            "Финализация"
-        ]
-        
-        for i, step in enumerate(steps):
-            # Обновляем статус и прогресс отдельно
-            status_text.write(f"⚙️ {step}... ({int((i+1) / len(steps) * 100)}%)")
-            progress_value = min(100, int((i+1) / len(steps) * 100))
-            progress_bar.progress(progress_value)  # Без параметра text
-            
-            # Имитируем задержку для наглядности прогресса
-            time.sleep(0.4)
+        # Журнал завершенных стадий конвейера (обновляется по событиям сервиса)
+        stage_log = st.empty()
+        status_text.write(f"⚙️ {STAGE_LABELS['derived_features']}...")
         
         # Получаем предсказания от модели - добавляем обработку ошибок
         try:
+            # Сервис (и ML-библиотеки) импортируется только при первом расчете
+            from src.services.predictor_service import PredictorService
+
             predictor: PredictorService = st.session_state.get("_predictor") or PredictorService()
             st.session_state._predictor = predictor
             
@@ -939,14 +843,31 @@ def show() -> None:
             if not hasattr(st.session_state, 'user_inputs') or not st.session_state.user_inputs:
                 raise ValueError("Отсутствуют введенные параметры. Пожалуйста, вернитесь на шаг ввода данных.")
             
+            completed_stages: List[str] = []
+
+            def on_stage_done(event: Dict[str, Any]) -> None:
+                """Отображает завершение стадии конвейера."""
+                completed_stages.append(format_stage_event(event))
+                stage_log.markdown("\n".join(completed_stages))
+                progress_bar.progress(int(event['index'] / event['total'] * 100))
+                if event['index'] < event['total']:
+                    next_stage = PIPELINE_STAGE_ORDER[event['index']]
+                    status_text.write(f"⚙️ {STAGE_LABELS[next_stage]}... ({event['index']}/{event['total']})")
+
             # Вызываем run_full_prediction только с допустимыми аргументами
-            results = predictor.run_full_prediction(**st.session_state.user_inputs)
+            results = predictor.run_full_prediction(
+                **st.session_state.user_inputs,
+                progress_callback=on_stage_done,
+                use_cache=True
+            )
             
             # Проверяем, что результаты не пустые
             if not results:
                 raise ValueError("Модель вернула пустые результаты.")
                 
             st.session_state.prediction_results = results
+            st.session_state.uncertainty = None
+            st.session_state.robustness = None
             
             # Форматируем результаты
             cards_data = format_prediction_results_for_display(results)
@@ -964,11 +885,7 @@ def show() -> None:
             progress_bar.progress(100)  # Без параметра text
             status_text.write("✅ Анализ завершен!")
             
-            # Показываем сообщение об успехе
-            st.success("✅ Оптимальные параметры синтеза успешно рассчитаны")
-            
-            # Автоматически переходим к следующему шагу через 2 секунды
-            time.sleep(2)
+            # Сразу переходим к результатам
             st.session_state.current_step = 2
             st.rerun()
             
@@ -1002,6 +919,8 @@ def show() -> None:
         # Отображаем результаты
         if st.session_state.formatted_results is not None:
             display_predicted_parameters(st.session_state.formatted_results)
+            display_uncertainty()
+            display_robustness()
             
             # Добавляем кнопку скачивания
             if st.session_state.download_df is not None:
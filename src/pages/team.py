@@ -3,7 +3,7 @@
 """
 
 import streamlit as st
-from src.utils.ui import load_theme_css
+from src.utils.ui import load_theme_css, page_image
 
 def show():
     """Отображает страницу с информацией о команде."""
@@ -92,7 +92,7 @@ def show():
     
     # Добавляем изображение команды
     try:
-        st.image("images/MOF_Synthesis_Prediction.png", 
+        st.image(page_image("MOF_Synthesis_Prediction.png"), 
         caption="Наша команда за работой",
         use_container_width=True)
     except:
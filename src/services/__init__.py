@@ -1,4 +1,25 @@
-from .model_service import ModelService
-from .predictor_service import PredictorService
+"""
+Сервисы моделей и предсказаний.
 
-__all__ = ['ModelService', 'PredictorService']
\ No newline at end of file
+Имена загружаются лениво (PEP 562): torch, XGBoost, pymatgen и RDKit
+импортируются только при первом обращении к сервису.
+"""
+
+from src.utils.lazy import make_lazy_module
+
+# Имя атрибута -> подмодуль, в котором он определен
+_LAZY_ATTRS = {
+    'ModelService': '.model_service',
+    'ModelResidency': '.model_residency',
+    'PredictorService': '.predictor_service',
+    'recipes_to_frame': '.predictor_service',
+    'run_sweep': '.sensitivity',
+    'run_inverse_design': '.inverse_design',
+    'run_robustness': '.robustness',
+    'PredictionLattice': '.lattice',
+    'get_lattice': '.lattice',
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+__getattr__, __dir__ = make_lazy_module(_LAZY_ATTRS, __name__)
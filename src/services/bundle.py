@@ -0,0 +1,410 @@
+"""
+Единый индексированный архив артефактов конвейера.
+
+Холодный старт открывает десятки файлов из saved_models/ и saved_scalers/.
+Архив (bundle) упаковывает их в один файл, который отображается в память
+одним mmap:
+
+    [8 байт]  сигнатура ADSNBNDL
+    [4 байта] версия формата (little-endian)
+    [4 байта] резерв
+    [8 байт]  длина заголовка
+    [заголовок JSON] индекс: версия архива, время сборки и записи
+    [данные]  блоки записей, выровненные по 64 байтам
+
+Запись индекса: вид ('torch_state', 'xgboost', 'preprocessor', 'pickle',
+'json'), смещение
+и длина блока, SHA-256 блока и исходного файла. Для torch-моделей блок —
+байты тензоров state_dict подряд, а в записи перечислены имя, тип, форма
+и смещение каждого тензора: тензоры создаются поверх mmap без копирования.
+Бустеры XGBoost хранятся в UBJSON (разбираются вдвое быстрее JSON).
+Скейлеры и энкодеры хранятся как массивы параметров (src.services.preprocessors)
+и читаются поверх mmap без pickle и sklearn; объекты других классов —
+как пиклы joblib.
+Записи 'features/<имя>' — списки признаков из src.domain; при открытии
+архива они сверяются с кодом.
+
+Ключ записи — путь исходного файла относительно корня проекта
+(например, 'saved_models/model_Tsyn.pth'), поэтому ModelService в режиме
+архива (BUNDLE_CONFIG['path']) берет артефакт из архива по тому же пути,
+по которому загрузил бы его с диска.
+
+Пример:
+    python -m src.services.bundle build            # сборка архива
+    python -m src.services.bundle verify           # проверка контрольных сумм
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import mmap
+import struct
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from src.config import BASE_DIR, BUNDLE_CONFIG, MODELS_DIR, SCALERS_DIR
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_MAGIC = b'ADSNBNDL'
+BUNDLE_FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct('<8sIIQ')
+_ALIGNMENT = 64
+
+# Списки признаков, упаковываемые в архив (имена из src.domain)
+FEATURE_LISTS = (
+    'features_metal', 'features_ligand', 'features_solvent', 'features_salt_mass',
+    'features_acid_mass', 'features_Vsyn', 'features_Tsyn', 'features_Tdry', 'features_Treg'
+)
+
+
+def artifact_key(path: Union[str, Path]) -> str:
+    """
+    Ключ записи архива для файла артефакта.
+
+    Args:
+        path: Путь к файлу артефакта
+
+    Returns:
+        str: Путь относительно корня проекта (через '/')
+    """
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(Path(BASE_DIR).resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def _artifact_paths() -> List[Path]:
+    """Файлы артефактов конвейера (как в отпечатке решетки предсказаний)."""
+    paths = []
+    for directory, patterns in ((MODELS_DIR, ('*.pth', '*.json')), (SCALERS_DIR, ('*.pkl',))):
+        paths.extend(sorted(p for pattern in patterns for p in Path(directory).glob(pattern)))
+    return paths
+
+
+def _torch_blob(path: Path) -> Dict[str, Any]:
+    """Байты тензоров чекпойнта и их описание."""
+    import torch
+
+    state = torch.load(path, map_location='cpu', weights_only=True)
+    chunks, tensors, offset = [], [], 0
+    for name, tensor in state.items():
+        data = tensor.detach().reshape(-1).contiguous().view(torch.uint8).numpy().tobytes()
+        tensors.append({
+            'name': name,
+            'dtype': str(tensor.dtype).replace('torch.', ''),
+            'shape': list(tensor.shape),
+            'offset': offset,
+            'length': len(data),
+        })
+        chunks.append(data)
+        # Тензоры выравниваются внутри блока, как и блоки в архиве
+        padding = -len(data) % _ALIGNMENT
+        chunks.append(b'\0' * padding)
+        offset += len(data) + padding
+    return {'kind': 'torch_state', 'data': b''.join(chunks), 'tensors': tensors}
+
+
+def _xgboost_blob(path: Path) -> Dict[str, Any]:
+    """Бустер XGBoost в UBJSON."""
+    import xgboost as xgb
+
+    booster = xgb.Booster()
+    booster.load_model(path)
+    return {'kind': 'xgboost', 'data': bytes(booster.save_raw(raw_format='ubj')), 'dtype': 'ubj'}
+
+
+def _preprocessor_blob(path: Path) -> Dict[str, Any]:
+    """Массивы параметров скейлера или энкодера (пикл, если класс не поддерживается)."""
+    import joblib
+
+    from src.services.preprocessors import export_arrays
+
+    obj = joblib.load(path)
+    try:
+        arrays, meta = export_arrays(obj)
+    except ValueError:
+        return {'kind': 'pickle', 'data': path.read_bytes(), 'dtype': 'joblib'}
+
+    chunks, described, offset = [], [], 0
+    for name, array in arrays.items():
+        data = array.tobytes()
+        described.append({
+            'name': name, 'dtype': array.dtype.str, 'shape': list(array.shape),
+            'offset': offset, 'length': len(data),
+        })
+        padding = -len(data) % _ALIGNMENT
+        chunks += [data, b'\0' * padding]
+        offset += len(data) + padding
+    return {'kind': 'preprocessor', 'data': b''.join(chunks), 'arrays': described, 'meta': meta}
+
+
+def build_bundle(output: Union[str, Path, None] = None) -> Dict[str, Any]:
+    """
+    Упаковывает модели, скейлеры, энкодеры и списки признаков в архив.
+
+    Args:
+        output: Путь к архиву (по умолчанию BUNDLE_CONFIG['path'])
+
+    Returns:
+        Dict[str, Any]: Путь, версия архива, число записей и размер
+    """
+    from src import domain
+
+    output = Path(output or BUNDLE_CONFIG['path'])
+    blobs: Dict[str, Dict[str, Any]] = {}
+    for path in _artifact_paths():
+        if path.suffix == '.pth':
+            blob = _torch_blob(path)
+        elif path.suffix == '.json':
+            blob = _xgboost_blob(path)
+        else:
+            blob = _preprocessor_blob(path)
+        blobs[artifact_key(path)] = {**blob, 'source_sha256': hashlib.sha256(path.read_bytes()).hexdigest()}
+    for name in FEATURE_LISTS:
+        blobs[f"features/{name}"] = {
+            'kind': 'json', 'dtype': 'utf-8',
+            'data': json.dumps(list(getattr(domain, name)), ensure_ascii=False).encode('utf-8')
+        }
+
+    # Смещения отсчитываются от начала данных, поэтому индекс строится до записи
+    entries, offset = {}, 0
+    for key, blob in blobs.items():
+        data = blob['data']
+        entries[key] = {
+            **{field: value for field, value in blob.items() if field != 'data'},
+            'offset': offset,
+            'length': len(data),
+            'sha256': hashlib.sha256(data).hexdigest(),
+        }
+        offset += len(data) + (-len(data) % _ALIGNMENT)
+
+    version = hashlib.sha256(
+        ''.join(f"{key}:{entry['sha256']}" for key, entry in sorted(entries.items())).encode()
+    ).hexdigest()[:16]
+    header = json.dumps({
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'bundle_version': version,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'entries': entries,
+    }, ensure_ascii=False).encode('utf-8')
+    data_start = _PREAMBLE.size + len(header)
+    data_start += -data_start % _ALIGNMENT
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_name(output.name + '.tmp')
+    with open(tmp, 'wb') as file:
+        file.write(_PREAMBLE.pack(BUNDLE_MAGIC, BUNDLE_FORMAT_VERSION, 0, len(header)))
+        file.write(header)
+        file.write(b'\0' * (data_start - _PREAMBLE.size - len(header)))
+        for key, blob in blobs.items():
+            file.write(blob['data'])
+            file.write(b'\0' * (-len(blob['data']) % _ALIGNMENT))
+    tmp.replace(output)
+
+    size = output.stat().st_size
+    logger.info(f"Архив {output} (версия {version}): {len(entries)} записей, {size / 1024 / 1024:.1f} МБ")
+    return {'path': str(output), 'bundle_version': version, 'entries': len(entries), 'bytes': size}
+
+
+class ModelBundle:
+    """Архив артефактов, отображенный в память."""
+
+    def __init__(self, path: Union[str, Path], verify: Optional[bool] = None):
+        """
+        Открывает архив.
+
+        Args:
+            path: Путь к архиву
+            verify: Проверять SHA-256 записи при первом обращении
+                (по умолчанию BUNDLE_CONFIG['verify_checksums'])
+
+        Raises:
+            FileNotFoundError: Если архив не найден
+            ValueError: Если файл не является архивом поддерживаемой версии или
+                списки признаков не совпадают с кодом
+        """
+        self.path = Path(path)
+        self.verify = BUNDLE_CONFIG['verify_checksums'] if verify is None else verify
+        with open(self.path, 'rb') as file:
+            # Частное отображение: страницы общие, пока в них не пишут, а тензоры
+            # поверх буфера не требуют копирования (буфер доступен для записи)
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        # Один последовательный упреждающий проход по файлу вместо чтения по записям
+        for advice in ('MADV_SEQUENTIAL', 'MADV_WILLNEED'):
+            if hasattr(self._mmap, 'madvise') and hasattr(mmap, advice):
+                self._mmap.madvise(getattr(mmap, advice))
+
+        magic, version, _, header_length = _PREAMBLE.unpack_from(self._mmap, 0)
+        if magic != BUNDLE_MAGIC:
+            raise ValueError(f"Файл не является архивом моделей: {self.path}")
+        if version != BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия формата архива {version}: {self.path}")
+        header = json.loads(bytes(self._mmap[_PREAMBLE.size:_PREAMBLE.size + header_length]))
+        self.bundle_version = header['bundle_version']
+        self.created_at = header['created_at']
+        self.entries: Dict[str, Dict[str, Any]] = header['entries']
+        data_start = _PREAMBLE.size + header_length
+        self._data_start = data_start + (-data_start % _ALIGNMENT)
+        self._verified = set()
+        self._lock = threading.Lock()
+        self._check_features()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.entries
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _check_features(self) -> None:
+        """Сверяет списки признаков архива с src.domain."""
+        from src import domain
+
+        for name in FEATURE_LISTS:
+            key = f"features/{name}"
+            if key in self.entries and self.load_json(key) != list(getattr(domain, name)):
+                raise ValueError(f"Список признаков {name} в архиве {self.path} не совпадает с кодом")
+
+    def _view(self, key: str) -> memoryview:
+        """Байты записи (без копирования) с проверкой контрольной суммы."""
+        entry = self.entries[key]
+        start = self._data_start + entry['offset']
+        view = memoryview(self._mmap)[start:start + entry['length']]
+        if self.verify and key not in self._verified:
+            if hashlib.sha256(view).hexdigest() != entry['sha256']:
+                raise ValueError(f"Контрольная сумма записи {key} не совпадает: {self.path}")
+            with self._lock:
+                self._verified.add(key)
+        return view
+
+    def load_state_dict(self, key: str) -> Dict[str, Any]:
+        """
+        Тензоры torch-модели поверх отображенных страниц архива.
+
+        Args:
+            key: Ключ записи
+
+        Returns:
+            Dict[str, torch.Tensor]: state_dict для load_state_dict(assign=True)
+        """
+        import torch
+
+        entry = self.entries[key]
+        view = self._view(key)
+        state = {}
+        for tensor in entry['tensors']:
+            dtype = getattr(torch, tensor['dtype'])
+            data = view[tensor['offset']:tensor['offset'] + tensor['length']]
+            if tensor['length']:
+                state[tensor['name']] = torch.frombuffer(data, dtype=dtype).reshape(tensor['shape'])
+            else:
+                state[tensor['name']] = torch.empty(tensor['shape'], dtype=dtype)
+        return state
+
+    def load_xgboost(self, key: str) -> Any:
+        """Бустер XGBoost из записи архива."""
+        import xgboost as xgb
+
+        booster = xgb.Booster()
+        booster.load_model(bytearray(self._view(key)))
+        return booster
+
+    def load_pickle(self, key: str) -> Any:
+        """Объект joblib (скейлер, энкодер) из записи архива."""
+        import joblib
+
+        return joblib.load(io.BytesIO(self._view(key)))
+
+    def load_preprocessor(self, key: str) -> Any:
+        """
+        Скейлер или энкодер из записи архива.
+
+        Массивы параметров создаются поверх отображенных страниц без копирования.
+
+        Args:
+            key: Ключ записи
+
+        Returns:
+            Any: Объект src.services.preprocessors (или объект sklearn для записей 'pickle')
+        """
+        import numpy as np
+
+        from src.services.preprocessors import from_arrays
+
+        entry = self.entries[key]
+        if entry['kind'] == 'pickle':
+            return self.load_pickle(key)
+        view = self._view(key)
+        arrays = {
+            array['name']: np.frombuffer(
+                view[array['offset']:array['offset'] + array['length']], dtype=np.dtype(array['dtype'])
+            ).reshape(array['shape'])
+            for array in entry['arrays']
+        }
+        return from_arrays(arrays, entry['meta'])
+
+    def load_json(self, key: str) -> Any:
+        """Значение JSON из записи архива."""
+        return json.loads(bytes(self._view(key)).decode('utf-8'))
+
+    def verify_all(self) -> Dict[str, bool]:
+        """
+        Проверяет контрольные суммы всех записей.
+
+        Returns:
+            Dict[str, bool]: Результат проверки по записям
+        """
+        results = {}
+        for key, entry in self.entries.items():
+            start = self._data_start + entry['offset']
+            view = memoryview(self._mmap)[start:start + entry['length']]
+            results[key] = hashlib.sha256(view).hexdigest() == entry['sha256']
+        return results
+
+    def info(self) -> Dict[str, Any]:
+        """Сводка архива: версия, время сборки, размер и записи по видам."""
+        kinds: Dict[str, int] = {}
+        for entry in self.entries.values():
+            kinds[entry['kind']] = kinds.get(entry['kind'], 0) + 1
+        return {
+            'path': str(self.path),
+            'bundle_version': self.bundle_version,
+            'created_at': self.created_at,
+            'bytes': len(self._mmap),
+            'entries': len(self.entries),
+            'kinds': kinds,
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Архив артефактов конвейера")
+    parser.add_argument('command', choices=('build', 'verify', 'info'), help="Действие")
+    parser.add_argument('--path', default=str(BUNDLE_CONFIG['path']), help="Путь к архиву")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        build_bundle(args.path)
+        return 0
+
+    bundle = ModelBundle(args.path, verify=False)
+    if args.command == 'info':
+        print(json.dumps(bundle.info(), ensure_ascii=False, indent=2))
+        return 0
+
+    results = bundle.verify_all()
+    for key, ok in results.items():
+        if not ok:
+            logger.error(f"Контрольная сумма не совпадает: {key}")
+    logger.info(f"Проверено записей: {len(results)}, ошибок: {sum(not ok for ok in results.values())}")
+    return 0 if all(results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
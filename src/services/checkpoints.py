@@ -0,0 +1,216 @@
+"""
+Чекпойнты torch-моделей в формате safetensors с отображением в память.
+
+torch.load читает .pth целиком и копирует веса в память процесса. Файл
+safetensors отображается в память (mmap), и веса, загруженные с
+load_state_dict(assign=True), остаются страницами файла: они общие для
+всех процессов через страничный кэш, а загрузка почти не зависит от
+размера модели.
+
+Конвертация записывает рядом с каждым .pth файл .safetensors с
+метаданными: SHA-256 исходного .pth и контрольная сумма тензоров
+(имена, типы, формы и байты). Проверка сравнивает тензоры .safetensors
+с тензорами исходного .pth по этой сумме. При загрузке .safetensors
+используется, только если SHA-256 в метаданных совпадает с текущим .pth.
+
+Пример:
+    python -m src.services.checkpoints            # конвертация saved_models/*.pth
+    python -m src.services.checkpoints --verify   # проверка контрольных сумм
+"""
+
+import argparse
+import hashlib
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import torch
+
+from src.config import CHECKPOINT_CONFIG, MODELS_DIR
+from src.utils.storage.digests import file_sha256, matches_source
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_SUFFIX = '.safetensors'
+
+
+def state_dict_digest(state: Dict[str, torch.Tensor]) -> str:
+    """
+    Рассчитывает контрольную сумму тензоров state_dict.
+
+    Сумма не зависит от формата файла: учитываются имена, типы, формы и
+    байты тензоров в порядке имен.
+
+    Args:
+        state: Тензоры модели
+
+    Returns:
+        str: Шестнадцатеричный дайджест SHA-256
+    """
+    digest = hashlib.sha256()
+    for name in sorted(state):
+        tensor = state[name].detach().cpu()
+        digest.update(f"{name}|{tensor.dtype}|{tuple(tensor.shape)}|".encode())
+        digest.update(tensor.reshape(-1).contiguous().view(torch.uint8).numpy().tobytes())
+    return digest.hexdigest()
+
+
+def checkpoint_path(pth_path: Union[str, Path]) -> Path:
+    """Путь к файлу safetensors для чекпойнта .pth."""
+    return Path(pth_path).with_suffix(CHECKPOINT_SUFFIX)
+
+
+def convert_checkpoint(pth_path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Конвертирует чекпойнт .pth в safetensors.
+
+    Args:
+        pth_path: Путь к файлу .pth
+
+    Returns:
+        Dict[str, Any]: Путь к новому файлу, число тензоров, размер и контрольные суммы
+    """
+    from safetensors.torch import save_file
+
+    pth_path = Path(pth_path)
+    state = torch.load(pth_path, map_location='cpu', weights_only=True)
+    # safetensors не хранит тензоры с общей памятью: каждый тензор копируется
+    tensors = {name: tensor.detach().contiguous().clone() for name, tensor in state.items()}
+    metadata = {
+        'source': pth_path.name,
+        'source_sha256': file_sha256(pth_path),
+        'tensors_sha256': state_dict_digest(tensors),
+    }
+    target = checkpoint_path(pth_path)
+    save_file(tensors, str(target), metadata=metadata)
+    logger.info(f"Чекпойнт {pth_path.name} -> {target.name} ({len(tensors)} тензоров)")
+    return {'path': str(target), 'tensors': len(tensors), 'bytes': target.stat().st_size, **metadata}
+
+
+def read_metadata(path: Union[str, Path]) -> Dict[str, str]:
+    """
+    Читает метаданные файла safetensors (без чтения тензоров).
+
+    Args:
+        path: Путь к файлу .safetensors
+
+    Returns:
+        Dict[str, str]: Метаданные, записанные при конвертации
+    """
+    from safetensors import safe_open
+
+    with safe_open(str(path), framework='pt') as file:
+        return dict(file.metadata() or {})
+
+
+def load_state_dict_mmap(path: Union[str, Path], verify: bool = False) -> Dict[str, torch.Tensor]:
+    """
+    Загружает тензоры из safetensors с отображением файла в память.
+
+    Args:
+        path: Путь к файлу .safetensors
+        verify: Проверить контрольную сумму тензоров (читает все байты)
+
+    Returns:
+        Dict[str, torch.Tensor]: Тензоры, хранящиеся в отображенных страницах файла
+
+    Raises:
+        ValueError: Если контрольная сумма не совпадает с записанной при конвертации
+    """
+    from safetensors.torch import load_file
+
+    state = load_file(str(path), device='cpu')
+    if verify:
+        expected = read_metadata(path).get('tensors_sha256')
+        if expected != state_dict_digest(state):
+            raise ValueError(f"Контрольная сумма тензоров не совпадает: {path}")
+    return state
+
+
+def verify_checkpoint(pth_path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Сверяет файл safetensors с исходным .pth.
+
+    Args:
+        pth_path: Путь к файлу .pth
+
+    Returns:
+        Dict[str, Any]: Признаки совпадения: source (SHA-256 .pth не изменился
+            после конвертации), tensors (тензоры совпадают с исходными) и ok
+    """
+    pth_path = Path(pth_path)
+    target = checkpoint_path(pth_path)
+    if not target.exists():
+        return {'path': str(target), 'exists': False, 'source': False, 'tensors': False, 'ok': False}
+
+    metadata = read_metadata(target)
+    source_digest = state_dict_digest(torch.load(pth_path, map_location='cpu', weights_only=True))
+    converted_digest = state_dict_digest(load_state_dict_mmap(target))
+    source_ok = metadata.get('source_sha256') == file_sha256(pth_path)
+    tensors_ok = source_digest == converted_digest == metadata.get('tensors_sha256')
+    return {
+        'path': str(target), 'exists': True,
+        'source': source_ok, 'tensors': tensors_ok, 'ok': source_ok and tensors_ok
+    }
+
+
+def find_checkpoint(pth_path: Union[str, Path]) -> Optional[Path]:
+    """
+    Возвращает файл safetensors для загрузки вместо .pth.
+
+    Args:
+        pth_path: Путь к файлу .pth
+
+    Returns:
+        Optional[Path]: Путь к .safetensors или None, если его нет, чтение
+            safetensors отключено (CHECKPOINT_CONFIG), пакет не установлен или
+            файл сконвертирован из другой версии .pth (SHA-256 в метаданных
+            не совпадает с текущим)
+    """
+    if not CHECKPOINT_CONFIG['use_safetensors']:
+        return None
+    target = checkpoint_path(pth_path)
+    if not target.exists():
+        return None
+    try:
+        import safetensors  # noqa: F401
+    except ImportError:
+        logger.warning(f"Найден {target.name}, но пакет safetensors не установлен: используется .pth")
+        return None
+    if not matches_source(read_metadata(target).get('source_sha256'), pth_path):
+        logger.warning(f"{target.name} сконвертирован из другой версии {Path(pth_path).name}: используется .pth")
+        return None
+    return target
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Конвертация чекпойнтов torch в safetensors")
+    parser.add_argument('--models-dir', default=str(MODELS_DIR), help="Каталог с файлами .pth")
+    parser.add_argument('--verify', action='store_true', help="Только проверить контрольные суммы")
+    args = parser.parse_args(argv)
+
+    sources = sorted(Path(args.models_dir).glob('*.pth'))
+    if not sources:
+        logger.error(f"В каталоге {args.models_dir} нет файлов .pth")
+        return 1
+
+    failed = 0
+    for source in sources:
+        if args.verify:
+            result = verify_checkpoint(source)
+            failed += not result['ok']
+            logger.info(
+                f"{source.name}: {'ok' if result['ok'] else 'ошибка'} "
+                f"(файл: {result['exists']}, исходный .pth: {result['source']}, тензоры: {result['tensors']})"
+            )
+        else:
+            convert_checkpoint(source)
+            result = verify_checkpoint(source)
+            failed += not result['ok']
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,391 @@
+"""
+Обратный поиск входного профиля по требованиям к рецепту.
+
+Известны ограничения на рецепт (например, металл Zr, Т.син. ≤ 120 °С,
+Vсин. ≤ 20 мл) и желаемый профиль пористости; требуется найти достижимый
+профиль, ближайший к желаемому, при котором конвейер рекомендует рецепт,
+удовлетворяющий ограничениям.
+
+Поиск ведется CMA-ES с перезапусками в нормированном пространстве [0, 1]^5:
+SБЭТ, а₀ и E — в рабочих диапазонах формы, Ws и Sme — через отношения
+Ws/W₀ и Sme/SБЭТ, как в sample_input_grid, поэтому все точки физически
+согласованы. Каждое поколение рассчитывается одним вызовом
+PredictorService.run_batch_prediction.
+
+Ограничения задаются по ключам SWEEP_OUTPUTS:
+    {'metal': 'Zr', 'tsyn': (None, 120), 'synthesis_volume': (None, 20)}
+Для категориальных выходов — допустимый класс или список классов, для
+числовых — пара (минимум, максимум), где None означает отсутствие границы.
+"""
+
+import logging
+import math
+import time
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.config import CALCULATION_CONSTANTS, INVERSE_DESIGN_CONFIG
+from src.domain.constants import INPUT_RANGES, SME_TO_SBAT_FRACTION_RANGE, WS_TO_W0_RATIO_RANGE
+from src.services.sensitivity import CATEGORICAL_OUTPUTS, NUMERIC_OUTPUTS, SWEEP_PARAMETERS, results_to_frame
+
+logger = logging.getLogger(__name__)
+
+# Координаты нормированного пространства поиска и их диапазоны
+SEARCH_COORDINATES = {
+    'SBAT_m2_gr': INPUT_RANGES['SBAT_m2_gr'],
+    'a0_mmoll_gr': INPUT_RANGES['a0_mmoll_gr'],
+    'E_kDg_moll': INPUT_RANGES['E_kDg_moll'],
+    'Ws_to_W0': WS_TO_W0_RATIO_RANGE,
+    'Sme_to_SBAT': SME_TO_SBAT_FRACTION_RANGE,
+}
+
+# Точность, с которой различаются найденные точки (как в форме ввода)
+_INPUT_DECIMALS = {
+    'SBAT_m2_gr': 1,
+    'a0_mmoll_gr': 2,
+    'E_kDg_moll': 2,
+    'Ws_cm3_gr': 4,
+    'Sme_m2_gr': 1,
+}
+
+
+def decode_points(u: np.ndarray) -> pd.DataFrame:
+    """
+    Переводит точки нормированного пространства во входные параметры конвейера.
+
+    Args:
+        u: Массив (n, 5) со значениями в [0, 1]
+
+    Returns:
+        pd.DataFrame: Входные точки (столбцы — параметры SWEEP_PARAMETERS)
+    """
+    lows = np.array([low for low, _ in SEARCH_COORDINATES.values()])
+    highs = np.array([high for _, high in SEARCH_COORDINATES.values()])
+    values = lows + np.clip(u, 0.0, 1.0) * (highs - lows)
+
+    sbat, a0, energy, ws_ratio, sme_fraction = values.T
+    w0 = CALCULATION_CONSTANTS['micropore_volume_factor'] * a0
+    return pd.DataFrame({
+        'SBAT_m2_gr': sbat,
+        'a0_mmoll_gr': a0,
+        'E_kDg_moll': energy,
+        'Ws_cm3_gr': w0 * ws_ratio,
+        'Sme_m2_gr': sbat * sme_fraction,
+    })
+
+
+def encode_points(points: Union[pd.DataFrame, Dict[str, float]]) -> np.ndarray:
+    """
+    Переводит входные параметры конвейера в координаты нормированного пространства.
+
+    Обратное преобразование к decode_points; точки вне рабочих диапазонов
+    получают координаты за пределами [0, 1].
+
+    Args:
+        points: Входные точки (столбцы — параметры SWEEP_PARAMETERS) или одна
+            точка в виде словаря
+
+    Returns:
+        np.ndarray: Массив (n, 5)
+    """
+    lows = np.array([low for low, _ in SEARCH_COORDINATES.values()])
+    highs = np.array([high for _, high in SEARCH_COORDINATES.values()])
+
+    sbat = np.asarray(points['SBAT_m2_gr'], dtype=float)
+    a0 = np.asarray(points['a0_mmoll_gr'], dtype=float)
+    w0 = CALCULATION_CONSTANTS['micropore_volume_factor'] * a0
+    values = np.column_stack([
+        sbat,
+        a0,
+        np.asarray(points['E_kDg_moll'], dtype=float),
+        np.asarray(points['Ws_cm3_gr'], dtype=float) / w0,
+        np.asarray(points['Sme_m2_gr'], dtype=float) / sbat,
+    ])
+    return (values - lows) / (highs - lows)
+
+
+def _normalize_constraints(constraints: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Проверяет ограничения и приводит их к единому виду.
+
+    Args:
+        constraints: Ограничения на рецепт
+
+    Returns:
+        Dict[str, Any]: Категориальные — множество классов, числовые — пара границ
+    """
+    normalized = {}
+    for output, rule in (constraints or {}).items():
+        if output in CATEGORICAL_OUTPUTS:
+            normalized[output] = {rule} if isinstance(rule, str) else set(rule)
+        elif output in NUMERIC_OUTPUTS:
+            low, high = rule
+            if low is not None and high is not None and low > high:
+                raise ValueError(f"Пустой диапазон ограничения {output}: {rule}")
+            normalized[output] = (low, high)
+        else:
+            raise ValueError(f"Неизвестный выход конвейера: {output}")
+    return normalized
+
+
+def constraint_violation(recipes: pd.DataFrame, constraints: Dict[str, Any]) -> np.ndarray:
+    """
+    Вычисляет суммарное нарушение ограничений для каждой точки.
+
+    Несовпадение класса дает 1; выход числового значения за границу —
+    относительную величину превышения.
+
+    Args:
+        recipes: Результаты конвейера (results_to_frame)
+        constraints: Ограничения (_normalize_constraints)
+
+    Returns:
+        np.ndarray: Нарушение (0 — точка допустима)
+    """
+    violation = np.zeros(len(recipes))
+    for output, rule in constraints.items():
+        if output in CATEGORICAL_OUTPUTS:
+            violation += (~recipes[output].isin(rule)).to_numpy(dtype=float)
+            continue
+        values = recipes[output].to_numpy(dtype=float)
+        low, high = rule
+        if low is not None:
+            violation += np.maximum(low - values, 0.0) / max(abs(low), 1.0)
+        if high is not None:
+            violation += np.maximum(values - high, 0.0) / max(abs(high), 1.0)
+    return violation
+
+
+def target_distance(points: pd.DataFrame, target: Optional[Dict[str, float]]) -> np.ndarray:
+    """
+    Вычисляет отклонение точек от желаемого профиля.
+
+    Args:
+        points: Входные точки
+        target: Желаемые значения части входных параметров (None — любые)
+
+    Returns:
+        np.ndarray: Среднеквадратичное относительное отклонение по заданным параметрам
+    """
+    if not target:
+        return np.zeros(len(points))
+    errors = [
+        (points[parameter].to_numpy() - value) / max(abs(value), 1e-9)
+        for parameter, value in target.items()
+    ]
+    return np.sqrt(np.mean(np.square(errors), axis=0))
+
+
+class _CMAES:
+    """CMA-ES (μ/μ_w, λ) с ограничением поиска кубом [0, 1]^n отсечением."""
+
+    def __init__(self, mean: np.ndarray, sigma: float, population_size: int, rng: np.random.Generator):
+        n = len(mean)
+        self.rng = rng
+        self.mean = np.array(mean, dtype=float)
+        self.sigma = sigma
+        self.lam = population_size
+        self.mu = population_size // 2
+
+        weights = math.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = weights / weights.sum()
+        self.mueff = 1.0 / np.sum(self.weights ** 2)
+
+        self.cc = (4 + self.mueff / n) / (n + 4 + 2 * self.mueff / n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3) ** 2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1 / self.mueff) / ((n + 2) ** 2 + self.mueff))
+        self.damps = 1 + 2 * max(0.0, math.sqrt((self.mueff - 1) / (n + 1)) - 1) + self.cs
+        self.chi_n = math.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+
+        self.pc = np.zeros(n)
+        self.ps = np.zeros(n)
+        self.C = np.eye(n)
+        self.B = np.eye(n)
+        self.D = np.ones(n)
+        self.generation = 0
+
+    def ask(self) -> np.ndarray:
+        """Возвращает поколение точек (λ, n) в кубе [0, 1]^n."""
+        z = self.rng.standard_normal((self.lam, len(self.mean)))
+        y = (z * self.D) @ self.B.T
+        return np.clip(self.mean + self.sigma * y, 0.0, 1.0)
+
+    def tell(self, ranked: np.ndarray) -> None:
+        """
+        Обновляет распределение по точкам поколения, упорядоченным от лучшей к худшей.
+
+        Args:
+            ranked: Точки поколения (λ, n)
+        """
+        n = len(self.mean)
+        self.generation += 1
+        old_mean = self.mean
+        selected = ranked[:self.mu]
+        self.mean = self.weights @ selected
+
+        y_w = (self.mean - old_mean) / self.sigma
+        inv_sqrt_c = self.B @ np.diag(1 / self.D) @ self.B.T
+        self.ps = (1 - self.cs) * self.ps + math.sqrt(self.cs * (2 - self.cs) * self.mueff) * (inv_sqrt_c @ y_w)
+        ps_norm = np.linalg.norm(self.ps)
+        hsig = ps_norm / math.sqrt(1 - (1 - self.cs) ** (2 * self.generation)) / self.chi_n < 1.4 + 2 / (n + 1)
+        self.pc = (1 - self.cc) * self.pc + hsig * math.sqrt(self.cc * (2 - self.cc) * self.mueff) * y_w
+
+        steps = (selected - old_mean) / self.sigma
+        self.C = (
+            (1 - self.c1 - self.cmu) * self.C
+            + self.c1 * (np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C)
+            + self.cmu * (steps.T * self.weights) @ steps
+        )
+        self.sigma *= math.exp((self.cs / self.damps) * (ps_norm / self.chi_n - 1))
+
+        self.C = np.triu(self.C) + np.triu(self.C, 1).T
+        eigenvalues, self.B = np.linalg.eigh(self.C)
+        self.D = np.sqrt(np.maximum(eigenvalues, 1e-20))
+
+    @property
+    def converged(self) -> bool:
+        """Шаг поиска стал пренебрежимо мал."""
+        return self.sigma * self.D.max() < 1e-4
+
+
+def run_inverse_design(
+    predictor: Any,
+    constraints: Optional[Dict[str, Any]] = None,
+    target: Optional[Dict[str, float]] = None,
+    top_n: Optional[int] = None,
+    time_budget_s: Optional[float] = None,
+    max_generations: Optional[int] = None,
+    population_size: Optional[int] = None,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Ищет входные профили, при которых рекомендуемый рецепт удовлетворяет ограничениям.
+
+    Среди допустимых точек лучшими считаются ближайшие к желаемому профилю;
+    допустимые точки всегда лучше недопустимых, недопустимые упорядочены
+    по величине нарушения. Поиск останавливается при достижении цели
+    (отклонение не больше tolerance), исчерпании бюджета времени или числа
+    поколений либо после max_idle_restarts перезапусков подряд без улучшения
+    (перезапуск выполняется при схождении CMA-ES или после patience поколений
+    без улучшения).
+
+    Args:
+        predictor: Экземпляр PredictorService
+        constraints: Ограничения на рецепт (см. описание модуля)
+        target: Желаемые значения части из пяти входных параметров
+        top_n: Число возвращаемых точек
+        time_budget_s: Бюджет времени, с
+        max_generations: Максимальное число поколений CMA-ES
+        population_size: Размер поколения
+        seed: Зерно генератора случайных чисел
+
+    Returns:
+        Dict[str, Any]: Лучшие допустимые точки с рецептами ('points'), лучшая
+            найденная точка независимо от допустимости ('closest') и статистика
+            поиска (поколения, число расчетов, время, причина остановки)
+    """
+    config = INVERSE_DESIGN_CONFIG
+    top_n = top_n or config['top_n']
+    time_budget_s = time_budget_s if time_budget_s is not None else config['time_budget_s']
+    max_generations = max_generations or config['max_generations']
+    population_size = population_size or config['population_size']
+
+    rules = _normalize_constraints(constraints)
+    for parameter in target or {}:
+        if parameter not in SWEEP_PARAMETERS:
+            raise ValueError(f"Неизвестный параметр: {parameter}")
+
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    # Архив допустимых точек: округленная точка -> (отклонение, точка, рецепт)
+    archive: Dict[Tuple[float, ...], Tuple[float, Dict[str, float], Dict[str, Any]]] = {}
+    best = (math.inf, math.inf)  # (нарушение, отклонение) лучшей точки
+    best_u = None
+    closest: Dict[str, Any] = {}
+    evaluations = 0
+
+    def evaluate(u: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        nonlocal best, best_u, closest, evaluations
+        points = decode_points(u)
+        results = predictor.run_batch_prediction(points)
+        evaluations += len(points)
+
+        violation = constraint_violation(results_to_frame(results), rules)
+        distance = target_distance(points, target)
+        order = np.lexsort((distance, violation))
+
+        for i in np.flatnonzero(violation == 0):
+            point = {parameter: float(points[parameter][i]) for parameter in SWEEP_PARAMETERS}
+            key = tuple(round(point[parameter], decimals) for parameter, decimals in _INPUT_DECIMALS.items())
+            archive[key] = (float(distance[i]), point, results[i])
+        i = order[0]
+        if (violation[i], distance[i]) < best:
+            best = (float(violation[i]), float(distance[i]))
+            best_u = u[i]
+            closest = {
+                'inputs': {parameter: float(points[parameter][i]) for parameter in SWEEP_PARAMETERS},
+                'violation': best[0],
+                'distance': best[1],
+                'recipe': results[i]
+            }
+        return order, violation
+
+    # Нулевое поколение — равномерная выборка для выбора начальной точки
+    evaluate(rng.uniform(size=(config['initial_samples'], len(SEARCH_COORDINATES))))
+
+    stop_reason = 'max_generations'
+    strategy = _CMAES(best_u, config['initial_sigma'], population_size, rng)
+    generations, restarts, idle_restarts, stall = 0, 0, 0, 0
+    while generations < max_generations:
+        if best[0] == 0 and best[1] <= config['tolerance']:
+            stop_reason = 'target_reached'
+            break
+        if time.perf_counter() - start > time_budget_s:
+            stop_reason = 'time_budget'
+            break
+        if idle_restarts > config['max_idle_restarts']:
+            stop_reason = 'no_improvement'
+            break
+
+        previous_best = best
+        u = strategy.ask()
+        order, _ = evaluate(u)
+        strategy.tell(u[order])
+        generations += 1
+        # Улучшения меньше tolerance не сбрасывают счетчик
+        improved = best[0] < previous_best[0] or best[1] < previous_best[1] - config['tolerance']
+        if improved:
+            stall, idle_restarts = 0, 0
+        else:
+            stall += 1
+
+        # Перезапуск из случайной точки при схождении или застое в локальном минимуме
+        if strategy.converged or stall >= config['patience']:
+            restarts += 1
+            idle_restarts += 1
+            stall = 0
+            strategy = _CMAES(rng.uniform(size=len(SEARCH_COORDINATES)), config['initial_sigma'], population_size, rng)
+
+    elapsed = time.perf_counter() - start
+    ranked = sorted(archive.values(), key=lambda item: item[0])[:top_n]
+    logger.info(
+        f"Обратный поиск: {len(archive)} допустимых точек из {evaluations}, "
+        f"{generations} поколений, {restarts} перезапусков за {elapsed:.2f} с ({stop_reason})"
+    )
+
+    return {
+        'points': [
+            {'rank': rank, 'inputs': point, 'distance': distance, 'recipe': recipe}
+            for rank, (distance, point, recipe) in enumerate(ranked, start=1)
+        ],
+        'closest': closest,
+        'feasible_found': len(archive),
+        'generations': generations,
+        'restarts': restarts,
+        'evaluations': evaluations,
+        'elapsed_s': elapsed,
+        'stop_reason': stop_reason,
+    }
@@ -0,0 +1,361 @@
+"""
+Предрассчитанная решетка предсказаний для быстрых приближенных ответов.
+
+Пространство входов пятимерно и ограничено рабочими диапазонами формы,
+поэтому конвейер можно заранее рассчитать на плотной выборке точек
+(последовательность Соболя в нормированном пространстве [0, 1]^5 из
+inverse_design: SБЭТ, а₀, E, Ws/W₀, Sme/SБЭТ). Результаты хранятся в
+каталоге .npy-файлов, которые открываются через memory map; при загрузке
+по координатам строится KD-дерево.
+
+Запрос находит k ближайших точек решетки: категориальные выходы
+выбираются взвешенным голосованием, массы и объем интерполируются по
+соседям с тем же рецептом. Оценка погрешности — расстояние до ближайшей
+точки решетки, доля несогласных соседей и разброс числовых выходов; если
+она превышает допуск, выполняется точный расчет.
+
+Сборка решетки:
+    python -m src.services.lattice --points-log2 16
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import shutil
+import time
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.config import LATTICE_CONFIG, MODELS_DIR, SCALERS_DIR
+from src.services.inverse_design import SEARCH_COORDINATES, decode_points, encode_points
+from src.services.sensitivity import results_to_frame
+
+logger = logging.getLogger(__name__)
+
+LATTICE_VERSION = 1
+
+# Категориальные выходы (коды классов) и числовые выходы решетки
+CATEGORICAL_KEYS = ('metal', 'ligand', 'solvent', 'tsyn', 'tdry', 'treg')
+NUMERIC_KEYS = ('salt_mass', 'acid_mass', 'synthesis_volume')
+
+# Выходы, по совпадению которых выбираются соседи для интерполяции масс и объема
+_RECIPE_COLUMNS = (0, 1, 2)
+
+_RESULT_KEYS = {'metal': 'metal_type', 'ligand': 'ligand_type', 'solvent': 'solvent_type'}
+
+
+def artifacts_fingerprint() -> str:
+    """
+    Вычисляет отпечаток файлов моделей, скейлеров и энкодеров.
+
+    Решетка, собранная для других артефактов, считается устаревшей.
+
+    Returns:
+        str: SHA-256 содержимого файлов
+    """
+    digest = hashlib.sha256()
+    for directory, patterns in ((MODELS_DIR, ('*.pth', '*.json')), (SCALERS_DIR, ('*.pkl',))):
+        for path in sorted(p for pattern in patterns for p in Path(directory).glob(pattern)):
+            digest.update(path.name.encode('utf-8'))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _json_class(value: Any) -> Union[str, int, float]:
+    """Приводит класс к типу JSON (температуры — целые, если значение целое)."""
+    if isinstance(value, str):
+        return value
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def build_lattice(
+    predictor: Any,
+    path: Optional[Union[str, Path]] = None,
+    points_log2: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    seed: int = 0
+) -> Path:
+    """
+    Рассчитывает конвейер на выборке Соболя и сохраняет решетку.
+
+    Args:
+        predictor: Экземпляр PredictorService
+        path: Каталог решетки (по умолчанию из LATTICE_CONFIG)
+        points_log2: Двоичный логарифм числа точек
+        batch_size: Число точек в одном пакетном прогоне
+        seed: Зерно перемешивания последовательности Соболя
+
+    Returns:
+        Path: Каталог решетки
+    """
+    from scipy.stats import qmc
+
+    path = Path(path or LATTICE_CONFIG['path'])
+    points_log2 = points_log2 or LATTICE_CONFIG['points_log2']
+    batch_size = batch_size or LATTICE_CONFIG['batch_size']
+
+    coords = qmc.Sobol(d=len(SEARCH_COORDINATES), scramble=True, seed=seed).random_base2(points_log2)
+    start = time.perf_counter()
+    frames = []
+    for offset in range(0, len(coords), batch_size):
+        chunk = coords[offset:offset + batch_size]
+        frames.append(results_to_frame(predictor.run_batch_prediction(decode_points(chunk))))
+        logger.info(f"Решетка: рассчитано {offset + len(chunk)}/{len(coords)} точек")
+    frame = pd.concat(frames, ignore_index=True)
+
+    classes = {key: sorted(frame[key].unique().tolist()) for key in CATEGORICAL_KEYS}
+    codes = np.column_stack([
+        pd.Categorical(frame[key], categories=classes[key]).codes for key in CATEGORICAL_KEYS
+    ]).astype(np.int16)
+    confidences = frame[[f'{key}_confidence' for key in CATEGORICAL_KEYS]].to_numpy(dtype=np.float32)
+    values = frame[list(NUMERIC_KEYS)].to_numpy(dtype=np.float32)
+
+    # Запись во временный каталог и замена целиком
+    tmp_path = path.with_name(path.name + '.tmp')
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    tmp_path.mkdir(parents=True)
+    np.save(tmp_path / 'coords.npy', coords.astype(np.float32))
+    np.save(tmp_path / 'codes.npy', codes)
+    np.save(tmp_path / 'confidences.npy', confidences)
+    np.save(tmp_path / 'values.npy', values)
+    meta = {
+        'version': LATTICE_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'n_points': len(coords),
+        'seed': seed,
+        'coordinates': list(SEARCH_COORDINATES),
+        'categorical': list(CATEGORICAL_KEYS),
+        'numeric': list(NUMERIC_KEYS),
+        'classes': {key: [_json_class(c) for c in key_classes] for key, key_classes in classes.items()},
+        'fingerprint': artifacts_fingerprint(),
+    }
+    (tmp_path / 'meta.json').write_text(json.dumps(meta, indent=2, ensure_ascii=False), encoding='utf-8')
+    shutil.rmtree(path, ignore_errors=True)
+    tmp_path.rename(path)
+
+    logger.info(f"Решетка из {len(coords)} точек собрана за {time.perf_counter() - start:.1f} с: {path}")
+    return path
+
+
+class PredictionLattice:
+    """Решетка предсказаний с пространственным индексом."""
+
+    def __init__(self, path: Union[str, Path], check_fingerprint: bool = True):
+        """
+        Открывает решетку.
+
+        Args:
+            path: Каталог решетки
+            check_fingerprint: Проверять соответствие решетки текущим моделям
+
+        Raises:
+            FileNotFoundError: Если решетка не найдена
+            ValueError: Если решетка другой версии или собрана для других моделей
+        """
+        from scipy.spatial import cKDTree
+
+        self.path = Path(path)
+        self.meta = json.loads((self.path / 'meta.json').read_text(encoding='utf-8'))
+        if self.meta.get('version') != LATTICE_VERSION:
+            raise ValueError(f"Неподдерживаемая версия решетки: {self.meta.get('version')}")
+        if check_fingerprint and self.meta['fingerprint'] != artifacts_fingerprint():
+            raise ValueError(f"Решетка {self.path} собрана для других моделей, требуется пересборка")
+
+        # Массивы отображаются в память; view(np.ndarray) убирает накладные
+        # расходы подкласса np.memmap при индексации
+        self.coords = np.load(self.path / 'coords.npy', mmap_mode='r').view(np.ndarray)
+        self.codes = np.load(self.path / 'codes.npy', mmap_mode='r').view(np.ndarray)
+        self.confidences = np.load(self.path / 'confidences.npy', mmap_mode='r').view(np.ndarray)
+        self.values = np.load(self.path / 'values.npy', mmap_mode='r').view(np.ndarray)
+        self.classes = [self.meta['classes'][key] for key in CATEGORICAL_KEYS]
+        self.tree = cKDTree(self.coords)
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def _vote(
+        self,
+        codes: np.ndarray,
+        confidences: np.ndarray,
+        weights: np.ndarray
+    ) -> Tuple[np.ndarray, float, np.ndarray]:
+        """
+        Выбирает классы взвешенным голосованием соседей.
+
+        Args:
+            codes: Коды классов соседей (k, число категориальных выходов)
+            confidences: Уверенность классификаторов в точках соседей
+            weights: Нормированные веса соседей
+
+        Returns:
+            Tuple[np.ndarray, float, np.ndarray]: Выбранные коды, минимальная по
+                выходам доля голосов за выбранный класс и средняя уверенность
+                проголосовавших за него соседей
+        """
+        chosen = np.empty(codes.shape[1], dtype=np.int64)
+        chosen_confidences = np.empty(codes.shape[1])
+        agreement = 1.0
+        for j in range(codes.shape[1]):
+            votes = np.bincount(codes[:, j], weights=weights, minlength=len(self.classes[j]))
+            chosen[j] = np.argmax(votes)
+            agreement = min(agreement, float(votes[chosen[j]]))
+            voters = codes[:, j] == chosen[j]
+            chosen_confidences[j] = np.dot(weights[voters], confidences[voters, j]) / weights[voters].sum()
+        return chosen, agreement, chosen_confidences
+
+    def query(self, point: Dict[str, float], k: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Возвращает приближенный рецепт по ближайшим точкам решетки.
+
+        Args:
+            point: Входная точка (SBAT_m2_gr, a0_mmoll_gr, E_kDg_moll, Ws_cm3_gr, Sme_m2_gr)
+            k: Число соседей (по умолчанию из LATTICE_CONFIG; 1 — ближайший рецепт,
+                больше числа точек решетки — все точки)
+
+        Returns:
+            Dict[str, Any]: Рецепт в формате run_full_prediction (без распределений
+                вероятностей и производных признаков) с ключом approximation —
+                оценкой погрешности: расстояние до ближайшей точки решетки
+                (в нормированном пространстве), доля несогласных соседей и
+                относительный разброс масс и объема
+
+        Raises:
+            ValueError: Если k меньше 1
+        """
+        k = LATTICE_CONFIG['neighbours'] if k is None else int(k)
+        if k < 1:
+            raise ValueError(f"Число соседей должно быть не меньше 1: {k}")
+        k = min(k, self.tree.n)
+        # При k=1 cKDTree возвращает скаляры, поэтому результат приводится к массивам
+        distances, indices = self.tree.query(encode_points(point)[0], k=k)
+        distances, indices = np.atleast_1d(distances), np.atleast_1d(indices)
+        weights = 1.0 / (distances + 1e-9)
+        weights /= weights.sum()
+
+        codes = self.codes[indices]
+        confidences = self.confidences[indices]
+        if (codes == codes[0]).all():
+            # Все соседи согласны — голосование не требуется
+            chosen = codes[0]
+            agreement = 1.0
+            chosen_confidences = weights @ confidences
+            same_recipe = None
+        else:
+            chosen, agreement, chosen_confidences = self._vote(codes, confidences, weights)
+            same_recipe = np.all(codes[:, _RECIPE_COLUMNS] == chosen[list(_RECIPE_COLUMNS)], axis=1)
+
+        recipe: Dict[str, Any] = {}
+        for j, key in enumerate(CATEGORICAL_KEYS):
+            recipe[key] = {
+                _RESULT_KEYS.get(key, 'temperature'): self.classes[j][chosen[j]],
+                'confidence': float(chosen_confidences[j])
+            }
+
+        # Массы и объем — по соседям с тем же металлом, лигандом и растворителем
+        neighbour_values = self.values[indices].astype(np.float64)
+        neighbour_weights = weights
+        if same_recipe is not None:
+            if not same_recipe.any():
+                same_recipe[0] = True
+            neighbour_values = neighbour_values[same_recipe]
+            neighbour_weights = weights[same_recipe] / weights[same_recipe].sum()
+        mean = neighbour_weights @ neighbour_values
+        spread = np.sqrt(neighbour_weights @ (neighbour_values - mean) ** 2) / np.maximum(np.abs(mean), 1e-9)
+        for key, value in zip(NUMERIC_KEYS, mean):
+            recipe[key] = round(float(value), 3)
+
+        recipe['approximation'] = {
+            'source': 'lattice',
+            'distance': float(distances[0]),
+            'disagreement': 1.0 - agreement,
+            'relative_spread': float(spread.max()),
+            'neighbours': int(k),
+        }
+        return recipe
+
+    def predict(
+        self,
+        point: Dict[str, float],
+        predictor: Optional[Any] = None,
+        max_distance: Optional[float] = None,
+        max_disagreement: Optional[float] = None,
+        max_relative_spread: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Возвращает приближенный рецепт или, если погрешность превышает допуск,
+        результат точного расчета.
+
+        Args:
+            point: Входная точка
+            predictor: Экземпляр PredictorService для точного расчета (None —
+                всегда возвращать приближенный ответ)
+            max_distance: Допустимое расстояние до ближайшей точки решетки
+            max_disagreement: Допустимая доля несогласных соседей
+            max_relative_spread: Допустимый относительный разброс масс и объема
+
+        Returns:
+            Dict[str, Any]: Рецепт с ключом approximation ('source' — 'lattice'
+                или 'exact', 'within_tolerance' — укладывается ли оценка в допуск)
+        """
+        limits = {
+            'distance': LATTICE_CONFIG['max_distance'] if max_distance is None else max_distance,
+            'disagreement': LATTICE_CONFIG['max_disagreement'] if max_disagreement is None else max_disagreement,
+            'relative_spread': (LATTICE_CONFIG['max_relative_spread']
+                                if max_relative_spread is None else max_relative_spread),
+        }
+        recipe = self.query(point)
+        estimate = recipe['approximation']
+        estimate['within_tolerance'] = all(estimate[name] <= limit for name, limit in limits.items())
+        if estimate['within_tolerance'] or predictor is None:
+            return recipe
+
+        result = predictor.run_full_prediction(**point)
+        result['approximation'] = {**estimate, 'source': 'exact'}
+        return result
+
+
+@lru_cache(maxsize=None)
+def get_lattice(path: Optional[str] = None) -> Optional[PredictionLattice]:
+    """
+    Открывает решетку один раз на процесс.
+
+    Args:
+        path: Каталог решетки (по умолчанию из LATTICE_CONFIG)
+
+    Returns:
+        Optional[PredictionLattice]: Решетка или None, если она не собрана или устарела
+    """
+    path = Path(path or LATTICE_CONFIG['path'])
+    try:
+        lattice = PredictionLattice(path)
+    except FileNotFoundError:
+        logger.info(f"Решетка предсказаний не собрана: {path}")
+        return None
+    except ValueError as e:
+        logger.warning(str(e))
+        return None
+    logger.info(f"Загружена решетка предсказаний: {len(lattice)} точек")
+    return lattice
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Сборка решетки предсказаний")
+    parser.add_argument('--points-log2', type=int, default=LATTICE_CONFIG['points_log2'],
+                        help="Двоичный логарифм числа точек")
+    parser.add_argument('--batch-size', type=int, default=LATTICE_CONFIG['batch_size'],
+                        help="Точек в одном пакетном прогоне")
+    parser.add_argument('--seed', type=int, default=0, help="Зерно последовательности Соболя")
+    parser.add_argument('--output', default=str(LATTICE_CONFIG['path']), help="Каталог решетки")
+    args = parser.parse_args()
+
+    from src.services.predictor_service import PredictorService
+
+    build_lattice(PredictorService(), args.output, args.points_log2, args.batch_size, args.seed)
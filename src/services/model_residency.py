@@ -0,0 +1,255 @@
+"""
+Управление резидентностью моделей в памяти.
+
+Загруженные модели хранятся в ModelResidency вместе с оценкой занимаемой
+памяти. Если суммарный размер превышает бюджет, вытесняются модели,
+которые давно не использовались (политика 'lru') или использовались реже
+всего (политика 'lfu'). Закрепленные модели не вытесняются. Хранилище —
+единственный владелец ссылок на модели, поэтому после вытеснения память
+освобождается, а следующий запрос модели загружает ее заново.
+"""
+
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EVICTION_POLICIES = ('lru', 'lfu')
+
+
+def estimate_memory_mb(model: Any) -> float:
+    """
+    Оценивает память, занимаемую моделью.
+
+    Для torch-моделей учитываются параметры и буферы. Для бустеров XGBoost —
+    размер сериализации в UBJSON: она хранит те же массивы узлов деревьев,
+    что и представление в памяти, и отличается от прироста RSS при
+    загрузке на единицы процентов (sys.getsizeof учитывает только обертку).
+
+    Args:
+        model: Загруженная модель
+
+    Returns:
+        float: Размер в МБ
+    """
+    if hasattr(model, 'parameters') and hasattr(model, 'buffers'):
+        size = sum(p.numel() * p.element_size() for p in model.parameters())
+        size += sum(b.numel() * b.element_size() for b in model.buffers())
+    elif hasattr(model, 'save_raw'):
+        size = len(model.save_raw(raw_format='ubj'))
+    else:
+        size = sys.getsizeof(model)
+    return size / (1024 * 1024)
+
+
+class _Entry:
+    """Запись хранилища: модель, ее размер и статистика использования."""
+
+    __slots__ = ('value', 'size_mb', 'hits', 'last_used', 'loaded_at')
+
+    def __init__(self, value: Any, size_mb: float):
+        self.value = value
+        self.size_mb = size_mb
+        self.hits = 0
+        self.loaded_at = self.last_used = time.monotonic()
+
+
+class ModelResidency:
+    """
+    Хранилище загруженных моделей с бюджетом памяти.
+
+    Поддерживает чтение как словарь (in, len, keys, items, pop), поэтому
+    может заменять обычный словарь моделей.
+    """
+
+    def __init__(
+        self,
+        budget_mb: float = 0.0,
+        policy: str = 'lru',
+        pinned: Iterable[str] = ()
+    ):
+        """
+        Инициализация.
+
+        Args:
+            budget_mb: Бюджет памяти в МБ (0 — без ограничения)
+            policy: Политика вытеснения ('lru' или 'lfu')
+            pinned: Имена моделей, которые не вытесняются
+        """
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Неизвестная политика вытеснения: {policy}")
+        if budget_mb < 0:
+            raise ValueError(f"Бюджет памяти не может быть отрицательным: {budget_mb}")
+        self.budget_mb = budget_mb
+        self.policy = policy
+        self._pinned = set(pinned)
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._lock = threading.RLock()
+        self._counters = {'loads': 0, 'evictions': 0, 'evicted_mb': 0.0}
+
+    # --- Интерфейс словаря ---
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._entries))
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        with self._lock:
+            return [(name, entry.value) for name, entry in self._entries.items()]
+
+    def pop(self, name: str, default: Any = None) -> Any:
+        """Удаляет модель из хранилища без учета вытеснения."""
+        with self._lock:
+            entry = self._entries.pop(name, None)
+        return default if entry is None else entry.value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # --- Резидентность ---
+
+    def get(self, name: str) -> Optional[Any]:
+        """
+        Возвращает модель и отмечает ее использование.
+
+        Args:
+            name: Имя модели
+
+        Returns:
+            Optional[Any]: Модель или None, если она не загружена
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            entry.hits += 1
+            entry.last_used = time.monotonic()
+            self._entries.move_to_end(name)
+            return entry.value
+
+    def put(self, name: str, value: Any, size_mb: Optional[float] = None) -> Any:
+        """
+        Помещает загруженную модель в хранилище и соблюдает бюджет памяти.
+
+        Args:
+            name: Имя модели
+            value: Модель
+            size_mb: Размер в МБ (по умолчанию оценивается estimate_memory_mb)
+
+        Returns:
+            Any: Переданная модель
+        """
+        if size_mb is None:
+            size_mb = estimate_memory_mb(value)
+        with self._lock:
+            self._entries[name] = _Entry(value, size_mb)
+            self._entries.move_to_end(name)
+            self._counters['loads'] += 1
+            self._enforce_budget(keep=name)
+        return value
+
+    def pin(self, name: str) -> None:
+        """Закрепляет модель: она не вытесняется при превышении бюджета."""
+        with self._lock:
+            self._pinned.add(name)
+
+    def unpin(self, name: str) -> None:
+        """Снимает закрепление модели."""
+        with self._lock:
+            self._pinned.discard(name)
+            self._enforce_budget()
+
+    def set_budget(self, budget_mb: float) -> None:
+        """
+        Изменяет бюджет памяти и сразу вытесняет лишние модели.
+
+        Args:
+            budget_mb: Бюджет памяти в МБ (0 — без ограничения)
+        """
+        if budget_mb < 0:
+            raise ValueError(f"Бюджет памяти не может быть отрицательным: {budget_mb}")
+        with self._lock:
+            self.budget_mb = budget_mb
+            self._enforce_budget()
+
+    def total_mb(self) -> float:
+        """Суммарный размер загруженных моделей в МБ."""
+        with self._lock:
+            return sum(entry.size_mb for entry in self._entries.values())
+
+    def sizes(self) -> Dict[str, float]:
+        """Размеры загруженных моделей в МБ."""
+        with self._lock:
+            return {name: entry.size_mb for name, entry in self._entries.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Возвращает состояние хранилища.
+
+        Returns:
+            Dict[str, Any]: Бюджет, политика, занятая память, закрепленные
+                модели, счетчики загрузок и вытеснений и статистика по моделям
+        """
+        with self._lock:
+            return {
+                'budget_mb': self.budget_mb,
+                'policy': self.policy,
+                'resident_mb': sum(entry.size_mb for entry in self._entries.values()),
+                'pinned': sorted(self._pinned),
+                **self._counters,
+                'models': {
+                    name: {
+                        'size_mb': entry.size_mb,
+                        'hits': entry.hits,
+                        'idle_s': time.monotonic() - entry.last_used,
+                        'pinned': name in self._pinned
+                    }
+                    for name, entry in self._entries.items()
+                }
+            }
+
+    def _victim(self, keep: Optional[str]) -> Optional[str]:
+        """Выбирает модель для вытеснения по политике (None — вытеснять нечего)."""
+        candidates = [
+            (name, entry) for name, entry in self._entries.items()
+            if name != keep and name not in self._pinned
+        ]
+        if not candidates:
+            return None
+        if self.policy == 'lfu':
+            return min(candidates, key=lambda item: (item[1].hits, item[1].last_used))[0]
+        # Порядок словаря — порядок использования, первая запись — самая старая
+        return candidates[0][0]
+
+    def _enforce_budget(self, keep: Optional[str] = None) -> None:
+        """Вытесняет модели, пока суммарный размер превышает бюджет."""
+        if not self.budget_mb:
+            return
+        total = sum(entry.size_mb for entry in self._entries.values())
+        while total > self.budget_mb:
+            victim = self._victim(keep)
+            if victim is None:
+                logger.warning(
+                    f"Бюджет памяти моделей превышен ({total:.1f} > {self.budget_mb:.1f} МБ), "
+                    f"но все загруженные модели закреплены или используются"
+                )
+                return
+            entry = self._entries.pop(victim)
+            total -= entry.size_mb
+            self._counters['evictions'] += 1
+            self._counters['evicted_mb'] += entry.size_mb
+            logger.info(f"Модель {victim} вытеснена из памяти ({entry.size_mb:.1f} МБ, политика {self.policy})")
@@ -3,45 +3,194 @@
 Реализует паттерны Singleton и Registry для эффективного управления моделями.
 """
 
+import numpy as np
 import torch
 import xgboost as xgb
-import joblib
 import logging
+import threading
+import time
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Dict, Any, Optional, Type, Union
-from functools import lru_cache
+from typing import Callable, Dict, Any, Hashable, Optional, Tuple, Type, Union
 
+from src.config import BUNDLE_CONFIG, CHECKPOINT_CONFIG, INPUT_FOLDING_CONFIG, MODEL_RESIDENCY_CONFIG
 from src.config.model_config import MODELS_DIR, SCALERS_DIR
+from src.services.bundle import ModelBundle, artifact_key
+from src.services.checkpoints import find_checkpoint, load_state_dict_mmap
+from src.services.model_residency import ModelResidency
+from src.services.preprocessors import load_artifact
+from src.services.scaling import AffineKernel
+from src.services.xgb_thresholds import (
+    FOLDED_SCALER_ATTR, SCALER_DIGEST_ATTR, SOURCE_DIGEST_ATTR, raw_model_path, scaler_path
+)
+from src.utils.performance.metrics import track_model_load
+from src.utils.storage.digests import file_sha256
 from src.domain import (
     features_metal, features_ligand, features_solvent,
-    features_Tsyn, features_Tdry, features_Treg
+    features_salt_mass, features_acid_mass, features_Vsyn,
+    features_Tsyn, features_Tdry, features_Treg,
+    metal_columns, ligand_columns, solvent_columns
 )
 
 logger = logging.getLogger(__name__)
 
+# Входы torch-моделей: модель -> (скейлер, признаки, One-Hot столбцы).
+# Скейлеры металлов обучены без имен признаков, в порядке features_metal
+# (None вместо списка One-Hot столбцов)
+TORCH_MODEL_INPUTS = {
+    'metal_binary': ('binary_metals', features_metal, None),
+    'major_metal': ('major_metal', features_metal, None),
+    'minor_metal': ('minor_metal', features_metal, None),
+    'Tsyn': ('Tsyn', features_Tsyn, metal_columns + ligand_columns + solvent_columns),
+    'Tdry': ('Tdry', features_Tdry, metal_columns + ligand_columns + solvent_columns),
+    'Treg': ('Treg', features_Treg, metal_columns + ligand_columns + solvent_columns),
+}
+
+# Входы бустеров XGBoost: модель -> (скейлер, признаки, One-Hot столбцы)
+XGB_MODEL_INPUTS = {
+    'ligand': ('ligand', features_ligand, metal_columns),
+    'solvent': ('solvent', features_solvent, metal_columns + ligand_columns),
+    'salt_mass': ('salt_mass', features_salt_mass, metal_columns + ligand_columns + solvent_columns),
+    'acid_mass': ('acid_mass', features_acid_mass, metal_columns + ligand_columns + solvent_columns),
+    'Vsyn': ('Vsyn', features_Vsyn, metal_columns + ligand_columns + solvent_columns),
+}
+
+# Файлы бустеров XGBoost в MODELS_DIR
+XGB_MODEL_FILES = {
+    'ligand': 'xgb_ligand_classifier.json',
+    'solvent': 'xgb_solvent_classifier.json',
+    'salt_mass': 'xgb_mass_salt_classifier.json',
+    'acid_mass': 'xgb_acid_mass_regressor.json',
+    'Vsyn': 'model_xgb_V_syn_regressor.json',
+}
+
+
+class _SingleFlight:
+    """
+    Однократная загрузка артефактов при конкурентных запросах.
+
+    Первый поток, запросивший артефакт, загружает его; остальные потоки,
+    пришедшие во время загрузки, ждут тот же Future и получают тот же
+    объект (или то же исключение). Блокировки действуют на уровне
+    отдельного артефакта: загрузки разных артефактов идут параллельно.
+    """
+
+    def __init__(self):
+        """Инициализация."""
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[str, Hashable], Future] = {}
+        # Счетчики по видам артефактов: загрузки, ожидания чужой загрузки, ошибки
+        self._counters: Dict[str, Dict[str, float]] = {}
+
+    def _count(self, kind: str, counter: str, value: float = 1) -> None:
+        """Увеличивает счетчик (вызывается под блокировкой)."""
+        counters = self._counters.setdefault(kind, {'loads': 0, 'waits': 0, 'wait_s': 0.0, 'errors': 0})
+        counters[counter] += value
+
+    def run(self, kind: str, name: Hashable, load: Callable[[], Any]) -> Any:
+        """
+        Выполняет загрузку артефакта не более одного раза одновременно.
+
+        Args:
+            kind: Вид артефакта ('model', 'scaler', 'encoder')
+            name: Имя артефакта
+            load: Загрузка с сохранением в кэш; сохранение должно произойти
+                до возврата, чтобы следующие запросы не начинали загрузку заново
+
+        Returns:
+            Any: Загруженный артефакт
+        """
+        key = (kind, name)
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self._count(kind, 'waits')
+
+        if not leader:
+            start = time.perf_counter()
+            try:
+                return future.result()
+            finally:
+                with self._lock:
+                    self._count(kind, 'wait_s', time.perf_counter() - start)
+
+        try:
+            value = load()
+        except BaseException as exc:
+            future.set_exception(exc)
+            with self._lock:
+                self._count(kind, 'errors')
+            raise
+        else:
+            future.set_result(value)
+            with self._lock:
+                self._count(kind, 'loads')
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Счетчики загрузок и ожиданий по видам артефактов."""
+        with self._lock:
+            return {
+                kind: dict(counters, in_flight=sum(1 for k in self._inflight if k[0] == kind))
+                for kind, counters in self._counters.items()
+            }
+
+
 class ModelService:
     """
     Сервис для управления моделями машинного обучения.
-    Реализует ленивую загрузку и кэширование моделей.
+    Реализует ленивую загрузку и кэширование моделей. Загруженные модели
+    хранятся в ModelResidency с бюджетом памяти (MODEL_RESIDENCY_CONFIG):
+    вытесненная модель прозрачно загружается заново при следующем запросе.
+    Сервис используется из нескольких потоков Streamlit: каждый артефакт
+    загружается одним потоком, остальные ждут его результата (_SingleFlight).
+    В режиме архива (BUNDLE_CONFIG['enabled']) артефакты читаются из единого
+    файла src.services.bundle; отсутствующие в архиве — из отдельных файлов.
     """
     
     _instance = None  # Синглтон-инстанс
+    _instance_lock = threading.Lock()
     
     def __new__(cls):
         """Реализация паттерна Singleton."""
-        if cls._instance is None:
-            cls._instance = super(ModelService, cls).__new__(cls)
-            cls._instance._initialized = False
+        with cls._instance_lock:
+            if cls._instance is None:
+                instance = super(ModelService, cls).__new__(cls)
+                instance._initialized = False
+                instance._init_lock = threading.Lock()
+                cls._instance = instance
         return cls._instance
     
     def __init__(self):
         """Инициализация сервиса моделей."""
-        if self._initialized:
-            return
-            
-        self._models = {}
+        with self._init_lock:
+            if self._initialized:
+                return
+            self._initialize()
+
+    def _initialize(self) -> None:
+        """Создает хранилища артефактов (однократно, под блокировкой)."""
+        self._models = ModelResidency(
+            budget_mb=MODEL_RESIDENCY_CONFIG['memory_budget_mb'],
+            policy=MODEL_RESIDENCY_CONFIG['eviction_policy'],
+            pinned=MODEL_RESIDENCY_CONFIG['pinned_models']
+        )
         self._encoders = {}
         self._scalers = {}
+        self._kernels = {}
+        # Обращения к кэшам артефактов: {вид: {'hit': n, 'miss': n}}
+        self._cache_requests = {
+            kind: {'hit': 0, 'miss': 0} for kind in ('model', 'scaler', 'encoder')
+        }
+        self._requests_lock = threading.Lock()
+        self._loads = _SingleFlight()
+        self._bundle = self._open_bundle()
         
         # Принудительно используем CPU для совместимости
         self._device = torch.device('cpu')
@@ -49,6 +198,53 @@ class ModelService:
         self._initialized = True
         logger.info(f"Инициализирован сервис моделей (устройство: {self._device})")
         
+    def _open_bundle(self) -> Optional[ModelBundle]:
+        """
+        Открывает архив артефактов, если включен режим архива.
+        
+        Returns:
+            Optional[ModelBundle]: Архив или None (режим отключен или архив недоступен)
+        """
+        if not BUNDLE_CONFIG['enabled']:
+            return None
+        try:
+            bundle = ModelBundle(BUNDLE_CONFIG['path'])
+        except (OSError, ValueError) as e:
+            logger.error(f"Архив артефактов недоступен, используются отдельные файлы: {str(e)}")
+            return None
+        logger.info(f"Открыт архив артефактов {bundle.path} (версия {bundle.bundle_version}, {len(bundle)} записей)")
+        return bundle
+
+    def _bundle_key(self, artifact_path: Union[str, Path]) -> Optional[str]:
+        """
+        Ключ записи архива для файла артефакта.
+        
+        Args:
+            artifact_path: Путь к файлу артефакта
+            
+        Returns:
+            Optional[str]: Ключ или None, если артефакт загружается из файла
+        """
+        if self._bundle is None:
+            return None
+        key = artifact_key(artifact_path)
+        return key if key in self._bundle else None
+
+    def _source_digest(self, artifact_path: Union[str, Path]) -> Optional[str]:
+        """
+        SHA-256 исходного файла артефакта, который загрузил бы сервис.
+        
+        Args:
+            artifact_path: Путь к файлу артефакта
+            
+        Returns:
+            Optional[str]: Дайджест из индекса архива или по файлу; None, если артефакта нет
+        """
+        bundle_key = self._bundle_key(artifact_path)
+        if bundle_key is not None:
+            return self._bundle.entries[bundle_key].get('source_sha256')
+        return file_sha256(artifact_path) if Path(artifact_path).exists() else None
+
     def get_device(self) -> torch.device:
         """Возвращает устройство, используемое для моделей."""
         return self._device
@@ -63,6 +259,11 @@ class ModelService:
         """
         Загружает модель PyTorch.
         
+        Если рядом с .pth есть сконвертированный файл .safetensors, веса
+        загружаются из него с отображением в память (load_state_dict с
+        assign=True): тензоры модели остаются страницами файла и разделяются
+        процессами через страничный кэш.
+        
         Args:
             model_class: Класс модели
             model_path: Путь к файлу модели
@@ -72,26 +273,46 @@ class ModelService:
         Returns:
             torch.nn.Module: Загруженная модель
         """
-        if num_classes is not None:
-            model = model_class(input_dim=input_dim, num_classes=num_classes)
-        else:
-            model = model_class(input_dim=input_dim)
-        
-        model.load_state_dict(
-            torch.load(
-                model_path,
-                map_location=self._device,  # Используем устройство из экземпляра
-                weights_only=True
-            )
-        )
-        model = model.to(self._device)  # Гарантируем, что модель на правильном устройстве
-        model.eval()
+        bundle_key = self._bundle_key(model_path)
+        checkpoint = None if bundle_key else find_checkpoint(model_path)
+        with track_model_load(checkpoint or model_path, 'torch'):
+            if num_classes is not None:
+                model = model_class(input_dim=input_dim, num_classes=num_classes)
+            else:
+                model = model_class(input_dim=input_dim)
+
+            if bundle_key is not None:
+                model.load_state_dict(self._bundle.load_state_dict(bundle_key), assign=True)
+                model_path = f"{self._bundle.path}:{bundle_key}"
+            elif checkpoint is not None:
+                model.load_state_dict(
+                    load_state_dict_mmap(checkpoint, verify=CHECKPOINT_CONFIG['verify_on_load']),
+                    assign=True
+                )
+                model_path = checkpoint
+            else:
+                model.load_state_dict(
+                    torch.load(
+                        model_path,
+                        map_location=self._device,  # Используем устройство из экземпляра
+                        weights_only=True
+                    )
+                )
+            model = model.to(self._device)  # Гарантируем, что модель на правильном устройстве
+            model.eval()
         logger.info(f"Загружена PyTorch модель: {model_path}")
         return model
     
     def _load_xgb_model(self, model_path: str) -> xgb.Booster:
         """
         Загружает модель XGBoost.
+
+        Если включена загрузка бустеров с порогами в исходных единицах
+        (INPUT_FOLDING_CONFIG['xgboost_raw_thresholds']) и бустер скомпилирован
+        (src.services.xgb_thresholds), загружается он: атрибут folded_scaler
+        хранит имя встроенного скейлера (см. get_input_kernel). Скомпилированный
+        бустер, SHA-256 исходного бустера или скейлера которого не совпадает
+        с текущим, не используется: загружается исходный бустер.
         
         Args:
             model_path: Путь к файлу модели
@@ -99,14 +320,64 @@ class ModelService:
         Returns:
             xgb.Booster: Загруженная модель
         """
-        model = xgb.Booster()
-        model.load_model(model_path)
+        raw_path = raw_model_path(model_path)
+        if INPUT_FOLDING_CONFIG['xgboost_raw_thresholds'] and (
+            self._bundle_key(raw_path) is not None or raw_path.exists()
+        ):
+            model = self._read_booster(raw_path)
+            folded_scaler = model.attr(FOLDED_SCALER_ATTR)
+            stale = [
+                Path(path).name
+                for path, attr in ((model_path, SOURCE_DIGEST_ATTR), (scaler_path(folded_scaler), SCALER_DIGEST_ATTR))
+                if self._source_digest(path) not in (None, model.attr(attr))
+            ]
+            if not stale:
+                model.folded_scaler = folded_scaler
+                return model
+            logger.warning(f"{raw_path.name} скомпилирован из другой версии {', '.join(stale)}: используется исходный бустер")
+        return self._read_booster(model_path)
+
+    def _read_booster(self, model_path: Union[str, Path]) -> xgb.Booster:
+        """
+        Читает бустер XGBoost из архива или файла.
+        
+        Args:
+            model_path: Путь к файлу бустера
+            
+        Returns:
+            xgb.Booster: Бустер
+        """
+        bundle_key = self._bundle_key(model_path)
+        with track_model_load(model_path, 'xgboost'):
+            if bundle_key is not None:
+                model = self._bundle.load_xgboost(bundle_key)
+            else:
+                model = xgb.Booster()
+                model.load_model(model_path)
         logger.info(f"Загружена XGBoost модель: {model_path}")
         return model
     
+    def _load_preprocessor(self, path: str, kind: str) -> Any:
+        """
+        Загружает скейлер или энкодер.
+
+        Источник по приоритету: архив, файл .npz без pickle
+        (src.services.preprocessors), пикл joblib.
+
+        Args:
+            path: Путь к пиклу
+            kind: Вид артефакта для метрик ('scaler' или 'encoder')
+
+        Returns:
+            Any: Загруженный объект
+        """
+        bundle_key = self._bundle_key(path)
+        with track_model_load(path, kind):
+            return self._bundle.load_preprocessor(bundle_key) if bundle_key else load_artifact(path)
+
     def _load_scaler(self, scaler_path: str) -> Any:
         """
-        Загружает sklearn скейлер.
+        Загружает скейлер.
         
         Args:
             scaler_path: Путь к файлу скейлера
@@ -114,13 +385,13 @@ class ModelService:
         Returns:
             Any: Загруженный скейлер
         """
-        scaler = joblib.load(scaler_path)
-        logger.info(f"Загружен скейлер: {scaler_path}")
+        scaler = self._load_preprocessor(scaler_path, 'scaler')
+        logger.info(f"Загружен скейлер: {scaler_path} ({type(scaler).__name__})")
         return scaler
     
     def _load_encoder(self, encoder_path: str) -> Any:
         """
-        Загружает sklearn энкодер.
+        Загружает энкодер.
         
         Args:
             encoder_path: Путь к файлу энкодера
@@ -128,11 +399,15 @@ class ModelService:
         Returns:
             Any: Загруженный энкодер
         """
-        encoder = joblib.load(encoder_path)
-        logger.info(f"Загружен энкодер: {encoder_path}")
+        encoder = self._load_preprocessor(encoder_path, 'encoder')
+        logger.info(f"Загружен энкодер: {encoder_path} ({type(encoder).__name__})")
         return encoder
     
-    @lru_cache(maxsize=None)
+    def _count_request(self, kind: str, hit: bool) -> None:
+        """Учитывает обращение к кэшу артефактов."""
+        with self._requests_lock:
+            self._cache_requests[kind]['hit' if hit else 'miss'] += 1
+
     def get_model(self, model_name: str) -> Any:
         """
         Получает модель по имени. Реализует ленивую загрузку.
@@ -146,9 +421,55 @@ class ModelService:
         Raises:
             ValueError: Если модель с указанным именем не найдена
         """
-        if model_name in self._models:
-            return self._models[model_name]
+        model = self._models.get(model_name)
+        self._count_request('model', model is not None)
+        if model is not None:
+            return model
+        return self._load_once(
+            'model', model_name,
+            lambda: self._models.get(model_name),
+            lambda: self._models.put(model_name, self._load_model(model_name))
+        )
+
+    def _load_once(
+        self,
+        kind: str,
+        name: str,
+        lookup: Callable[[], Optional[Any]],
+        load: Callable[[], Any]
+    ) -> Any:
+        """
+        Загружает артефакт однократно при конкурентных запросах.
+
+        Args:
+            kind: Вид артефакта ('model', 'scaler', 'encoder')
+            name: Имя артефакта
+            lookup: Поиск в кэше (None — артефакт не загружен)
+            load: Загрузка с сохранением в кэш
+
+        Returns:
+            Any: Артефакт
+        """
+        def lookup_or_load() -> Any:
+            # Артефакт мог загрузить поток, закончивший загрузку перед нами
+            value = lookup()
+            return value if value is not None else load()
+
+        return self._loads.run(kind, name, lookup_or_load)
+
+    def _load_model(self, model_name: str) -> Any:
+        """
+        Загружает модель по имени (вместе с нужным ей энкодером).
+        
+        Args:
+            model_name: Имя модели
             
+        Returns:
+            Any: Загруженная модель
+            
+        Raises:
+            ValueError: Если модель с указанным именем не найдена
+        """
         # Загрузка моделей по запросу
         from saved_models.models_list import (
             MetalClassifier, TransformerClassifier,
@@ -157,26 +478,9 @@ class ModelService:
         )
         
         # Получаем сначала необходимые энкодеры, если нужны
-        if model_name.startswith('major_metal') and 'label_encoder_major_metal' not in self._encoders:
-            self._encoders['label_encoder_major_metal'] = self._load_encoder(
-                SCALERS_DIR / 'label_encoder_major_metal.pkl'
-            )
-        elif model_name.startswith('minor_metal') and 'label_encoder_minor_metal' not in self._encoders:
-            self._encoders['label_encoder_minor_metal'] = self._load_encoder(
-                SCALERS_DIR / 'label_encoder_minor_metal.pkl'
-            )
-        elif model_name.startswith('Tsyn') and 'label_encoder_Tsyn' not in self._encoders:
-            self._encoders['label_encoder_Tsyn'] = self._load_encoder(
-                SCALERS_DIR / 'label_encoder_Tsyn.pkl'
-            )
-        elif model_name.startswith('Tdry') and 'label_encoder_Tdry' not in self._encoders:
-            self._encoders['label_encoder_Tdry'] = self._load_encoder(
-                SCALERS_DIR / 'label_encoder_Tdry.pkl'
-            )
-        elif model_name.startswith('Treg') and 'label_encoder_Treg' not in self._encoders:
-            self._encoders['label_encoder_Treg'] = self._load_encoder(
-                SCALERS_DIR / 'label_encoder_Treg.pkl'
-            )
+        for encoder_name in ('major_metal', 'minor_metal', 'Tsyn', 'Tdry', 'Treg'):
+            if model_name.startswith(encoder_name):
+                self.get_encoder(encoder_name)
         
         # Загрузка модели в зависимости от имени
         if model_name == 'metal_binary':
@@ -190,53 +494,106 @@ class ModelService:
                 TransformerClassifier,
                 MODELS_DIR / 'best_major_classifier_metal.pth',
                 len(features_metal),
-                len(self._encoders['label_encoder_major_metal'].classes_)
+                len(self.get_encoder('major_metal').classes_)
             )
         elif model_name == 'minor_metal':
             model = self._load_torch_model(
                 TransformerClassifier,
                 MODELS_DIR / 'best_minor_classifier_metal.pth',
                 len(features_metal),
-                len(self._encoders['label_encoder_minor_metal'].classes_)
+                len(self.get_encoder('minor_metal').classes_)
             )
-        elif model_name == 'ligand':
-            model = self._load_xgb_model(MODELS_DIR / 'xgb_ligand_classifier.json')
-        elif model_name == 'solvent':
-            model = self._load_xgb_model(MODELS_DIR / 'xgb_solvent_classifier.json')
-        elif model_name == 'salt_mass':
-            model = self._load_xgb_model(MODELS_DIR / 'xgb_mass_salt_classifier.json')
-        elif model_name == 'acid_mass':
-            model = self._load_xgb_model(MODELS_DIR / 'xgb_acid_mass_regressor.json')
-        elif model_name == 'Vsyn':
-            model = self._load_xgb_model(MODELS_DIR / 'model_xgb_V_syn_regressor.json')
+        elif model_name in XGB_MODEL_FILES:
+            model = self._load_xgb_model(MODELS_DIR / XGB_MODEL_FILES[model_name])
         elif model_name == 'Tsyn':
             model = self._load_torch_model(
                 TransformerTsynClassifier,
                 MODELS_DIR / 'model_Tsyn.pth',
                 len(features_Tsyn),
-                len(self._encoders['label_encoder_Tsyn'].classes_)
+                len(self.get_encoder('Tsyn').classes_)
             )
         elif model_name == 'Tdry':
             model = self._load_torch_model(
                 TransformerTdryClassifier,
                 MODELS_DIR / 'model_Tdry.pth',
                 len(features_Tdry),
-                len(self._encoders['label_encoder_Tdry'].classes_)
+                len(self.get_encoder('Tdry').classes_)
             )
         elif model_name == 'Treg':
             model = self._load_torch_model(
                 TransformerTregClassifier,
                 MODELS_DIR / 'model_Treg.pth',
                 len(features_Treg),
-                len(self._encoders['label_encoder_Treg'].classes_)
+                len(self.get_encoder('Treg').classes_)
             )
         else:
             raise ValueError(f"Неизвестная модель: {model_name}")
+
+        if INPUT_FOLDING_CONFIG['enabled'] and model_name in TORCH_MODEL_INPUTS:
+            self._fold_input_scaling(model_name, model)
         
-        self._models[model_name] = model
         return model
+
+    def _fold_input_scaling(self, model_name: str, model: torch.nn.Module) -> None:
+        """
+        Встраивает скейлер модели в ее первый слой (embedding).
+
+        После встраивания модель принимает исходные признаки, а атрибут
+        folded_scaler хранит имя встроенного скейлера (см. get_input_kernel).
+
+        Args:
+            model_name: Имя torch-модели
+            model: Загруженная модель
+        """
+        scaler_name, features, categorical_columns = TORCH_MODEL_INPUTS[model_name]
+        kernel = self.get_scaling_kernel(scaler_name)
+        if categorical_columns is None:
+            positions = np.arange(len(features), dtype=np.intp)
+        else:
+            positions = kernel.layout(features, categorical_columns).positions
+        kernel.fold_into(model.embedding, positions)
+        model.folded_scaler = scaler_name
+        logger.info(f"Скейлер {scaler_name} встроен в первый слой модели {model_name}")
+    
+    def get_mc_dropout_model(self, model_name: str) -> torch.nn.Module:
+        """
+        Получает копию torch-модели для Monte Carlo dropout.
+
+        В копии включен режим обучения у всех модулей, кроме BatchNorm: так
+        работают слои dropout (в том числе внутри TransformerEncoderLayer,
+        который в режиме eval() использует быстрый путь без dropout), а
+        нормализация по-прежнему использует накопленную статистику. Исходная
+        модель остается в режиме eval() и может использоваться параллельно.
+        Копия хранится в ModelResidency под именем 'mc_dropout:<имя>' и
+        учитывается в бюджете памяти наравне с обычными моделями.
+
+        Args:
+            model_name: Имя torch-модели
+
+        Returns:
+            torch.nn.Module: Копия модели с активным dropout
+        """
+        import copy
+        from torch.nn.modules.batchnorm import _BatchNorm
+
+        residency_name = f"mc_dropout:{model_name}"
+        model = self._models.get(residency_name)
+        self._count_request('model', model is not None)
+        if model is not None:
+            return model
+
+        def load() -> torch.nn.Module:
+            model = copy.deepcopy(self.get_model(model_name))
+            model.train()
+            for module in model.modules():
+                if isinstance(module, _BatchNorm):
+                    module.eval()
+            for parameter in model.parameters():
+                parameter.requires_grad_(False)
+            return self._models.put(residency_name, model)
+
+        return self._load_once('model', residency_name, lambda: self._models.get(residency_name), load)
     
-    @lru_cache(maxsize=None)
     def get_scaler(self, scaler_name: str) -> Any:
         """
         Получает скейлер по имени. Реализует ленивую загрузку.
@@ -250,6 +607,7 @@ class ModelService:
         Raises:
             ValueError: Если скейлер с указанным именем не найден
         """
+        self._count_request('scaler', scaler_name in self._scalers)
         if scaler_name in self._scalers:
             return self._scalers[scaler_name]
             
@@ -271,12 +629,52 @@ class ModelService:
             raise ValueError(f"Неизвестный скейлер: {scaler_name}")
             
         scaler_path = SCALERS_DIR / scaler_mapping[scaler_name]
-        scaler = self._load_scaler(scaler_path)
-        self._scalers[scaler_name] = scaler
-        
-        return scaler
+        return self._load_once(
+            'scaler', scaler_name,
+            lambda: self._scalers.get(scaler_name),
+            lambda: self._scalers.setdefault(scaler_name, self._load_scaler(scaler_path))
+        )
     
-    @lru_cache(maxsize=None)
+    def get_scaling_kernel(self, scaler_name: str) -> AffineKernel:
+        """
+        Получает параметры скейлера для масштабирования без sklearn.
+
+        Параметры извлекаются из скейлера один раз (src.services.scaling).
+
+        Args:
+            scaler_name: Имя скейлера
+
+        Returns:
+            AffineKernel: Параметры скейлера
+
+        Raises:
+            ValueError: Если скейлер с указанным именем не найден
+        """
+        kernel = self._kernels.get(scaler_name)
+        if kernel is None:
+            kernel = self._kernels.setdefault(scaler_name, AffineKernel(self.get_scaler(scaler_name)))
+        return kernel
+
+    def get_input_kernel(self, scaler_name: str, model: Any = None) -> AffineKernel:
+        """
+        Получает ядро для сборки входа модели.
+
+        Если скейлер встроен в модель (первый слой torch-модели или пороги
+        бустера XGBoost), возвращается тождественное ядро: модель принимает
+        исходные признаки.
+
+        Args:
+            scaler_name: Имя скейлера стадии
+            model: Модель, для которой собирается вход
+
+        Returns:
+            AffineKernel: Ядро масштабирования или тождественное ядро
+        """
+        kernel = self.get_scaling_kernel(scaler_name)
+        if getattr(model, 'folded_scaler', None) == scaler_name:
+            return kernel.passthrough()
+        return kernel
+
     def get_encoder(self, encoder_name: str) -> Any:
         """
         Получает энкодер по имени. Реализует ленивую загрузку.
@@ -290,6 +688,7 @@ class ModelService:
         Raises:
             ValueError: Если энкодер с указанным именем не найден
         """
+        self._count_request('encoder', encoder_name in self._encoders)
         if encoder_name in self._encoders:
             return self._encoders[encoder_name]
             
@@ -307,10 +706,11 @@ class ModelService:
             raise ValueError(f"Неизвестный энкодер: {encoder_name}")
             
         encoder_path = SCALERS_DIR / encoder_mapping[encoder_name]
-        encoder = self._load_encoder(encoder_path)
-        self._encoders[encoder_name] = encoder
-        
-        return encoder
+        return self._load_once(
+            'encoder', encoder_name,
+            lambda: self._encoders.get(encoder_name),
+            lambda: self._encoders.setdefault(encoder_name, self._load_encoder(encoder_path))
+        )
     
     def get_all_models(self) -> Dict[str, Any]:
         """
@@ -327,11 +727,7 @@ class ModelService:
         ]
         
         # Загружаем все модели
-        for name in model_names:
-            if name not in self._models:
-                self.get_model(name)
-                
-        return self._models
+        return {name: self.get_model(name) for name in model_names}
     
     def get_all_scalers(self) -> Dict[str, Any]:
         """
@@ -376,15 +772,11 @@ class ModelService:
     
     def clear_cache(self) -> None:
         """Очищает кэш моделей, скейлеров и энкодеров."""
-        self._models = {}
+        self._models.clear()
         self._scalers = {}
+        self._kernels = {}
         self._encoders = {}
         
-        # Очищаем также кэш декораторов
-        self.get_model.cache_clear()
-        self.get_scaler.cache_clear()
-        self.get_encoder.cache_clear()
-        
         logger.info("Кэш моделей очищен")
         
     # Добавим эти методы в класс ModelService в src/services/model_service.py
@@ -402,14 +794,11 @@ class ModelService:
         # Определяем модели для выгрузки
         models_to_unload = [name for name in self._models.keys() if name not in keep_models]
         
-        # Выгружаем модели
+        # Выгружаем модели: хранилище — единственный владелец ссылок
         for model_name in models_to_unload:
             self._models.pop(model_name, None)
             logger.info(f"Модель {model_name} выгружена из памяти")
         
-        # Очищаем кэш декораторов
-        self.get_model.cache_clear()
-        
         # Запускаем сборщик мусора
         import gc
         gc.collect()
@@ -447,24 +836,67 @@ class ModelService:
         """
         Оценивает использование памяти каждой загруженной моделью.
         
+        Размер оценивается при загрузке (estimate_memory_mb): для torch-моделей —
+        параметры и буферы, для бустеров XGBoost — массивы узлов деревьев.
+        
         Returns:
             Dict[str, float]: Словарь {имя_модели: размер_в_МБ}
         """
-        memory_usage = {}
+        return self._models.sizes()
+
+    def pin_model(self, model_name: str) -> None:
+        """
+        Закрепляет модель в памяти: она не вытесняется при превышении бюджета.
         
-        for name, model in self._models.items():
-            try:
-                # Для PyTorch моделей
-                if hasattr(model, 'parameters'):
-                    params_size = sum(p.numel() * p.element_size() for p in model.parameters()) / (1024 * 1024)
-                    buffers_size = sum(b.numel() * b.element_size() for b in model.buffers()) / (1024 * 1024)
-                    memory_usage[name] = params_size + buffers_size
-                # Для других типов моделей (XGBoost и т.д.)
-                else:
-                    import sys
-                    memory_usage[name] = sys.getsizeof(model) / (1024 * 1024)
-            except Exception as e:
-                logger.warning(f"Не удалось определить размер модели {name}: {str(e)}")
-                memory_usage[name] = 0.0
+        Args:
+            model_name: Имя модели
+        """
+        self._models.pin(model_name)
+
+    def unpin_model(self, model_name: str) -> None:
+        """
+        Снимает закрепление модели.
+        
+        Args:
+            model_name: Имя модели
+        """
+        self._models.unpin(model_name)
+
+    def set_memory_budget(self, budget_mb: float) -> None:
+        """
+        Изменяет бюджет памяти моделей (лишние модели вытесняются сразу).
+        
+        Args:
+            budget_mb: Бюджет в МБ (0 — без ограничения)
+        """
+        self._models.set_budget(budget_mb)
+
+    def get_residency_stats(self) -> Dict[str, Any]:
+        """
+        Возвращает состояние хранилища моделей.
+        
+        Returns:
+            Dict[str, Any]: Бюджет, политика, занятая память, счетчики загрузок
+                и вытеснений и статистика по моделям (см. ModelResidency.stats)
+        """
+        return self._models.stats()
+
+    def get_load_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Возвращает счетчики конкурентной загрузки артефактов.
         
-        return memory_usage
\ No newline at end of file
+        Returns:
+            Dict[str, Dict[str, float]]: {вид: loads, waits (запросов, дождавшихся
+                чужой загрузки), wait_s (суммарное ожидание), errors, in_flight}
+        """
+        return self._loads.stats()
+
+    def get_cache_info(self) -> Dict[str, Dict[str, int]]:
+        """
+        Возвращает счетчики обращений к кэшам артефактов.
+        
+        Returns:
+            Dict[str, Dict[str, int]]: {'model'|'scaler'|'encoder': {'hit': n, 'miss': n}}
+        """
+        with self._requests_lock:
+            return {kind: dict(counts) for kind, counts in self._cache_requests.items()}
@@ -8,11 +8,17 @@ import pandas as pd
 import torch
 import torch.nn.functional as F
 import xgboost as xgb
+import copy
 import logging
-from typing import Dict, Any, List, Tuple, Union, Optional
+import math
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Any, List, Tuple, Union, Optional
 import pymatgen.core as mg
 
+from src.config import PREDICTION_CACHE_CONFIG, UNCERTAINTY_CONFIG
 from src.services.model_service import ModelService
+from src.services.uncertainty import summarize_samples
 from src.domain.constants import METAL_MOLAR_MASSES, LIGAND_MOLAR_MASSES
 from src.domain.features import (
     features_metal, features_ligand, features_solvent,
@@ -23,9 +29,363 @@ from src.domain.features import (
 from src.utils.data.feature_generation import (
     safe_generate_features, safe_generate_solvent_features
 )
+from src.utils.performance.instrumentation import latency_tracker
+from src.utils.performance.metrics import CACHE_REQUESTS, track_prediction_request
 
 logger = logging.getLogger(__name__)
 
+# Стадии полного конвейера в порядке выполнения
+PIPELINE_STAGES = (
+    'derived_features', 'metal', 'ligand', 'solvent', 'salt_mass',
+    'acid_mass', 'Vsyn', 'Tsyn', 'Tdry', 'Treg'
+)
+
+# Ключи результата run_full_prediction по стадиям конвейера
+STAGE_RESULT_KEYS = {
+    'derived_features': 'derived_features', 'metal': 'metal', 'ligand': 'ligand',
+    'solvent': 'solvent', 'salt_mass': 'salt_mass', 'acid_mass': 'acid_mass',
+    'Vsyn': 'synthesis_volume', 'Tsyn': 'tsyn', 'Tdry': 'tdry', 'Treg': 'treg'
+}
+
+# Обработчик событий прогресса конвейера
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+# Стадии поиска лучшими рецептами (beam search) в порядке выполнения
+BEAM_STAGES = (
+    'metal', 'ligand', 'solvent', 'salt_mass', 'acid_mass',
+    'Vsyn', 'Tsyn', 'Tdry', 'Treg'
+)
+
+
+@lru_cache(maxsize=None)
+def _metal_descriptors(metal_type: str) -> Tuple[Tuple[str, float], ...]:
+    """Дескрипторы металла (pymatgen), вычисляются один раз на процесс."""
+    composition = mg.Composition(metal_type)
+    return (
+        ('Total molecular weight (metal)', composition.weight),
+        ('Average ionic radius (metal)', mg.Element(composition.elements[0]).average_ionic_radius),
+        ('Average electronegativity (metal)', composition.average_electroneg),
+    )
+
+
+@lru_cache(maxsize=None)
+def _ligand_descriptors(ligand_type: str) -> Tuple[Tuple[str, Any], ...]:
+    """Дескрипторы лиганда (RDKit), вычисляются один раз на процесс."""
+    descriptors, _ = safe_generate_features(ligand_type)
+    return tuple(descriptors.items())
+
+
+@lru_cache(maxsize=None)
+def _solvent_descriptors(solvent_type: str) -> Tuple[Tuple[str, Any], ...]:
+    """Дескрипторы растворителя (RDKit), вычисляются один раз на процесс."""
+    descriptors, _ = safe_generate_solvent_features(solvent_type)
+    return tuple(descriptors.items())
+
+
+def recipes_to_frame(recipes: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Сводит рецепты поиска (run_beam_search, run_enumeration) в таблицу.
+
+    Args:
+        recipes: Рецепты в формате run_beam_search
+
+    Returns:
+        pd.DataFrame: Строка на рецепт, столбцы с подписями параметров синтеза
+    """
+    return pd.DataFrame([
+        {
+            '№': recipe.get('rank', number),
+            'P(рецепта)': recipe['joint_probability'],
+            'Металл': recipe['metal']['metal_type'],
+            'Лиганд': recipe['ligand']['ligand_type'],
+            'Растворитель': recipe['solvent']['solvent_type'],
+            'm (соли), г': recipe['salt_mass'],
+            'm(кис-ты), г': recipe['acid_mass'],
+            'Vсин. (р-ля), мл': recipe['synthesis_volume'],
+            'Т.син., °С': recipe['tsyn']['temperature'],
+            'Т суш., °С': recipe['tdry']['temperature'],
+            'Tрег, ᵒС': recipe['treg']['temperature'],
+        }
+        for number, recipe in enumerate(recipes, start=1)
+    ])
+
+
+class _PipelineProgress:
+    """Формирует события прогресса по завершении стадий конвейера."""
+
+    def __init__(self, callback: Optional[ProgressCallback]):
+        """
+        Инициализация.
+
+        Args:
+            callback: Обработчик событий (None — события не формируются)
+        """
+        self.callback = callback
+        self.partial: Dict[str, Any] = {}
+        self.started = time.perf_counter()
+        self._last = self.started
+
+    def done(self, stage: str, result: Any) -> None:
+        """
+        Сообщает о завершении стадии.
+
+        Args:
+            stage: Имя стадии (из PIPELINE_STAGES)
+            result: Результат стадии
+        """
+        if self.callback is None:
+            return
+        now = time.perf_counter()
+        self.partial[stage] = result
+        self.callback({
+            'stage': stage,
+            'index': PIPELINE_STAGES.index(stage) + 1,
+            'total': len(PIPELINE_STAGES),
+            'stage_ms': (now - self._last) * 1000,
+            'elapsed_ms': (now - self.started) * 1000,
+            'result': result,
+            'partial': dict(self.partial)
+        })
+        self._last = now
+
+
+class _BranchInputs:
+    """
+    Входы моделей для ветвей поиска по одному целевому профилю.
+
+    Признаки профиля (производные от пяти входных параметров) одинаковы для
+    всех ветвей, поэтому их масштабированные значения для каждой стадии, а
+    для torch-моделей — и вклад этих столбцов в первый слой (embedding),
+    вычисляются один раз. Для каждой комбинации масштабируются только
+    зависящие от нее столбцы (металл, лиганд, растворитель, массы, объем,
+    температуры). Скейлеры проекта — покомпонентные StandardScaler и
+    MinMaxScaler, поэтому частичное масштабирование совпадает с полным.
+    Если скейлер встроен в модель (первый слой torch-модели или пороги
+    XGBoost), столбцы передаются без масштабирования
+    (ModelService.get_input_kernel).
+    """
+
+    def __init__(self, model_service: ModelService, features_df: pd.DataFrame):
+        """
+        Инициализация.
+
+        Args:
+            model_service: Сервис моделей
+            features_df: DataFrame с признаками целевого профиля (одна строка)
+        """
+        self.model_service = model_service
+        self.target = features_df.iloc[0]
+        self._layouts: Dict[str, Dict[str, Any]] = {}
+        self._projections: Dict[str, Tuple[torch.Tensor, torch.Tensor]] = {}
+
+    def layout(
+        self,
+        stage: str,
+        features: List[str],
+        categorical_columns: List[str],
+        model: Any = None
+    ) -> Dict[str, Any]:
+        """
+        Возвращает разметку входа стадии (вычисляется один раз).
+
+        Args:
+            stage: Имя стадии (совпадает с именем скейлера и модели)
+            features: Признаки модели в порядке обучения
+            categorical_columns: One-Hot столбцы, которые не масштабируются
+            model: Модель стадии (если скейлер встроен в модель, столбцы
+                не масштабируются)
+
+        Returns:
+            Dict[str, Any]: Индексы постоянных и переменных столбцов и
+                масштабированные значения постоянных
+        """
+        layout = self._layouts.get(stage)
+        if layout is not None:
+            return layout
+
+        kernel = self.model_service.get_input_kernel(stage, model)
+        numeric_columns = list(np.setdiff1d(features, categorical_columns))
+        scaler_position = {column: i for i, column in enumerate(numeric_columns)}
+
+        constant = [i for i, column in enumerate(features) if column in self.target.index]
+        variable = [i for i, column in enumerate(features) if column not in self.target.index]
+        constant_columns = [features[i] for i in constant]
+        variable_columns = [features[i] for i in variable]
+        scaled_variable = [column in scaler_position for column in variable_columns]
+
+        layout = {
+            'features': features,
+            'constant': np.array(constant, dtype=np.intp),
+            'variable': np.array(variable, dtype=np.intp),
+            'variable_columns': variable_columns,
+            'scaled_variable': np.array(scaled_variable, dtype=bool),
+            'variable_positions': np.array(
+                [scaler_position[column] for column in variable_columns if column in scaler_position],
+                dtype=np.intp
+            ),
+            'constant_scaled': kernel.transform_columns(
+                self.target[constant_columns].to_numpy(dtype=np.float64)[None, :],
+                np.array([scaler_position[column] for column in constant_columns], dtype=np.intp)
+            )[0],
+            'kernel': kernel
+        }
+        self._layouts[stage] = layout
+        return layout
+
+    def variable_part(self, layout: Dict[str, Any], df: pd.DataFrame) -> np.ndarray:
+        """
+        Масштабирует зависящие от ветви столбцы.
+
+        Args:
+            layout: Разметка стадии
+            df: Признаки ветвей
+
+        Returns:
+            np.ndarray: Значения переменных столбцов (ветви x столбцы)
+        """
+        values = df[layout['variable_columns']].to_numpy(dtype=np.float64)
+        mask = layout['scaled_variable']
+        values[:, mask] = layout['kernel'].transform_columns(values[:, mask], layout['variable_positions'])
+        return values
+
+    def matrix(
+        self,
+        stage: str,
+        features: List[str],
+        categorical_columns: List[str],
+        df: pd.DataFrame,
+        model: Any = None
+    ) -> np.ndarray:
+        """
+        Собирает масштабированные признаки стадии для всех ветвей.
+
+        Args:
+            stage: Имя стадии
+            features: Признаки модели в порядке обучения
+            categorical_columns: One-Hot столбцы
+            df: Признаки ветвей
+            model: Модель стадии (если скейлер встроен в модель, столбцы
+                не масштабируются)
+
+        Returns:
+            np.ndarray: Признаки модели float32 (строка на ветвь)
+        """
+        layout = self.layout(stage, features, categorical_columns, model)
+        X = np.empty((len(df), len(features)), dtype=np.float32)
+        X[:, layout['constant']] = layout['constant_scaled']
+        X[:, layout['variable']] = self.variable_part(layout, df)
+        return X
+
+    def embedding(
+        self,
+        stage: str,
+        features: List[str],
+        categorical_columns: List[str],
+        df: pd.DataFrame,
+        model: torch.nn.Module,
+        device: torch.device
+    ) -> torch.Tensor:
+        """
+        Рассчитывает выход первого слоя torch-модели для всех ветвей.
+
+        Вклад постоянных столбцов (W_const @ x_const + b) вычисляется один
+        раз; для ветвей добавляется только W_var @ x_var.
+
+        Args:
+            stage: Имя стадии
+            features: Признаки модели в порядке обучения
+            categorical_columns: One-Hot столбцы
+            df: Признаки ветвей
+            model: Модель с первым слоем embedding
+            device: Устройство вычислений
+
+        Returns:
+            torch.Tensor: Выход embedding (ветви x embed_dim)
+        """
+        layout = self.layout(stage, features, categorical_columns, model)
+        projection = self._projections.get(stage)
+        if projection is None:
+            weight = model.embedding.weight.detach()
+            constant = torch.tensor(layout['constant_scaled'], dtype=torch.float32, device=device)
+            constant_projection = model.embedding.bias.detach() + weight[:, layout['constant']] @ constant
+            variable_weight = weight[:, layout['variable']].t().contiguous()
+            projection = self._projections[stage] = (constant_projection, variable_weight)
+
+        constant_projection, variable_weight = projection
+        variable = torch.tensor(self.variable_part(layout, df), dtype=torch.float32, device=device)
+        return torch.addmm(constant_projection, variable, variable_weight)
+
+
+class _FrameInputs:
+    """
+    Входы моделей для ветвей разных целевых профилей (пакетный расчет).
+
+    Масштабирование выполняется так же, как в методах predict_*: по всем
+    числовым столбцам стадии (src.services.scaling).
+    """
+
+    def __init__(self, model_service: ModelService):
+        """
+        Инициализация.
+
+        Args:
+            model_service: Сервис моделей
+        """
+        self.model_service = model_service
+
+    def matrix(
+        self,
+        stage: str,
+        features: List[str],
+        categorical_columns: List[str],
+        df: pd.DataFrame,
+        model: Any = None
+    ) -> np.ndarray:
+        """
+        Масштабирует числовые признаки ветвей и добавляет категориальные.
+
+        Args:
+            stage: Имя стадии (совпадает с именем скейлера)
+            features: Признаки модели в порядке обучения
+            categorical_columns: One-Hot столбцы, которые не масштабируются
+            df: Признаки ветвей
+            model: Модель стадии (если скейлер встроен в модель, признаки
+                не масштабируются)
+
+        Returns:
+            np.ndarray: Признаки модели float32 (строка на ветвь)
+        """
+        kernel = self.model_service.get_input_kernel(stage, model)
+        return kernel.layout(features, categorical_columns).transform(df)
+
+    def embedding(
+        self,
+        stage: str,
+        features: List[str],
+        categorical_columns: List[str],
+        df: pd.DataFrame,
+        model: torch.nn.Module,
+        device: torch.device
+    ) -> torch.Tensor:
+        """
+        Рассчитывает выход первого слоя torch-модели для всех ветвей.
+
+        Args:
+            stage: Имя стадии
+            features: Признаки модели в порядке обучения
+            categorical_columns: One-Hot столбцы
+            df: Признаки ветвей
+            model: Модель с первым слоем embedding
+            device: Устройство вычислений
+
+        Returns:
+            torch.Tensor: Выход embedding (ветви x embed_dim)
+        """
+        X = self.matrix(stage, features, categorical_columns, df, model)
+        return model.embedding(torch.from_numpy(X).to(device))
+
+
 class PredictorService:
     """
     Сервис для предсказания параметров синтеза MOF.
@@ -38,9 +398,21 @@ class PredictorService:
         # Используем то же устройство, что и в ModelService
         self.device = self.model_service.get_device()
         
+        # Трекер задержек стадий конвейера
+        self.latency_tracker = latency_tracker
+        
         logger.info(f"Сервис предсказаний инициализирован (устройство: {self.device})")
         
     
+    def get_latency_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Возвращает сводку задержек по стадиям и подфазам конвейера.
+        
+        Returns:
+            Dict[str, Dict[str, float]]: {стадия[.подфаза]: count, mean_ms, p50_ms, p90_ms, p99_ms, max_ms, last_ms}
+        """
+        return self.latency_tracker.get_stats()
+    
     # Добавим метод в PredictorService для использования улучшенного кэширования
 
     def get_cached_prediction(self, input_params: Dict[str, float], prediction_type: str) -> Optional[Dict[str, Any]]:
@@ -65,6 +437,7 @@ class PredictorService:
         
         if result is not None:
             logger.info(f"Получено кэшированное предсказание для {prediction_type}")
+        CACHE_REQUESTS.inc(cache='prediction', result='hit' if result is not None else 'miss')
         
         return result
 
@@ -77,15 +450,14 @@ class PredictorService:
             prediction_type: Тип предсказания
             result: Результат предсказания
         """
-        from src.utils.storage import create_cache_key, cached_prediction
+        from src.utils.storage import create_cache_key, store_prediction
         
         # Создаем ключ кэша
         cache_key = create_cache_key(input_params)
         
         # Сохраняем в кэш
         model_name = f"{prediction_type.capitalize()}Classifier"
-        _ = cached_prediction(cache_key, model_name)  # Вызов для создания записи в LRU кэше
-        cached_prediction.cache_info = result
+        store_prediction(cache_key, model_name, result)
         
         logger.info(f"Результат предсказания для {prediction_type} кэширован")
 
@@ -110,11 +482,36 @@ class PredictorService:
         Returns:
             pd.DataFrame: Датафрейм с рассчитанными параметрами
         """
+        return self.calculate_derived_features_batch(pd.DataFrame({
+            'SBAT_m2_gr': [SBAT_m2_gr],
+            'a0_mmoll_gr': [a0_mmoll_gr],
+            'E_kDg_moll': [E_kDg_moll],
+            'Ws_cm3_gr': [Ws_cm3_gr],
+            'Sme_m2_gr': [Sme_m2_gr]
+        }))
+
+    def calculate_derived_features_batch(self, inputs: pd.DataFrame) -> pd.DataFrame:
+        """
+        Рассчитывает производные признаки для набора входных точек.
+        
+        Args:
+            inputs: DataFrame со столбцами SBAT_m2_gr, a0_mmoll_gr, E_kDg_moll,
+                Ws_cm3_gr, Sme_m2_gr (строка на точку)
+            
+        Returns:
+            pd.DataFrame: Датафрейм с рассчитанными параметрами (строка на точку)
+        """
+        SBAT_m2_gr = inputs['SBAT_m2_gr'].to_numpy(dtype=np.float64)
+        a0_mmoll_gr = inputs['a0_mmoll_gr'].to_numpy(dtype=np.float64)
+        E_kDg_moll = inputs['E_kDg_moll'].to_numpy(dtype=np.float64)
+        Ws_cm3_gr = inputs['Ws_cm3_gr'].to_numpy(dtype=np.float64)
+        Sme_m2_gr = inputs['Sme_m2_gr'].to_numpy(dtype=np.float64)
+
         # Расчет объема микропор
         W0_cm3_g = 0.034692 * a0_mmoll_gr
         
         # Расчет энергии адсорбции по бензолу
-        E0_KDG_moll = E_kDg_moll / 0.33 if E_kDg_moll > 0 else 1e-6
+        E0_KDG_moll = np.where(E_kDg_moll > 0, E_kDg_moll / 0.33, 1e-6)
         
         # Расчет полуширины пор
         x0_nm = 12 / E0_KDG_moll
@@ -124,15 +521,15 @@ class PredictorService:
         
         # Создаем DataFrame
         data = {
-            'SБЭТ, м2/г': [SBAT_m2_gr],
-            'а0, ммоль/г': [a0_mmoll_gr],
-            'E,  кДж/моль': [E_kDg_moll],
-            'W0, см3/г': [W0_cm3_g],
-            'Ws, см3/г': [Ws_cm3_gr],
-            'E0, кДж/моль': [E0_KDG_moll],
-            'х0, нм': [x0_nm],
-            'Wme, см3/г': [Wme_cm3_gr],
-            'Sme, м2/г': [Sme_m2_gr]
+            'SБЭТ, м2/г': SBAT_m2_gr,
+            'а0, ммоль/г': a0_mmoll_gr,
+            'E,  кДж/моль': E_kDg_moll,
+            'W0, см3/г': W0_cm3_g,
+            'Ws, см3/г': Ws_cm3_gr,
+            'E0, кДж/моль': E0_KDG_moll,
+            'х0, нм': x0_nm,
+            'Wme, см3/г': Wme_cm3_gr,
+            'Sme, м2/г': Sme_m2_gr
         }
         
         df = pd.DataFrame(data)
@@ -153,6 +550,31 @@ class PredictorService:
         
         return df
     
+    def _scaled_inputs(
+        self,
+        stage: str,
+        features: List[str],
+        categorical_columns: List[str],
+        df: pd.DataFrame,
+        model: Any = None
+    ) -> np.ndarray:
+        """
+        Масштабирует признаки стадии без вызова transform скейлера.
+
+        Args:
+            stage: Имя стадии (совпадает с именем скейлера)
+            features: Признаки модели в порядке обучения
+            categorical_columns: One-Hot столбцы, которые не масштабируются
+            df: Признаки (строка на пример)
+            model: Модель стадии (если скейлер встроен в модель, признаки
+                не масштабируются)
+
+        Returns:
+            np.ndarray: Вход модели float32 в порядке признаков
+        """
+        kernel = self.model_service.get_input_kernel(stage, model)
+        return kernel.layout(features, categorical_columns).transform(df)
+
     def predict_metal(self, features_df: pd.DataFrame) -> Dict[str, Any]:
         """
         Предсказывает тип металла для MOF.
@@ -163,58 +585,70 @@ class PredictorService:
         Returns:
             Dict[str, Any]: Результаты предсказания (тип металла, вероятность)
         """
+        timer = self.latency_tracker
+
         # 1. Бинарная классификация металла
-        binary_scaler = self.model_service.get_scaler('binary_metals')
-        scaled_features = binary_scaler.transform(features_df[features_metal].values)
-        
-        # Используем устройство из экземпляра
-        input_tensor = torch.tensor(scaled_features, dtype=torch.float32).to(self.device)
-        
-        binary_model = self.model_service.get_model('metal_binary')
-        
-        with torch.no_grad():
-            logits = binary_model(input_tensor)
-            prob = torch.sigmoid(logits)
-            pred = (prob >= 0.5).int()
-        
+        with timer.phase('features'):
+            metal_values = features_df[features_metal].values
+
+        with timer.phase('scaling'):
+            binary_model = self.model_service.get_model('metal_binary')
+            kernel = self.model_service.get_input_kernel('binary_metals', binary_model)
+            scaled_features = kernel.transform(metal_values)
+
+        with timer.phase('inference'):
+            # Используем устройство из экземпляра
+            input_tensor = torch.from_numpy(scaled_features).to(self.device)
+
+            with torch.no_grad():
+                logits = binary_model(input_tensor)
+                prob = torch.sigmoid(logits)
+                pred = (prob >= 0.5).int()
+
         class_mapping = {0: 'La-Zn-Zr', 1: 'Cu-Al-Fe'}
         predicted_class = class_mapping.get(pred.item(), "Unknown")
-        
+
         # 2. Классификация конкретного металла
         if predicted_class == 'Cu-Al-Fe':
             # Используем классификатор основных металлов
-            major_scaler = self.model_service.get_scaler('major_metal')
-            scaled_features = major_scaler.transform(features_df[features_metal].values)
-            input_tensor = torch.tensor(scaled_features, dtype=torch.float32).to(self.device)
-            
-            major_model = self.model_service.get_model('major_metal')
-            encoder = self.model_service.get_encoder('major_metal')
-            
-            with torch.no_grad():
-                logits = major_model(input_tensor)
-                probs = F.softmax(logits, dim=1)
-                preds = torch.argmax(probs, dim=1)
-            
-            predicted_metal = encoder.inverse_transform(preds.cpu().numpy())[0]
-            metal_probability = probs[0][preds].item()
-            
+            with timer.phase('scaling'):
+                major_model = self.model_service.get_model('major_metal')
+                kernel = self.model_service.get_input_kernel('major_metal', major_model)
+                scaled_features = kernel.transform(metal_values)
+
+            with timer.phase('inference'):
+                input_tensor = torch.from_numpy(scaled_features).to(self.device)
+
+                with torch.no_grad():
+                    logits = major_model(input_tensor)
+                    probs = F.softmax(logits, dim=1)
+                    preds = torch.argmax(probs, dim=1)
+
+            with timer.phase('decode'):
+                encoder = self.model_service.get_encoder('major_metal')
+                predicted_metal = encoder.inverse_transform(preds.cpu().numpy())[0]
+                metal_probability = probs[0][preds].item()
+
         elif predicted_class == 'La-Zn-Zr':
             # Используем классификатор второстепенных металлов
-            minor_scaler = self.model_service.get_scaler('minor_metal')
-            scaled_features = minor_scaler.transform(features_df[features_metal].values)
-            input_tensor = torch.tensor(scaled_features, dtype=torch.float32).to(self.device)
-            
-            minor_model = self.model_service.get_model('minor_metal')
-            encoder = self.model_service.get_encoder('minor_metal')
-            
-            with torch.no_grad():
-                logits = minor_model(input_tensor)
-                probs = F.softmax(logits, dim=1)
-                preds = torch.argmax(probs, dim=1)
-            
-            predicted_metal = encoder.inverse_transform(preds.cpu().numpy())[0]
-            metal_probability = probs[0][preds].item()
-            
+            with timer.phase('scaling'):
+                minor_model = self.model_service.get_model('minor_metal')
+                kernel = self.model_service.get_input_kernel('minor_metal', minor_model)
+                scaled_features = kernel.transform(metal_values)
+
+            with timer.phase('inference'):
+                input_tensor = torch.from_numpy(scaled_features).to(self.device)
+
+                with torch.no_grad():
+                    logits = minor_model(input_tensor)
+                    probs = F.softmax(logits, dim=1)
+                    preds = torch.argmax(probs, dim=1)
+
+            with timer.phase('decode'):
+                encoder = self.model_service.get_encoder('minor_metal')
+                predicted_metal = encoder.inverse_transform(preds.cpu().numpy())[0]
+                metal_probability = probs[0][preds].item()
+
         else:
             return {
                 'metal_type': None,
@@ -238,56 +672,51 @@ class PredictorService:
         Returns:
             Dict[str, Any]: Результаты предсказания (тип лиганда, вероятность)
         """
-        # Обогащаем признаки информацией о металле
-        df_ligand = features_df.copy()
-        
-        # One-Hot Encoding для металла
-        for metal in metal_columns:
-            metal_label = metal.split('_')[1]  # Extract 'Al', 'Cu', etc.
-            df_ligand[metal] = 1 if metal_label == metal_type else 0
-        
-        # Добавляем дескрипторы металла
-        df_ligand['Total molecular weight (metal)'] = mg.Composition(metal_type).weight
-        df_ligand['Average ionic radius (metal)'] = mg.Element(mg.Composition(metal_type).elements[0]).average_ionic_radius
-        df_ligand['Average electronegativity (metal)'] = mg.Composition(metal_type).average_electroneg
-        
-        # Масштабируем признаки
-        ligand_scaler = self.model_service.get_scaler('ligand')
-        categorical_columns = metal_columns
-        numeric_columns = np.setdiff1d(features_ligand, categorical_columns)
-        
-        df_ligand_numeric = df_ligand[numeric_columns].copy()
-        df_ligand_numeric = pd.DataFrame(
-            ligand_scaler.transform(df_ligand_numeric),
-            columns=numeric_columns
-        )
-        
-        # Объединяем числовые и категориальные признаки
-        for col in categorical_columns:
-            if col in df_ligand.columns:
-                df_ligand_numeric[col] = df_ligand[col]
-        
-        # Создаем DMatrix для XGBoost
-        dligand = xgb.DMatrix(df_ligand_numeric[features_ligand])
-        
-        # Получаем модель и делаем предсказание
-        ligand_model = self.model_service.get_model('ligand')
-        encoder = self.model_service.get_encoder('ligand')
-        
-        y_pred_proba = ligand_model.predict(dligand)
-        y_pred = np.argmax(y_pred_proba, axis=1)
-        y_pred_proba_max = y_pred_proba[np.arange(len(y_pred)), y_pred]
-        
-        # Декодируем предсказание
-        predicted_ligand = encoder.inverse_transform(y_pred)[0]
-        ligand_probability = y_pred_proba_max[0]
-        
-        # Формируем словарь с вероятностями для всех классов
-        probabilities = {
-            ligand: float(prob)
-            for ligand, prob in zip(encoder.classes_, y_pred_proba[0])
-        }
-        
+        timer = self.latency_tracker
+
+        with timer.phase('features'):
+            # Обогащаем признаки информацией о металле
+            df_ligand = features_df.copy()
+
+            # One-Hot Encoding для металла
+            for metal in metal_columns:
+                metal_label = metal.split('_')[1]  # Extract 'Al', 'Cu', etc.
+                df_ligand[metal] = 1 if metal_label == metal_type else 0
+
+            # Добавляем дескрипторы металла
+            df_ligand['Total molecular weight (metal)'] = mg.Composition(metal_type).weight
+            df_ligand['Average ionic radius (metal)'] = mg.Element(mg.Composition(metal_type).elements[0]).average_ionic_radius
+            df_ligand['Average electronegativity (metal)'] = mg.Composition(metal_type).average_electroneg
+
+        with timer.phase('scaling'):
+            # Масштабируем числовые признаки (One-Hot столбцы без изменений)
+            categorical_columns = metal_columns
+            ligand_model = self.model_service.get_model('ligand')
+            ligand_inputs = self._scaled_inputs('ligand', features_ligand, categorical_columns, df_ligand, ligand_model)
+
+        with timer.phase('inference'):
+            # Создаем DMatrix для XGBoost
+            dligand = xgb.DMatrix(ligand_inputs, feature_names=features_ligand)
+
+            # Делаем предсказание
+            y_pred_proba = ligand_model.predict(dligand)
+
+        with timer.phase('decode'):
+            encoder = self.model_service.get_encoder('ligand')
+
+            y_pred = np.argmax(y_pred_proba, axis=1)
+            y_pred_proba_max = y_pred_proba[np.arange(len(y_pred)), y_pred]
+
+            # Декодируем предсказание
+            predicted_ligand = encoder.inverse_transform(y_pred)[0]
+            ligand_probability = y_pred_proba_max[0]
+
+            # Формируем словарь с вероятностями для всех классов
+            probabilities = {
+                ligand: float(prob)
+                for ligand, prob in zip(encoder.classes_, y_pred_proba[0])
+            }
+
         return {
             'ligand_type': predicted_ligand,
             'confidence': ligand_probability,
@@ -311,77 +740,72 @@ class PredictorService:
         Returns:
             Dict[str, Any]: Результаты предсказания (тип растворителя, вероятность)
         """
-        # Обогащаем признаки информацией о металле и лиганде
-        df_solvent = features_df.copy()
-        
-        # One-Hot Encoding для металла
-        for metal in metal_columns:
-            metal_label = metal.split('_')[1]
-            df_solvent[metal] = 1 if metal_label == metal_type else 0
-        
-        # Добавляем дескрипторы металла
-        df_solvent['Total molecular weight (metal)'] = mg.Composition(metal_type).weight
-        df_solvent['Average ionic radius (metal)'] = mg.Element(mg.Composition(metal_type).elements[0]).average_ionic_radius
-        df_solvent['Average electronegativity (metal)'] = mg.Composition(metal_type).average_electroneg
-        
-        # Добавляем информацию о молярных массах
-        df_solvent["Молярка_соли"] = METAL_MOLAR_MASSES[metal_type]
-        df_solvent["Молярка_кислоты"] = LIGAND_MOLAR_MASSES[ligand_type]
-        
-        # One-Hot Encoding для лиганда
-        for ligand in ligand_columns:
-            ligand_label = ligand.split('_')[1]
-            df_solvent[ligand] = 1 if ligand_label == ligand_type else 0
-            
-        # Добавляем дескрипторы лиганда
-        ligand_descriptors, _ = safe_generate_features(ligand_type)
-        for column, value in ligand_descriptors.items():
-            df_solvent[column] = value
-        
-        # Масштабируем признаки
-        solvent_scaler = self.model_service.get_scaler('solvent')
-        categorical_columns = metal_columns + ligand_columns
-        numeric_columns = np.setdiff1d(features_solvent, categorical_columns)
-        
-        df_solvent_numeric = df_solvent[numeric_columns].copy()
-        df_solvent_numeric = pd.DataFrame(
-            solvent_scaler.transform(df_solvent_numeric),
-            columns=numeric_columns
-        )
-        
-        # Объединяем числовые и категориальные признаки
-        for col in categorical_columns:
-            if col in df_solvent.columns:
-                df_solvent_numeric[col] = df_solvent[col]
-        
-        # Создаем DMatrix для XGBoost
-        dsolvent = xgb.DMatrix(df_solvent_numeric[features_solvent])
-        
-        # Получаем модель и делаем предсказание
-        solvent_model = self.model_service.get_model('solvent')
-        encoder = self.model_service.get_encoder('solvent')
-        
-        y_pred_proba = solvent_model.predict(dsolvent)
-        y_pred = np.argmax(y_pred_proba, axis=1)
-        y_pred_proba_max = y_pred_proba[np.arange(len(y_pred)), y_pred]
-        
-        # Декодируем предсказание
-        predicted_solvent = encoder.inverse_transform(y_pred)[0]
-        solvent_probability = y_pred_proba_max[0]
-        
-        # Формируем словарь с вероятностями для всех классов
-        probabilities = {
-            solvent: float(prob)
-            for solvent, prob in zip(encoder.classes_, y_pred_proba[0])
-        }
-        
-        # Сортируем растворители по убыванию вероятности
-        sorted_solvents = sorted(
-            probabilities.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
-        
+        timer = self.latency_tracker
+
+        with timer.phase('features'):
+            # Обогащаем признаки информацией о металле и лиганде
+            df_solvent = features_df.copy()
+
+            # One-Hot Encoding для металла
+            for metal in metal_columns:
+                metal_label = metal.split('_')[1]
+                df_solvent[metal] = 1 if metal_label == metal_type else 0
+
+            # Добавляем дескрипторы металла
+            df_solvent['Total molecular weight (metal)'] = mg.Composition(metal_type).weight
+            df_solvent['Average ionic radius (metal)'] = mg.Element(mg.Composition(metal_type).elements[0]).average_ionic_radius
+            df_solvent['Average electronegativity (metal)'] = mg.Composition(metal_type).average_electroneg
+
+            # Добавляем информацию о молярных массах
+            df_solvent["Молярка_соли"] = METAL_MOLAR_MASSES[metal_type]
+            df_solvent["Молярка_кислоты"] = LIGAND_MOLAR_MASSES[ligand_type]
+
+            # One-Hot Encoding для лиганда
+            for ligand in ligand_columns:
+                ligand_label = ligand.split('_')[1]
+                df_solvent[ligand] = 1 if ligand_label == ligand_type else 0
+
+            # Добавляем дескрипторы лиганда
+            ligand_descriptors, _ = safe_generate_features(ligand_type)
+            for column, value in ligand_descriptors.items():
+                df_solvent[column] = value
+
+        with timer.phase('scaling'):
+            # Масштабируем числовые признаки (One-Hot столбцы без изменений)
+            categorical_columns = metal_columns + ligand_columns
+            solvent_model = self.model_service.get_model('solvent')
+            solvent_inputs = self._scaled_inputs('solvent', features_solvent, categorical_columns, df_solvent, solvent_model)
+
+        with timer.phase('inference'):
+            # Создаем DMatrix для XGBoost
+            dsolvent = xgb.DMatrix(solvent_inputs, feature_names=features_solvent)
+
+            # Делаем предсказание
+            y_pred_proba = solvent_model.predict(dsolvent)
+
+        with timer.phase('decode'):
+            encoder = self.model_service.get_encoder('solvent')
+
+            y_pred = np.argmax(y_pred_proba, axis=1)
+            y_pred_proba_max = y_pred_proba[np.arange(len(y_pred)), y_pred]
+
+            # Декодируем предсказание
+            predicted_solvent = encoder.inverse_transform(y_pred)[0]
+            solvent_probability = y_pred_proba_max[0]
+
+            # Формируем словарь с вероятностями для всех классов
+            probabilities = {
+                solvent: float(prob)
+                for solvent, prob in zip(encoder.classes_, y_pred_proba[0])
+            }
+
+            # Сортируем растворители по убыванию вероятности
+            sorted_solvents = sorted(
+                probabilities.items(),
+                key=lambda x: x[1],
+                reverse=True
+            )
+
         return {
             'solvent_type': predicted_solvent,
             'confidence': solvent_probability,
@@ -411,66 +835,60 @@ class PredictorService:
         Returns:
             float: Предсказанная масса соли
         """
-        # Обогащаем признаки информацией о металле, лиганде и растворителе
-        df_salt = features_df.copy()
-        
-        # One-Hot Encoding для металла
-        for metal in metal_columns:
-            metal_label = metal.split('_')[1]
-            df_salt[metal] = 1 if metal_label == metal_type else 0
-        
-        # Добавляем дескрипторы металла
-        df_salt['Total molecular weight (metal)'] = mg.Composition(metal_type).weight
-        df_salt['Average ionic radius (metal)'] = mg.Element(mg.Composition(metal_type).elements[0]).average_ionic_radius
-        df_salt['Average electronegativity (metal)'] = mg.Composition(metal_type).average_electroneg
-        
-        # Добавляем информацию о молярных массах
-        df_salt["Молярка_соли"] = METAL_MOLAR_MASSES[metal_type]
-        df_salt["Молярка_кислоты"] = LIGAND_MOLAR_MASSES[ligand_type]
-        
-        # One-Hot Encoding для лиганда
-        for ligand in ligand_columns:
-            ligand_label = ligand.split('_')[1]
-            df_salt[ligand] = 1 if ligand_label == ligand_type else 0
-            
-        # Добавляем дескрипторы лиганда
-        ligand_descriptors, _ = safe_generate_features(ligand_type)
-        for column, value in ligand_descriptors.items():
-            df_salt[column] = value
-        
-        # One-Hot Encoding для растворителя
-        for solvent in solvent_columns:
-            solvent_label = solvent.split('_')[1]
-            df_salt[solvent] = 1 if solvent_label == solvent_type else 0
-            
-        # Добавляем дескрипторы растворителя
-        solvent_descriptors, _ = safe_generate_solvent_features(solvent_type)
-        for column, value in solvent_descriptors.items():
-            df_salt[column] = value
-        
-        # Масштабируем признаки
-        salt_scaler = self.model_service.get_scaler('salt_mass')
-        categorical_columns = metal_columns + ligand_columns + solvent_columns
-        numeric_columns = np.setdiff1d(features_salt_mass, categorical_columns)
-        
-        df_salt_numeric = df_salt[numeric_columns].copy()
-        df_salt_numeric = pd.DataFrame(
-            salt_scaler.transform(df_salt_numeric),
-            columns=numeric_columns
-        )
-        
-        # Объединяем числовые и категориальные признаки
-        for col in categorical_columns:
-            if col in df_salt.columns:
-                df_salt_numeric[col] = df_salt[col]
-        
-        # Создаем DMatrix для XGBoost
-        dsalt = xgb.DMatrix(df_salt_numeric[features_salt_mass])
-        
-        # Получаем модель и делаем предсказание
-        salt_model = self.model_service.get_model('salt_mass')
-        
-        salt_mass = float(salt_model.predict(dsalt)[0])
+        timer = self.latency_tracker
+
+        with timer.phase('features'):
+            # Обогащаем признаки информацией о металле, лиганде и растворителе
+            df_salt = features_df.copy()
+
+            # One-Hot Encoding для металла
+            for metal in metal_columns:
+                metal_label = metal.split('_')[1]
+                df_salt[metal] = 1 if metal_label == metal_type else 0
+
+            # Добавляем дескрипторы металла
+            df_salt['Total molecular weight (metal)'] = mg.Composition(metal_type).weight
+            df_salt['Average ionic radius (metal)'] = mg.Element(mg.Composition(metal_type).elements[0]).average_ionic_radius
+            df_salt['Average electronegativity (metal)'] = mg.Composition(metal_type).average_electroneg
+
+            # Добавляем информацию о молярных массах
+            df_salt["Молярка_соли"] = METAL_MOLAR_MASSES[metal_type]
+            df_salt["Молярка_кислоты"] = LIGAND_MOLAR_MASSES[ligand_type]
+
+            # One-Hot Encoding для лиганда
+            for ligand in ligand_columns:
+                ligand_label = ligand.split('_')[1]
+                df_salt[ligand] = 1 if ligand_label == ligand_type else 0
+
+            # Добавляем дескрипторы лиганда
+            ligand_descriptors, _ = safe_generate_features(ligand_type)
+            for column, value in ligand_descriptors.items():
+                df_salt[column] = value
+
+            # One-Hot Encoding для растворителя
+            for solvent in solvent_columns:
+                solvent_label = solvent.split('_')[1]
+                df_salt[solvent] = 1 if solvent_label == solvent_type else 0
+
+            # Добавляем дескрипторы растворителя
+            solvent_descriptors, _ = safe_generate_solvent_features(solvent_type)
+            for column, value in solvent_descriptors.items():
+                df_salt[column] = value
+
+        with timer.phase('scaling'):
+            # Масштабируем числовые признаки (One-Hot столбцы без изменений)
+            categorical_columns = metal_columns + ligand_columns + solvent_columns
+            salt_model = self.model_service.get_model('salt_mass')
+            salt_inputs = self._scaled_inputs('salt_mass', features_salt_mass, categorical_columns, df_salt, salt_model)
+
+        with timer.phase('inference'):
+            # Создаем DMatrix для XGBoost
+            dsalt = xgb.DMatrix(salt_inputs, feature_names=features_salt_mass)
+
+            # Делаем предсказание
+
+            salt_mass = float(salt_model.predict(dsalt)[0])
+
         return round(salt_mass, 3)
     
     def predict_acid_mass(
@@ -494,73 +912,67 @@ class PredictorService:
         Returns:
             float: Предсказанная масса кислоты
         """
-        # Аналогично salt_mass, но добавляем информацию о массе соли
-        df_acid = features_df.copy()
-        
-        # Заполняем признаки как в предыдущих методах
-        # (металл, лиганд, растворитель)
-        
-        # One-Hot Encoding для металла
-        for metal in metal_columns:
-            metal_label = metal.split('_')[1]
-            df_acid[metal] = 1 if metal_label == metal_type else 0
-        
-        # Добавляем дескрипторы металла
-        df_acid['Total molecular weight (metal)'] = mg.Composition(metal_type).weight
-        df_acid['Average ionic radius (metal)'] = mg.Element(mg.Composition(metal_type).elements[0]).average_ionic_radius
-        df_acid['Average electronegativity (metal)'] = mg.Composition(metal_type).average_electroneg
-        
-        # Добавляем информацию о молярных массах
-        df_acid["Молярка_соли"] = METAL_MOLAR_MASSES[metal_type]
-        df_acid["Молярка_кислоты"] = LIGAND_MOLAR_MASSES[ligand_type]
-        
-        # One-Hot Encoding для лиганда
-        for ligand in ligand_columns:
-            ligand_label = ligand.split('_')[1]
-            df_acid[ligand] = 1 if ligand_label == ligand_type else 0
-            
-        # Добавляем дескрипторы лиганда
-        ligand_descriptors, _ = safe_generate_features(ligand_type)
-        for column, value in ligand_descriptors.items():
-            df_acid[column] = value
-        
-        # One-Hot Encoding для растворителя
-        for solvent in solvent_columns:
-            solvent_label = solvent.split('_')[1]
-            df_acid[solvent] = 1 if solvent_label == solvent_type else 0
-            
-        # Добавляем дескрипторы растворителя
-        solvent_descriptors, _ = safe_generate_solvent_features(solvent_type)
-        for column, value in solvent_descriptors.items():
-            df_acid[column] = value
-            
-        # Добавляем информацию о массе соли
-        df_acid["m (соли), г"] = salt_mass
-        df_acid["n_соли"] = salt_mass / METAL_MOLAR_MASSES[metal_type]
-        
-        # Масштабируем признаки
-        acid_scaler = self.model_service.get_scaler('acid_mass')
-        categorical_columns = metal_columns + ligand_columns + solvent_columns
-        numeric_columns = np.setdiff1d(features_acid_mass, categorical_columns)
-        
-        df_acid_numeric = df_acid[numeric_columns].copy()
-        df_acid_numeric = pd.DataFrame(
-            acid_scaler.transform(df_acid_numeric),
-            columns=numeric_columns
-        )
-        
-        # Объединяем числовые и категориальные признаки
-        for col in categorical_columns:
-            if col in df_acid.columns:
-                df_acid_numeric[col] = df_acid[col]
-        
-        # Создаем DMatrix для XGBoost
-        dacid = xgb.DMatrix(df_acid_numeric[features_acid_mass])
-        
-        # Получаем модель и делаем предсказание
-        acid_model = self.model_service.get_model('acid_mass')
-        
-        acid_mass = float(acid_model.predict(dacid)[0])
+        timer = self.latency_tracker
+
+        with timer.phase('features'):
+            # Аналогично salt_mass, но добавляем информацию о массе соли
+            df_acid = features_df.copy()
+
+            # Заполняем признаки как в предыдущих методах
+            # (металл, лиганд, растворитель)
+
+            # One-Hot Encoding для металла
+            for metal in metal_columns:
+                metal_label = metal.split('_')[1]
+                df_acid[metal] = 1 if metal_label == metal_type else 0
+
+            # Добавляем дескрипторы металла
+            df_acid['Total molecular weight (metal)'] = mg.Composition(metal_type).weight
+            df_acid['Average ionic radius (metal)'] = mg.Element(mg.Composition(metal_type).elements[0]).average_ionic_radius
+            df_acid['Average electronegativity (metal)'] = mg.Composition(metal_type).average_electroneg
+
+            # Добавляем информацию о молярных массах
+            df_acid["Молярка_соли"] = METAL_MOLAR_MASSES[metal_type]
+            df_acid["Молярка_кислоты"] = LIGAND_MOLAR_MASSES[ligand_type]
+
+            # One-Hot Encoding для лиганда
+            for ligand in ligand_columns:
+                ligand_label = ligand.split('_')[1]
+                df_acid[ligand] = 1 if ligand_label == ligand_type else 0
+
+            # Добавляем дескрипторы лиганда
+            ligand_descriptors, _ = safe_generate_features(ligand_type)
+            for column, value in ligand_descriptors.items():
+                df_acid[column] = value
+
+            # One-Hot Encoding для растворителя
+            for solvent in solvent_columns:
+                solvent_label = solvent.split('_')[1]
+                df_acid[solvent] = 1 if solvent_label == solvent_type else 0
+
+            # Добавляем дескрипторы растворителя
+            solvent_descriptors, _ = safe_generate_solvent_features(solvent_type)
+            for column, value in solvent_descriptors.items():
+                df_acid[column] = value
+
+            # Добавляем информацию о массе соли
+            df_acid["m (соли), г"] = salt_mass
+            df_acid["n_соли"] = salt_mass / METAL_MOLAR_MASSES[metal_type]
+
+        with timer.phase('scaling'):
+            # Масштабируем числовые признаки (One-Hot столбцы без изменений)
+            categorical_columns = metal_columns + ligand_columns + solvent_columns
+            acid_model = self.model_service.get_model('acid_mass')
+            acid_inputs = self._scaled_inputs('acid_mass', features_acid_mass, categorical_columns, df_acid, acid_model)
+
+        with timer.phase('inference'):
+            # Создаем DMatrix для XGBoost
+            dacid = xgb.DMatrix(acid_inputs, feature_names=features_acid_mass)
+
+            # Делаем предсказание
+
+            acid_mass = float(acid_model.predict(dacid)[0])
+
         return round(acid_mass, 3)
 
     def predict_synthesis_volume(
@@ -586,75 +998,69 @@ class PredictorService:
         Returns:
             float: Предсказанный объем синтеза
         """
-        # Аналогично предыдущим, но добавляем информацию о массе соли и кислоты
-        df_vsyn = features_df.copy()
-        
-        # Заполняем признаки как в предыдущих методах
-        # (металл, лиганд, растворитель, масса соли)
-        
-        # One-Hot Encoding для металла
-        for metal in metal_columns:
-            metal_label = metal.split('_')[1]
-            df_vsyn[metal] = 1 if metal_label == metal_type else 0
-        
-        # Добавляем дескрипторы металла
-        df_vsyn['Total molecular weight (metal)'] = mg.Composition(metal_type).weight
-        df_vsyn['Average ionic radius (metal)'] = mg.Element(mg.Composition(metal_type).elements[0]).average_ionic_radius
-        df_vsyn['Average electronegativity (metal)'] = mg.Composition(metal_type).average_electroneg
-        
-        # Добавляем информацию о молярных массах
-        df_vsyn["Молярка_соли"] = METAL_MOLAR_MASSES[metal_type]
-        df_vsyn["Молярка_кислоты"] = LIGAND_MOLAR_MASSES[ligand_type]
-        
-        # One-Hot Encoding для лиганда
-        for ligand in ligand_columns:
-            ligand_label = ligand.split('_')[1]
-            df_vsyn[ligand] = 1 if ligand_label == ligand_type else 0
-            
-        # Добавляем дескрипторы лиганда
-        ligand_descriptors, _ = safe_generate_features(ligand_type)
-        for column, value in ligand_descriptors.items():
-            df_vsyn[column] = value
-        
-        # One-Hot Encoding для растворителя
-        for solvent in solvent_columns:
-            solvent_label = solvent.split('_')[1]
-            df_vsyn[solvent] = 1 if solvent_label == solvent_type else 0
-            
-        # Добавляем дескрипторы растворителя
-        solvent_descriptors, _ = safe_generate_solvent_features(solvent_type)
-        for column, value in solvent_descriptors.items():
-            df_vsyn[column] = value
-            
-        # Добавляем информацию о массе соли и кислоты
-        df_vsyn["m (соли), г"] = salt_mass
-        df_vsyn["n_соли"] = salt_mass / METAL_MOLAR_MASSES[metal_type]
-        df_vsyn["m(кис-ты), г"] = acid_mass
-        df_vsyn["n_кислоты"] = acid_mass / LIGAND_MOLAR_MASSES[ligand_type]
-        
-        # Масштабируем признаки
-        vsyn_scaler = self.model_service.get_scaler('Vsyn')
-        categorical_columns = metal_columns + ligand_columns + solvent_columns
-        numeric_columns = np.setdiff1d(features_Vsyn, categorical_columns)
-        
-        df_vsyn_numeric = df_vsyn[numeric_columns].copy()
-        df_vsyn_numeric = pd.DataFrame(
-            vsyn_scaler.transform(df_vsyn_numeric),
-            columns=numeric_columns
-        )
-        
-        # Объединяем числовые и категориальные признаки
-        for col in categorical_columns:
-            if col in df_vsyn.columns:
-                df_vsyn_numeric[col] = df_vsyn[col]
-        
-        # Создаем DMatrix для XGBoost
-        dvsyn = xgb.DMatrix(df_vsyn_numeric[features_Vsyn])
-        
-        # Получаем модель и делаем предсказание
-        vsyn_model = self.model_service.get_model('Vsyn')
-        
-        vsyn = float(vsyn_model.predict(dvsyn)[0])
+        timer = self.latency_tracker
+
+        with timer.phase('features'):
+            # Аналогично предыдущим, но добавляем информацию о массе соли и кислоты
+            df_vsyn = features_df.copy()
+
+            # Заполняем признаки как в предыдущих методах
+            # (металл, лиганд, растворитель, масса соли)
+
+            # One-Hot Encoding для металла
+            for metal in metal_columns:
+                metal_label = metal.split('_')[1]
+                df_vsyn[metal] = 1 if metal_label == metal_type else 0
+
+            # Добавляем дескрипторы металла
+            df_vsyn['Total molecular weight (metal)'] = mg.Composition(metal_type).weight
+            df_vsyn['Average ionic radius (metal)'] = mg.Element(mg.Composition(metal_type).elements[0]).average_ionic_radius
+            df_vsyn['Average electronegativity (metal)'] = mg.Composition(metal_type).average_electroneg
+
+            # Добавляем информацию о молярных массах
+            df_vsyn["Молярка_соли"] = METAL_MOLAR_MASSES[metal_type]
+            df_vsyn["Молярка_кислоты"] = LIGAND_MOLAR_MASSES[ligand_type]
+
+            # One-Hot Encoding для лиганда
+            for ligand in ligand_columns:
+                ligand_label = ligand.split('_')[1]
+                df_vsyn[ligand] = 1 if ligand_label == ligand_type else 0
+
+            # Добавляем дескрипторы лиганда
+            ligand_descriptors, _ = safe_generate_features(ligand_type)
+            for column, value in ligand_descriptors.items():
+                df_vsyn[column] = value
+
+            # One-Hot Encoding для растворителя
+            for solvent in solvent_columns:
+                solvent_label = solvent.split('_')[1]
+                df_vsyn[solvent] = 1 if solvent_label == solvent_type else 0
+
+            # Добавляем дескрипторы растворителя
+            solvent_descriptors, _ = safe_generate_solvent_features(solvent_type)
+            for column, value in solvent_descriptors.items():
+                df_vsyn[column] = value
+
+            # Добавляем информацию о массе соли и кислоты
+            df_vsyn["m (соли), г"] = salt_mass
+            df_vsyn["n_соли"] = salt_mass / METAL_MOLAR_MASSES[metal_type]
+            df_vsyn["m(кис-ты), г"] = acid_mass
+            df_vsyn["n_кислоты"] = acid_mass / LIGAND_MOLAR_MASSES[ligand_type]
+
+        with timer.phase('scaling'):
+            # Масштабируем числовые признаки (One-Hot столбцы без изменений)
+            categorical_columns = metal_columns + ligand_columns + solvent_columns
+            vsyn_model = self.model_service.get_model('Vsyn')
+            vsyn_inputs = self._scaled_inputs('Vsyn', features_Vsyn, categorical_columns, df_vsyn, vsyn_model)
+
+        with timer.phase('inference'):
+            # Создаем DMatrix для XGBoost
+            dvsyn = xgb.DMatrix(vsyn_inputs, feature_names=features_Vsyn)
+
+            # Делаем предсказание
+
+            vsyn = float(vsyn_model.predict(dvsyn)[0])
+
         return round(vsyn, 3)
     
     def predict_temperature(
@@ -688,149 +1094,797 @@ class PredictorService:
         Returns:
             Dict[str, Any]: Результаты предсказания (температура, вероятность)
         """
-        # Подготавливаем DataFrame с признаками
-        df_temp = features_df.copy()
-        
-        # Заполняем признаки как в предыдущих методах
-        # (металл, лиганд, растворитель, масса соли, масса кислоты)
-        
-        # One-Hot Encoding для металла
-        for metal in metal_columns:
-            metal_label = metal.split('_')[1]
-            df_temp[metal] = 1 if metal_label == metal_type else 0
-        
-        # Добавляем дескрипторы металла
-        df_temp['Total molecular weight (metal)'] = mg.Composition(metal_type).weight
-        df_temp['Average ionic radius (metal)'] = mg.Element(mg.Composition(metal_type).elements[0]).average_ionic_radius
-        df_temp['Average electronegativity (metal)'] = mg.Composition(metal_type).average_electroneg
-        
-        # Добавляем информацию о молярных массах
-        df_temp["Молярка_соли"] = METAL_MOLAR_MASSES[metal_type]
-        df_temp["Молярка_кислоты"] = LIGAND_MOLAR_MASSES[ligand_type]
+        timer = self.latency_tracker
+
+        with timer.phase('features'):
+            # Подготавливаем DataFrame с признаками
+            df_temp = features_df.copy()
+
+            # Заполняем признаки как в предыдущих методах
+            # (металл, лиганд, растворитель, масса соли, масса кислоты)
+
+            # One-Hot Encoding для металла
+            for metal in metal_columns:
+                metal_label = metal.split('_')[1]
+                df_temp[metal] = 1 if metal_label == metal_type else 0
+
+            # Добавляем дескрипторы металла
+            df_temp['Total molecular weight (metal)'] = mg.Composition(metal_type).weight
+            df_temp['Average ionic radius (metal)'] = mg.Element(mg.Composition(metal_type).elements[0]).average_ionic_radius
+            df_temp['Average electronegativity (metal)'] = mg.Composition(metal_type).average_electroneg
+
+            # Добавляем информацию о молярных массах
+            df_temp["Молярка_соли"] = METAL_MOLAR_MASSES[metal_type]
+            df_temp["Молярка_кислоты"] = LIGAND_MOLAR_MASSES[ligand_type]
+
+            # One-Hot Encoding для лиганда
+            for ligand in ligand_columns:
+                ligand_label = ligand.split('_')[1]
+                df_temp[ligand] = 1 if ligand_label == ligand_type else 0
+
+            # Добавляем дескрипторы лиганда
+            ligand_descriptors, _ = safe_generate_features(ligand_type)
+            for column, value in ligand_descriptors.items():
+                df_temp[column] = value
+
+            # One-Hot Encoding для растворителя
+            for solvent in solvent_columns:
+                solvent_label = solvent.split('_')[1]
+                df_temp[solvent] = 1 if solvent_label == solvent_type else 0
+
+            # Добавляем дескрипторы растворителя
+            solvent_descriptors, _ = safe_generate_solvent_features(solvent_type)
+            for column, value in solvent_descriptors.items():
+                df_temp[column] = value
+
+            # Добавляем информацию о массе соли и кислоты
+            df_temp["m (соли), г"] = salt_mass
+            df_temp["n_соли"] = salt_mass / METAL_MOLAR_MASSES[metal_type]
+            df_temp["m(кис-ты), г"] = acid_mass
+            df_temp["n_кислоты"] = acid_mass / LIGAND_MOLAR_MASSES[ligand_type]
+
+            # Добавляем информацию об объеме синтеза, если указано
+            if vsyn is not None:
+                df_temp["Vсин. (р-ля), мл"] = vsyn
+
+            # Добавляем информацию о температуре синтеза, если указано
+            if tsyn is not None:
+                df_temp["Т.син., °С"] = tsyn
+
+            # Добавляем информацию о температуре сушки, если указано
+            if tdry is not None:
+                df_temp["Т суш., °С"] = tdry
+
+            # Выбираем признаки и скейлер в зависимости от типа температуры
+            if temp_type == 'Tsyn':
+                features = features_Tsyn
+                scaler_name = 'Tsyn'
+                model_name = 'Tsyn'
+            elif temp_type == 'Tdry':
+                features = features_Tdry
+                scaler_name = 'Tdry'
+                model_name = 'Tdry'
+            elif temp_type == 'Treg':
+                features = features_Treg
+                scaler_name = 'Treg'
+                model_name = 'Treg'
+            else:
+                raise ValueError(f"Неизвестный тип температуры: {temp_type}")
+
+        with timer.phase('scaling'):
+            categorical_columns = metal_columns + ligand_columns + solvent_columns
+
+            # Проверяем, что все нужные признаки есть в df_temp
+            for feature in features:
+                if feature not in df_temp.columns and feature not in categorical_columns:
+                    logger.warning(f"Feature '{feature}' not found in DataFrame")
+
+            # Масштабируем числовые признаки (One-Hot столбцы без изменений)
+            temp_model = self.model_service.get_model(model_name)
+            temp_values = self._scaled_inputs(scaler_name, features, categorical_columns, df_temp, temp_model)
+
+        with timer.phase('inference'):
+            # Преобразуем в тензор для PyTorch
+            input_tensor = torch.from_numpy(temp_values).to(self.device)
+
+            # Делаем предсказание
+            with torch.no_grad():
+                logits = temp_model(input_tensor)
+                probs = F.softmax(logits, dim=1)
+                preds = torch.argmax(probs, dim=1)
+
+        with timer.phase('decode'):
+            encoder = self.model_service.get_encoder(scaler_name)
+
+            # Декодируем предсказание
+            predicted_temp = encoder.inverse_transform(preds.cpu().numpy())[0]
+            temp_probability = probs[0][preds].item()
+
+            # Формируем словарь с вероятностями для всех классов
+            probabilities = {
+                str(temp): float(prob)
+                for temp, prob in zip(encoder.classes_, probs[0].cpu().numpy())
+            }
+
+            # Сортируем температуры по убыванию вероятности
+            sorted_temps = sorted(
+                probabilities.items(),
+                key=lambda x: x[1],
+                reverse=True
+            )
+
+        return {
+            'temperature': predicted_temp,
+            'confidence': temp_probability,
+            'all_probabilities': probabilities,
+            'top_3_temperatures': [
+                {'value': temp, 'probability': prob}
+                for temp, prob in sorted_temps[:3]
+            ]
+        }
+    
+    def _metal_distribution(self, features_df: pd.DataFrame) -> Dict[str, float]:
+        """
+        Рассчитывает вероятности всех металлов.
+
+        Вероятность металла — произведение вероятности его группы (бинарный
+        классификатор Cu-Al-Fe / La-Zn-Zr) и вероятности внутри группы.
         
-        # One-Hot Encoding для лиганда
-        for ligand in ligand_columns:
-            ligand_label = ligand.split('_')[1]
-            df_temp[ligand] = 1 if ligand_label == ligand_type else 0
-            
-        # Добавляем дескрипторы лиганда
-        ligand_descriptors, _ = safe_generate_features(ligand_type)
-        for column, value in ligand_descriptors.items():
-            df_temp[column] = value
-        
-        # One-Hot Encoding для растворителя
-        for solvent in solvent_columns:
-            solvent_label = solvent.split('_')[1]
-            df_temp[solvent] = 1 if solvent_label == solvent_type else 0
+        Args:
+            features_df: DataFrame с признаками (одна строка)
             
-        # Добавляем дескрипторы растворителя
-        solvent_descriptors, _ = safe_generate_solvent_features(solvent_type)
-        for column, value in solvent_descriptors.items():
-            df_temp[column] = value
+        Returns:
+            Dict[str, float]: {металл: вероятность}
+        """
+        timer = self.latency_tracker
+
+        with timer.phase('features'):
+            metal_values = features_df[features_metal].values
+
+        with timer.phase('scaling'):
+            binary_model = self.model_service.get_model('metal_binary')
+            kernel = self.model_service.get_input_kernel('binary_metals', binary_model)
+            scaled_features = kernel.transform(metal_values)
+
+        with timer.phase('inference'):
+            input_tensor = torch.from_numpy(scaled_features).to(self.device)
+            with torch.no_grad():
+                major_probability = torch.sigmoid(binary_model(input_tensor)).item()
+
+        distribution = {}
+        for group, group_probability in (('major_metal', major_probability), ('minor_metal', 1.0 - major_probability)):
+            with timer.phase('scaling'):
+                group_model = self.model_service.get_model(group)
+                scaled_features = self.model_service.get_input_kernel(group, group_model).transform(metal_values)
+
+            with timer.phase('inference'):
+                input_tensor = torch.from_numpy(scaled_features).to(self.device)
+                with torch.no_grad():
+                    probs = F.softmax(group_model(input_tensor), dim=1)[0].cpu().numpy()
+
+            encoder = self.model_service.get_encoder(group)
+            for metal, prob in zip(encoder.classes_, probs):
+                distribution[str(metal)] = group_probability * float(prob)
+
+        return distribution
+
+    def _branch_frame(self, features_df: pd.DataFrame, branches: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Формирует таблицу признаков с одной строкой на ветвь поиска.
+
+        Признаки заполняются так же, как в методах predict_*, по уже выбранным
+        в ветви значениям (металл, лиганд, растворитель, массы, объем,
+        температуры). Дескрипторы металлов, лигандов и растворителей берутся
+        из кэша и не пересчитываются для каждой ветви.
+        
+        Args:
+            features_df: DataFrame с признаками целевых профилей
+            branches: Ветви поиска (ключ 'target' — строка features_df, по умолчанию 0)
             
-        # Добавляем информацию о массе соли и кислоты
-        df_temp["m (соли), г"] = salt_mass
-        df_temp["n_соли"] = salt_mass / METAL_MOLAR_MASSES[metal_type]
-        df_temp["m(кис-ты), г"] = acid_mass
-        df_temp["n_кислоты"] = acid_mass / LIGAND_MOLAR_MASSES[ligand_type]
-        
-        # Добавляем информацию об объеме синтеза, если указано
-        if vsyn is not None:
-            df_temp["Vсин. (р-ля), мл"] = vsyn
+        Returns:
+            pd.DataFrame: Признаки ветвей
+        """
+        base_rows = features_df.to_dict('records')
+        rows = []
+        for branch in branches:
+            row = dict(base_rows[branch.get('target', 0)])
+            metal_type = branch['metal']
+
+            # One-Hot Encoding и дескрипторы металла
+            for metal in metal_columns:
+                row[metal] = 1 if metal.split('_')[1] == metal_type else 0
+            row.update(_metal_descriptors(metal_type))
+
+            ligand_type = branch.get('ligand')
+            if ligand_type is not None:
+                row["Молярка_соли"] = METAL_MOLAR_MASSES[metal_type]
+                row["Молярка_кислоты"] = LIGAND_MOLAR_MASSES[ligand_type]
+                for ligand in ligand_columns:
+                    row[ligand] = 1 if ligand.split('_')[1] == ligand_type else 0
+                row.update(_ligand_descriptors(ligand_type))
+
+            solvent_type = branch.get('solvent')
+            if solvent_type is not None:
+                for solvent in solvent_columns:
+                    row[solvent] = 1 if solvent.split('_')[1] == solvent_type else 0
+                row.update(_solvent_descriptors(solvent_type))
+
+            # Уже рассчитанные массы, объем и температуры
+            if 'salt_mass' in branch:
+                row["m (соли), г"] = branch['salt_mass']
+                row["n_соли"] = branch['salt_mass'] / METAL_MOLAR_MASSES[metal_type]
+            if 'acid_mass' in branch:
+                row["m(кис-ты), г"] = branch['acid_mass']
+                row["n_кислоты"] = branch['acid_mass'] / LIGAND_MOLAR_MASSES[ligand_type]
+            if 'Vsyn' in branch:
+                row["Vсин. (р-ля), мл"] = branch['Vsyn']
+            if 'Tsyn' in branch:
+                row["Т.син., °С"] = branch['Tsyn']
+            if 'Tdry' in branch:
+                row["Т суш., °С"] = branch['Tdry']
+
+            rows.append(row)
+
+        return pd.DataFrame(rows)
+
+    @staticmethod
+    def _expand(
+        branches: List[Dict[str, Any]],
+        key: str,
+        classes: np.ndarray,
+        probabilities: np.ndarray,
+        top_k: int,
+        beam_width: Optional[int]
+    ) -> List[Dict[str, Any]]:
+        """
+        Раскрывает каждую ветвь top_k наиболее вероятными классами стадии.
+        
+        Args:
+            branches: Ветви поиска
+            key: Ключ выбранного класса в ветви ('ligand', 'solvent')
+            classes: Классы стадии
+            probabilities: Вероятности классов (строка на ветвь)
+            top_k: Число раскрываемых классов
+            beam_width: Число сохраняемых ветвей (None — все)
             
-        # Добавляем информацию о температуре синтеза, если указано
-        if tsyn is not None:
-            df_temp["Т.син., °С"] = tsyn
+        Returns:
+            List[Dict[str, Any]]: Новые ветви по убыванию совместной оценки
+        """
+        expanded = []
+        for branch, probs in zip(branches, probabilities):
+            for index in np.argsort(-probs, kind='stable')[:top_k]:
+                child = dict(branch)
+                child[key] = str(classes[index])
+                child['scores'] = {**branch['scores'], key: float(probs[index])}
+                child['probabilities'] = {**branch['probabilities'], key: probs}
+                child['log_score'] = branch['log_score'] + math.log(max(float(probs[index]), 1e-12))
+                expanded.append(child)
+
+        expanded.sort(key=lambda item: item['log_score'], reverse=True)
+        return expanded[:beam_width] if beam_width else expanded
+
+    def _temperature_results(self, temp_type: str, probs: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Декодирует вероятности температурного классификатора по строкам.
+        
+        Args:
+            temp_type: Тип температуры ('Tsyn', 'Tdry', 'Treg')
+            probs: Вероятности классов (строка на ветвь)
             
-        # Добавляем информацию о температуре сушки, если указано
-        if tdry is not None:
-            df_temp["Т суш., °С"] = tdry
+        Returns:
+            List[Dict[str, Any]]: Результаты в формате predict_temperature
+        """
+        encoder = self.model_service.get_encoder(temp_type)
+        predicted = encoder.inverse_transform(np.argmax(probs, axis=1))
+
+        results = []
+        for temperature, row in zip(predicted, probs):
+            probabilities = {str(temp): float(prob) for temp, prob in zip(encoder.classes_, row)}
+            sorted_temps = sorted(probabilities.items(), key=lambda x: x[1], reverse=True)
+            results.append({
+                'temperature': temperature,
+                'confidence': float(row.max()),
+                'all_probabilities': probabilities,
+                'top_3_temperatures': [
+                    {'value': temp, 'probability': prob}
+                    for temp, prob in sorted_temps[:3]
+                ]
+            })
+        return results
+
+    def _search_branches(
+        self,
+        features_df: pd.DataFrame,
+        top_k: int,
+        beam_width: Optional[int]
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+        """
+        Раскрывает ветви категориальных стадий для одного целевого профиля и
+        рассчитывает для всех выживших ветвей последующие стадии.
+        
+        Args:
+            features_df: DataFrame с признаками целевого профиля (одна строка)
+            top_k: Число классов, раскрываемых на каждой категориальной стадии
+            beam_width: Число ветвей, сохраняемых после каждой стадии (None — все)
             
-        # Выбираем признаки и скейлер в зависимости от типа температуры
-        if temp_type == 'Tsyn':
-            features = features_Tsyn
-            scaler_name = 'Tsyn'
-            model_name = 'Tsyn'
-        elif temp_type == 'Tdry':
-            features = features_Tdry
-            scaler_name = 'Tdry'
-            model_name = 'Tdry'
-        elif temp_type == 'Treg':
-            features = features_Treg
-            scaler_name = 'Treg'
-            model_name = 'Treg'
-        else:
-            raise ValueError(f"Неизвестный тип температуры: {temp_type}")
+        Returns:
+            Tuple[List[Dict[str, Any]], Dict[str, float]]: Ветви по убыванию
+                совместной оценки и вероятности металлов
+        """
+        if top_k < 1:
+            raise ValueError(f"top_k должен быть не меньше 1: {top_k}")
+
+        # Металлы: распределение по всем классам обеих групп
+        with self.latency_tracker.stage('branches_metal'):
+            metal_probabilities = self._metal_distribution(features_df)
+            metals = list(metal_probabilities)
+            branches = self._expand(
+                [{'scores': {}, 'probabilities': {}, 'log_score': 0.0}],
+                'metal', np.array(metals), np.array([[metal_probabilities[m] for m in metals]]),
+                top_k, beam_width
+            )
+
+        branches = self._run_branch_stages(
+            features_df, branches, _BranchInputs(self.model_service, features_df), top_k, beam_width
+        )
+        return branches, metal_probabilities
+
+    def _run_branch_stages(
+        self,
+        features_df: pd.DataFrame,
+        branches: List[Dict[str, Any]],
+        inputs: Union['_BranchInputs', '_FrameInputs'],
+        top_k: int,
+        beam_width: Optional[int],
+        mc_samples: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Рассчитывает стадии после выбора металла — по одному пакетному вызову
+        модели на стадию для всех ветвей.
+        
+        Args:
+            features_df: DataFrame с признаками целевых профилей
+            branches: Ветви с выбранным металлом
+            inputs: Построитель входов моделей (_BranchInputs или _FrameInputs)
+            top_k: Число классов, раскрываемых на стадиях лиганда и растворителя
+            beam_width: Число ветвей, сохраняемых после каждой стадии (None — все)
+            mc_samples: Число проходов Monte Carlo dropout для температурных
+                классификаторов (0 — без оценки неопределенности)
             
-        # Масштабируем признаки
-        temp_scaler = self.model_service.get_scaler(scaler_name)
+        Returns:
+            List[Dict[str, Any]]: Ветви с результатами всех стадий
+        """
+        timer = self.latency_tracker
+
+        # Лиганды и растворители: один вызов XGBoost для всех ветвей стадии
+        for stage, features, categorical_columns in (
+            ('ligand', features_ligand, metal_columns),
+            ('solvent', features_solvent, metal_columns + ligand_columns)
+        ):
+            with timer.stage(f'branches_{stage}'):
+                with timer.phase('features'):
+                    df = self._branch_frame(features_df, branches)
+                with timer.phase('scaling'):
+                    model = self.model_service.get_model(stage)
+                    X = inputs.matrix(stage, features, categorical_columns, df, model)
+                with timer.phase('inference'):
+                    probs = model.predict(xgb.DMatrix(X, feature_names=features))
+                branches = self._expand(
+                    branches, stage, self.model_service.get_encoder(stage).classes_,
+                    probs, top_k, beam_width
+                )
+
         categorical_columns = metal_columns + ligand_columns + solvent_columns
+
+        # Регрессоры масс и объема
+        for stage, features in (
+            ('salt_mass', features_salt_mass),
+            ('acid_mass', features_acid_mass),
+            ('Vsyn', features_Vsyn)
+        ):
+            with timer.stage(f'branches_{stage}'):
+                with timer.phase('features'):
+                    df = self._branch_frame(features_df, branches)
+                with timer.phase('scaling'):
+                    model = self.model_service.get_model(stage)
+                    X = inputs.matrix(stage, features, categorical_columns, df, model)
+                with timer.phase('inference'):
+                    values = model.predict(xgb.DMatrix(X, feature_names=features))
+                for branch, value in zip(branches, values):
+                    branch[stage] = round(float(value), 3)
+
+        # Температурные классификаторы
+        for stage, features in (('Tsyn', features_Tsyn), ('Tdry', features_Tdry), ('Treg', features_Treg)):
+            with timer.stage(f'branches_{stage}'):
+                with timer.phase('features'):
+                    df = self._branch_frame(features_df, branches)
+                with timer.phase('inference'):
+                    model = self.model_service.get_model(stage)
+                    with torch.no_grad():
+                        embedded = inputs.embedding(stage, features, categorical_columns, df, model, self.device)
+                        probs = F.softmax(model.forward_embedded(embedded), dim=1).cpu().numpy()
+                with timer.phase('decode'):
+                    results = self._temperature_results(stage, probs)
+                for branch, result in zip(branches, results):
+                    branch[stage] = result['temperature']
+                    branch[f'{stage}_result'] = result
+
+                if mc_samples:
+                    with timer.phase('inference'):
+                        samples = self._mc_dropout_samples(stage, embedded, mc_samples, embedded=True)
+                    with timer.phase('decode'):
+                        summaries = summarize_samples(samples, self.model_service.get_encoder(stage).classes_)
+                    for branch, summary in zip(branches, summaries):
+                        branch[f'{stage}_uncertainty'] = summary
+
+        return branches
+
+    def _predict_metal_batch(self, features_df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Предсказывает металл для каждой строки так же, как predict_metal:
+        группа по бинарному классификатору, затем наиболее вероятный металл группы.
         
-        # Проверяем, что все нужные признаки есть в df_temp
-        for feature in features:
-            if feature not in df_temp.columns and feature not in categorical_columns:
-                logger.warning(f"Feature '{feature}' not found in DataFrame")
-        
-        numeric_columns = np.setdiff1d(features, categorical_columns)
-        
-        df_temp_numeric = df_temp[numeric_columns].copy()
-        df_temp_numeric = pd.DataFrame(
-            temp_scaler.transform(df_temp_numeric),
-            columns=numeric_columns
-        )
+        Args:
+            features_df: DataFrame с признаками (строка на точку)
+            
+        Returns:
+            List[Dict[str, Any]]: Ветви с выбранным металлом (ключ 'target' — номер строки)
+        """
+        timer = self.latency_tracker
+
+        with timer.phase('features'):
+            metal_values = features_df[features_metal].values
+
+        with timer.phase('scaling'):
+            binary_model = self.model_service.get_model('metal_binary')
+            kernel = self.model_service.get_input_kernel('binary_metals', binary_model)
+            scaled_features = kernel.transform(metal_values)
+
+        with timer.phase('inference'):
+            input_tensor = torch.from_numpy(scaled_features).to(self.device)
+            with torch.no_grad():
+                major_mask = (torch.sigmoid(binary_model(input_tensor)).reshape(-1) >= 0.5).cpu().numpy()
+
+        branches: List[Optional[Dict[str, Any]]] = [None] * len(features_df)
+        for group, mask in (('major_metal', major_mask), ('minor_metal', ~major_mask)):
+            rows = np.flatnonzero(mask)
+            if len(rows) == 0:
+                continue
+
+            with timer.phase('scaling'):
+                group_model = self.model_service.get_model(group)
+                scaled_features = self.model_service.get_input_kernel(group, group_model).transform(metal_values[rows])
+
+            with timer.phase('inference'):
+                input_tensor = torch.from_numpy(scaled_features).to(self.device)
+                with torch.no_grad():
+                    probs = F.softmax(group_model(input_tensor), dim=1).cpu().numpy()
+
+            with timer.phase('decode'):
+                preds = np.argmax(probs, axis=1)
+                metals = self.model_service.get_encoder(group).inverse_transform(preds)
+                for row, metal, prob, index in zip(rows, metals, probs, preds):
+                    branches[row] = {
+                        'target': int(row),
+                        'metal': str(metal),
+                        'scores': {'metal': float(prob[index])},
+                        'probabilities': {},
+                        'log_score': math.log(max(float(prob[index]), 1e-12))
+                    }
+
+        return branches
+
+    def _mc_dropout_samples(
+        self,
+        model_name: str,
+        inputs: torch.Tensor,
+        mc_samples: int,
+        embedded: bool = False
+    ) -> np.ndarray:
+        """
+        Выполняет mc_samples стохастических проходов классификатора одним вызовом:
+        входы повторяются по оси пакета, и каждая копия получает свою маску dropout.
         
-        # Объединяем числовые и категориальные признаки
-        for col in categorical_columns:
-            if col in df_temp.columns and col in features:
-                df_temp_numeric[col] = df_temp[col]
+        Args:
+            model_name: Имя torch-модели
+            inputs: Входы модели (n, d) — признаки или результат model.embedding
+            mc_samples: Число проходов T
+            embedded: Входы уже спроецированы слоем embedding
+            
+        Returns:
+            np.ndarray: Вероятности (T, n, C); для бинарного классификатора C = 1
+        """
+        model = self.model_service.get_mc_dropout_model(model_name)
+        tiled = inputs.repeat(mc_samples, 1)
+        with torch.no_grad():
+            logits = model.forward_embedded(tiled) if embedded else model(tiled)
+            if model_name == 'metal_binary':
+                probs = torch.sigmoid(logits.reshape(-1, 1))
+            else:
+                probs = F.softmax(logits, dim=1)
+        return probs.reshape(mc_samples, len(inputs), -1).cpu().numpy()
+
+    def _metal_uncertainty(self, features_df: pd.DataFrame, mc_samples: int) -> List[Dict[str, Any]]:
+        """
+        Оценивает неопределенность выбора металла методом Monte Carlo dropout.
+
+        В каждом проходе вероятность металла — произведение вероятности группы
+        и вероятности металла внутри группы, как в _metal_distribution.
         
-        # Преобразуем в тензор для PyTorch
-        input_tensor = torch.tensor(df_temp_numeric[features].values, dtype=torch.float32).to(self.device)
+        Args:
+            features_df: DataFrame с признаками (строка на точку)
+            mc_samples: Число проходов
+            
+        Returns:
+            List[Dict[str, Any]]: Оценки summarize_samples для каждой точки
+        """
+        timer = self.latency_tracker
+
+        with timer.phase('features'):
+            metal_values = features_df[features_metal].values
+
+        with timer.phase('scaling'):
+            binary_model = self.model_service.get_mc_dropout_model('metal_binary')
+            kernel = self.model_service.get_input_kernel('binary_metals', binary_model)
+            scaled_features = kernel.transform(metal_values)
+
+        with timer.phase('inference'):
+            input_tensor = torch.from_numpy(scaled_features).to(self.device)
+            major_probability = self._mc_dropout_samples('metal_binary', input_tensor, mc_samples)
+
+        parts, classes = [], []
+        for group, group_probability in (('major_metal', major_probability), ('minor_metal', 1.0 - major_probability)):
+            with timer.phase('scaling'):
+                group_model = self.model_service.get_mc_dropout_model(group)
+                scaled_features = self.model_service.get_input_kernel(group, group_model).transform(metal_values)
+
+            with timer.phase('inference'):
+                input_tensor = torch.from_numpy(scaled_features).to(self.device)
+                parts.append(group_probability * self._mc_dropout_samples(group, input_tensor, mc_samples))
+            classes.extend(str(metal) for metal in self.model_service.get_encoder(group).classes_)
+
+        with timer.phase('decode'):
+            return summarize_samples(np.concatenate(parts, axis=2), classes)
+
+    def run_batch_prediction(
+        self,
+        inputs: Union[pd.DataFrame, List[Dict[str, float]]],
+        mc_samples: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Выполняет полное предсказание для набора входных точек.
+
+        Результат для каждой точки совпадает с run_full_prediction (на каждой
+        категориальной стадии выбирается наиболее вероятный класс), но каждая
+        стадия конвейера выполняется одним пакетным вызовом модели для всех точек.
+
+        При mc_samples > 0 для классификаторов металла и температур
+        дополнительно оценивается неопределенность методом Monte Carlo
+        dropout: T проходов выполняются одним вызовом модели на стадию.
         
-        # Получаем модель и энкодер
-        temp_model = self.model_service.get_model(model_name)
-        encoder = self.model_service.get_encoder(scaler_name)
+        Args:
+            inputs: Входные точки — DataFrame или список словарей с ключами
+                SBAT_m2_gr, a0_mmoll_gr, E_kDg_moll, Ws_cm3_gr, Sme_m2_gr
+            mc_samples: Число проходов Monte Carlo dropout (0 — без оценки)
+            
+        Returns:
+            List[Dict[str, Any]]: Результаты в формате run_full_prediction (в порядке
+                входных точек) с дополнительным ключом joint_probability и, при
+                mc_samples > 0, ключом uncertainty ({'metal', 'tsyn', 'tdry', 'treg'})
+        """
+        if not 0 <= mc_samples <= UNCERTAINTY_CONFIG['max_mc_samples']:
+            raise ValueError(
+                f"mc_samples должен быть от 0 до {UNCERTAINTY_CONFIG['max_mc_samples']}: {mc_samples}"
+            )
+
+        inputs_df = inputs if isinstance(inputs, pd.DataFrame) else pd.DataFrame(list(inputs))
+        if len(inputs_df) == 0:
+            return []
+
+        timer = self.latency_tracker
+        with track_prediction_request(), timer.stage('batch_pipeline'):
+            with timer.stage('derived_features'):
+                features_df = self.calculate_derived_features_batch(inputs_df.reset_index(drop=True))
+
+            with timer.stage('branches_metal'):
+                branches = self._predict_metal_batch(features_df)
+                if mc_samples:
+                    metal_uncertainty = self._metal_uncertainty(features_df, mc_samples)
+
+            branches = self._run_branch_stages(
+                features_df, branches, _FrameInputs(self.model_service), top_k=1, beam_width=None,
+                mc_samples=mc_samples
+            )
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(features_df)
+        for branch in branches:
+            target = branch['target']
+            results[target] = self._branch_recipe(branch, self._derived_features_summary(features_df, target))
+            if mc_samples:
+                results[target]['uncertainty'] = {
+                    'metal': metal_uncertainty[target],
+                    'tsyn': branch['Tsyn_uncertainty'],
+                    'tdry': branch['Tdry_uncertainty'],
+                    'treg': branch['Treg_uncertainty']
+                }
+        return results
+
+    def run_beam_search(
+        self,
+        SBAT_m2_gr: float,
+        a0_mmoll_gr: float,
+        E_kDg_moll: float,
+        Ws_cm3_gr: float,
+        Sme_m2_gr: float,
+        top_k: int = 3,
+        beam_width: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Находит несколько лучших полных рецептов синтеза поиском по лучу.
+
+        В отличие от run_full_prediction, который на каждой категориальной
+        стадии берет наиболее вероятный класс, здесь каждая ветвь раскрывается
+        top_k классами: металлы -> лиганды для каждого металла -> растворители
+        для каждой пары. Совместная оценка ветви — произведение вероятностей
+        выбранных классов. Все выжившие ветви последующих стадий (массы, объем,
+        температуры) рассчитываются одним пакетным вызовом модели на стадию.
         
-        # Делаем предсказание
-        with torch.no_grad():
-            logits = temp_model(input_tensor)
-            probs = F.softmax(logits, dim=1)
-            preds = torch.argmax(probs, dim=1)
-        
-        # Декодируем предсказание
-        predicted_temp = encoder.inverse_transform(preds.cpu().numpy())[0]
-        temp_probability = probs[0][preds].item()
-        
-        # Формируем словарь с вероятностями для всех классов
-        probabilities = {
-            str(temp): float(prob)
-            for temp, prob in zip(encoder.classes_, probs[0].cpu().numpy())
+        Args:
+            SBAT_m2_gr: Удельная площадь поверхности (м²/г)
+            a0_mmoll_gr: Предельная адсорбция (ммоль/г)
+            E_kDg_moll: Энергия адсорбции азота (кДж/моль)
+            Ws_cm3_gr: Общий объем пор (см³/г)
+            Sme_m2_gr: Площадь поверхности мезопор (м²/г)
+            top_k: Число классов, раскрываемых на каждой категориальной стадии
+            beam_width: Число ветвей, сохраняемых после каждой стадии (None — все)
+            
+        Returns:
+            Dict[str, Any]: recipes — рецепты по убыванию совместной вероятности
+                (ключи как у run_full_prediction плюс rank и joint_probability;
+                confidence металла — его полная вероятность с учетом группы),
+                metal_probabilities, derived_features, n_branches
+        """
+        with self.latency_tracker.stage('beam_search'):
+            features_df = self.calculate_derived_features(
+                SBAT_m2_gr, a0_mmoll_gr, E_kDg_moll, Ws_cm3_gr, Sme_m2_gr
+            )
+            derived_features = self._derived_features_summary(features_df)
+            branches, metal_probabilities = self._search_branches(features_df, top_k, beam_width)
+            recipes = [
+                {'rank': rank, **self._branch_recipe(branch, derived_features)}
+                for rank, branch in enumerate(branches, start=1)
+            ]
+
+        return {
+            'recipes': recipes,
+            'metal_probabilities': metal_probabilities,
+            'derived_features': derived_features,
+            'n_branches': len(branches)
         }
+
+    def run_enumeration(
+        self,
+        SBAT_m2_gr: float,
+        a0_mmoll_gr: float,
+        E_kDg_moll: float,
+        Ws_cm3_gr: float,
+        Sme_m2_gr: float
+    ) -> Dict[str, Any]:
+        """
+        Оценивает все комбинации металл x лиганд x растворитель для целевого профиля.
+
+        Пространство комбинаций невелико (6 x 3 x 2), поэтому перебирается
+        полностью: это поиск по лучу без отсечения. Масштабированные признаки
+        профиля и их вклад в первый слой температурных моделей вычисляются
+        один раз, для комбинаций пересчитываются только зависящие от них столбцы.
         
-        # Сортируем температуры по убыванию вероятности
-        sorted_temps = sorted(
-            probabilities.items(),
-            key=lambda x: x[1],
-            reverse=True
+        Args:
+            SBAT_m2_gr: Удельная площадь поверхности (м²/г)
+            a0_mmoll_gr: Предельная адсорбция (ммоль/г)
+            E_kDg_moll: Энергия адсорбции азота (кДж/моль)
+            Ws_cm3_gr: Общий объем пор (см³/г)
+            Sme_m2_gr: Площадь поверхности мезопор (м²/г)
+            
+        Returns:
+            Dict[str, Any]: recipes (все комбинации по убыванию совместной
+                вероятности, формат run_beam_search), table (pd.DataFrame для
+                отображения), metal_probabilities, derived_features, n_combinations
+        """
+        n_classes = max(
+            len(metal_columns),
+            len(self.model_service.get_encoder('ligand').classes_),
+            len(self.model_service.get_encoder('solvent').classes_)
         )
+
+        with self.latency_tracker.stage('enumeration'):
+            features_df = self.calculate_derived_features(
+                SBAT_m2_gr, a0_mmoll_gr, E_kDg_moll, Ws_cm3_gr, Sme_m2_gr
+            )
+            derived_features = self._derived_features_summary(features_df)
+            branches, metal_probabilities = self._search_branches(features_df, n_classes, None)
+            recipes = [
+                {'rank': rank, **self._branch_recipe(branch, derived_features)}
+                for rank, branch in enumerate(branches, start=1)
+            ]
+
+        return {
+            'recipes': recipes,
+            'table': recipes_to_frame(recipes),
+            'metal_probabilities': metal_probabilities,
+            'derived_features': derived_features,
+            'n_combinations': len(recipes)
+        }
+
+    @staticmethod
+    def _derived_features_summary(features_df: pd.DataFrame, row: int = 0) -> Dict[str, float]:
+        """Производные признаки строки features_df для отображения в результатах."""
+        return {
+            'W0_cm3_g': features_df['W0, см3/г'][row],
+            'E0_KDG_moll': features_df['E0, кДж/моль'][row],
+            'x0_nm': features_df['х0, нм'][row],
+            'Wme_cm3_gr': features_df['Wme, см3/г'][row]
+        }
+
+    def _branch_recipe(self, branch: Dict[str, Any], derived_features: Dict[str, float]) -> Dict[str, Any]:
+        """
+        Переводит ветвь поиска в рецепт в формате run_full_prediction.
         
+        Args:
+            branch: Ветвь поиска
+            derived_features: Производные признаки
+            
+        Returns:
+            Dict[str, Any]: Рецепт
+        """
+        ligand_classes = self.model_service.get_encoder('ligand').classes_
+        solvent_classes = self.model_service.get_encoder('solvent').classes_
+        solvent_probabilities = {
+            solvent: float(prob)
+            for solvent, prob in zip(solvent_classes, branch['probabilities']['solvent'])
+        }
+        sorted_solvents = sorted(solvent_probabilities.items(), key=lambda x: x[1], reverse=True)
+
         return {
-            'temperature': predicted_temp,
-            'confidence': temp_probability,
-            'all_probabilities': probabilities,
-            'top_3_temperatures': [
-                {'value': temp, 'probability': prob}
-                for temp, prob in sorted_temps[:3]
-            ]
+            'joint_probability': math.exp(branch['log_score']),
+            'metal': {
+                'metal_type': branch['metal'],
+                'confidence': branch['scores']['metal']
+            },
+            'ligand': {
+                'ligand_type': branch['ligand'],
+                'confidence': branch['scores']['ligand'],
+                'all_probabilities': {
+                    ligand: float(prob)
+                    for ligand, prob in zip(ligand_classes, branch['probabilities']['ligand'])
+                }
+            },
+            'solvent': {
+                'solvent_type': branch['solvent'],
+                'confidence': branch['scores']['solvent'],
+                'all_probabilities': solvent_probabilities,
+                'top_3_solvents': [
+                    {'type': solv, 'probability': prob}
+                    for solv, prob in sorted_solvents[:3]
+                ]
+            },
+            'salt_mass': branch['salt_mass'],
+            'acid_mass': branch['acid_mass'],
+            'synthesis_volume': branch['Vsyn'],
+            'tsyn': branch['Tsyn_result'],
+            'tdry': branch['Tdry_result'],
+            'treg': branch['Treg_result'],
+            'derived_features': derived_features
         }
-    
+
     def run_full_prediction(
         self,
         SBAT_m2_gr: float,
         a0_mmoll_gr: float,
         E_kDg_moll: float,
         Ws_cm3_gr: float,
-        Sme_m2_gr: float
+        Sme_m2_gr: float,
+        progress_callback: Optional[ProgressCallback] = None,
+        use_cache: bool = False
     ) -> Dict[str, Any]:
         """
         Выполняет полное предсказание всех параметров синтеза MOF.
@@ -841,58 +1895,112 @@ class PredictorService:
             E_kDg_moll: Энергия адсорбции азота (кДж/моль)
             Ws_cm3_gr: Общий объем пор (см³/г)
             Sme_m2_gr: Площадь поверхности мезопор (м²/г)
+            progress_callback: Обработчик событий прогресса. Вызывается после каждой
+                стадии со словарем: stage, index, total, stage_ms, elapsed_ms,
+                result (результат стадии) и partial (результаты завершенных стадий)
+            use_cache: Использовать кэш предсказаний. Ключ строится по входам,
+                квантованным с допусками PREDICTION_CACHE_CONFIG['key_policy'],
+                поэтому близкие входы получают сохраненный рецепт; производные
+                признаки всегда рассчитываются по точным входам
             
         Returns:
             Dict[str, Any]: Результаты всех предсказаний
         """
-        # Рассчитываем производные признаки
-        features_df = self.calculate_derived_features(
-            SBAT_m2_gr, a0_mmoll_gr, E_kDg_moll, Ws_cm3_gr, Sme_m2_gr
-        )
-        
-        # Предсказываем тип металла
-        metal_result = self.predict_metal(features_df)
-        metal_type = metal_result['metal_type']
-        
-        # Предсказываем тип лиганда
-        ligand_result = self.predict_ligand(features_df, metal_type)
-        ligand_type = ligand_result['ligand_type']
-        
-        # Предсказываем тип растворителя
-        solvent_result = self.predict_solvent(features_df, metal_type, ligand_type)
-        solvent_type = solvent_result['solvent_type']
-        
-        # Предсказываем массу соли
-        salt_mass = self.predict_salt_mass(features_df, metal_type, ligand_type, solvent_type)
-        
-        # Предсказываем массу кислоты
-        acid_mass = self.predict_acid_mass(features_df, metal_type, ligand_type, solvent_type, salt_mass)
-        
-        # Предсказываем объем синтеза
-        vsyn = self.predict_synthesis_volume(features_df, metal_type, ligand_type, solvent_type, salt_mass, acid_mass)
-        
-        # Предсказываем температуру синтеза
-        tsyn_result = self.predict_temperature(
-            features_df, metal_type, ligand_type, solvent_type, salt_mass, acid_mass, vsyn, 
-            temp_type='Tsyn'
-        )
-        tsyn = tsyn_result['temperature']
-        
-        # Предсказываем температуру сушки
-        tdry_result = self.predict_temperature(
-            features_df, metal_type, ligand_type, solvent_type, salt_mass, acid_mass, vsyn, tsyn, 
-            temp_type='Tdry'
-        )
-        tdry = tdry_result['temperature']
-        
-        # Предсказываем температуру регенерации
-        treg_result = self.predict_temperature(
-            features_df, metal_type, ligand_type, solvent_type, salt_mass, acid_mass, vsyn, tsyn, tdry, 
-            temp_type='Treg'
-        )
-        
+        timer = self.latency_tracker
+        progress = _PipelineProgress(progress_callback)
+
+        cache_key = None
+        # Попадания в кэш учитываются в счетчике запросов и задержке конвейера наравне с расчетами
+        with track_prediction_request(), timer.stage('pipeline'):
+            if use_cache and PREDICTION_CACHE_CONFIG['enabled']:
+                from src.utils.storage import create_cache_key, cached_prediction
+
+                cache_key = create_cache_key({
+                    'SBAT_m2_gr': SBAT_m2_gr, 'a0_mmoll_gr': a0_mmoll_gr, 'E_kDg_moll': E_kDg_moll,
+                    'Ws_cm3_gr': Ws_cm3_gr, 'Sme_m2_gr': Sme_m2_gr
+                })
+                cached = cached_prediction(cache_key, 'Pipeline')
+                CACHE_REQUESTS.inc(cache='pipeline', result='hit' if cached is not None else 'miss')
+                if cached is not None:
+                    result = copy.deepcopy(cached)
+                    with timer.stage('derived_features'):
+                        features_df = self.calculate_derived_features(
+                            SBAT_m2_gr, a0_mmoll_gr, E_kDg_moll, Ws_cm3_gr, Sme_m2_gr
+                        )
+                        result['derived_features'] = self._derived_features_summary(features_df)
+                    for stage in PIPELINE_STAGES:
+                        progress.done(stage, result[STAGE_RESULT_KEYS[stage]])
+                    return result
+
+            # Рассчитываем производные признаки
+            with timer.stage('derived_features'):
+                features_df = self.calculate_derived_features(
+                    SBAT_m2_gr, a0_mmoll_gr, E_kDg_moll, Ws_cm3_gr, Sme_m2_gr
+                )
+                derived_features = self._derived_features_summary(features_df)
+            progress.done('derived_features', derived_features)
+
+            # Предсказываем тип металла
+            with timer.stage('metal'):
+                metal_result = self.predict_metal(features_df)
+            metal_type = metal_result['metal_type']
+            progress.done('metal', metal_result)
+
+            # Предсказываем тип лиганда
+            with timer.stage('ligand'):
+                ligand_result = self.predict_ligand(features_df, metal_type)
+            ligand_type = ligand_result['ligand_type']
+            progress.done('ligand', ligand_result)
+
+            # Предсказываем тип растворителя
+            with timer.stage('solvent'):
+                solvent_result = self.predict_solvent(features_df, metal_type, ligand_type)
+            solvent_type = solvent_result['solvent_type']
+            progress.done('solvent', solvent_result)
+
+            # Предсказываем массу соли
+            with timer.stage('salt_mass'):
+                salt_mass = self.predict_salt_mass(features_df, metal_type, ligand_type, solvent_type)
+            progress.done('salt_mass', salt_mass)
+
+            # Предсказываем массу кислоты
+            with timer.stage('acid_mass'):
+                acid_mass = self.predict_acid_mass(features_df, metal_type, ligand_type, solvent_type, salt_mass)
+            progress.done('acid_mass', acid_mass)
+
+            # Предсказываем объем синтеза
+            with timer.stage('Vsyn'):
+                vsyn = self.predict_synthesis_volume(features_df, metal_type, ligand_type, solvent_type, salt_mass, acid_mass)
+            progress.done('Vsyn', vsyn)
+
+            # Предсказываем температуру синтеза
+            with timer.stage('Tsyn'):
+                tsyn_result = self.predict_temperature(
+                    features_df, metal_type, ligand_type, solvent_type, salt_mass, acid_mass, vsyn,
+                    temp_type='Tsyn'
+                )
+            tsyn = tsyn_result['temperature']
+            progress.done('Tsyn', tsyn_result)
+
+            # Предсказываем температуру сушки
+            with timer.stage('Tdry'):
+                tdry_result = self.predict_temperature(
+                    features_df, metal_type, ligand_type, solvent_type, salt_mass, acid_mass, vsyn, tsyn,
+                    temp_type='Tdry'
+                )
+            tdry = tdry_result['temperature']
+            progress.done('Tdry', tdry_result)
+
+            # Предсказываем температуру регенерации
+            with timer.stage('Treg'):
+                treg_result = self.predict_temperature(
+                    features_df, metal_type, ligand_type, solvent_type, salt_mass, acid_mass, vsyn, tsyn, tdry,
+                    temp_type='Treg'
+                )
+            progress.done('Treg', treg_result)
+
         # Формируем результат
-        return {
+        result = {
             'metal': metal_result,
             'ligand': ligand_result,
             'solvent': solvent_result,
@@ -902,10 +2010,10 @@ class PredictorService:
             'tsyn': tsyn_result,
             'tdry': tdry_result,
             'treg': treg_result,
-            'derived_features': {
-                'W0_cm3_g': features_df['W0, см3/г'][0],
-                'E0_KDG_moll': features_df['E0, кДж/моль'][0],
-                'x0_nm': features_df['х0, нм'][0],
-                'Wme_cm3_gr': features_df['Wme, см3/г'][0]
-            }
-        }
\ No newline at end of file
+            'derived_features': derived_features
+        }
+        if cache_key is not None:
+            from src.utils.storage import store_prediction
+
+            store_prediction(cache_key, 'Pipeline', copy.deepcopy(result))
+        return result
\ No newline at end of file
@@ -0,0 +1,346 @@
+"""
+Pre-fork запуск рабочих процессов с общими весами моделей.
+
+Родительский процесс один раз загружает все артефакты ModelService
+(модели, скейлеры, энкодеры), переводит torch-модели в режим eval() без
+градиентов, закрепляет их в хранилище моделей и замораживает сборщик
+мусора (gc.freeze), после чего порождает рабочие процессы через fork.
+Страницы с весами наследуются рабочими процессами copy-on-write и
+физически не копируются, пока в них не пишут: N процессов занимают
+память одной копии моделей плюс собственные данные каждого процесса.
+
+Режимы рабочих процессов:
+    - streamlit: каждый процесс запускает приложение на своем порту
+      (base_port + номер), балансировка — внешним прокси; метрики процесс
+      отдает на порту METRICS_CONFIG['port'] + номер или пишет в свой файл
+      textfile-коллектора (<имя>.worker<номер>.prom) с меткой worker;
+    - bench: каждый процесс выполняет пакетный расчет на выборке точек,
+      после чего родитель печатает отчет о памяти и завершает процессы.
+
+Отчет о памяти (Linux, /proc/<pid>/smaps_rollup): для каждого процесса
+RSS, PSS, общая (Shared_*) и уникальная (Private_*) память.
+
+В родительском процессе инференс не выполняется: пулы потоков OpenMP,
+созданные до fork, в дочерних процессах неработоспособны.
+
+Пример:
+    python -m src.services.prefork --workers 4 --mode bench
+    python -m src.services.prefork --workers 4 --mode streamlit --base-port 8501
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.config import BASE_DIR, METRICS_CONFIG, PREFORK_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Поля smaps_rollup, из которых складывается отчет (кБ)
+_SMAPS_FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+
+
+def preload_artifacts() -> Dict[str, int]:
+    """
+    Загружает все артефакты ModelService и готовит их к совместному использованию.
+
+    Torch-модели переводятся в eval() с отключенными градиентами, все модели
+    закрепляются в хранилище (вытеснение в рабочем процессе освободило бы
+    только его копию страниц). Импортируются также модули конвейера
+    (pymatgen, RDKit), чтобы их код и данные тоже были общими.
+
+    Returns:
+        Dict[str, int]: Число загруженных моделей, скейлеров и энкодеров
+    """
+    import torch
+
+    import src.services.predictor_service  # noqa: F401
+    from src.services.model_service import ModelService
+
+    service = ModelService()
+    models = service.get_all_models()
+    scalers = service.get_all_scalers()
+    encoders = service.get_all_encoders()
+
+    for name, model in models.items():
+        if isinstance(model, torch.nn.Module):
+            model.eval()
+            for parameter in model.parameters():
+                parameter.requires_grad_(False)
+        service.pin_model(name)
+
+    return {'models': len(models), 'scalers': len(scalers), 'encoders': len(encoders)}
+
+
+def freeze_heap() -> None:
+    """
+    Замораживает объекты родительского процесса перед fork.
+
+    Сборка мусора в дочернем процессе обходит все отслеживаемые объекты и
+    пишет в их заголовки, из-за чего общие страницы копируются. gc.freeze
+    переносит существующие объекты в постоянное поколение, которое
+    сборщик не обходит.
+    """
+    gc.disable()
+    gc.collect()
+    gc.freeze()
+
+
+def read_memory(pid: int) -> Dict[str, float]:
+    """
+    Читает сводку памяти процесса.
+
+    Args:
+        pid: Идентификатор процесса
+
+    Returns:
+        Dict[str, float]: rss_mb, pss_mb, shared_mb и unique_mb
+
+    Raises:
+        RuntimeError: Если /proc/<pid>/smaps_rollup недоступен (не Linux)
+    """
+    path = Path(f"/proc/{pid}/smaps_rollup")
+    if not path.exists():
+        raise RuntimeError(f"Отчет о памяти доступен только в Linux (нет {path})")
+
+    values = dict.fromkeys(_SMAPS_FIELDS, 0.0)
+    for line in path.read_text().splitlines():
+        field, _, rest = line.partition(':')
+        if field in values:
+            values[field] = float(rest.split()[0]) / 1024
+    return {
+        'rss_mb': values['Rss'],
+        'pss_mb': values['Pss'],
+        'shared_mb': values['Shared_Clean'] + values['Shared_Dirty'],
+        'unique_mb': values['Private_Clean'] + values['Private_Dirty'],
+    }
+
+
+def memory_report(parent_pid: int, worker_pids: List[int]) -> Dict[str, Any]:
+    """
+    Формирует отчет о разделении памяти между процессами.
+
+    Args:
+        parent_pid: Идентификатор родительского процесса
+        worker_pids: Идентификаторы рабочих процессов
+
+    Returns:
+        Dict[str, Any]: Строки по процессам ('processes') и итоги: сумма RSS
+            (память без разделения), сумма PSS (фактическая память группы)
+            и доля общей памяти в RSS рабочих процессов
+    """
+    processes = [{'role': 'parent', 'pid': parent_pid, **read_memory(parent_pid)}]
+    processes += [
+        {'role': f"worker {number}", 'pid': pid, **read_memory(pid)}
+        for number, pid in enumerate(worker_pids)
+    ]
+    workers = processes[1:]
+    workers_rss = sum(row['rss_mb'] for row in workers)
+    return {
+        'processes': processes,
+        'total_rss_mb': sum(row['rss_mb'] for row in processes),
+        'total_pss_mb': sum(row['pss_mb'] for row in processes),
+        'worker_shared_fraction': (
+            sum(row['shared_mb'] for row in workers) / workers_rss if workers_rss else 0.0
+        ),
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Форматирует отчет о памяти в таблицу."""
+    lines = [f"{'процесс':<12} {'pid':>8} {'RSS, МБ':>10} {'PSS, МБ':>10} {'общая, МБ':>10} {'уник., МБ':>10}"]
+    for row in report['processes']:
+        lines.append(
+            f"{row['role']:<12} {row['pid']:>8} {row['rss_mb']:>10.1f} {row['pss_mb']:>10.1f} "
+            f"{row['shared_mb']:>10.1f} {row['unique_mb']:>10.1f}"
+        )
+    lines.append(
+        f"Сумма RSS {report['total_rss_mb']:.1f} МБ, сумма PSS {report['total_pss_mb']:.1f} МБ, "
+        f"общая память рабочих процессов {report['worker_shared_fraction']:.0%} от их RSS"
+    )
+    return "\n".join(lines)
+
+
+def _worker_metrics(number: int) -> None:
+    """
+    Выделяет рабочему процессу собственные порт /metrics и файл textfile-коллектора.
+
+    Конфигурация унаследована от родителя: без этого все процессы занимали бы
+    один порт (экспортирует только первый) и перезаписывали бы один файл .prom.
+
+    Args:
+        number: Номер рабочего процесса
+    """
+    METRICS_CONFIG['port'] += number
+    if METRICS_CONFIG['textfile_path']:
+        path = Path(METRICS_CONFIG['textfile_path'])
+        METRICS_CONFIG['textfile_path'] = str(path.with_name(f"{path.stem}.worker{number}{path.suffix}"))
+    METRICS_CONFIG['worker'] = str(number)
+
+
+def _child_init(number: int) -> None:
+    """Настраивает рабочий процесс сразу после fork."""
+    import torch
+
+    # Сборщик включается снова: замороженные объекты родителя он не обходит
+    gc.enable()
+    torch.set_num_threads(PREFORK_CONFIG['threads_per_worker'])
+    _worker_metrics(number)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    logger.info(f"Рабочий процесс {number} запущен (pid {os.getpid()})")
+
+
+def run_streamlit_worker(number: int, base_port: int) -> None:
+    """
+    Запускает приложение Streamlit в рабочем процессе.
+
+    Args:
+        number: Номер рабочего процесса
+        base_port: Порт первого процесса
+    """
+    from streamlit.web import bootstrap
+
+    flag_options = {'server.port': base_port + number, 'server.headless': True}
+    bootstrap.load_config_options(flag_options)
+    bootstrap.run(str(BASE_DIR / 'app.py'), False, [], flag_options)
+
+
+def run_bench_worker(number: int, points: int, ready_fd: int) -> None:
+    """
+    Выполняет пакетный расчет и ждет завершения от родительского процесса.
+
+    Args:
+        number: Номер рабочего процесса (зерно выборки точек)
+        points: Число точек расчета
+        ready_fd: Дескриптор канала, в который сообщается о готовности
+    """
+    from src.services.predictor_service import PredictorService
+    from src.utils.data import sample_input_grid
+
+    start = time.perf_counter()
+    PredictorService().run_batch_prediction(sample_input_grid(points, seed=number))
+    logger.info(f"Рабочий процесс {number}: {points} точек за {time.perf_counter() - start:.2f} с")
+    os.write(ready_fd, b'1')
+    os.close(ready_fd)
+    signal.pause()
+
+
+def spawn_workers(count: int, target: Callable[[int], None]) -> List[int]:
+    """
+    Порождает рабочие процессы через fork.
+
+    Args:
+        count: Число процессов
+        target: Функция рабочего процесса (аргумент — номер процесса)
+
+    Returns:
+        List[int]: Идентификаторы рабочих процессов
+    """
+    pids = []
+    for number in range(count):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _child_init(number)
+                target(number)
+            except Exception:
+                logger.exception(f"Ошибка в рабочем процессе {number}")
+                code = 1
+            finally:
+                os._exit(code)
+        pids.append(pid)
+    return pids
+
+
+def stop_workers(pids: List[int]) -> None:
+    """Завершает рабочие процессы и дожидается их."""
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    for pid in pids:
+        try:
+            os.waitpid(pid, 0)
+        except ChildProcessError:
+            pass
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Pre-fork запуск рабочих процессов с общими моделями")
+    parser.add_argument('--workers', type=int, default=PREFORK_CONFIG['workers'], help="Число рабочих процессов")
+    parser.add_argument('--mode', choices=('streamlit', 'bench'), default='streamlit', help="Режим рабочих процессов")
+    parser.add_argument('--base-port', type=int, default=PREFORK_CONFIG['base_port'],
+                        help="Порт первого процесса Streamlit")
+    parser.add_argument('--points', type=int, default=256, help="Точек расчета в режиме bench")
+    parser.add_argument('--report-interval', type=float, default=PREFORK_CONFIG['report_interval_s'],
+                        help="Период отчета о памяти в режиме streamlit, с (0 — без отчета)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    args = parse_args(argv)
+    if not hasattr(os, 'fork'):
+        logger.error("Pre-fork запуск требует os.fork (Linux/macOS)")
+        return 1
+
+    start = time.perf_counter()
+    loaded = preload_artifacts()
+    logger.info(f"Загружены артефакты {loaded} за {time.perf_counter() - start:.2f} с")
+    freeze_heap()
+
+    if args.mode == 'bench':
+        ready_read, ready_write = os.pipe()
+
+        def target(number: int) -> None:
+            os.close(ready_read)
+            run_bench_worker(number, args.points, ready_write)
+
+        pids = spawn_workers(args.workers, target)
+        os.close(ready_write)
+        gc.enable()
+        try:
+            # Каждый процесс сообщает о готовности одним байтом
+            received = 0
+            while received < len(pids):
+                chunk = os.read(ready_read, len(pids))
+                if not chunk:
+                    break
+                received += len(chunk)
+            print(format_report(memory_report(os.getpid(), pids)))
+        finally:
+            stop_workers(pids)
+        return 0 if received == len(pids) else 1
+
+    pids = spawn_workers(args.workers, lambda number: run_streamlit_worker(number, args.base_port))
+    gc.enable()
+    logger.info(f"Запущено {len(pids)} процессов Streamlit на портах {args.base_port}-{args.base_port + len(pids) - 1}")
+
+    def shutdown(signum, frame):
+        stop_workers(pids)
+        sys.exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    alive, next_report = list(pids), time.monotonic() + args.report_interval
+    while alive:
+        time.sleep(1.0)
+        alive = [pid for pid in alive if os.waitpid(pid, os.WNOHANG) == (0, 0)]
+        if alive and args.report_interval and time.monotonic() >= next_report:
+            logger.info("\n" + format_report(memory_report(os.getpid(), alive)))
+            next_report += args.report_interval
+    logger.error("Все рабочие процессы завершились")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""
+Скейлеры и энкодеры без pickle и без sklearn.
+
+Пиклы StandardScaler, MinMaxScaler и LabelEncoder из saved_scalers/
+требуют импорта sklearn при загрузке и ломаются при смене его версии.
+Экспорт записывает параметры каждого объекта в .npz рядом с пиклом:
+массивы (mean_, scale_, var_, min_, classes_, feature_names_in_ и т.д.) и
+метаданные JSON в массиве '__meta__' (класс, n_features_in_, флаги и
+SHA-256 исходного пикла). Файл .npz используется вместо пикла, только если
+записанный SHA-256 совпадает с текущим пиклом: переобученный скейлер не
+подменяется устаревшим экспортом.
+Строковые массивы хранятся как Unicode фиксированной ширины, поэтому файл
+читается с allow_pickle=False.
+
+NpStandardScaler, NpMinMaxScaler и NpLabelEncoder повторяют формулы и
+проверки transform/inverse_transform sklearn и используют только NumPy.
+Совпадение с исходными пиклами проверяет benchmarks/check_preprocessors.py.
+
+Пример:
+    python -m src.services.preprocessors    # экспорт saved_scalers/*.pkl в .npz
+"""
+
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.config import PREPROCESSOR_CONFIG, SCALERS_DIR
+from src.utils.storage.digests import file_sha256, matches_source
+
+logger = logging.getLogger(__name__)
+
+PREPROCESSOR_SUFFIX = '.npz'
+_META_KEY = '__meta__'
+
+
+def _feature_names(X: Any) -> Optional[np.ndarray]:
+    """Имена столбцов DataFrame (None для массивов)."""
+    columns = getattr(X, 'columns', None)
+    return None if columns is None else np.asarray(columns, dtype=object)
+
+
+class _NpScaler:
+    """Общая часть скейлеров: проверка входа как в sklearn."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        """
+        Инициализация.
+
+        Args:
+            arrays: Массивы параметров (атрибуты sklearn с суффиксом '_')
+            meta: Метаданные экспорта (n_features_in_ и флаги скейлера)
+        """
+        for name, value in arrays.items():
+            setattr(self, name, value)
+        self.n_features_in_ = meta['n_features_in_']
+        if 'feature_names_in_' in arrays:
+            self.feature_names_in_ = arrays['feature_names_in_'].astype(object)
+
+    def _validate(self, X: Any) -> np.ndarray:
+        """Копия входа в float64 (float32 сохраняется) с проверкой признаков."""
+        names = _feature_names(X)
+        fitted_names = getattr(self, 'feature_names_in_', None)
+        if names is not None and fitted_names is not None and not np.array_equal(names, fitted_names):
+            raise ValueError(
+                "The feature names should match those that were passed during fit."
+            )
+        X = np.asarray(X)
+        dtype = X.dtype if X.dtype in (np.float32, np.float64) else np.float64
+        X = np.array(X, dtype=dtype, copy=True)
+        if X.ndim != 2:
+            raise ValueError(f"Expected 2D array, got {X.ndim}D array instead")
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but {type(self).__name__} is expecting "
+                f"{self.n_features_in_} features as input."
+            )
+        return X
+
+
+class NpStandardScaler(_NpScaler):
+    """Аналог sklearn.preprocessing.StandardScaler (только transform)."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        super().__init__(arrays, meta)
+        self.with_mean = meta['with_mean']
+        self.with_std = meta['with_std']
+        if not self.with_mean:
+            self.mean_ = arrays.get('mean_')
+        if not self.with_std:
+            self.scale_ = None
+
+    def transform(self, X: Any) -> np.ndarray:
+        """(X - mean_) / scale_, как StandardScaler.transform."""
+        X = self._validate(X)
+        if self.with_mean:
+            X -= self.mean_
+        if self.with_std:
+            X /= self.scale_
+        return X
+
+    def inverse_transform(self, X: Any) -> np.ndarray:
+        """X * scale_ + mean_, как StandardScaler.inverse_transform."""
+        X = np.array(X, dtype=np.float64, copy=True)
+        if self.with_std:
+            X *= self.scale_
+        if self.with_mean:
+            X += self.mean_
+        return X
+
+
+class NpMinMaxScaler(_NpScaler):
+    """Аналог sklearn.preprocessing.MinMaxScaler (только transform)."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        super().__init__(arrays, meta)
+        self.feature_range = tuple(meta['feature_range'])
+        self.clip = meta['clip']
+
+    def transform(self, X: Any) -> np.ndarray:
+        """X * scale_ + min_, как MinMaxScaler.transform."""
+        X = self._validate(X)
+        X *= self.scale_
+        X += self.min_
+        if self.clip:
+            np.clip(X, self.feature_range[0], self.feature_range[1], out=X)
+        return X
+
+    def inverse_transform(self, X: Any) -> np.ndarray:
+        """(X - min_) / scale_, как MinMaxScaler.inverse_transform."""
+        X = np.array(X, dtype=np.float64, copy=True)
+        X -= self.min_
+        X /= self.scale_
+        return X
+
+
+class NpLabelEncoder:
+    """Аналог sklearn.preprocessing.LabelEncoder (transform/inverse_transform)."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Optional[Dict[str, Any]] = None):
+        """
+        Инициализация.
+
+        Args:
+            arrays: Массив 'classes_'
+            meta: Метаданные экспорта (не используются)
+        """
+        classes = arrays['classes_']
+        # Строковые классы в sklearn хранятся как массив object
+        self.classes_ = classes.astype(object) if classes.dtype.kind == 'U' else classes
+
+    def transform(self, y: Any) -> np.ndarray:
+        """Индексы классов, как LabelEncoder.transform."""
+        y = np.ravel(np.asarray(y))
+        if y.size == 0:
+            return np.array([], dtype=np.int64)
+        unseen = np.setdiff1d(y, self.classes_)
+        if len(unseen):
+            raise ValueError(f"y contains previously unseen labels: {unseen.tolist()}")
+        return np.searchsorted(self.classes_, y)
+
+    def inverse_transform(self, y: Any) -> np.ndarray:
+        """Классы по индексам, как LabelEncoder.inverse_transform."""
+        y = np.ravel(np.asarray(y))
+        if y.size == 0:
+            return np.array([], dtype=self.classes_.dtype)
+        unseen = np.setdiff1d(y, np.arange(len(self.classes_)))
+        if len(unseen):
+            raise ValueError(f"y contains previously unseen labels: {unseen.tolist()}")
+        return self.classes_[np.asarray(y, dtype=np.intp)]
+
+
+_CLASSES = {
+    'StandardScaler': NpStandardScaler,
+    'MinMaxScaler': NpMinMaxScaler,
+    'LabelEncoder': NpLabelEncoder,
+}
+
+# Атрибуты sklearn, которые экспортируются как массивы
+_ARRAY_ATTRIBUTES = (
+    'mean_', 'var_', 'scale_', 'min_', 'data_min_', 'data_max_', 'data_range_', 'n_samples_seen_',
+    'classes_', 'feature_names_in_'
+)
+
+
+def export_arrays(obj: Any) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Извлекает параметры объекта sklearn.
+
+    Args:
+        obj: StandardScaler, MinMaxScaler или LabelEncoder
+
+    Returns:
+        Tuple[Dict[str, np.ndarray], Dict[str, Any]]: Массивы и метаданные
+
+    Raises:
+        ValueError: Если класс объекта не поддерживается
+    """
+    kind = type(obj).__name__
+    if kind not in _CLASSES:
+        raise ValueError(f"Неподдерживаемый класс: {kind}")
+
+    arrays = {}
+    for name in _ARRAY_ATTRIBUTES:
+        value = getattr(obj, name, None)
+        if value is None:
+            continue
+        value = np.asarray(value)
+        # Массивы object (строки) переводятся в Unicode фиксированной ширины
+        arrays[name] = value.astype(str) if value.dtype == object else value
+
+    meta: Dict[str, Any] = {'class': kind}
+    if kind != 'LabelEncoder':
+        meta['n_features_in_'] = int(obj.n_features_in_)
+    if kind == 'StandardScaler':
+        meta.update(with_mean=bool(obj.with_mean), with_std=bool(obj.with_std))
+    if kind == 'MinMaxScaler':
+        meta.update(feature_range=[float(v) for v in obj.feature_range], clip=bool(obj.clip))
+    return arrays, meta
+
+
+def from_arrays(arrays: Dict[str, np.ndarray], meta: Dict[str, Any]) -> Any:
+    """
+    Создает скейлер или энкодер по экспортированным параметрам.
+
+    Args:
+        arrays: Массивы параметров
+        meta: Метаданные экспорта
+
+    Returns:
+        Any: NpStandardScaler, NpMinMaxScaler или NpLabelEncoder
+    """
+    return _CLASSES[meta['class']](arrays, meta)
+
+
+def preprocessor_path(pickle_path: Union[str, Path]) -> Path:
+    """Путь к файлу .npz для пикла скейлера или энкодера."""
+    return Path(pickle_path).with_suffix(PREPROCESSOR_SUFFIX)
+
+
+def save_preprocessor(
+    obj: Any,
+    path: Union[str, Path],
+    source: Optional[Union[str, Path]] = None
+) -> Path:
+    """
+    Записывает параметры объекта sklearn в .npz.
+
+    Args:
+        obj: StandardScaler, MinMaxScaler или LabelEncoder
+        path: Путь к файлу .npz
+        source: Пикл, из которого загружен объект (его SHA-256 записывается
+            в метаданные и сверяется при загрузке)
+
+    Returns:
+        Path: Путь к файлу
+    """
+    arrays, meta = export_arrays(obj)
+    if source is not None:
+        meta['source_sha256'] = file_sha256(source)
+    path = Path(path)
+    np.savez(path, **arrays, **{_META_KEY: np.array(json.dumps(meta))})
+    return path
+
+
+def read_meta(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Читает метаданные файла .npz (без чтения массивов параметров).
+
+    Args:
+        path: Путь к файлу .npz
+
+    Returns:
+        Dict[str, Any]: Метаданные экспорта
+    """
+    with np.load(path, allow_pickle=False) as data:
+        return json.loads(str(data[_META_KEY]))
+
+
+def load_preprocessor(path: Union[str, Path]) -> Any:
+    """
+    Загружает скейлер или энкодер из .npz без sklearn и pickle.
+
+    Args:
+        path: Путь к файлу .npz
+
+    Returns:
+        Any: NpStandardScaler, NpMinMaxScaler или NpLabelEncoder
+    """
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data[_META_KEY]))
+        arrays = {name: data[name] for name in data.files if name != _META_KEY}
+    return from_arrays(arrays, meta)
+
+
+def find_preprocessor(pickle_path: Union[str, Path]) -> Optional[Path]:
+    """
+    Возвращает файл .npz для загрузки вместо пикла.
+
+    Args:
+        pickle_path: Путь к пиклу
+
+    Returns:
+        Optional[Path]: Путь к .npz или None, если его нет, чтение .npz
+            отключено (PREPROCESSOR_CONFIG) или он экспортирован из другой
+            версии пикла (SHA-256 в метаданных не совпадает с текущим)
+    """
+    if not PREPROCESSOR_CONFIG['use_npz']:
+        return None
+    path = preprocessor_path(pickle_path)
+    if not path.exists():
+        return None
+    if not matches_source(read_meta(path).get('source_sha256'), pickle_path):
+        logger.warning(f"{path.name} экспортирован из другой версии {Path(pickle_path).name}: используется пикл")
+        return None
+    return path
+
+
+def load_artifact(pickle_path: Union[str, Path]) -> Any:
+    """
+    Загружает скейлер или энкодер: из .npz, если он экспортирован, иначе из пикла.
+
+    Args:
+        pickle_path: Путь к пиклу
+
+    Returns:
+        Any: Загруженный объект
+    """
+    exported = find_preprocessor(pickle_path)
+    if exported is not None:
+        return load_preprocessor(exported)
+    import joblib
+
+    return joblib.load(pickle_path)
+
+
+def export_all(scalers_dir: Union[str, Path] = SCALERS_DIR) -> List[Path]:
+    """
+    Экспортирует все пиклы каталога в .npz.
+
+    Args:
+        scalers_dir: Каталог с пиклами
+
+    Returns:
+        List[Path]: Записанные файлы
+    """
+    import joblib
+
+    written = []
+    for source in sorted(Path(scalers_dir).glob('*.pkl')):
+        target = save_preprocessor(joblib.load(source), preprocessor_path(source), source)
+        logger.info(f"{source.name} -> {target.name}")
+        written.append(target)
+    return written
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    written = export_all(sys.argv[1] if len(sys.argv) > 1 else SCALERS_DIR)
+    sys.exit(0 if written else 1)
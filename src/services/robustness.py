@@ -0,0 +1,149 @@
+"""
+Устойчивость рекомендаций к погрешности измерения входных параметров.
+
+SБЭТ, а₀, E, Ws и Sme измеряются с инструментальной погрешностью. Для
+оценки устойчивости рецепта формируются N копий входной точки с
+нормальным шумом (стандартное отклонение — относительная погрешность
+параметра), и все копии вместе с исходной точкой рассчитываются одним
+пакетным прогоном конвейера (PredictorService.run_batch_prediction).
+По выборке рецептов рассчитываются частоты классов, распределение
+сочетаний металл/лиганд/растворитель и квантили масс, объема и температур.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.config import ROBUSTNESS_CONFIG
+from src.services.sensitivity import CATEGORICAL_OUTPUTS, NUMERIC_OUTPUTS, SWEEP_PARAMETERS, results_to_frame
+
+logger = logging.getLogger(__name__)
+
+# Выходы, по которым сравниваются рецепты (полный категориальный рецепт)
+RECIPE_KEYS = ('metal', 'ligand', 'solvent', 'tsyn', 'tdry', 'treg')
+
+
+def perturb_inputs(
+    base_point: Dict[str, float],
+    relative_errors: Dict[str, float],
+    n_samples: int,
+    seed: int = 0
+) -> pd.DataFrame:
+    """
+    Формирует копии входной точки с нормальным шумом измерения.
+
+    Args:
+        base_point: Входная точка (значения всех пяти параметров)
+        relative_errors: Относительная погрешность параметров (0.02 = 2%);
+            параметры без погрешности не изменяются
+        n_samples: Число копий
+        seed: Зерно генератора случайных чисел
+
+    Returns:
+        pd.DataFrame: Копии точки (столбцы — параметры SWEEP_PARAMETERS)
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for parameter in SWEEP_PARAMETERS:
+        value = float(base_point[parameter])
+        error = relative_errors.get(parameter, 0.0)
+        noise = rng.standard_normal(n_samples) * error if error else np.zeros(n_samples)
+        # Погрешность не может сделать физическую величину неположительной
+        columns[parameter] = np.maximum(value * (1.0 + noise), value * 1e-3)
+    return pd.DataFrame(columns)
+
+
+def run_robustness(
+    predictor: Any,
+    base_point: Dict[str, float],
+    relative_errors: Optional[Dict[str, float]] = None,
+    n_samples: Optional[int] = None,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Оценивает распределение рецептов при погрешности входных параметров.
+
+    Args:
+        predictor: Экземпляр PredictorService
+        base_point: Входная точка (значения всех пяти параметров)
+        relative_errors: Относительная погрешность параметров
+            (по умолчанию из ROBUSTNESS_CONFIG)
+        n_samples: Число возмущенных копий (по умолчанию из ROBUSTNESS_CONFIG)
+        seed: Зерно генератора случайных чисел
+
+    Returns:
+        Dict[str, Any]: Рецепт исходной точки ('nominal'), частоты классов
+            ('categorical'), частоты сочетаний металл/лиганд/растворитель
+            ('recipes'), квантили числовых выходов ('numeric') и доли копий,
+            полный рецепт которых совпадает с исходным ('recipe_stability')
+    """
+    relative_errors = {**ROBUSTNESS_CONFIG['relative_errors'], **(relative_errors or {})}
+    n_samples = n_samples or ROBUSTNESS_CONFIG['samples']
+    for parameter, error in relative_errors.items():
+        if parameter not in SWEEP_PARAMETERS:
+            raise ValueError(f"Неизвестный параметр: {parameter}")
+        if error < 0:
+            raise ValueError(f"Погрешность не может быть отрицательной: {parameter}={error}")
+    if not 1 <= n_samples <= ROBUSTNESS_CONFIG['max_samples']:
+        raise ValueError(f"n_samples должен быть от 1 до {ROBUSTNESS_CONFIG['max_samples']}: {n_samples}")
+
+    # Исходная точка — первая строка того же пакета
+    points = pd.concat([
+        pd.DataFrame([{parameter: float(base_point[parameter]) for parameter in SWEEP_PARAMETERS}]),
+        perturb_inputs(base_point, relative_errors, n_samples, seed)
+    ], ignore_index=True)
+
+    start = time.perf_counter()
+    results = predictor.run_batch_prediction(points)
+    elapsed = time.perf_counter() - start
+
+    frame = results_to_frame(results)
+    nominal, samples = frame.iloc[0], frame.iloc[1:]
+
+    categorical = {}
+    for output in CATEGORICAL_OUTPUTS:
+        frequencies = samples[output].value_counts(normalize=True)
+        categorical[output] = {
+            'mode': frequencies.index[0],
+            'mode_frequency': float(frequencies.iloc[0]),
+            'nominal': nominal[output],
+            'nominal_frequency': float(frequencies.get(nominal[output], 0.0)),
+            'frequencies': {str(cls): float(freq) for cls, freq in frequencies.items()}
+        }
+
+    quantiles = ROBUSTNESS_CONFIG['quantiles']
+    numeric = {}
+    for output in NUMERIC_OUTPUTS:
+        values = samples[output].to_numpy(dtype=float)
+        numeric[output] = {
+            'nominal': float(nominal[output]),
+            'mean': float(values.mean()),
+            'std': float(values.std()),
+            'quantiles': {str(q): float(v) for q, v in zip(quantiles, np.quantile(values, quantiles))}
+        }
+
+    recipe_counts = samples.groupby(list(CATEGORICAL_OUTPUTS)).size().sort_values(ascending=False)
+    recipes = [
+        {**dict(zip(CATEGORICAL_OUTPUTS, combination)), 'frequency': float(count / len(samples))}
+        for combination, count in recipe_counts.items()
+    ]
+
+    stability = float((samples[list(RECIPE_KEYS)] == nominal[list(RECIPE_KEYS)]).all(axis=1).mean())
+    logger.info(
+        f"Устойчивость рецепта: {n_samples} копий за {elapsed * 1000:.0f} мс, "
+        f"совпадение с исходным рецептом {stability:.0%}"
+    )
+
+    return {
+        'nominal': results[0],
+        'n_samples': n_samples,
+        'relative_errors': relative_errors,
+        'categorical': categorical,
+        'recipes': recipes,
+        'numeric': numeric,
+        'recipe_stability': stability,
+        'elapsed_s': elapsed
+    }
@@ -0,0 +1,323 @@
+"""
+Масштабирование входов моделей без sklearn на горячем пути.
+
+Каждый расчет вызывает transform скейлеров около 11 раз, и на входах из
+одной строки почти все время уходит на проверки sklearn (имена и число
+признаков, типы, копирование DataFrame), а не на арифметику. AffineKernel
+один раз извлекает параметры скейлера (StandardScaler или MinMaxScaler,
+в том числе из src.services.preprocessors) и применяет их к массивам на
+месте.
+
+ScalingLayout — разметка входа стадии: параметры, разложенные по порядку
+признаков модели. Числовые столбцы — np.setdiff1d(признаки, One-Hot
+столбцы), как в PredictorService; у One-Hot столбцов тождественные
+параметры (сдвиг 0, масштаб 1), поэтому вход модели собирается одной
+выборкой столбцов из DataFrame и двумя операциями над массивом.
+
+Вычисления повторяют sklearn побитово: float64 и тот же порядок операций
+((x - mean_) / scale_ и x * scale_ + min_). Результат приводится к
+float32 — типу входа torch-моделей и XGBoost.
+
+Для torch-моделей масштабирование можно встроить в первый линейный слой
+(AffineKernel.fold_into): скейлер и слой embedding — два аффинных
+отображения подряд, и их композиция — один линейный слой, принимающий
+исходные признаки. Для бустеров XGBoost масштабирование переносится в
+пороги разбиений (src.services.xgb_thresholds). Вход таких моделей
+собирается тождественным ядром (AffineKernel.passthrough).
+"""
+
+import copy
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class ScalingLayout:
+    """Разметка входа стадии: параметры скейлера в порядке признаков модели."""
+
+    def __init__(self, kernel: 'AffineKernel', features: Sequence[str], categorical_columns: Sequence[str]):
+        """
+        Инициализация.
+
+        Args:
+            kernel: Параметры скейлера
+            features: Признаки модели в порядке обучения
+            categorical_columns: One-Hot столбцы, которые не масштабируются
+
+        Raises:
+            ValueError: Если числовые столбцы не совпадают с признаками,
+                на которых обучен скейлер
+        """
+        numeric_columns = list(np.setdiff1d(features, categorical_columns))
+        kernel.check_columns(numeric_columns)
+        position = {column: i for i, column in enumerate(numeric_columns)}
+
+        self.features = list(features)
+        # Позиции числовых столбцов в скейлере (-1 — столбец не масштабируется)
+        self.positions = np.array([position.get(column, -1) for column in self.features], dtype=np.intp)
+        self.offset, self.scale, self.bounds = kernel.expand(self.positions)
+        self.kernel = kernel
+
+    def transform(self, df: pd.DataFrame, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Собирает масштабированный вход модели.
+
+        Args:
+            df: Признаки (строка на пример)
+            out: Буфер float32 (строки x признаки) для результата
+
+        Returns:
+            np.ndarray: Вход модели float32 в порядке признаков
+        """
+        values = None
+        try:
+            # Одно приведение всей таблицы и выборка столбцов по индексам быстрее
+            # df[features]: таблицы признаков собираются по столбцу и состоят из
+            # десятков блоков
+            positions = df.columns.get_indexer(self.features)
+            if (positions >= 0).all():
+                values = df.to_numpy(dtype=np.float64)[:, positions]
+        except (TypeError, ValueError, pd.errors.InvalidIndexError):
+            pass
+        if values is None:
+            # Нечисловые или повторяющиеся столбцы, отсутствующие признаки (KeyError)
+            values = df[self.features].to_numpy(dtype=np.float64, copy=True)
+        self.kernel.apply(values, self.offset, self.scale, self.bounds)
+        return _to_float32(values, out)
+
+
+class AffineKernel:
+    """Покомпонентное аффинное масштабирование по параметрам скейлера."""
+
+    def __init__(self, scaler: Any):
+        """
+        Извлекает параметры скейлера.
+
+        Args:
+            scaler: StandardScaler или MinMaxScaler (sklearn или src.services.preprocessors)
+        """
+        self.n_features_in_ = int(scaler.n_features_in_)
+        names = getattr(scaler, 'feature_names_in_', None)
+        self.feature_names_in_ = None if names is None else [str(name) for name in names]
+        self.bounds: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+        identity = (np.zeros(self.n_features_in_), np.ones(self.n_features_in_))
+        if hasattr(scaler, 'min_'):
+            self.kind = 'minmax'
+            self.offset = np.asarray(scaler.min_, dtype=np.float64)
+            self.scale = np.asarray(scaler.scale_, dtype=np.float64)
+            if getattr(scaler, 'clip', False):
+                low, high = scaler.feature_range
+                self.bounds = (np.full(self.n_features_in_, float(low)), np.full(self.n_features_in_, float(high)))
+        else:
+            self.kind = 'standard'
+            mean = getattr(scaler, 'mean_', None) if getattr(scaler, 'with_mean', True) else None
+            scale = getattr(scaler, 'scale_', None) if getattr(scaler, 'with_std', True) else None
+            self.offset = identity[0] if mean is None else np.asarray(mean, dtype=np.float64)
+            self.scale = identity[1] if scale is None else np.asarray(scale, dtype=np.float64)
+        self._layouts: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], ScalingLayout] = {}
+        self._passthrough: Optional['AffineKernel'] = None
+        # Тождественное ядро (passthrough): apply не изменяет значения
+        self.identity = False
+
+    def check_columns(self, numeric_columns: List[str]) -> None:
+        """
+        Проверяет, что столбцы совпадают с признаками обучения скейлера.
+
+        Args:
+            numeric_columns: Масштабируемые столбцы в порядке скейлера
+
+        Raises:
+            ValueError: Если число или имена столбцов не совпадают
+        """
+        if len(numeric_columns) != self.n_features_in_:
+            raise ValueError(
+                f"Скейлер ожидает {self.n_features_in_} признаков, передано {len(numeric_columns)}"
+            )
+        if self.feature_names_in_ is not None and list(numeric_columns) != self.feature_names_in_:
+            raise ValueError("Имена признаков не совпадают с признаками обучения скейлера")
+
+    def expand(self, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, Optional[Tuple[np.ndarray, np.ndarray]]]:
+        """
+        Раскладывает параметры по столбцам.
+
+        Args:
+            positions: Позиция каждого столбца в скейлере (-1 — без масштабирования)
+
+        Returns:
+            Tuple: Сдвиг, масштаб и границы отсечения (None — без отсечения);
+                для немасштабируемых столбцов параметры тождественные
+        """
+        scaled = positions >= 0
+        offset = np.zeros(len(positions))
+        scale = np.ones(len(positions))
+        offset[scaled] = self.offset[positions[scaled]]
+        scale[scaled] = self.scale[positions[scaled]]
+        bounds = None
+        if self.bounds is not None:
+            low, high = np.full(len(positions), -np.inf), np.full(len(positions), np.inf)
+            low[scaled] = self.bounds[0][positions[scaled]]
+            high[scaled] = self.bounds[1][positions[scaled]]
+            bounds = (low, high)
+        return offset, scale, bounds
+
+    def apply(
+        self,
+        values: np.ndarray,
+        offset: np.ndarray,
+        scale: np.ndarray,
+        bounds: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    ) -> np.ndarray:
+        """
+        Масштабирует массив float64 на месте (формулы и порядок операций sklearn).
+
+        Args:
+            values: Значения (строки x столбцы), изменяются на месте
+            offset: Сдвиг по столбцам (mean_ или min_)
+            scale: Масштаб по столбцам (scale_)
+            bounds: Границы отсечения MinMaxScaler(clip=True)
+
+        Returns:
+            np.ndarray: Тот же массив values
+        """
+        if self.identity:
+            return values
+        if self.kind == 'minmax':
+            np.multiply(values, scale, out=values)
+            np.add(values, offset, out=values)
+            if bounds is not None:
+                np.clip(values, bounds[0], bounds[1], out=values)
+        else:
+            np.subtract(values, offset, out=values)
+            np.divide(values, scale, out=values)
+        return values
+
+    def transform(self, values: Any, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Масштабирует все признаки скейлера (столбцы в порядке обучения).
+
+        Args:
+            values: Значения (строки x признаки скейлера)
+            out: Буфер float32 для результата
+
+        Returns:
+            np.ndarray: Масштабированные значения float32
+        """
+        values = np.array(values, dtype=np.float64)
+        if values.shape[-1] != self.n_features_in_:
+            raise ValueError(
+                f"Скейлер ожидает {self.n_features_in_} признаков, передано {values.shape[-1]}"
+            )
+        self.apply(values, self.offset, self.scale, self.bounds)
+        return _to_float32(values, out)
+
+    def transform_columns(self, values: Any, positions: np.ndarray) -> np.ndarray:
+        """
+        Масштабирует подмножество столбцов скейлера.
+
+        Args:
+            values: Значения столбцов (строки x столбцы)
+            positions: Индексы столбцов в порядке обучения скейлера
+
+        Returns:
+            np.ndarray: Масштабированные значения float64
+        """
+        values = np.array(values, dtype=np.float64)
+        bounds = None if self.bounds is None else (self.bounds[0][positions], self.bounds[1][positions])
+        return self.apply(values, self.offset[positions], self.scale[positions], bounds)
+
+    def passthrough(self) -> 'AffineKernel':
+        """
+        Тождественное ядро с теми же признаками (для моделей со встроенным скейлером).
+
+        Разметки и проверки столбцов те же, а значения не изменяются
+        (арифметика масштабирования пропускается).
+
+        Returns:
+            AffineKernel: Ядро без масштабирования
+        """
+        if self._passthrough is None:
+            kernel = copy.copy(self)
+            kernel.kind = 'standard'
+            kernel.offset = np.zeros(self.n_features_in_)
+            kernel.scale = np.ones(self.n_features_in_)
+            kernel.bounds = None
+            kernel.identity = True
+            kernel._layouts = {}
+            kernel._passthrough = kernel
+            self._passthrough = kernel
+        return self._passthrough
+
+    def fold_into(self, linear: Any, positions: np.ndarray) -> None:
+        """
+        Встраивает масштабирование в линейный слой.
+
+        Для StandardScaler W·((x - m) / s) + b = (W / s)·x + (b - (W / s)·m),
+        для MinMaxScaler W·(x·s + m) + b = (W·s)·x + (b + W·m). Столбцы без
+        масштабирования (One-Hot) получают тождественные параметры, и их
+        веса не меняются. Новые веса рассчитываются в float64 и заменяют
+        параметры слоя (исходные тензоры могут быть отображены из файла
+        только для чтения).
+
+        Args:
+            linear: Слой torch.nn.Linear, принимающий масштабированные признаки
+            positions: Позиция каждого входа слоя в скейлере (-1 — без масштабирования)
+
+        Raises:
+            ValueError: Если скейлер отсекает значения (MinMaxScaler(clip=True))
+                или число входов слоя не совпадает с разметкой
+        """
+        import torch
+
+        if self.bounds is not None:
+            raise ValueError("Масштабирование с отсечением (clip=True) нельзя встроить в линейный слой")
+        if linear.in_features != len(positions):
+            raise ValueError(f"Слой принимает {linear.in_features} признаков, разметка — {len(positions)}")
+
+        offset, scale, _ = self.expand(positions)
+        weight = linear.weight.detach().cpu().double().numpy()
+        bias = (
+            linear.bias.detach().cpu().double().numpy()
+            if linear.bias is not None else np.zeros(linear.out_features)
+        )
+        if self.kind == 'minmax':
+            folded_weight = weight * scale
+            folded_bias = bias + weight @ offset
+        else:
+            folded_weight = weight / scale
+            folded_bias = bias - folded_weight @ offset
+
+        device, dtype = linear.weight.device, linear.weight.dtype
+        requires_grad = linear.weight.requires_grad
+        linear.weight = torch.nn.Parameter(
+            torch.from_numpy(folded_weight).to(device=device, dtype=dtype), requires_grad=requires_grad
+        )
+        linear.bias = torch.nn.Parameter(
+            torch.from_numpy(folded_bias).to(device=device, dtype=dtype), requires_grad=requires_grad
+        )
+
+    def layout(self, features: Sequence[str], categorical_columns: Sequence[str]) -> ScalingLayout:
+        """
+        Возвращает разметку входа стадии (строится один раз).
+
+        Args:
+            features: Признаки модели в порядке обучения
+            categorical_columns: One-Hot столбцы, которые не масштабируются
+
+        Returns:
+            ScalingLayout: Разметка
+        """
+        key = (tuple(features), tuple(categorical_columns))
+        layout = self._layouts.get(key)
+        if layout is None:
+            layout = self._layouts[key] = ScalingLayout(self, features, categorical_columns)
+        return layout
+
+
+def _to_float32(values: np.ndarray, out: Optional[np.ndarray]) -> np.ndarray:
+    """Приводит результат к float32 (в буфер out, если он передан)."""
+    if out is None:
+        return values.astype(np.float32)
+    np.copyto(out, values, casting='same_kind')
+    return out
@@ -0,0 +1,197 @@
+"""
+Анализ чувствительности рекомендаций к входным параметрам.
+
+Один или два из пяти входных параметров run_full_prediction изменяются по
+сетке при фиксированных остальных. Все точки сетки рассчитываются одним
+пакетным прогоном конвейера (PredictorService.run_batch_prediction), а
+результат сводится в таблицу для построения кривых и тепловых карт.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.config.model_config import CALCULATION_CONSTANTS
+from src.domain.constants import INPUT_RANGES, SME_TO_SBAT_FRACTION_RANGE, WS_TO_W0_RATIO_RANGE
+
+logger = logging.getLogger(__name__)
+
+# Входные параметры конвейера и их подписи
+SWEEP_PARAMETERS = {
+    'SBAT_m2_gr': 'SБЭТ, м²/г',
+    'a0_mmoll_gr': 'а₀, ммоль/г',
+    'E_kDg_moll': 'E (азот), кДж/моль',
+    'Ws_cm3_gr': 'Ws, см³/г',
+    'Sme_m2_gr': 'Sme, м²/г',
+}
+
+# Категориальные результаты конвейера
+CATEGORICAL_OUTPUTS = {
+    'metal': 'Металл',
+    'ligand': 'Лиганд',
+    'solvent': 'Растворитель',
+}
+
+# Числовые результаты конвейера (массы, объем и температуры)
+NUMERIC_OUTPUTS = {
+    'salt_mass': 'm (соли), г',
+    'acid_mass': 'm(кис-ты), г',
+    'synthesis_volume': 'Vсин. (р-ля), мл',
+    'tsyn': 'Т.син., °С',
+    'tdry': 'Т суш., °С',
+    'treg': 'Tрег, ᵒС',
+}
+
+SWEEP_OUTPUTS = {**CATEGORICAL_OUTPUTS, **NUMERIC_OUTPUTS}
+
+# Максимальное число точек сетки
+MAX_SWEEP_POINTS = 10000
+
+
+def default_sweep_range(parameter: str, base_point: Dict[str, float]) -> Tuple[float, float]:
+    """
+    Возвращает диапазон изменения параметра по умолчанию.
+
+    SБЭТ, а₀ и E берутся из рабочих диапазонов формы; Ws и Sme — относительно
+    W₀ и SБЭТ базовой точки, как в sample_input_grid.
+
+    Args:
+        parameter: Имя параметра (ключ SWEEP_PARAMETERS)
+        base_point: Базовая точка
+
+    Returns:
+        Tuple[float, float]: Нижняя и верхняя границы
+    """
+    if parameter in INPUT_RANGES:
+        return INPUT_RANGES[parameter]
+    if parameter == 'Ws_cm3_gr':
+        w0 = CALCULATION_CONSTANTS['micropore_volume_factor'] * base_point['a0_mmoll_gr']
+        return (w0 * WS_TO_W0_RATIO_RANGE[0], w0 * WS_TO_W0_RATIO_RANGE[1])
+    if parameter == 'Sme_m2_gr':
+        sbat = base_point['SBAT_m2_gr']
+        return (sbat * SME_TO_SBAT_FRACTION_RANGE[0], sbat * SME_TO_SBAT_FRACTION_RANGE[1])
+    raise ValueError(f"Неизвестный параметр: {parameter}")
+
+
+def build_sweep_grid(
+    base_point: Dict[str, float],
+    x_parameter: str,
+    x_range: Tuple[float, float],
+    x_points: int,
+    y_parameter: Optional[str] = None,
+    y_range: Optional[Tuple[float, float]] = None,
+    y_points: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Формирует сетку входных точек.
+
+    Args:
+        base_point: Базовая точка (значения всех пяти параметров)
+        x_parameter: Первый изменяемый параметр
+        x_range: Диапазон первого параметра
+        x_points: Число значений первого параметра
+        y_parameter: Второй изменяемый параметр (None — одномерная развертка)
+        y_range: Диапазон второго параметра
+        y_points: Число значений второго параметра
+
+    Returns:
+        pd.DataFrame: Входные точки (столбцы — параметры SWEEP_PARAMETERS)
+    """
+    for parameter in (x_parameter, y_parameter):
+        if parameter is not None and parameter not in SWEEP_PARAMETERS:
+            raise ValueError(f"Неизвестный параметр: {parameter}")
+    if y_parameter == x_parameter:
+        raise ValueError("Параметры развертки должны различаться")
+
+    x_values = np.linspace(x_range[0], x_range[1], x_points)
+    if y_parameter is None:
+        grid = {x_parameter: x_values}
+    else:
+        y_values = np.linspace(y_range[0], y_range[1], y_points)
+        xx, yy = np.meshgrid(x_values, y_values)
+        grid = {x_parameter: xx.ravel(), y_parameter: yy.ravel()}
+
+    n_points = len(grid[x_parameter])
+    if n_points > MAX_SWEEP_POINTS:
+        raise ValueError(f"Слишком много точек сетки: {n_points} (максимум {MAX_SWEEP_POINTS})")
+
+    return pd.DataFrame({
+        parameter: grid.get(parameter, np.full(n_points, float(base_point[parameter])))
+        for parameter in SWEEP_PARAMETERS
+    })
+
+
+def results_to_frame(results: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Сводит результаты конвейера в таблицу: значение и уверенность для каждого выхода.
+
+    Args:
+        results: Результаты в формате run_full_prediction
+
+    Returns:
+        pd.DataFrame: Строка на точку; столбцы — ключи SWEEP_OUTPUTS и
+            <ключ>_confidence для классификаторов
+    """
+    rows = []
+    for result in results:
+        rows.append({
+            'metal': result['metal']['metal_type'],
+            'metal_confidence': float(result['metal']['confidence']),
+            'ligand': result['ligand']['ligand_type'],
+            'ligand_confidence': float(result['ligand']['confidence']),
+            'solvent': result['solvent']['solvent_type'],
+            'solvent_confidence': float(result['solvent']['confidence']),
+            'salt_mass': result['salt_mass'],
+            'acid_mass': result['acid_mass'],
+            'synthesis_volume': result['synthesis_volume'],
+            'tsyn': float(result['tsyn']['temperature']),
+            'tsyn_confidence': result['tsyn']['confidence'],
+            'tdry': float(result['tdry']['temperature']),
+            'tdry_confidence': result['tdry']['confidence'],
+            'treg': float(result['treg']['temperature']),
+            'treg_confidence': result['treg']['confidence'],
+        })
+    return pd.DataFrame(rows)
+
+
+def run_sweep(
+    predictor: Any,
+    base_point: Dict[str, float],
+    x_parameter: str,
+    x_range: Optional[Tuple[float, float]] = None,
+    x_points: int = 50,
+    y_parameter: Optional[str] = None,
+    y_range: Optional[Tuple[float, float]] = None,
+    y_points: int = 30
+) -> pd.DataFrame:
+    """
+    Рассчитывает рекомендации конвейера на сетке вокруг базовой точки.
+
+    Args:
+        predictor: Экземпляр PredictorService
+        base_point: Базовая точка (значения всех пяти параметров)
+        x_parameter: Первый изменяемый параметр
+        x_range: Диапазон первого параметра (None — default_sweep_range)
+        x_points: Число значений первого параметра
+        y_parameter: Второй изменяемый параметр (None — одномерная развертка)
+        y_range: Диапазон второго параметра (None — default_sweep_range)
+        y_points: Число значений второго параметра
+
+    Returns:
+        pd.DataFrame: Входные параметры и результаты (results_to_frame) для каждой точки
+    """
+    x_range = x_range or default_sweep_range(x_parameter, base_point)
+    if y_parameter is not None:
+        y_range = y_range or default_sweep_range(y_parameter, base_point)
+
+    grid = build_sweep_grid(base_point, x_parameter, x_range, x_points, y_parameter, y_range, y_points)
+
+    start = time.perf_counter()
+    results = predictor.run_batch_prediction(grid)
+    logger.info(f"Развертка {x_parameter}" + (f" x {y_parameter}" if y_parameter else "") +
+                f": {len(grid)} точек за {(time.perf_counter() - start) * 1000:.0f} мс")
+
+    return pd.concat([grid, results_to_frame(results)], axis=1)
@@ -0,0 +1,66 @@
+"""
+Оценка неопределенности классификаторов методом Monte Carlo dropout.
+
+Для каждой точки классификатор выполняет T стохастических проходов с
+активным dropout (см. ModelService.get_mc_dropout_model). По выборке
+вероятностей p_t (t = 1..T) рассчитываются:
+    - предсказательное среднее p̄ = mean_t p_t и наиболее вероятный класс;
+    - полная энтропия H[p̄] (неопределенность предсказания в целом);
+    - ожидаемая энтропия E_t H[p_t] (шум данных, алеаторная часть);
+    - взаимная информация H[p̄] - E_t H[p_t] (неуверенность модели,
+      эпистемическая часть).
+Энтропия измеряется в натах.
+"""
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+# Классификаторы, для которых оценивается неопределенность (ключи результата)
+UNCERTAINTY_OUTPUTS = ('metal', 'tsyn', 'tdry', 'treg')
+
+
+def entropy(probs: np.ndarray) -> np.ndarray:
+    """
+    Энтропия распределений по последней оси.
+
+    Args:
+        probs: Вероятности классов (..., C)
+
+    Returns:
+        np.ndarray: Энтропия (...), наты
+    """
+    return -np.sum(probs * np.log(np.clip(probs, 1e-12, 1.0)), axis=-1)
+
+
+def summarize_samples(samples: np.ndarray, classes: Sequence[Any]) -> List[Dict[str, Any]]:
+    """
+    Сводит выборку стохастических предсказаний в оценки неопределенности.
+
+    Args:
+        samples: Вероятности классов по проходам (T, n, C)
+        classes: Имена классов (C)
+
+    Returns:
+        List[Dict[str, Any]]: Для каждой из n точек: класс по среднему,
+            его вероятность, все средние вероятности, полная и ожидаемая
+            энтропия, взаимная информация и число проходов
+    """
+    mean = samples.mean(axis=0)
+    total = entropy(mean)
+    expected = entropy(samples).mean(axis=0)
+    mutual_information = np.maximum(total - expected, 0.0)
+    predicted = np.argmax(mean, axis=1)
+
+    return [
+        {
+            'prediction': classes[predicted[i]],
+            'mean_probability': float(mean[i, predicted[i]]),
+            'probabilities': {str(cls): float(prob) for cls, prob in zip(classes, mean[i])},
+            'entropy': float(total[i]),
+            'expected_entropy': float(expected[i]),
+            'mutual_information': float(mutual_information[i]),
+            'samples': int(samples.shape[0])
+        }
+        for i in range(samples.shape[1])
+    ]
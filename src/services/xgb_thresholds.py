@@ -0,0 +1,488 @@
+"""
+Бустеры XGBoost с порогами разбиений в исходных единицах признаков.
+
+Стадии XGBoost (лиганд, растворитель, массы соли и кислоты, объем)
+масштабируют числовые признаки перед predict. Масштабирование
+покомпонентное и неубывающее, поэтому разбиение x_s < t по
+масштабированному признаку равносильно разбиению x < r по исходному
+значению. Компиляция переписывает пороги каждого бустера и записывает
+рядом с исходным файлом <имя>.raw.json. Атрибуты бустера хранят имя
+встроенного скейлера (folded_scaler) и SHA-256 исходного бустера и пикла
+скейлера; вход такой модели собирается без масштабирования
+(ModelService.get_input_kernel). ModelService загружает скомпилированный
+бустер, только если загрузка включена (ADSORPNET_RAW_THRESHOLDS=1, по
+умолчанию выключена) и оба SHA-256 совпадают с текущими файлами.
+
+Граница R — наименьшее число float64, масштабированное значение которого
+(та же арифметика, что в src.services.scaling, с приведением к float32)
+не меньше t; она находится двоичным поиском. XGBoost приводит вход к
+float32, поэтому порог в файле — R, округленная до float32: все входы
+x >= R (в том числе значения признаков из обучающих данных, на которых
+XGBoost ставит пороги) идут по разбиению так же, как раньше. Расхождение
+возможно только для x < R, которые округляются к тому же числу float32,
+то есть отстоят от R меньше чем на полшага float32. Проверка для каждого
+порога доказывает, что R — граница, и сверяет округление.
+
+Пример:
+    python -m src.services.xgb_thresholds            # компиляция бустеров saved_models/
+    python -m src.services.xgb_thresholds --verify   # проверка скомпилированных файлов
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.config import MODELS_DIR, SCALERS_DIR
+from src.services.scaling import AffineKernel
+from src.utils.storage.digests import file_sha256
+
+logger = logging.getLogger(__name__)
+
+RAW_SUFFIX = '.raw.json'
+FOLDED_SCALER_ATTR = 'folded_scaler'
+SOURCE_DIGEST_ATTR = 'source_sha256'
+SCALER_DIGEST_ATTR = 'scaler_sha256'
+
+# Целые типы и маски битов для порядковых номеров чисел с плавающей точкой
+_KEY_TYPES = {
+    np.dtype(np.float32): (np.int32, np.uint32, 0x7FFFFFFF, 1 << 31),
+    np.dtype(np.float64): (np.int64, np.uint64, 0x7FFFFFFFFFFFFFFF, 1 << 63),
+}
+# Порядковый номер наибольшего конечного числа float32
+_MAX_KEY = int(np.array(np.finfo(np.float32).max, dtype=np.float32).view(np.int32))
+
+
+def _to_keys(values: np.ndarray, dtype: Any = np.float32) -> np.ndarray:
+    """Порядковые номера чисел: соседние числа типа dtype имеют соседние номера (-0 и +0 — номер 0)."""
+    signed, _, mask, _ = _KEY_TYPES[np.dtype(dtype)]
+    bits = np.asarray(values, dtype=dtype).view(signed).astype(np.int64)
+    return np.where(bits < 0, -(bits & mask), bits)
+
+
+def _from_keys(keys: np.ndarray, dtype: Any = np.float32) -> np.ndarray:
+    """Числа типа dtype по порядковым номерам (обратное к _to_keys)."""
+    _, unsigned, _, sign = _KEY_TYPES[np.dtype(dtype)]
+    keys = np.asarray(keys, dtype=np.int64)
+    bits = np.where(keys < 0, np.abs(keys).astype(unsigned) | unsigned(sign), keys.astype(unsigned))
+    return bits.view(dtype)
+
+
+def _scaled(kernel: AffineKernel, position: int, values: np.ndarray) -> np.ndarray:
+    """Масштабированные значения одного столбца в float32 (как на входе модели)."""
+    column = np.asarray(values, dtype=np.float64)[:, None]
+    return kernel.transform_columns(column, np.array([position], dtype=np.intp))[:, 0].astype(np.float32)
+
+
+def _search(
+    kernel: AffineKernel,
+    position: int,
+    thresholds: np.ndarray,
+    low: np.ndarray,
+    high: np.ndarray,
+    dtype: Any
+) -> np.ndarray:
+    """
+    Двоичный поиск наименьшего числа, масштабированное значение которого не меньше порога.
+
+    Инвариант: масштабированное число с номером low < t, с номером high >= t.
+
+    Returns:
+        np.ndarray: Порядковые номера найденных чисел типа dtype
+    """
+    while np.any(high - low > 1):
+        middle = low + (high - low) // 2
+        above = _scaled(kernel, position, _from_keys(middle, dtype)) >= thresholds
+        high = np.where(above, middle, high)
+        low = np.where(above, low, middle)
+    return high
+
+
+def raw_boundaries(kernel: AffineKernel, position: int, thresholds: np.ndarray) -> np.ndarray:
+    """
+    Границы разбиений в исходных единицах (float64).
+
+    Масштабирование неубывающее, поэтому масштабированное x < t тогда и
+    только тогда, когда x < R, где R — наименьшее число float64, для
+    которого масштабированное значение (в float32) не меньше t.
+
+    Args:
+        kernel: Ядро масштабирования стадии
+        position: Позиция признака в скейлере
+        thresholds: Пороги float32 по масштабированному признаку
+
+    Returns:
+        np.ndarray: Границы R (float64)
+
+    Raises:
+        ValueError: Если масштаб признака не положителен или порог
+            недостижим для конечных чисел float32
+    """
+    if not kernel.scale[position] > 0:
+        raise ValueError(f"Масштаб признака {position} не положителен: разбиение нельзя перенести")
+
+    thresholds = np.asarray(thresholds, dtype=np.float32)
+    # Сначала ближайшее сверху число float32 (границы поиска — -inf и +inf),
+    # затем граница float64 между ним и предыдущим числом float32
+    upper = _search(
+        kernel, position, thresholds,
+        np.full(len(thresholds), -_MAX_KEY - 1, dtype=np.int64),
+        np.full(len(thresholds), _MAX_KEY + 1, dtype=np.int64),
+        np.float32
+    )
+    if np.any(upper > _MAX_KEY):
+        raise ValueError(f"Порог признака {position} недостижим для конечных чисел float32")
+    boundaries = _search(
+        kernel, position, thresholds,
+        _to_keys(_from_keys(upper - 1).astype(np.float64), np.float64),
+        _to_keys(_from_keys(upper).astype(np.float64), np.float64),
+        np.float64
+    )
+    return _from_keys(boundaries, np.float64)
+
+
+def raw_thresholds(kernel: AffineKernel, position: int, thresholds: np.ndarray) -> np.ndarray:
+    """
+    Переводит пороги разбиений по масштабированному признаку в исходные единицы.
+
+    Порог — граница R (raw_boundaries), округленная до float32 так же, как
+    XGBoost округляет вход float64. Все входы x >= R идут по разбиению так
+    же, как раньше; расхождение возможно только для x < R, которые
+    округляются к тому же числу float32 (меньше полушага float32 от R).
+
+    Args:
+        kernel: Ядро масштабирования стадии
+        position: Позиция признака в скейлере
+        thresholds: Пороги float32 по масштабированному признаку
+
+    Returns:
+        np.ndarray: Пороги float32 в исходных единицах
+
+    Raises:
+        ValueError: Если масштаб признака не положителен или порог
+            недостижим для конечных чисел float32
+    """
+    return raw_boundaries(kernel, position, thresholds).astype(np.float32)
+
+
+def check_thresholds(
+    kernel: AffineKernel,
+    position: int,
+    thresholds: np.ndarray,
+    raw: np.ndarray
+) -> np.ndarray:
+    """
+    Проверяет пороги в исходных единицах.
+
+    Для каждой границы R проверяется, что масштабированное R >= t, а
+    предыдущего числа float64 — < t (для неубывающего масштабирования это
+    доказывает, что R — граница), и что порог равен R, округленной до float32.
+
+    Args:
+        kernel: Ядро масштабирования стадии
+        position: Позиция признака в скейлере
+        thresholds: Пороги float32 по масштабированному признаку
+        raw: Пороги float32 в исходных единицах
+
+    Returns:
+        np.ndarray: Признак корректности каждого порога
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float32)
+    boundaries = raw_boundaries(kernel, position, thresholds)
+    previous = _from_keys(_to_keys(boundaries, np.float64) - 1, np.float64)
+    return (
+        np.isfinite(boundaries)
+        & (_scaled(kernel, position, boundaries) >= thresholds)
+        & (_scaled(kernel, position, previous) < thresholds)
+        & (boundaries.astype(np.float32).view(np.int32) == np.asarray(raw, dtype=np.float32).view(np.int32))
+    )
+
+
+def _model_json(booster: Any) -> Dict[str, Any]:
+    """Модель бустера в виде JSON."""
+    return json.loads(bytes(booster.save_raw(raw_format='json')))
+
+
+def _trees(model: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Деревья модели gbtree.
+
+    Raises:
+        ValueError: Если бустер не gbtree
+    """
+    booster = model['learner']['gradient_booster']
+    if booster['name'] != 'gbtree':
+        raise ValueError(f"Поддерживаются только бустеры gbtree, получен {booster['name']}")
+    return booster['model']['trees']
+
+
+def _scaled_splits(
+    trees: List[Dict[str, Any]],
+    positions: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Разбиения всех деревьев по масштабированным признакам.
+
+    Args:
+        trees: Деревья модели
+        positions: Позиция каждого признака бустера в скейлере (-1 — без масштабирования)
+
+    Returns:
+        Tuple: Номер дерева, номер узла, позиция признака в скейлере и порог float32
+    """
+    tree_ids, node_ids, split_positions, thresholds = [], [], [], []
+    for index, tree in enumerate(trees):
+        features = np.asarray(tree['split_indices'], dtype=np.intp)
+        numerical = (np.asarray(tree['left_children']) != -1) & (np.asarray(tree['split_type']) == 0)
+        nodes = np.flatnonzero(numerical & (positions[features] >= 0))
+        tree_ids.append(np.full(len(nodes), index, dtype=np.intp))
+        node_ids.append(nodes)
+        split_positions.append(positions[features[nodes]])
+        thresholds.append(np.asarray(tree['split_conditions'], dtype=np.float32)[nodes])
+    return (
+        np.concatenate(tree_ids), np.concatenate(node_ids),
+        np.concatenate(split_positions), np.concatenate(thresholds)
+    )
+
+
+def split_thresholds(booster: Any, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Пороги бустера по масштабируемым признакам.
+
+    Args:
+        booster: Бустер XGBoost
+        positions: Позиция каждого признака бустера в скейлере (-1 — One-Hot)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Позиция признака в скейлере и порог
+            float32 для каждого разбиения
+    """
+    _, _, split_positions, thresholds = _scaled_splits(_trees(_model_json(booster)), positions)
+    return split_positions, thresholds
+
+
+def compile_booster(booster: Any, kernel: AffineKernel, positions: np.ndarray, scaler_name: str) -> Any:
+    """
+    Переводит пороги бустера в исходные единицы признаков.
+
+    Args:
+        booster: Бустер, обученный на масштабированных признаках
+        kernel: Ядро масштабирования стадии
+        positions: Позиция каждого признака бустера в скейлере (-1 — One-Hot)
+        scaler_name: Имя скейлера (сохраняется в атрибуте folded_scaler)
+
+    Returns:
+        xgb.Booster: Бустер, принимающий исходные признаки
+    """
+    import xgboost as xgb
+
+    model = _model_json(booster)
+    trees = _trees(model)
+    tree_ids, node_ids, split_positions, thresholds = _scaled_splits(trees, positions)
+
+    raw = np.empty_like(thresholds)
+    for position in np.unique(split_positions):
+        mask = split_positions == position
+        raw[mask] = raw_thresholds(kernel, int(position), thresholds[mask])
+    for tree, node, value in zip(tree_ids, node_ids, raw):
+        trees[tree]['split_conditions'][node] = float(value)
+
+    model['learner']['attributes'][FOLDED_SCALER_ATTR] = scaler_name
+    compiled = xgb.Booster()
+    # Имена признаков (кириллица) записываются без экранирования: XGBoost не
+    # раскрывает последовательности \uXXXX
+    compiled.load_model(bytearray(json.dumps(model, ensure_ascii=False).encode('utf-8')))
+    return compiled
+
+
+def verify_booster(source: Any, compiled: Any, kernel: AffineKernel, positions: np.ndarray) -> Dict[str, Any]:
+    """
+    Сверяет скомпилированный бустер с исходным.
+
+    Структура деревьев, значения листьев и пороги по One-Hot признакам
+    должны совпадать побитово, а каждый перенесенный порог — проходить
+    check_thresholds.
+
+    Args:
+        source: Исходный бустер
+        compiled: Скомпилированный бустер
+        kernel: Ядро масштабирования стадии
+        positions: Позиция каждого признака бустера в скейлере (-1 — One-Hot)
+
+    Returns:
+        Dict[str, Any]: Число перенесенных порогов (splits), число ошибочных
+            (failed), совпадение остальной модели (structure) и ok
+    """
+    source_model, compiled_model = _model_json(source), _model_json(compiled)
+    source_trees, compiled_trees = _trees(source_model), _trees(compiled_model)
+    tree_ids, node_ids, split_positions, thresholds = _scaled_splits(source_trees, positions)
+
+    scaled = {(int(tree), int(node)) for tree, node in zip(tree_ids, node_ids)}
+    structure = len(source_trees) == len(compiled_trees) and source.feature_names == compiled.feature_names
+    for index, (expected, actual) in enumerate(zip(source_trees, compiled_trees)):
+        expected_conditions = np.asarray(expected.pop('split_conditions'), dtype=np.float32)
+        actual_conditions = np.asarray(actual['split_conditions'], dtype=np.float32)
+        rest = {key: value for key, value in actual.items() if key != 'split_conditions'}
+        kept = np.array(
+            [node for node in range(len(expected_conditions)) if (index, node) not in scaled], dtype=np.intp
+        )
+        # Листья и пороги по One-Hot признакам сравниваются побитово
+        structure &= (
+            expected == rest
+            and expected_conditions.shape == actual_conditions.shape
+            and np.array_equal(expected_conditions[kept].view(np.int32), actual_conditions[kept].view(np.int32))
+        )
+    source_model['learner'].pop('attributes')
+    compiled_model['learner'].pop('attributes')
+    source_model['learner']['gradient_booster']['model'].pop('trees')
+    compiled_model['learner']['gradient_booster']['model'].pop('trees')
+    structure &= source_model == compiled_model
+
+    failed = 0
+    if structure:
+        raw = np.array([compiled_trees[tree]['split_conditions'][node] for tree, node in zip(tree_ids, node_ids)],
+                       dtype=np.float32)
+        for position in np.unique(split_positions):
+            mask = split_positions == position
+            failed += int(np.sum(~check_thresholds(kernel, int(position), thresholds[mask], raw[mask])))
+    return {
+        'splits': len(thresholds), 'failed': failed, 'structure': bool(structure),
+        'ok': bool(structure) and failed == 0
+    }
+
+
+def raw_model_path(model_path: Union[str, Path]) -> Path:
+    """Путь к бустеру с порогами в исходных единицах."""
+    return Path(model_path).with_suffix(RAW_SUFFIX)
+
+
+def scaler_path(scaler_name: str) -> Path:
+    """Путь к пиклу скейлера, встроенного в пороги бустера."""
+    return SCALERS_DIR / f"scaler_{scaler_name}.pkl"
+
+
+def stage_inputs(model_name: str) -> Tuple[str, AffineKernel, np.ndarray]:
+    """
+    Скейлер стадии и позиции признаков бустера в нем.
+
+    Args:
+        model_name: Имя модели XGBoost (ключ XGB_MODEL_INPUTS)
+
+    Returns:
+        Tuple[str, AffineKernel, np.ndarray]: Имя скейлера, ядро и позиции
+            (-1 — One-Hot столбец)
+    """
+    from src.services.model_service import XGB_MODEL_INPUTS
+    from src.services.preprocessors import load_artifact
+
+    scaler_name, features, categorical_columns = XGB_MODEL_INPUTS[model_name]
+    kernel = AffineKernel(load_artifact(scaler_path(scaler_name)))
+    return scaler_name, kernel, kernel.layout(features, categorical_columns).positions
+
+
+def load_booster(path: Union[str, Path]) -> Any:
+    """Загружает бустер XGBoost из файла."""
+    import xgboost as xgb
+
+    booster = xgb.Booster()
+    booster.load_model(path)
+    return booster
+
+
+def compile_model(model_name: str, models_dir: Union[str, Path] = MODELS_DIR) -> Dict[str, Any]:
+    """
+    Компилирует бустер модели и записывает его рядом с исходным.
+
+    Args:
+        model_name: Имя модели XGBoost
+        models_dir: Каталог с бустерами
+
+    Returns:
+        Dict[str, Any]: Путь к новому файлу и результат verify_model
+
+    Raises:
+        ValueError: Если признаки бустера не совпадают с признаками стадии
+    """
+    from src.services.model_service import XGB_MODEL_FILES, XGB_MODEL_INPUTS
+
+    source = Path(models_dir) / XGB_MODEL_FILES[model_name]
+    booster = load_booster(source)
+    if booster.feature_names != list(XGB_MODEL_INPUTS[model_name][1]):
+        raise ValueError(f"Признаки бустера {source.name} не совпадают с признаками стадии {model_name}")
+
+    scaler_name, kernel, positions = stage_inputs(model_name)
+    compiled = compile_booster(booster, kernel, positions, scaler_name)
+    compiled.set_attr(**{
+        SOURCE_DIGEST_ATTR: file_sha256(source),
+        SCALER_DIGEST_ATTR: file_sha256(scaler_path(scaler_name)),
+    })
+    target = raw_model_path(source)
+    compiled.save_model(str(target))
+    logger.info(f"Бустер {source.name} -> {target.name}")
+    return {'path': str(target), **verify_model(model_name, models_dir)}
+
+
+def verify_model(model_name: str, models_dir: Union[str, Path] = MODELS_DIR) -> Dict[str, Any]:
+    """
+    Сверяет скомпилированный файл модели с исходным бустером.
+
+    Args:
+        model_name: Имя модели XGBoost
+        models_dir: Каталог с бустерами
+
+    Returns:
+        Dict[str, Any]: Результат verify_booster, признаки exists (файл есть)
+            и source (исходный бустер и скейлер не изменились после компиляции)
+    """
+    from src.services.model_service import XGB_MODEL_FILES
+
+    source = Path(models_dir) / XGB_MODEL_FILES[model_name]
+    target = raw_model_path(source)
+    if not target.exists():
+        return {'exists': False, 'source': False, 'splits': 0, 'failed': 0, 'structure': False, 'ok': False}
+
+    compiled = load_booster(target)
+    scaler_name, kernel, positions = stage_inputs(model_name)
+    result = verify_booster(load_booster(source), compiled, kernel, positions)
+    source_ok = (
+        compiled.attr(SOURCE_DIGEST_ATTR) == file_sha256(source)
+        and compiled.attr(SCALER_DIGEST_ATTR) == file_sha256(scaler_path(scaler_name))
+    )
+    scaler_ok = compiled.attr(FOLDED_SCALER_ATTR) == scaler_name
+    return {
+        'exists': True, 'source': source_ok, **result,
+        'ok': result['ok'] and source_ok and scaler_ok
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Перевод порогов бустеров XGBoost в исходные единицы признаков")
+    parser.add_argument('--models-dir', default=str(MODELS_DIR), help="Каталог с бустерами")
+    parser.add_argument('--verify', action='store_true', help="Только проверить скомпилированные файлы")
+    args = parser.parse_args(argv)
+
+    from src.services.model_service import XGB_MODEL_FILES
+
+    failed = compiled = 0
+    for model_name, file_name in XGB_MODEL_FILES.items():
+        if not (Path(args.models_dir) / file_name).exists():
+            logger.warning(f"{file_name}: файл не найден, модель {model_name} пропущена")
+            continue
+        result = verify_model(model_name, args.models_dir) if args.verify else compile_model(model_name, args.models_dir)
+        compiled += 1
+        failed += not result['ok']
+        logger.info(
+            f"{model_name}: {'ok' if result['ok'] else 'ошибка'} (файл: {result['exists']}, "
+            f"исходный бустер: {result['source']}, структура: {result['structure']}, "
+            f"порогов: {result['splits']}, ошибочных: {result['failed']})"
+        )
+    return 1 if failed or not compiled else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
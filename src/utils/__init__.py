@@ -2,49 +2,52 @@
 """
 Пакет утилит проекта AdsorpNET.
 Содержит вспомогательные модули, сгруппированные по назначению.
-"""
-
-# Импорты из подмодулей UI
-from .ui.messages import (
-    show_success_message, 
-    show_info_message, 
-    show_warning_message, 
-    show_error_message
-)
-from .ui.page_config import load_theme_css, load_user_preferences
-
-# Импорты из подмодулей обработки данных
-from .data.feature_generation import (
-    safe_generate_features, 
-    safe_generate_solvent_features
-)
-from .data.data_processing import (
-    validate_input_parameters,
-    calculate_derived_parameters,
-    normalize_features,
-    prepare_features
-)
 
-# Импорты из подмодулей производительности
-from .performance.batch_processing import BatchProcessor
-from .performance.cuda_optimization import CUDAOptimizer
-from .performance.profiling import ModelProfiler
-from .performance.pruning import ModelPruner
-from .performance.quantization import ModelQuantizer
+Имена пакета загружаются лениво (PEP 562): подмодуль импортируется при первом
+обращении к атрибуту, поэтому импорт легких утилит (UI, кэш) не тянет за собой
+torch, RDKit и другие тяжелые зависимости.
+"""
 
-# Импорты из подмодулей хранения
-from .storage.cache import create_cache_key, cached_prediction, clear_prediction_cache
+from .lazy import make_lazy_module
 
-__all__ = [
+# Имя атрибута -> подмодуль, в котором он определен
+_LAZY_ATTRS = {
     # UI
-    'show_success_message', 'show_info_message', 'show_warning_message', 'show_error_message',
-    'load_theme_css', 'load_user_preferences',
+    'show_success_message': '.ui.messages',
+    'show_info_message': '.ui.messages',
+    'show_warning_message': '.ui.messages',
+    'show_error_message': '.ui.messages',
+    'load_theme_css': '.ui.page_config',
+    'load_user_preferences': '.ui.page_config',
     # Data
-    'validate_input_parameters', 'calculate_derived_parameters', 
-    'normalize_features', 'prepare_features',
-    'safe_generate_features', 'safe_generate_solvent_features',
+    'safe_generate_features': '.data.feature_generation',
+    'safe_generate_solvent_features': '.data.feature_generation',
+    'validate_input_parameters': '.data.data_processing',
+    'calculate_derived_parameters': '.data.data_processing',
+    'normalize_features': '.data.data_processing',
+    'prepare_features': '.data.data_processing',
     # Performance
-    'BatchProcessor', 'CUDAOptimizer', 'ModelProfiler', 'ModelPruner', 'ModelQuantizer',
+    'BatchProcessor': '.performance.batch_processing',
+    'CUDAOptimizer': '.performance.cuda_optimization',
+    'ModelProfiler': '.performance.profiling',
+    'ModelPruner': '.performance.pruning',
+    'ModelQuantizer': '.performance.quantization',
+    'LatencyTracker': '.performance.instrumentation',
+    'latency_tracker': '.performance.instrumentation',
+    'metrics_registry': '.performance.metrics',
+    'start_metrics_server': '.performance.metrics',
+    'write_metrics_textfile': '.performance.metrics',
     # Storage
-    'create_cache_key', 'cached_prediction', 'clear_prediction_cache'
-]
\ No newline at end of file
+    'create_cache_key': '.storage.cache',
+    'quantize_inputs': '.storage.cache',
+    'cached_prediction': '.storage.cache',
+    'store_prediction': '.storage.cache',
+    'clear_prediction_cache': '.storage.cache',
+    'get_cache_stats': '.storage.cache',
+    'file_sha256': '.storage.digests',
+    'matches_source': '.storage.digests',
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+__getattr__, __dir__ = make_lazy_module(_LAZY_ATTRS, __name__)
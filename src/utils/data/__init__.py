@@ -9,11 +9,13 @@ from .data_processing import (
     calculate_derived_parameters,
     normalize_features,
     prepare_features,
-    process_model_output
+    process_model_output,
+    sample_input_grid
 )
 
 __all__ = [
     'safe_generate_features', 'safe_generate_solvent_features',
     'validate_input_parameters', 'calculate_derived_parameters',
-    'normalize_features', 'prepare_features', 'process_model_output'
+    'normalize_features', 'prepare_features', 'process_model_output',
+    'sample_input_grid'
 ]
\ No newline at end of file
@@ -1,7 +1,8 @@
 import numpy as np
 import pandas as pd
-from typing import Dict, Any, Union, Tuple
+from typing import Dict, Any, List, Union, Tuple
 from ...config import CALCULATION_CONSTANTS, VALIDATION_RULES
+from ...domain.constants import INPUT_RANGES, WS_TO_W0_RATIO_RANGE, SME_TO_SBAT_FRACTION_RANGE
 import logging
 
 logger = logging.getLogger(__name__)
@@ -68,6 +69,39 @@ def calculate_derived_parameters(
         'Wme_cm3_gr': Wme_cm3_gr
     }
 
+def sample_input_grid(n: int, seed: int = 0) -> List[Dict[str, float]]:
+    """
+    Формирует воспроизводимую выборку входных параметров из рабочих диапазонов формы.
+
+    Ws и Sme выбираются относительно W₀ и SБЭТ, поэтому все точки физически
+    согласованы (Ws > W₀, Sme — 10-30% от SБЭТ).
+
+    Args:
+        n: Количество точек
+        seed: Зерно генератора случайных чисел
+
+    Returns:
+        List[Dict[str, float]]: Именованные аргументы для run_full_prediction
+    """
+    rng = np.random.default_rng(seed)
+    sbat = rng.uniform(*INPUT_RANGES['SBAT_m2_gr'], size=n)
+    a0 = rng.uniform(*INPUT_RANGES['a0_mmoll_gr'], size=n)
+    energy = rng.uniform(*INPUT_RANGES['E_kDg_moll'], size=n)
+    w0 = CALCULATION_CONSTANTS['micropore_volume_factor'] * a0
+    ws = w0 * rng.uniform(*WS_TO_W0_RATIO_RANGE, size=n)
+    sme = sbat * rng.uniform(*SME_TO_SBAT_FRACTION_RANGE, size=n)
+
+    return [
+        {
+            'SBAT_m2_gr': round(float(sbat[i]), 1),
+            'a0_mmoll_gr': round(float(a0[i]), 2),
+            'E_kDg_moll': round(float(energy[i]), 2),
+            'Ws_cm3_gr': round(float(ws[i]), 4),
+            'Sme_m2_gr': round(float(sme[i]), 1)
+        }
+        for i in range(n)
+    ]
+
 def normalize_features(
     features: np.ndarray,
     scaler: Any
@@ -0,0 +1,41 @@
+# src/utils/lazy.py
+"""
+Ленивая загрузка имен пакета (PEP 562).
+
+Пакет объявляет словарь «имя -> подмодуль» и получает __getattr__ и
+__dir__, которые импортируют подмодуль при первом обращении к имени.
+"""
+
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def make_lazy_module(
+    lazy_attrs: Dict[str, str],
+    module_name: str
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Создает __getattr__ и __dir__ пакета с ленивыми именами.
+
+    Args:
+        lazy_attrs: Имя атрибута -> подмодуль (относительно пакета), в котором он определен
+        module_name: Имя пакета (__name__)
+
+    Returns:
+        Tuple[Callable, Callable]: Функции __getattr__ и __dir__ модуля
+    """
+    def __getattr__(name: str) -> Any:
+        """Импортирует подмодуль при первом обращении к экспортируемому имени."""
+        submodule = lazy_attrs.get(name)
+        if submodule is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(submodule, module_name), name)
+        # Следующие обращения находят имя в модуле без вызова __getattr__
+        setattr(sys.modules[module_name], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[module_name])) | set(lazy_attrs))
+
+    return __getattr__, __dir__
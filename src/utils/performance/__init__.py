@@ -1,14 +1,28 @@
 # src/utils/performance/__init__.py
 """
 Подмодуль утилит для оптимизации производительности.
+
+Имена загружаются лениво (PEP 562): инструментирование и метрики не требуют
+torch, а утилиты оптимизации моделей импортируют его только при обращении.
 """
 
-from .batch_processing import BatchProcessor
-from .cuda_optimization import CUDAOptimizer
-from .profiling import ModelProfiler
-from .pruning import ModelPruner
-from .quantization import ModelQuantizer
+from ..lazy import make_lazy_module
+
+# Имя атрибута -> подмодуль, в котором он определен
+_LAZY_ATTRS = {
+    'BatchProcessor': '.batch_processing',
+    'CUDAOptimizer': '.cuda_optimization',
+    'ModelProfiler': '.profiling',
+    'ModelPruner': '.pruning',
+    'ModelQuantizer': '.quantization',
+    'LatencyTracker': '.instrumentation',
+    'latency_tracker': '.instrumentation',
+    'MetricsRegistry': '.metrics',
+    'metrics_registry': '.metrics',
+    'start_metrics_server': '.metrics',
+    'write_metrics_textfile': '.metrics',
+}
+
+__all__ = list(_LAZY_ATTRS)
 
-__all__ = [
-    'BatchProcessor', 'CUDAOptimizer', 'ModelProfiler', 'ModelPruner', 'ModelQuantizer'
-]
\ No newline at end of file
+__getattr__, __dir__ = make_lazy_module(_LAZY_ATTRS, __name__)
@@ -0,0 +1,244 @@
+"""
+Модуль инструментирования задержек конвейера предсказаний.
+
+Замеряет время стадий (металл, лиганд, растворитель и т.д.) и их подфаз
+(сборка признаков, масштабирование, инференс, декодирование) высокоточными
+таймерами и хранит скользящие гистограммы. Во время профилирования те же
+области открывают record_function, чтобы стадии были видны в trace. В выключенном состоянии
+контекстные менеджеры возвращают общий пустой контекст, поэтому накладные
+расходы сводятся к одной проверке флага.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ...config.app_config import METRICS_CONFIG, PERFORMANCE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Общий пустой контекст для выключенного режима (переиспользуется без аллокаций)
+_NULL_CONTEXT = nullcontext()
+
+# Границы корзин гистограммы (в миллисекундах)
+DEFAULT_BUCKETS_MS = (
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0,
+    50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0
+)
+
+
+class LatencyHistogram:
+    """Скользящая гистограмма задержек одной стадии или подфазы."""
+
+    def __init__(self, window_size: int, buckets_ms: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        """
+        Инициализация гистограммы.
+
+        Args:
+            window_size: Количество последних замеров для расчета перцентилей
+            buckets_ms: Верхние границы корзин (мс)
+        """
+        self.buckets_ms = tuple(buckets_ms)
+        self.bucket_counts = [0] * (len(self.buckets_ms) + 1)  # последняя корзина — +Inf
+        self.count = 0
+        self.total_ms = 0.0
+        self._window = deque(maxlen=window_size)
+
+    def observe(self, value_ms: float) -> None:
+        """
+        Добавляет замер в гистограмму.
+
+        Args:
+            value_ms: Длительность в миллисекундах
+        """
+        self.count += 1
+        self.total_ms += value_ms
+        self._window.append(value_ms)
+        for i, bound in enumerate(self.buckets_ms):
+            if value_ms <= bound:
+                self.bucket_counts[i] += 1
+                return
+        self.bucket_counts[-1] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Возвращает копию счетчиков гистограммы.
+
+        Returns:
+            Dict[str, Any]: Границы корзин (мс), счетчики корзин, количество и сумма (мс)
+        """
+        return {
+            'buckets_ms': self.buckets_ms,
+            'bucket_counts': list(self.bucket_counts),
+            'count': self.count,
+            'total_ms': self.total_ms
+        }
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Возвращает сводку по скользящему окну.
+
+        Returns:
+            Dict[str, float]: Количество, среднее, перцентили и максимум (мс)
+        """
+        window = sorted(self._window)
+        if not window:
+            return {'count': self.count, 'mean_ms': 0.0, 'p50_ms': 0.0,
+                    'p90_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0}
+
+        def percentile(q: float) -> float:
+            return window[min(len(window) - 1, int(round(q * (len(window) - 1))))]
+
+        return {
+            'count': self.count,
+            'mean_ms': sum(window) / len(window),
+            'p50_ms': percentile(0.50),
+            'p90_ms': percentile(0.90),
+            'p99_ms': percentile(0.99),
+            'max_ms': window[-1],
+            'last_ms': self._window[-1]
+        }
+
+
+class LatencyTracker:
+    """
+    Трекер задержек стадий конвейера.
+    Стадии вложены друг в друга через стек потока, подфазы записываются
+    под именем текущей стадии ('metal.scaling', 'Tsyn.inference').
+    """
+
+    def __init__(self, enabled: bool = False, window_size: int = 1000):
+        """
+        Инициализация трекера.
+
+        Args:
+            enabled: Включен ли сбор замеров
+            window_size: Размер скользящего окна гистограмм
+        """
+        self.enabled = enabled
+        self.profiling = False
+        self.window_size = window_size
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def set_enabled(self, enabled: bool) -> None:
+        """Включает или выключает сбор замеров."""
+        if enabled != self.enabled:
+            logger.info(f"Инструментирование задержек {'включено' if enabled else 'выключено'}")
+        self.enabled = enabled
+
+    def set_profiling(self, profiling: bool) -> None:
+        """Включает или выключает области record_function для профилировщика torch."""
+        self.profiling = profiling
+
+    def _stack(self) -> List[str]:
+        """Возвращает стек активных стадий текущего потока."""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current_stage(self) -> Optional[str]:
+        """Возвращает имя активной стадии текущего потока."""
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else None
+
+    def stage(self, name: str):
+        """
+        Контекст замера стадии конвейера.
+
+        Args:
+            name: Имя стадии ('metal', 'ligand', 'Tsyn', ...)
+        """
+        if not (self.enabled or self.profiling):
+            return _NULL_CONTEXT
+        return self._measure(name, push=True)
+
+    def phase(self, name: str):
+        """
+        Контекст замера подфазы текущей стадии.
+
+        Args:
+            name: Имя подфазы ('features', 'scaling', 'inference', 'decode')
+        """
+        if not (self.enabled or self.profiling):
+            return _NULL_CONTEXT
+        stage = self.current_stage()
+        return self._measure(f"{stage}.{name}" if stage else name, push=False)
+
+    @contextmanager
+    def _measure(self, key: str, push: bool) -> Iterator[None]:
+        """Замеряет время выполнения блока и записывает его в гистограмму."""
+        stack = self._stack()
+        if push:
+            stack.append(key)
+        if self.profiling:
+            from torch.profiler import record_function
+            scope = record_function(key)
+        else:
+            scope = _NULL_CONTEXT
+        start = time.perf_counter_ns()
+        try:
+            with scope:
+                yield
+        finally:
+            elapsed_ms = (time.perf_counter_ns() - start) / 1e6
+            if push:
+                stack.pop()
+            if self.enabled:
+                self.record(key, elapsed_ms)
+
+    def record(self, key: str, elapsed_ms: float) -> None:
+        """
+        Записывает замер вручную.
+
+        Args:
+            key: Имя стадии или подфазы
+            elapsed_ms: Длительность в миллисекундах
+        """
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram(self.window_size)
+            histogram.observe(elapsed_ms)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Возвращает сводку по всем стадиям и подфазам.
+
+        Returns:
+            Dict[str, Dict[str, float]]: {ключ: сводка гистограммы}
+        """
+        with self._lock:
+            return {key: hist.summary() for key, hist in sorted(self._histograms.items())}
+
+    def get_histograms(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Возвращает согласованные копии счетчиков гистограмм (для экспортеров метрик).
+
+        Копии снимаются под блокировкой трекера: record() в других потоках не
+        меняет их во время экспорта, поэтому сумма корзин всегда равна количеству.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: {ключ: LatencyHistogram.snapshot()}
+        """
+        with self._lock:
+            return {key: hist.snapshot() for key, hist in self._histograms.items()}
+
+    def reset(self) -> None:
+        """Сбрасывает все накопленные замеры."""
+        with self._lock:
+            self._histograms.clear()
+        logger.info("Замеры задержек сброшены")
+
+
+# Глобальный трекер, используемый сервисами предсказаний
+# (при экспорте метрик включается автоматически — из него строятся гистограммы стадий)
+latency_tracker = LatencyTracker(
+    enabled=PERFORMANCE_CONFIG['instrumentation_enabled'] or METRICS_CONFIG['enabled'],
+    window_size=PERFORMANCE_CONFIG['latency_window_size']
+)
@@ -0,0 +1,446 @@
+"""
+Модуль метрик сервиса в формате Prometheus.
+
+Содержит реестр счетчиков, датчиков и гистограмм: частота запросов к
+конвейеру, задержки стадий (из трекера задержек), попадания в кэши, время
+загрузки моделей и занимаемая моделями память. Метрики отдаются в
+текстовом формате Prometheus через локальный HTTP-эндпоинт или
+записываются в файл для textfile-коллектора node_exporter (режим Streamlit).
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ...config.app_config import METRICS_CONFIG
+from .instrumentation import latency_tracker
+
+logger = logging.getLogger(__name__)
+
+# Тип строки выборки: (суффикс имени, метки, значение)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape_label(value: str) -> str:
+    """Экранирует значение метки по правилам текстового формата Prometheus."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """Форматирует метки в виде {k="v",...}."""
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape_label(v)}"' for k, v in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    """Форматирует числовое значение выборки."""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class _Metric:
+    """Базовый класс метрики с метками."""
+
+    metric_type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Инициализация метрики.
+
+        Args:
+            name: Имя метрики
+            documentation: Описание (строка HELP)
+            labelnames: Имена меток
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """Формирует ключ значения по меткам."""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Метрика {self.name} ожидает метки {self.labelnames}, получены {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Sample]:
+        """Возвращает текущие выборки метрики."""
+        with self._lock:
+            return [('', dict(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+
+
+class Counter(_Metric):
+    """Монотонно возрастающий счетчик."""
+
+    metric_type = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Увеличивает счетчик на *amount*."""
+        if amount < 0:
+            raise ValueError("Счетчик не может уменьшаться")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        """Возвращает текущее значение счетчика."""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """Произвольно изменяемое значение."""
+
+    metric_type = 'gauge'
+
+    def set(self, value: float, **labels: str) -> None:
+        """Устанавливает значение датчика."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    """Гистограмма с фиксированными границами корзин."""
+
+    metric_type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)):
+        """
+        Инициализация гистограммы.
+
+        Args:
+            name: Имя метрики
+            documentation: Описание (строка HELP)
+            labelnames: Имена меток
+            buckets: Верхние границы корзин
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Добавляет наблюдение в гистограмму."""
+        key = self._key(labels)
+        with self._lock:
+            # [счетчики корзин..., +Inf, сумма]
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def samples(self) -> List[Sample]:
+        """Возвращает выборки гистограммы (_bucket, _count, _sum)."""
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        result = []
+        for key, series in items:
+            labels = dict(zip(self.labelnames, key))
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                result.append(('_bucket', {**labels, 'le': _format_value(bound)}, count))
+            result.append(('_count', labels, series[-2]))
+            result.append(('_sum', labels, series[-1]))
+        return result
+
+
+# Коллектор возвращает готовые семейства метрик: (имя, тип, описание, выборки)
+Collector = Callable[[], List[Tuple[str, str, str, List[Sample]]]]
+
+
+class MetricsRegistry:
+    """Реестр метрик и коллекторов, вычисляемых в момент сбора."""
+
+    def __init__(self):
+        """Инициализация реестра."""
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        """Регистрирует метрику или возвращает уже существующую с тем же именем."""
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Создает (или возвращает) счетчик."""
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Создает (или возвращает) датчик."""
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Histogram:
+        """Создает (или возвращает) гистограмму."""
+        return self._register(Histogram(name, documentation, labelnames, **kwargs))
+
+    def register_collector(self, collector: Collector) -> None:
+        """Добавляет коллектор, вызываемый при каждом сборе метрик."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Формирует текстовое представление всех метрик в формате Prometheus.
+
+        Если задан номер рабочего процесса (METRICS_CONFIG['worker']), все
+        выборки получают метку worker: ряды процессов pre-fork не совпадают.
+
+        Returns:
+            str: Текст для эндпоинта /metrics
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        families = [(m.name, m.metric_type, m.documentation, m.samples()) for m in metrics]
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.warning(f"Ошибка коллектора метрик: {str(e)}")
+
+        worker = {'worker': METRICS_CONFIG['worker']} if METRICS_CONFIG['worker'] else {}
+        lines = []
+        for name, metric_type, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels({**labels, **worker})} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+# --- Глобальный реестр и метрики сервиса ---
+
+metrics_registry = MetricsRegistry()
+
+PREDICTION_REQUESTS = metrics_registry.counter(
+    'adsorpnet_prediction_requests_total',
+    'Количество запусков полного конвейера предсказаний',
+    ['status']
+)
+
+CACHE_REQUESTS = metrics_registry.counter(
+    'adsorpnet_cache_requests_total',
+    'Обращения к кэшу предсказаний по результату (hit/miss)',
+    ['cache', 'result']
+)
+
+MODEL_LOAD_SECONDS = metrics_registry.gauge(
+    'adsorpnet_model_load_seconds',
+    'Длительность последней загрузки артефакта модели',
+    ['artifact', 'kind']
+)
+
+
+@contextmanager
+def track_prediction_request() -> Iterator[None]:
+    """Учитывает запуск конвейера в счетчике запросов (success/error)."""
+    try:
+        yield
+    except Exception:
+        PREDICTION_REQUESTS.inc(status='error')
+        raise
+    PREDICTION_REQUESTS.inc(status='success')
+
+
+@contextmanager
+def track_model_load(artifact_path, kind: str) -> Iterator[None]:
+    """
+    Замеряет длительность загрузки артефакта модели.
+
+    Args:
+        artifact_path: Путь к файлу артефакта
+        kind: Тип артефакта ('torch', 'xgboost', 'scaler', 'encoder')
+    """
+    start = time.perf_counter()
+    yield
+    MODEL_LOAD_SECONDS.set(time.perf_counter() - start, artifact=Path(artifact_path).stem, kind=kind)
+
+
+def _collect_stage_latency() -> List[Tuple[str, str, str, List[Sample]]]:
+    """Переводит гистограммы трекера задержек в гистограмму Prometheus."""
+    samples: List[Sample] = []
+    for key, histogram in latency_tracker.get_histograms().items():
+        cumulative = 0
+        for bound_ms, count in zip(histogram['buckets_ms'], histogram['bucket_counts']):
+            cumulative += count
+            samples.append(('_bucket', {'stage': key, 'le': _format_value(bound_ms / 1000)}, cumulative))
+        samples.append(('_bucket', {'stage': key, 'le': '+Inf'}, histogram['count']))
+        samples.append(('_count', {'stage': key}, histogram['count']))
+        samples.append(('_sum', {'stage': key}, histogram['total_ms'] / 1000))
+    return [(
+        'adsorpnet_stage_latency_seconds', 'histogram',
+        'Задержка стадий и подфаз конвейера предсказаний', samples
+    )]
+
+
+def _collect_model_cache() -> List[Tuple[str, str, str, List[Sample]]]:
+    """Собирает попадания в кэши артефактов ModelService."""
+    # Сервис моделей импортируется лениво — не загружаем torch ради сбора метрик
+    if 'src.services.model_service' not in sys.modules:
+        return []
+    from src.services.model_service import ModelService
+
+    service = ModelService()
+    samples: List[Sample] = []
+    for cache_name, counts in service.get_cache_info().items():
+        samples.append(('', {'cache': cache_name, 'result': 'hit'}, counts['hit']))
+        samples.append(('', {'cache': cache_name, 'result': 'miss'}, counts['miss']))
+    residency = service.get_residency_stats()
+    loads = service.get_load_stats()
+    return [
+        (
+            'adsorpnet_artifact_cache_requests_total', 'counter',
+            'Обращения к кэшу артефактов ModelService по результату (hit/miss)', samples
+        ),
+        (
+            'adsorpnet_model_evictions_total', 'counter',
+            'Вытеснения моделей из памяти по бюджету', [('', {}, residency['evictions'])]
+        ),
+        (
+            'adsorpnet_model_memory_budget_bytes', 'gauge',
+            'Бюджет памяти моделей (0 — без ограничения)', [('', {}, residency['budget_mb'] * 1024 * 1024)]
+        ),
+        (
+            'adsorpnet_artifact_load_waits_total', 'counter',
+            'Запросы, дождавшиеся загрузки артефакта другим потоком',
+            [('', {'kind': kind}, counters['waits']) for kind, counters in loads.items()]
+        ),
+        (
+            'adsorpnet_artifact_load_wait_seconds_total', 'counter',
+            'Суммарное время ожидания загрузки артефакта другим потоком',
+            [('', {'kind': kind}, counters['wait_s']) for kind, counters in loads.items()]
+        ),
+    ]
+
+
+def _collect_model_memory() -> List[Tuple[str, str, str, List[Sample]]]:
+    """Собирает оценку памяти загруженных моделей и RSS процесса."""
+    families = []
+    if 'src.services.model_service' in sys.modules:
+        from src.services.model_service import ModelService
+
+        usage = ModelService().get_model_memory_usage()
+        model_samples = [('', {'model': name}, size_mb * 1024 * 1024) for name, size_mb in usage.items()]
+        families.append((
+            'adsorpnet_model_memory_bytes', 'gauge',
+            'Оценка памяти, занимаемой загруженной моделью', model_samples
+        ))
+
+    rss = _process_rss_bytes()
+    if rss is not None:
+        families.append((
+            'adsorpnet_process_resident_memory_bytes', 'gauge',
+            'Резидентная память процесса', [('', {}, rss)]
+        ))
+    return families
+
+
+def _process_rss_bytes() -> Optional[float]:
+    """Возвращает RSS текущего процесса в байтах (Linux: /proc/self/statm)."""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return float(resident_pages * os.sysconf('SC_PAGE_SIZE'))
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+            # ru_maxrss — пиковое значение (КБ на Linux), используем как оценку
+            return float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+        except Exception:
+            return None
+
+
+metrics_registry.register_collector(_collect_stage_latency)
+metrics_registry.register_collector(_collect_model_cache)
+metrics_registry.register_collector(_collect_model_memory)
+
+
+# --- Экспорт ---
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Обработчик HTTP-запросов эндпоинта /metrics."""
+
+    registry = metrics_registry
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"metrics: {format % args}")
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: Optional[int] = None, host: Optional[str] = None) -> ThreadingHTTPServer:
+    """
+    Запускает локальный HTTP-эндпоинт /metrics в фоновом потоке (один раз на процесс).
+
+    Args:
+        port: Порт (по умолчанию из METRICS_CONFIG)
+        host: Адрес (по умолчанию из METRICS_CONFIG)
+
+    Returns:
+        ThreadingHTTPServer: Запущенный сервер
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        address = (host or METRICS_CONFIG['host'], port if port is not None else METRICS_CONFIG['port'])
+        _server = ThreadingHTTPServer(address, _MetricsHandler)
+        thread = threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True)
+        thread.start()
+        logger.info(f"Эндпоинт метрик запущен: http://{address[0]}:{_server.server_address[1]}/metrics")
+        return _server
+
+
+def write_metrics_textfile(path: Optional[str] = None) -> Optional[Path]:
+    """
+    Атомарно записывает метрики в файл для textfile-коллектора node_exporter.
+
+    Args:
+        path: Путь к файлу *.prom (по умолчанию из METRICS_CONFIG)
+
+    Returns:
+        Optional[Path]: Путь к записанному файлу или None, если путь не задан
+    """
+    target = path or METRICS_CONFIG['textfile_path']
+    if not target:
+        return None
+    target = Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_text(metrics_registry.render(), encoding='utf-8')
+        os.replace(tmp_path, target)
+    except OSError as e:
+        logger.warning(f"Не удалось записать метрики в {target}: {str(e)}")
+        return None
+    return target
@@ -1,16 +1,43 @@
 import torch
 from torch.profiler import profile, record_function, ProfilerActivity
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union, Tuple
+from collections import defaultdict
 import logging
+import time
 from pathlib import Path
 import json
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Входные данные модели: тензор, кортеж позиционных аргументов или словарь именованных
+ModelInput = Union[torch.Tensor, Tuple[Any, ...], List[Any], Dict[str, Any]]
+
+
+def available_activities() -> List[ProfilerActivity]:
+    """
+    Определяет доступные активности профилировщика.
+
+    Returns:
+        List[ProfilerActivity]: CPU и, если доступна, CUDA
+    """
+    activities = [ProfilerActivity.CPU]
+    if torch.cuda.is_available():
+        activities.append(ProfilerActivity.CUDA)
+    return activities
+
+
+def _device_time_us(event: Any) -> float:
+    """Возвращает время на устройстве (мкс) для события профилировщика."""
+    value = getattr(event, 'device_time_total', None)
+    if value is None:
+        value = getattr(event, 'cuda_time_total', 0)
+    return float(value or 0)
+
+
 class ModelProfiler:
     """Класс для профилирования моделей."""
-    
+
     def __init__(
         self,
         activities: Optional[List[ProfilerActivity]] = None,
@@ -20,136 +47,376 @@ class ModelProfiler:
     ):
         """
         Инициализация профилировщика.
-        
+
         Args:
-            activities: Список активностей для профилирования
+            activities: Список активностей для профилирования (по умолчанию — доступные на хосте)
             profile_memory: Профилировать ли использование памяти
             with_stack: Включать ли информацию о стеке вызовов
             output_dir: Директория для сохранения результатов
         """
-        self.activities = activities or [
-            ProfilerActivity.CPU,
-            ProfilerActivity.CUDA
-        ]
+        self.activities = activities or available_activities()
         self.profile_memory = profile_memory
         self.with_stack = with_stack
         self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(exist_ok=True)
-        
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def uses_cuda(self) -> bool:
+        """Профилируется ли CUDA."""
+        return ProfilerActivity.CUDA in self.activities
+
+    def _profile(self) -> profile:
+        """Создает контекст профилировщика с текущими настройками."""
+        return profile(
+            activities=self.activities,
+            profile_memory=self.profile_memory,
+            with_stack=self.with_stack,
+            record_shapes=True
+        )
+
+    @staticmethod
+    def _call_model(model: torch.nn.Module, input_data: ModelInput) -> Any:
+        """
+        Вызывает модель с входными данными любого поддерживаемого вида.
+
+        Args:
+            model: Модель
+            input_data: Тензор, кортеж/список аргументов или словарь именованных аргументов
+        """
+        if isinstance(input_data, dict):
+            return model(**input_data)
+        if isinstance(input_data, (tuple, list)):
+            return model(*input_data)
+        return model(input_data)
+
+    def _reset_memory_stats(self) -> None:
+        """Сбрасывает пиковые значения памяти перед замером."""
+        if self.uses_cuda:
+            torch.cuda.reset_peak_memory_stats()
+
+    def _memory_stats(self, prof: profile) -> Dict[str, Any]:
+        """
+        Собирает статистику памяти: CUDA, если профилируется, иначе CPU.
+
+        Args:
+            prof: Завершенный профилировщик
+        """
+        if self.uses_cuda:
+            return {
+                "device": "cuda",
+                "max_allocated_mb": torch.cuda.max_memory_allocated() / 1024**2,
+                "max_reserved_mb": torch.cuda.max_memory_reserved() / 1024**2
+            }
+
+        allocated = sum(
+            e.self_cpu_memory_usage for e in prof.events()
+            if e.self_cpu_memory_usage and e.self_cpu_memory_usage > 0
+        )
+        stats = {"device": "cpu", "allocated_mb": allocated / 1024**2}
+        try:
+            import resource
+            # ru_maxrss — КБ на Linux
+            stats["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        except ImportError:
+            pass
+        return stats
+
+    @staticmethod
+    def _timing(durations_ms: List[float]) -> Dict[str, float]:
+        """Формирует сводку по длительностям итераций."""
+        return {
+            "avg_ms": sum(durations_ms) / len(durations_ms) if durations_ms else 0.0,
+            "min_ms": min(durations_ms, default=0.0),
+            "max_ms": max(durations_ms, default=0.0),
+            "steps": len(durations_ms)
+        }
+
+    @staticmethod
+    def _bottlenecks(prof: profile, threshold_ms: float = 1.0) -> List[Dict[str, Any]]:
+        """Возвращает операции, суммарно занявшие больше *threshold_ms*."""
+        bottlenecks = []
+        for event in prof.key_averages():
+            if event.cpu_time_total > threshold_ms * 1000:
+                bottlenecks.append({
+                    "name": event.key,
+                    "cpu_time_ms": event.cpu_time_total / 1000,
+                    "cuda_time_ms": _device_time_us(event) / 1000,
+                    "memory_mb": event.cpu_memory_usage / 1024**2 if event.cpu_memory_usage else 0
+                })
+        bottlenecks.sort(key=lambda b: b["cpu_time_ms"], reverse=True)
+        return bottlenecks
+
+    @staticmethod
+    def _stage_tables(prof: profile, top_n: int, steps: int) -> Dict[str, Dict[str, Any]]:
+        """
+        Строит таблицы операторов по стадиям конвейера.
+
+        Каждое событие относится к ближайшей объемлющей стадии (область
+        record_function без точки в имени; подфазы вида 'metal.inference'
+        прозрачны). Собственное время областей — это время вне операторов
+        torch (pandas, XGBoost, pymatgen/RDKit), оно выводится как untracked.
+
+        Args:
+            prof: Завершенный профилировщик
+            top_n: Количество операторов в таблице стадии
+            steps: Количество профилируемых итераций (для усреднения)
+        """
+        stage_totals: Dict[str, float] = defaultdict(float)
+        stage_calls: Dict[str, int] = defaultdict(int)
+        untracked: Dict[str, float] = defaultdict(float)
+        operators: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(lambda: [0, 0.0, 0.0]))
+
+        def owner_stage(event) -> Optional[str]:
+            node = event
+            while node is not None:
+                if node.is_user_annotation and '.' not in node.name:
+                    return node.name
+                node = node.cpu_parent
+            return None
+
+        for event in prof.events():
+            stage = owner_stage(event)
+            if stage is None:
+                continue
+            if event.is_user_annotation:
+                if event.name == stage:
+                    stage_totals[stage] += event.cpu_time_total
+                    stage_calls[stage] += 1
+                untracked[stage] += event.self_cpu_time_total
+            else:
+                row = operators[stage][event.name]
+                row[0] += 1
+                row[1] += event.self_cpu_time_total
+                row[2] += _device_time_us(event)
+
+        tables = {}
+        for stage, total_us in stage_totals.items():
+            rows = sorted(operators[stage].items(), key=lambda item: item[1][1], reverse=True)
+            tables[stage] = {
+                "calls": stage_calls[stage],
+                "avg_total_ms": total_us / 1000 / max(steps, 1),
+                "avg_untracked_ms": untracked[stage] / 1000 / max(steps, 1),
+                "top_operators": [
+                    {
+                        "name": name,
+                        "calls": int(calls),
+                        "self_cpu_ms": self_us / 1000,
+                        "device_ms": device_us / 1000
+                    }
+                    for name, (calls, self_us, device_us) in rows[:top_n]
+                ]
+            }
+        return tables
+
+    def _save_results(self, results: Dict[str, Any], prefix: str) -> Path:
+        """Сохраняет результаты профилирования в JSON."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = self.output_dir / f"{prefix}_{timestamp}.json"
+        with open(output_file, "w") as f:
+            json.dump(results, f, indent=4, ensure_ascii=False, default=str)
+        logger.info(f"Результаты профилирования сохранены в {output_file}")
+        return output_file
+
+    def _export_trace(self, prof: profile, prefix: str) -> Path:
+        """Экспортирует chrome trace в директорию результатов."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        trace_file = self.output_dir / f"{prefix}_trace_{timestamp}.json"
+        prof.export_chrome_trace(str(trace_file))
+        logger.info(f"Trace-файл сохранен в {trace_file}")
+        return trace_file
+
     def profile_model(
         self,
         model: torch.nn.Module,
-        input_data: Dict[str, Any],
+        input_data: ModelInput,
         warm_up: int = 5,
         steps: int = 10
     ) -> Dict[str, Any]:
         """
         Профилирование модели.
-        
+
         Args:
             model: Модель для профилирования
-            input_data: Входные данные
-            warm_up: Количество прогревочных итераций
+            input_data: Входные данные (тензор, кортеж аргументов или словарь именованных аргументов)
+            warm_up: Количество прогревочных итераций (вне окна профилирования)
             steps: Количество итераций для профилирования
-            
+
         Returns:
             Dict[str, Any]: Результаты профилирования
         """
         results = {}
-        
-        with profile(
-            activities=self.activities,
-            profile_memory=self.profile_memory,
-            with_stack=self.with_stack,
-            record_shapes=True
-        ) as prof:
+        durations = []
+
+        with torch.no_grad():
             # Прогрев
             for _ in range(warm_up):
-                with record_function("warm_up"):
-                    _ = model(input_data)
-            
-            # Профилирование
-            for _ in range(steps):
-                with record_function("inference"):
-                    _ = model(input_data)
-        
+                self._call_model(model, input_data)
+
+            self._reset_memory_stats()
+            with self._profile() as prof:
+                # Профилирование
+                for _ in range(steps):
+                    start = time.perf_counter()
+                    with record_function("inference"):
+                        self._call_model(model, input_data)
+                    if self.uses_cuda:
+                        torch.cuda.synchronize()
+                    durations.append((time.perf_counter() - start) * 1000)
+
         # Анализ результатов
-        results["execution_time"] = {
-            "avg_ms": prof.key_averages().total_average().cpu_time_total / 1000,
-            "max_ms": max(e.cpu_time_total for e in prof.events()) / 1000
-        }
-        
+        results["execution_time"] = self._timing(durations)
+
         if self.profile_memory:
-            results["memory"] = {
-                "max_allocated_mb": torch.cuda.max_memory_allocated() / 1024**2,
-                "max_reserved_mb": torch.cuda.max_memory_reserved() / 1024**2
-            }
-        
+            results["memory"] = self._memory_stats(prof)
+
         # Анализ узких мест
-        results["bottlenecks"] = []
-        for event in prof.key_averages():
-            if event.cpu_time_total > 1000:  # > 1ms
-                results["bottlenecks"].append({
-                    "name": event.key,
-                    "cpu_time_ms": event.cpu_time_total / 1000,
-                    "cuda_time_ms": event.cuda_time_total / 1000 if event.cuda_time_total else 0,
-                    "memory_mb": event.cpu_memory_usage / 1024**2 if event.cpu_memory_usage else 0
-                })
-        
+        results["bottlenecks"] = self._bottlenecks(prof)
+
         # Сохранение результатов
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_file = self.output_dir / f"profile_{timestamp}.json"
-        with open(output_file, "w") as f:
-            json.dump(results, f, indent=4)
-        
-        logger.info(f"Результаты профилирования сохранены в {output_file}")
+        self._save_results(results, "profile")
         return results
-    
+
+    def profile_pipeline(
+        self,
+        predictor: Any,
+        inputs: Dict[str, float],
+        warm_up: int = 1,
+        steps: int = 3,
+        top_n: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Профилирует PredictorService.run_full_prediction целиком.
+
+        Стадии и подфазы трекера задержек открывают области record_function,
+        поэтому в trace видны и стадии без torch (XGBoost, pandas, pymatgen).
+
+        Args:
+            predictor: Экземпляр PredictorService
+            inputs: Именованные аргументы run_full_prediction
+            warm_up: Количество прогревочных запусков (загрузка моделей, вне окна профилирования)
+            steps: Количество профилируемых запусков
+            top_n: Количество операторов в таблице каждой стадии
+
+        Returns:
+            Dict[str, Any]: Время выполнения, память, таблицы стадий и путь к trace-файлу
+        """
+        for _ in range(warm_up):
+            predictor.run_full_prediction(**inputs)
+
+        tracker = predictor.latency_tracker
+        durations = []
+        self._reset_memory_stats()
+        tracker.set_profiling(True)
+        try:
+            with torch.no_grad(), self._profile() as prof:
+                for _ in range(steps):
+                    start = time.perf_counter()
+                    predictor.run_full_prediction(**inputs)
+                    durations.append((time.perf_counter() - start) * 1000)
+        finally:
+            tracker.set_profiling(False)
+
+        results = {
+            "inputs": inputs,
+            "execution_time": self._timing(durations),
+            "stages": self._stage_tables(prof, top_n, steps),
+            "trace_file": str(self._export_trace(prof, "pipeline"))
+        }
+        if self.profile_memory:
+            results["memory"] = self._memory_stats(prof)
+
+        self._save_results(results, "pipeline")
+        return results
+
     @staticmethod
     def analyze_trace(
         model: torch.nn.Module,
-        input_data: Dict[str, Any],
+        input_data: ModelInput,
         trace_file: str
     ) -> None:
         """
         Создает trace-файл для анализа в Chrome Trace Viewer.
-        
+
         Args:
             model: Модель для профилирования
-            input_data: Входные данные
+            input_data: Входные данные (тензор, кортеж аргументов или словарь именованных аргументов)
             trace_file: Путь для сохранения trace-файла
         """
-        with profile(
-            activities=[ProfilerActivity.CPU, ProfilerActivity.CUDA],
+        with torch.no_grad(), profile(
+            activities=available_activities(),
             with_stack=True,
             record_shapes=True
         ) as prof:
-            model(input_data)
-        
+            ModelProfiler._call_model(model, input_data)
+
         prof.export_chrome_trace(trace_file)
         logger.info(f"Trace-файл сохранен в {trace_file}")
-    
+
     @staticmethod
     def print_summary(results: Dict[str, Any]) -> None:
         """
         Выводит сводку результатов профилирования.
-        
+
         Args:
             results: Результаты профилирования
         """
         print("\n=== Результаты профилирования ===")
         print(f"Среднее время выполнения: {results['execution_time']['avg_ms']:.2f} мс")
         print(f"Максимальное время выполнения: {results['execution_time']['max_ms']:.2f} мс")
-        
-        if "memory" in results:
-            print(f"\nИспользование памяти:")
-            print(f"Максимально выделено: {results['memory']['max_allocated_mb']:.2f} МБ")
-            print(f"Максимально зарезервировано: {results['memory']['max_reserved_mb']:.2f} МБ")
-        
-        if results["bottlenecks"]:
+
+        memory = results.get("memory")
+        if memory:
+            print(f"\nИспользование памяти ({memory['device']}):")
+            if memory["device"] == "cuda":
+                print(f"Максимально выделено: {memory['max_allocated_mb']:.2f} МБ")
+                print(f"Максимально зарезервировано: {memory['max_reserved_mb']:.2f} МБ")
+            else:
+                print(f"Выделено операторами: {memory['allocated_mb']:.2f} МБ")
+                if "peak_rss_mb" in memory:
+                    print(f"Пиковый RSS процесса: {memory['peak_rss_mb']:.2f} МБ")
+
+        if results.get("bottlenecks"):
             print("\nУзкие места:")
             for b in results["bottlenecks"]:
                 print(f"\nОперация: {b['name']}")
                 print(f"CPU время: {b['cpu_time_ms']:.2f} мс")
                 print(f"CUDA время: {b['cuda_time_ms']:.2f} мс")
-                print(f"Использование памяти: {b['memory_mb']:.2f} МБ") 
\ No newline at end of file
+                print(f"Использование памяти: {b['memory_mb']:.2f} МБ")
+
+        for stage, table in results.get("stages", {}).items():
+            print(f"\n--- Стадия {stage}: {table['avg_total_ms']:.2f} мс "
+                  f"(вне torch: {table['avg_untracked_ms']:.2f} мс) ---")
+            for op in table["top_operators"]:
+                print(f"{op['name']:<40} {op['calls']:>6} {op['self_cpu_ms']:>10.3f} мс")
+
+        if results.get("trace_file"):
+            print(f"\nTrace-файл: {results['trace_file']}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Профилирование конвейера предсказаний AdsorpNET")
+    parser.add_argument("--sbet", type=float, default=1500.0, help="Удельная площадь поверхности, м²/г")
+    parser.add_argument("--a0", type=float, default=10.0, help="Предельная адсорбция, ммоль/г")
+    parser.add_argument("--e", type=float, default=7.0, help="Энергия адсорбции азота, кДж/моль")
+    parser.add_argument("--ws", type=float, default=0.8, help="Общий объем пор, см³/г")
+    parser.add_argument("--sme", type=float, default=300.0, help="Площадь поверхности мезопор, м²/г")
+    parser.add_argument("--steps", type=int, default=3, help="Количество профилируемых запусков")
+    parser.add_argument("--top", type=int, default=10, help="Операторов в таблице стадии")
+    parser.add_argument("--output-dir", default="profiling_results", help="Директория результатов")
+    args = parser.parse_args()
+
+    from src.services.predictor_service import PredictorService
+
+    profiler = ModelProfiler(with_stack=False, output_dir=args.output_dir)
+    summary = profiler.profile_pipeline(
+        PredictorService(),
+        {
+            "SBAT_m2_gr": args.sbet, "a0_mmoll_gr": args.a0, "E_kDg_moll": args.e,
+            "Ws_cm3_gr": args.ws, "Sme_m2_gr": args.sme
+        },
+        steps=args.steps,
+        top_n=args.top
+    )
+    ModelProfiler.print_summary(summary)
@@ -3,8 +3,13 @@
 Подмодуль утилит для кэширования и хранения данных.
 """
 
-from .cache import create_cache_key, cached_prediction, clear_prediction_cache
+from .cache import (
+    create_cache_key, quantize_inputs, cached_prediction, store_prediction,
+    clear_prediction_cache, get_cache_stats
+)
+from .digests import file_sha256, matches_source
 
 __all__ = [
-    'create_cache_key', 'cached_prediction', 'clear_prediction_cache'
+    'create_cache_key', 'quantize_inputs', 'cached_prediction', 'store_prediction',
+    'clear_prediction_cache', 'get_cache_stats', 'file_sha256', 'matches_source'
 ]
\ No newline at end of file
@@ -1,101 +1,191 @@
 # src/utils/storage/cache.py
 """
 Модуль для кэширования результатов предсказаний моделей.
+
+Ключ кэша строится по входным параметрам после квантования: значения,
+отличающиеся меньше допуска поля (политика PREDICTION_CACHE_CONFIG['key_policy']),
+попадают в одну корзину и дают один ключ. Так 1200.0 и 1200.0000001
+(шум арифметики в полях ввода) не создают отдельных записей.
+
+Кэш — LRU в памяти процесса, общий для всех сессий Streamlit; при запуске
+процесса он пуст. Сессии его не очищают: иначе новая сессия стирала бы
+результаты остальных и сбрасывала счетчики попаданий, экспортируемые в
+метрики (clear_prediction_cache — для явного сброса).
 """
 
 import hashlib
 import json
-from functools import lru_cache
-from typing import Dict, Any, Optional
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
 import logging
 import time
 
+from src.config import PREDICTION_CACHE_CONFIG
+
 logger = logging.getLogger(__name__)
 
 # Словарь для хранения времени жизни кэша для разных моделей (в секундах)
 CACHE_TTL = {
     'default': 3600,  # 1 час по умолчанию
     'MetalClassifier': 7200,  # 2 часа
-    'LigandClassifier': 7200,  # 2 часа 
+    'LigandClassifier': 7200,  # 2 часа
     'SolventClassifier': 7200,  # 2 часа
     'TsynClassifier': 7200,  # 2 часа
     'TdryClassifier': 7200,  # 2 часа
     'TregClassifier': 7200,  # 2 часа
+    'Pipeline': 7200,  # 2 часа (полный конвейер)
 }
 
-# Глобальный словарь для хранения времени последнего обновления кэша
-_cache_timestamps = {}
+# Записи кэша: "модель:ключ" -> (время записи, результат), порядок — LRU
+_cache_entries: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_counters = {'hits': 0, 'misses': 0, 'expired': 0}
+
+
+def quantize_value(value: Any, tolerance: Optional[Dict[str, float]]) -> Any:
+    """
+    Переводит значение поля в номер корзины по допуску.
+
+    Args:
+        value: Значение поля
+        tolerance: Допуск {'abs': шаг} или {'rel': относительная доля};
+            None — значение не квантуется
+
+    Returns:
+        Any: Номер корзины (или исходное значение для нечисловых полей и полей без допуска)
+    """
+    if not tolerance or isinstance(value, bool) or not isinstance(value, (int, float)):
+        return value
+    value = float(value)
+    if not math.isfinite(value):
+        return repr(value)
+    if 'rel' in tolerance:
+        if value <= 0:
+            # Логарифмические корзины определены только для положительных значений
+            return ['nonpositive', value]
+        return ['rel', round(math.log(value) / math.log1p(tolerance['rel']))]
+    return ['abs', round(value / tolerance['abs'])]
+
+
+def quantize_inputs(
+    input_data: Dict[str, Any],
+    policy: Optional[Dict[str, Dict[str, float]]] = None
+) -> Dict[str, Any]:
+    """
+    Квантует входные параметры по политике допусков.
+
+    Args:
+        input_data: Словарь входных параметров
+        policy: Допуски полей (по умолчанию PREDICTION_CACHE_CONFIG['key_policy'])
+
+    Returns:
+        Dict[str, Any]: Номера корзин по полям
+    """
+    if policy is None:
+        policy = PREDICTION_CACHE_CONFIG['key_policy']
+    return {key: quantize_value(value, policy.get(key)) for key, value in input_data.items()}
+
 
-def create_cache_key(input_data: Dict[str, Any]) -> str:
+def create_cache_key(
+    input_data: Dict[str, Any],
+    policy: Optional[Dict[str, Dict[str, float]]] = None
+) -> str:
     """
-    Создает уникальный ключ для кэширования на основе входных данных.
-    
+    Создает ключ для кэширования на основе квантованных входных данных.
+
     Args:
         input_data: Словарь входных параметров
-        
+        policy: Допуски полей (по умолчанию PREDICTION_CACHE_CONFIG['key_policy']);
+            пустой словарь — точный ключ без квантования
+
     Returns:
-        str: Уникальный хеш-ключ
+        str: Хеш-ключ (одинаковый для значений из одной корзины)
     """
     # Сортируем ключи для обеспечения консистентности
-    sorted_items = sorted(input_data.items())
+    sorted_items = sorted(quantize_inputs(input_data, policy).items())
     # Создаем строку для хэширования
     cache_str = json.dumps(sorted_items)
     # Создаем хеш
     return hashlib.md5(cache_str.encode()).hexdigest()
 
-@lru_cache(maxsize=1000)
+
 def cached_prediction(cache_key: str, model_name: str) -> Optional[Dict[str, Any]]:
     """
     Получает кэшированный результат предсказания, учитывая TTL кэша.
-    
+
     Args:
         cache_key: Ключ кэша
         model_name: Имя модели
-        
+
     Returns:
         Optional[Dict[str, Any]]: Результат предсказания или None, если кэш устарел/отсутствует
     """
-    # Проверяем время жизни кэша
     full_key = f"{model_name}:{cache_key}"
-    current_time = time.time()
-    
-    if full_key in _cache_timestamps:
-        last_update = _cache_timestamps[full_key]
-        ttl = CACHE_TTL.get(model_name, CACHE_TTL['default'])
-        
-        # Если кэш устарел, возвращаем None
-        if current_time - last_update > ttl:
+    ttl = CACHE_TTL.get(model_name, CACHE_TTL['default'])
+
+    with _cache_lock:
+        entry = _cache_entries.get(full_key)
+        if entry is None:
+            _cache_counters['misses'] += 1
+            return None
+
+        stored_at, result = entry
+        # Если кэш устарел, удаляем запись
+        if time.time() - stored_at > ttl:
+            del _cache_entries[full_key]
+            _cache_counters['misses'] += 1
+            _cache_counters['expired'] += 1
             logger.debug(f"Кэш для {model_name} с ключом {cache_key[:8]} устарел")
             return None
-            
-    # Если кэша нет, возвращаем None
-    if not hasattr(cached_prediction, 'cache_info'):
-        return None
-        
-    # Записываем время обновления кэша
-    _cache_timestamps[full_key] = current_time
-    
-    return cached_prediction.cache_info
+
+        _cache_entries.move_to_end(full_key)
+        _cache_counters['hits'] += 1
+        return result
+
+
+def store_prediction(cache_key: str, model_name: str, result: Dict[str, Any]) -> None:
+    """
+    Сохраняет результат предсказания в кэш.
+
+    Args:
+        cache_key: Ключ кэша
+        model_name: Имя модели
+        result: Результат предсказания
+    """
+    full_key = f"{model_name}:{cache_key}"
+    with _cache_lock:
+        _cache_entries[full_key] = (time.time(), result)
+        _cache_entries.move_to_end(full_key)
+        # Вытесняем давно не использованные записи
+        while len(_cache_entries) > PREDICTION_CACHE_CONFIG['maxsize']:
+            _cache_entries.popitem(last=False)
+
 
 def clear_prediction_cache():
     """Очищает кэш предсказаний."""
-    cached_prediction.cache_clear()
-    _cache_timestamps.clear()
+    with _cache_lock:
+        _cache_entries.clear()
+        for counter in _cache_counters:
+            _cache_counters[counter] = 0
     logger.info("Кэш предсказаний очищен")
 
+
 def get_cache_stats() -> Dict[str, Any]:
     """
     Возвращает статистику использования кэша.
-    
+
     Returns:
         Dict[str, Any]: Статистика кэша
     """
-    cache_info = cached_prediction.cache_info()
+    with _cache_lock:
+        keys = list(_cache_entries)
+        counters = dict(_cache_counters)
     return {
-        'hits': cache_info.hits,
-        'misses': cache_info.misses,
-        'maxsize': cache_info.maxsize,
-        'currsize': cache_info.currsize,
-        'cache_items': len(_cache_timestamps),
-        'models_cached': len(set(k.split(':')[0] for k in _cache_timestamps.keys()))
-    }
\ No newline at end of file
+        **counters,
+        'maxsize': PREDICTION_CACHE_CONFIG['maxsize'],
+        'currsize': len(keys),
+        'cache_items': len(keys),
+        'models_cached': len(set(k.split(':')[0] for k in keys))
+    }
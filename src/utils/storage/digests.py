@@ -0,0 +1,66 @@
+# src/utils/storage/digests.py
+"""
+Дайджесты SHA-256 исходных файлов артефактов.
+
+Сконвертированные артефакты (.safetensors, .npz, .raw.json) записывают
+SHA-256 исходного файла и при загрузке сверяют его с текущим: после
+переобучения исходника устаревшая копия не используется. Дайджест
+кэшируется в процессе по пути, размеру и времени изменения файла, поэтому
+повторная проверка не перечитывает файл.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+# Путь -> (размер, время изменения в нс, дайджест)
+_digests: Dict[str, Tuple[int, int, str]] = {}
+_digests_lock = threading.Lock()
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    """
+    Рассчитывает SHA-256 файла (с кэшем по размеру и времени изменения).
+
+    Args:
+        path: Путь к файлу
+
+    Returns:
+        str: Шестнадцатеричный дайджест
+
+    Raises:
+        FileNotFoundError: Если файл не найден
+    """
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+    with _digests_lock:
+        cached = _digests.get(key)
+    if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(key, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    with _digests_lock:
+        _digests[key] = (stat.st_size, stat.st_mtime_ns, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def matches_source(recorded: Optional[str], source: Union[str, Path]) -> bool:
+    """
+    Проверяет, что записанный дайджест соответствует текущему исходному файлу.
+
+    Args:
+        recorded: SHA-256 исходного файла, записанный при конвертации
+        source: Путь к исходному файлу
+
+    Returns:
+        bool: True, если исходного файла нет (сверять не с чем) или дайджесты совпадают;
+            False, если дайджест не записан или исходный файл изменился
+    """
+    if not Path(source).exists():
+        return True
+    return recorded is not None and recorded == file_sha256(source)
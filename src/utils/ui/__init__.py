@@ -5,8 +5,12 @@
 
 from .messages import show_success_message, show_info_message, show_warning_message, show_error_message
 from .page_config import load_theme_css, load_user_preferences
+from .assets import build_image_variant, build_result_icons, image_src, page_image
+from .styles import inject_css_bundle
 
 __all__ = [
     'show_success_message', 'show_info_message', 'show_warning_message', 'show_error_message',
-    'load_theme_css', 'load_user_preferences'
+    'load_theme_css', 'load_user_preferences',
+    'build_image_variant', 'build_result_icons', 'image_src', 'page_image',
+    'inject_css_bundle'
 ]
\ No newline at end of file
@@ -0,0 +1,252 @@
+"""
+Модуль подготовки графических ресурсов интерфейса.
+
+Создает уменьшенные сжатые варианты изображений (иконки карточек результатов,
+иллюстрации страниц) один раз — при сборке или первом обращении — и хранит их
+в STATIC_DIR/assets под именами с хэшем содержимого. Манифест связывает
+исходный файл и параметры варианта с готовым файлом, поэтому повторная
+сборка пропускает неизменившиеся изображения.
+
+Сборка всех ресурсов:
+    python -m src.utils.ui.assets
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import threading
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from ...config.app_config import ASSETS_CONFIG, STATIC_DIR
+
+logger = logging.getLogger(__name__)
+
+# Иконки карточек результатов предсказания
+RESULT_ICONS = {
+    "Металл": "Metal.png",
+    "Лиганд": "Ligand.png",
+    "Растворитель": "Solvent.png",
+    "m (соли), г": "SaltMass.png",
+    "m(кис-ты), г": "AcidMass.png",
+    "Vсин. (р-ля), мл": "Vsyn.png",
+    "Т.син., °С": "Tsyn.png",
+    "Т суш., °С": "Tdry.png",
+    "Tрег, ᵒС": "Treg.png",
+}
+
+# Иллюстрации страниц: файл -> максимальный размер варианта (px), примерно
+# вдвое больше ширины, в которой изображение показывается на странице
+PAGE_IMAGES = {
+    "logo.png": 640,
+    "MOF_Synthesis_Prediction.png": 900,
+    "1page.jpg": 1200,
+    "2page.jpg": 1200,
+}
+
+_MIME_TYPES = {'WEBP': 'image/webp', 'PNG': 'image/png', 'JPEG': 'image/jpeg'}
+_EXTENSIONS = {'WEBP': 'webp', 'PNG': 'png', 'JPEG': 'jpg'}
+
+_manifest_lock = threading.Lock()
+
+
+def _manifest_path() -> Path:
+    """Путь к манифесту собранных ресурсов."""
+    return Path(ASSETS_CONFIG['output_dir']) / 'manifest.json'
+
+
+def _load_manifest() -> Dict[str, Dict[str, str]]:
+    """Читает манифест собранных ресурсов."""
+    path = _manifest_path()
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        logger.warning(f"Манифест ресурсов поврежден и будет пересобран: {path}")
+        return {}
+
+
+def _save_manifest(manifest: Dict[str, Dict[str, str]]) -> None:
+    """Атомарно записывает манифест собранных ресурсов."""
+    path = _manifest_path()
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(manifest, indent=2, ensure_ascii=False, sort_keys=True), encoding='utf-8')
+    tmp_path.replace(path)
+
+
+def build_image_variant(
+    source: Union[str, Path],
+    max_size: int,
+    image_format: Optional[str] = None,
+    quality: Optional[int] = None
+) -> Optional[Path]:
+    """
+    Возвращает уменьшенный вариант изображения, собирая его при необходимости.
+
+    Args:
+        source: Исходное изображение
+        max_size: Максимальный размер большей стороны (px)
+        image_format: Формат варианта ('WEBP', 'PNG', 'JPEG'; по умолчанию из ASSETS_CONFIG)
+        quality: Качество сжатия (по умолчанию из ASSETS_CONFIG)
+
+    Returns:
+        Optional[Path]: Путь к варианту или None, если исходный файл недоступен
+    """
+    from PIL import Image
+
+    source = Path(source)
+    image_format = (image_format or ASSETS_CONFIG['image_format']).upper()
+    quality = quality or ASSETS_CONFIG['quality']
+    output_dir = Path(ASSETS_CONFIG['output_dir'])
+
+    try:
+        source_bytes = source.read_bytes()
+    except OSError:
+        logger.warning(f"Изображение не найдено: {source}")
+        return None
+    source_hash = hashlib.sha256(source_bytes).hexdigest()
+    key = f"{source.name}@{max_size}.{image_format}.q{quality}"
+
+    with _manifest_lock:
+        manifest = _load_manifest()
+        entry = manifest.get(key)
+        if entry and entry.get('source_sha256') == source_hash:
+            cached = output_dir / entry['file']
+            if cached.exists():
+                return cached
+
+        with Image.open(BytesIO(source_bytes)) as image:
+            image.load()
+            if image_format == 'JPEG':
+                image = image.convert('RGB')
+            elif image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA')
+            image.thumbnail((max_size, max_size), Image.LANCZOS)
+
+            buffer = BytesIO()
+            save_kwargs = {'optimize': True}
+            if image_format in ('WEBP', 'JPEG'):
+                save_kwargs['quality'] = quality
+            if image_format == 'WEBP':
+                save_kwargs['method'] = 6
+            image.save(buffer, format=image_format, **save_kwargs)
+
+        data = buffer.getvalue()
+        content_hash = hashlib.sha256(data).hexdigest()[:12]
+        file_name = f"{source.stem}-{max_size}.{content_hash}.{_EXTENSIONS[image_format]}"
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+        target = output_dir / file_name
+        if not target.exists():
+            target.write_bytes(data)
+
+        manifest[key] = {'source_sha256': source_hash, 'file': file_name}
+        _save_manifest(manifest)
+
+    logger.info(f"Собран вариант {file_name}: {len(source_bytes) // 1024} КБ -> {len(data) // 1024} КБ")
+    return target
+
+
+def static_serving_enabled() -> bool:
+    """Проверяет, включена ли раздача статических файлов Streamlit."""
+    try:
+        import streamlit as st
+        return bool(st.get_option('server.enableStaticServing'))
+    except Exception:
+        return False
+
+
+def image_src(path: Optional[Path]) -> str:
+    """
+    Формирует значение src для HTML-тега <img>.
+
+    Если включена статическая раздача Streamlit и файл лежит в STATIC_DIR,
+    возвращается URL (браузер кэширует его по имени с хэшем), иначе —
+    небольшой data URI.
+
+    Args:
+        path: Путь к собранному варианту изображения
+
+    Returns:
+        str: URL или data URI (пустая строка, если изображения нет)
+    """
+    if path is None:
+        return ''
+    path = Path(path)
+    if static_serving_enabled():
+        try:
+            return f"/app/static/{path.resolve().relative_to(Path(STATIC_DIR).resolve()).as_posix()}"
+        except ValueError:
+            pass
+    mime = _MIME_TYPES.get(path.suffix.lstrip('.').upper().replace('JPG', 'JPEG'), 'image/png')
+    return f"data:{mime};base64,{base64.b64encode(path.read_bytes()).decode()}"
+
+
+def build_result_icons(size: Optional[int] = None) -> Dict[str, Optional[Path]]:
+    """
+    Собирает иконки карточек результатов.
+
+    Args:
+        size: Размер иконок (по умолчанию из ASSETS_CONFIG)
+
+    Returns:
+        Dict[str, Optional[Path]]: {название параметра: путь к иконке}
+    """
+    size = size or ASSETS_CONFIG['icon_size']
+    images_dir = Path(ASSETS_CONFIG['images_dir'])
+    return {
+        name: build_image_variant(images_dir / file_name, size)
+        for name, file_name in RESULT_ICONS.items()
+    }
+
+
+@lru_cache(maxsize=None)
+def page_image(file_name: str) -> Optional[str]:
+    """
+    Возвращает источник иллюстрации страницы для st.image.
+
+    Вариант размера из PAGE_IMAGES собирается один раз на процесс.
+    Возвращается путь к уменьшенному варианту (если собрать его не удалось —
+    путь к исходному изображению), а не URL статической раздачи: относительные
+    URL st.image принимает не во всех поддерживаемых версиях Streamlit
+    (URL для HTML-тегов <img> формирует image_src).
+
+    Args:
+        file_name: Имя файла в каталоге изображений
+
+    Returns:
+        Optional[str]: Путь к файлу (None, если изображения нет)
+    """
+    source = Path(ASSETS_CONFIG['images_dir']) / file_name
+    try:
+        variant = build_image_variant(source, PAGE_IMAGES.get(file_name, 1200))
+    except Exception as e:
+        logger.warning(f"Не удалось подготовить вариант {file_name}: {str(e)}")
+        variant = None
+    if variant is None:
+        return str(source) if source.exists() else None
+    return str(variant)
+
+
+def build_all_assets() -> Dict[str, Optional[Path]]:
+    """
+    Собирает все графические ресурсы интерфейса.
+
+    Returns:
+        Dict[str, Optional[Path]]: Собранные варианты по ключам
+    """
+    built = {f"icon:{name}": path for name, path in build_result_icons().items()}
+    images_dir = Path(ASSETS_CONFIG['images_dir'])
+    for file_name, size in PAGE_IMAGES.items():
+        built[f"page:{file_name}"] = build_image_variant(images_dir / file_name, size)
+    return built
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    for asset_name, asset_path in build_all_assets().items():
+        print(f"{asset_name:<30} {asset_path}")
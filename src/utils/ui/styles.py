@@ -0,0 +1,122 @@
+"""
+Модуль сборки и подключения CSS-бандлов.
+
+Таблицы стилей из STATIC_DIR минифицируются и объединяются в бандлы
+с хэшем содержимого в имени (STATIC_DIR/assets/<бандл>.<хэш>.css).
+Бандл собирается один раз на процесс; при каждой перерисовке страницы
+в нее передается только тег <link> на неизменяемый файл (браузер берет его
+из кэша) или, если статическая раздача выключена, уже минифицированный
+текст из памяти — без повторного чтения файлов с диска.
+
+Сборка всех бандлов:
+    python -m src.utils.ui.styles
+"""
+
+import hashlib
+import logging
+import re
+from pathlib import Path
+from typing import Dict
+
+import streamlit as st
+
+from ...config.app_config import ASSETS_CONFIG, STATIC_DIR
+from .assets import static_serving_enabled
+
+logger = logging.getLogger(__name__)
+
+# Бандлы: имя -> таблицы стилей из STATIC_DIR в порядке подключения
+CSS_BUNDLES = {
+    'app': ('style.css', 'navigation.css'),
+    'theme': ('theme.css',),
+    'predict': ('predict.css',),
+}
+
+_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_SPACE_RE = re.compile(r'\s+')
+_PUNCT_RE = re.compile(r'\s*([{};,>])\s*')
+
+
+def minify_css(css: str) -> str:
+    """
+    Минифицирует CSS: удаляет комментарии и лишние пробелы.
+
+    Пробелы перед ':' сохраняются (в селекторах они значимы: 'a :hover').
+
+    Args:
+        css: Исходный текст стилей
+
+    Returns:
+        str: Минифицированный текст
+    """
+    css = _COMMENT_RE.sub('', css)
+    css = _SPACE_RE.sub(' ', css)
+    css = _PUNCT_RE.sub(r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+
+def build_css_bundle(name: str) -> Path:
+    """
+    Собирает бандл стилей и сохраняет его под именем с хэшем содержимого.
+
+    Args:
+        name: Имя бандла из CSS_BUNDLES
+
+    Returns:
+        Path: Путь к файлу бандла
+    """
+    parts = []
+    for file_name in CSS_BUNDLES[name]:
+        path = Path(STATIC_DIR) / file_name
+        try:
+            parts.append(minify_css(path.read_text(encoding='utf-8')))
+        except OSError:
+            logger.error(f"Файл стилей не найден: {path}")
+    css = '\n'.join(parts)
+
+    content_hash = hashlib.sha256(css.encode('utf-8')).hexdigest()[:12]
+    output_dir = Path(ASSETS_CONFIG['output_dir'])
+    output_dir.mkdir(parents=True, exist_ok=True)
+    target = output_dir / f"{name}.{content_hash}.css"
+    if not target.exists():
+        target.write_text(css, encoding='utf-8')
+        logger.info(f"Собран CSS-бандл {target.name} ({len(css) // 1024} КБ)")
+    return target
+
+
+@st.cache_resource(show_spinner=False)
+def _bundle_markup(name: str) -> str:
+    """Собирает бандл (один раз на процесс) и возвращает разметку для его подключения."""
+    path = build_css_bundle(name)
+    if static_serving_enabled():
+        href = f"/app/static/{path.resolve().relative_to(Path(STATIC_DIR).resolve()).as_posix()}"
+        return f'<link rel="stylesheet" href="{href}">'
+    return f"<style>{path.read_text(encoding='utf-8')}</style>"
+
+
+def inject_css_bundle(name: str) -> None:
+    """
+    Подключает бандл стилей на текущей странице.
+
+    Args:
+        name: Имя бандла из CSS_BUNDLES
+    """
+    st.markdown(_bundle_markup(name), unsafe_allow_html=True)
+
+
+def build_all_bundles() -> Dict[str, Path]:
+    """
+    Собирает все CSS-бандлы.
+
+    Returns:
+        Dict[str, Path]: {имя бандла: путь к файлу}
+    """
+    return {name: build_css_bundle(name) for name in CSS_BUNDLES}
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    for bundle_name, bundle_path in build_all_bundles().items():
+        print(f"{bundle_name:<10} {bundle_path}")